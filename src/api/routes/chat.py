@@ -2,9 +2,11 @@
 Chat-related API endpoints for FastAPI.
 MIGRATED TO PHASE 4 FACADE ARCHITECTURE
 """
+import json
 import logging
-from typing import Optional, Dict, Any, List
+from typing import AsyncIterator, Optional, Dict, Any, List
 from fastapi import APIRouter, Request, Depends, HTTPException, Body
+from fastapi.responses import StreamingResponse
 
 import os
 
@@ -101,6 +103,70 @@ async def chat_endpoint(
         logger.error(f"Error processing chat message: {str(e)}", exc_info=True)
         raise SecureErrorHandler.internal_server_error(e, get_request_id(request))
 
+def _format_sse(event: str, data: Dict[str, Any]) -> str:
+    """Format a payload as a Server-Sent Events message."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
+
+@router.post("/chat/stream", tags=["Chat"])
+async def chat_stream_endpoint(
+    message_request: ChatMessageRequest,
+    request: Request,
+    chatbot: Chatbot = Depends(get_chatbot)
+):
+    """
+    Process a chat message and stream the response as Server-Sent Events.
+
+    Emits a ``start`` event with the session information, ``delta`` events with
+    incremental response text, and a final ``done`` event carrying the complete
+    response once the session has been saved.
+
+    Args:
+        message_request: The chat message request containing the user message and session ID
+        request: The FastAPI request object
+        chatbot: The chatbot instance dependency
+
+    Returns:
+        StreamingResponse: An SSE stream of chat events
+    """
+    log_data = {
+        "message": message_request.message,
+        "session_id": message_request.session_id[:10] + "..." if message_request.session_id else None,
+        "language": message_request.language,
+        "client_ip": request.client.host if request.client else None,
+    }
+    logger.info(f"Chat stream request: {log_data}")
+
+    async def event_stream() -> AsyncIterator[str]:
+        events = chatbot.process_message_stream(
+            user_message=message_request.message,
+            session_id=message_request.session_id,
+            language=message_request.language
+        )
+        try:
+            async for event in events:
+                if await request.is_disconnected():
+                    logger.info("Chat stream client disconnected")
+                    break
+                yield _format_sse(event.pop("event"), event)
+        except Exception as e:
+            logger.error(f"Error streaming chat message: {str(e)}", exc_info=True)
+            yield _format_sse("error", {
+                "message": "Failed to process message",
+                "request_id": get_request_id(request)
+            })
+        finally:
+            # Closing the generator cancels any in-flight Anthropic stream
+            await events.aclose()
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no"  # Disable proxy buffering so deltas flush immediately
+        }
+    )
+
 @router.get("/suggestions", response_model=SuggestionsResponse)
 async def get_suggestions(
     request: Request,
@@ -202,6 +268,7 @@ async def chat_health_check(request: Request):
                     "db_connected": chatbot.db_manager.is_connected() if hasattr(chatbot, 'db_manager') else False
                 }
             },
+            "response_cache": chatbot.get_response_cache_stats(),
             "optimization": "Using singleton from app.state (no factory calls)"
         }
     except Exception as e:
@@ -4,6 +4,8 @@ Knowledge Base API Routes
 This module provides API routes for accessing the tourism knowledge base.
 MIGRATED TO PHASE 4 FACADE ARCHITECTURE
 """
+import asyncio
+import inspect
 from typing import Dict, List, Optional, Any
 from fastapi import APIRouter, Depends, HTTPException, Query, Request
 
@@ -11,6 +13,7 @@ from fastapi import APIRouter, Depends, HTTPException, Query, Request
 # REMOVED: from src.knowledge.factory import ComponentFactory  # Archived - using unified service provider
 from src.core.container import container
 from src.api.dependencies import get_optional_user
+from src.services.auth_service import get_current_admin_user
 # FIXED: get_optional_user returns Dict, not User object
 from src.utils.logger import get_logger
 
@@ -51,6 +54,19 @@ def get_knowledge_base(request: Request):
         logger.error(f"Error accessing knowledge base singleton: {e}")
         raise HTTPException(status_code=503, detail="Knowledge base service unavailable")
 
+async def call_kb(kb: Any, method_name: str, *args, **kwargs) -> Any:
+    """
+    Call a knowledge base method without blocking the event loop.
+
+    Uses the method's native async variant (``<method_name>_async``, backed by
+    the asyncio database pool) when the knowledge base has one, otherwise runs
+    the sync method in a worker thread.
+    """
+    async_method = getattr(kb, f"{method_name}_async", None)
+    if inspect.iscoroutinefunction(async_method):
+        return await async_method(*args, **kwargs)
+    return await asyncio.to_thread(getattr(kb, method_name), *args, **kwargs)
+
 def get_session_id(request: Request) -> str:
     """Extract session ID from cookies or generate a new one."""
     return request.cookies.get("session_id", "anonymous")
@@ -67,14 +83,14 @@ async def get_attraction(
     PHASE 4: Now using facade architecture.
     """
     try:
-        attraction = kb.get_attraction_by_id(int(attraction_id))
+        attraction = await call_kb(kb, "get_attraction_by_id", int(attraction_id))
         
         if not attraction:
             raise HTTPException(status_code=404, detail="Attraction not found")
         
         # Log the view for analytics
         session_id = get_session_id(request)
-        kb.log_view(
+        await call_kb(kb, "log_view",
             "attraction", 
             attraction_id, 
             attraction.get("name"), 
@@ -113,12 +129,12 @@ async def search_attractions(
         if type:
             filters['type'] = type
             
-        attractions = kb.search_attractions(query=name or "", filters=filters, language="en", limit=limit)
+        attractions = await call_kb(kb, "search_attractions", query=name or "", filters=filters, language="en", limit=limit)
         
         # Log the search for analytics
         session_id = get_session_id(request)
         search_filters = {k: v for k, v in {"name": name, "city_id": city_id, "type": type}.items() if v is not None}
-        kb.log_search(
+        await call_kb(kb, "log_search",
             name or "all attractions", 
             len(attractions), 
             search_filters, 
@@ -144,14 +160,14 @@ async def get_city(
     PHASE 4: Now using facade architecture.
     """
     try:
-        city = kb.lookup_location(city_id, "en")
+        city = await call_kb(kb, "lookup_location", city_id, "en")
         
         if not city:
             raise HTTPException(status_code=404, detail="City not found")
         
         # Log the view for analytics
         session_id = get_session_id(request)
-        kb.log_view(
+        await call_kb(kb, "log_view",
             "city", 
             city_id, 
             city.get("name"), 
@@ -186,12 +202,12 @@ async def search_cities(
             raise HTTPException(status_code=503, detail="Database service unavailable")
         
         db_manager = request.app.state.chatbot.db_manager
-        cities = db_manager.search_cities({"name": name} if name else {}, limit, offset)
+        cities = await asyncio.to_thread(db_manager.search_cities, {"name": name} if name else {}, limit, offset)
         
         # Log the search for analytics
         session_id = get_session_id(request)
         search_filters = {k: v for k, v in {"name": name}.items() if v is not None}
-        kb.log_search(
+        await call_kb(kb, "log_search",
             name or "all cities", 
             len(cities), 
             search_filters, 
@@ -217,14 +233,14 @@ async def get_hotel(
     PHASE 4: Now using facade architecture.
     """
     try:
-        hotel = kb.get_hotel_by_id(hotel_id)
+        hotel = await call_kb(kb, "get_hotel_by_id", hotel_id)
         
         if not hotel:
             raise HTTPException(status_code=404, detail="Hotel not found")
         
         # Log the view for analytics
         session_id = get_session_id(request)
-        kb.log_view(
+        await call_kb(kb, "log_view",
             "hotel", 
             hotel_id, 
             hotel.get("name"), 
@@ -263,12 +279,12 @@ async def search_hotels(
         if stars:
             filters['stars'] = stars
             
-        hotels = kb.search_hotels({"name": name} if name else filters, limit, "en")
+        hotels = await call_kb(kb, "search_hotels", {"name": name} if name else filters, limit, "en")
         
         # Log the search for analytics
         session_id = get_session_id(request)
         search_filters = {k: v for k, v in {"name": name, "city_id": city_id, "stars": stars}.items() if v is not None}
-        kb.log_search(
+        await call_kb(kb, "log_search",
             name or "all hotels", 
             len(hotels), 
             search_filters, 
@@ -294,14 +310,14 @@ async def get_restaurant(
     PHASE 4: Now using facade architecture.
     """
     try:
-        restaurant = kb.get_restaurant_by_id(restaurant_id)
+        restaurant = await call_kb(kb, "get_restaurant_by_id", restaurant_id)
         
         if not restaurant:
             raise HTTPException(status_code=404, detail="Restaurant not found")
         
         # Log the view for analytics
         session_id = get_session_id(request)
-        kb.log_view(
+        await call_kb(kb, "log_view",
             "restaurant", 
             restaurant_id, 
             restaurant.get("name"), 
@@ -340,12 +356,12 @@ async def search_restaurants(
         if cuisine:
             filters['cuisine'] = cuisine
             
-        restaurants = kb.search_restaurants({"name": name} if name else filters, limit, "en")
+        restaurants = await call_kb(kb, "search_restaurants", {"name": name} if name else filters, limit, "en")
         
         # Log the search for analytics
         session_id = get_session_id(request)
         search_filters = {k: v for k, v in {"name": name, "city_id": city_id, "cuisine": cuisine}.items() if v is not None}
-        kb.log_search(
+        await call_kb(kb, "log_search",
             name or "all restaurants", 
             len(restaurants), 
             search_filters, 
@@ -392,12 +408,12 @@ async def search_practical_info(
         if not query_dict:
             query_dict = filters
             
-        practical_info = kb.search_practical_info(query=query_dict, limit=limit, language="en")
+        practical_info = await call_kb(kb, "search_practical_info", query=query_dict, limit=limit, language="en")
         
         # Log the search for analytics
         session_id = get_session_id(request)
         search_filters = {k: v for k, v in {"category": category, "query": search_term}.items() if v is not None}
-        kb.log_search(
+        await call_kb(kb, "log_search",
             search_term or f"practical info - {category}", 
             len(practical_info), 
             search_filters, 
@@ -431,12 +447,12 @@ async def search_faqs(
         if category:
             filters['category'] = category
             
-        faqs = kb.search_faqs({"keyword": keyword} if keyword else filters, limit, "en")
+        faqs = await call_kb(kb, "search_faqs", {"keyword": keyword} if keyword else filters, limit, "en")
         
         # Log the search for analytics
         session_id = get_session_id(request)
         search_filters = {k: v for k, v in {"category": category, "keyword": keyword}.items() if v is not None}
-        kb.log_search(
+        await call_kb(kb, "log_search",
             keyword or f"faqs - {category}", 
             len(faqs), 
             search_filters, 
@@ -450,6 +466,27 @@ async def search_faqs(
         logger.error(f"Error searching FAQs: {e}")
         raise HTTPException(status_code=500, detail=f"Error searching FAQs: {str(e)}")
 
+@router.post("/entity-vectors/refresh", dependencies=[Depends(get_current_admin_user)])
+async def refresh_entity_vectors(request: Request):
+    """
+    Reload entity names from the knowledge base and refresh the NLU entity vectors.
+
+    Call after knowledge base content changes; only new entity names are embedded.
+    Requires admin privileges.
+    """
+    chatbot = getattr(request.app.state, 'chatbot', None)
+    nlu_engine = getattr(chatbot, 'nlu_engine', None)
+    if nlu_engine is None or not hasattr(nlu_engine, 'refresh_entity_vectors'):
+        raise HTTPException(status_code=503, detail="NLU engine with entity vectors unavailable")
+
+    try:
+        stats = await asyncio.to_thread(nlu_engine.refresh_entity_vectors)
+        logger.info(f"✅ Refreshed entity vectors for {', '.join(stats) or 'no languages'}")
+        return {"status": "refreshed", "languages": stats}
+    except Exception as e:
+        logger.error(f"Error refreshing entity vectors: {e}")
+        raise HTTPException(status_code=500, detail=f"Error refreshing entity vectors: {str(e)}")
+
 @router.get("/health")
 async def knowledge_health_check(request: Request):
     """
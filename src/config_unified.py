@@ -237,6 +237,26 @@ class UnifiedSettings(BaseSettings):
         description="Session expiry in seconds",
         env="SESSION_EXPIRY"
     )
+    session_max_messages: int = Field(
+        default=100,
+        description="Maximum number of messages kept per session (older messages are trimmed)",
+        env="SESSION_MAX_MESSAGES"
+    )
+    session_write_behind: bool = Field(
+        default=True,
+        description="Serve chat sessions from memory and flush changes to the session store in the background",
+        env="SESSION_WRITE_BEHIND"
+    )
+    session_flush_interval_ms: int = Field(
+        default=200,
+        description="Interval between background flushes of changed sessions, in milliseconds",
+        env="SESSION_FLUSH_INTERVAL_MS"
+    )
+    session_flush_batch_size: int = Field(
+        default=100,
+        description="Maximum number of sessions written per flush batch",
+        env="SESSION_FLUSH_BATCH_SIZE"
+    )
 
     # ============================================================================
     # SECURITY CONFIGURATION
@@ -307,6 +327,40 @@ class UnifiedSettings(BaseSettings):
         env="TRANSLATION_API_KEY"
     )
 
+    # ============================================================================
+    # LLM CLIENT CONFIGURATION
+    # ============================================================================
+    anthropic_timeout_seconds: float = Field(
+        default=30.0,
+        description="Per-call timeout for Anthropic API requests",
+        env="ANTHROPIC_TIMEOUT_SECONDS"
+    )
+    anthropic_max_connections: int = Field(
+        default=100,
+        description="Maximum connections in the shared async Anthropic HTTP pool",
+        env="ANTHROPIC_MAX_CONNECTIONS"
+    )
+    anthropic_max_keepalive_connections: int = Field(
+        default=20,
+        description="Maximum idle keep-alive connections in the shared async Anthropic HTTP pool",
+        env="ANTHROPIC_MAX_KEEPALIVE_CONNECTIONS"
+    )
+    response_cache_similarity_threshold: float = Field(
+        default=0.92,
+        description="Minimum cosine similarity for a semantic LLM response cache hit",
+        env="RESPONSE_CACHE_SIMILARITY_THRESHOLD"
+    )
+    response_cache_ttl: int = Field(
+        default=86400,
+        description="Time to live of cached LLM responses in seconds",
+        env="RESPONSE_CACHE_TTL"
+    )
+    response_cache_max_entries: int = Field(
+        default=1000,
+        description="Maximum cached LLM responses per language",
+        env="RESPONSE_CACHE_MAX_ENTRIES"
+    )
+
     # ============================================================================
     # FILE PATHS
     # ============================================================================
@@ -0,0 +1,353 @@
+"""
+Approximate nearest-neighbour index for in-process VectorDB collections.
+
+IVF-flat: normalized vectors are clustered with spherical k-means and stored
+in per-centroid inverted lists; a query scores only the ``nprobe`` lists whose
+centroids are closest to it. ``nprobe`` is the recall-vs-latency knob
+(``nprobe == nlist`` is exact). Inserts go to the nearest list, deletes are
+tombstones, and the index retrains itself once the collection has doubled
+or too many tombstones have accumulated.
+"""
+import logging
+import threading
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from src.knowledge.vector_collection import VectorCollection
+
+logger = logging.getLogger(__name__)
+
+
+class _InvertedList:
+    """Growable block of normalized vectors assigned to one centroid."""
+
+    def __init__(self, dimension: int, capacity: int = 16):
+        self.vectors = np.zeros((capacity, dimension), dtype=np.float32)
+        self.alive = np.zeros(capacity, dtype=bool)
+        self.ids: List[str] = []
+        self.size = 0
+
+    def append(self, item_id: str, vector: np.ndarray) -> int:
+        if self.size == self.vectors.shape[0]:
+            capacity = max(self.vectors.shape[0] * 2, 16)
+            vectors = np.zeros((capacity, self.vectors.shape[1]), dtype=np.float32)
+            alive = np.zeros(capacity, dtype=bool)
+            vectors[:self.size] = self.vectors[:self.size]
+            alive[:self.size] = self.alive[:self.size]
+            self.vectors, self.alive = vectors, alive
+        position = self.size
+        self.vectors[position] = vector
+        self.alive[position] = True
+        self.ids.append(item_id)
+        self.size += 1
+        return position
+
+
+class IVFFlatIndex:
+    """
+    Pure NumPy IVF-flat index over a VectorCollection.
+
+    The collection stays the source of truth (metadata, filters, exact
+    search); the index only narrows down which rows are scored.
+    """
+
+    def __init__(self, nlist: Optional[int] = None, nprobe: int = 8, min_train_size: int = 1000,
+                 kmeans_iterations: int = 10, max_tombstone_ratio: float = 0.2, seed: int = 42):
+        """
+        Initialize an untrained index.
+
+        Args:
+            nlist: Number of centroids (defaults to ~sqrt(n) at training time)
+            nprobe: Number of closest lists scored per query
+            min_train_size: Collections smaller than this are searched exactly
+            kmeans_iterations: Lloyd iterations used for training
+            max_tombstone_ratio: Share of dead entries that triggers a retrain
+            seed: Random seed for centroid initialization and sampling
+        """
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.min_train_size = min_train_size
+        self.kmeans_iterations = kmeans_iterations
+        self.max_tombstone_ratio = max_tombstone_ratio
+        self.seed = seed
+
+        self.centroids: Optional[np.ndarray] = None
+        self.lists: List[_InvertedList] = []
+        self._location: Dict[str, Tuple[int, int]] = {}
+        self.tombstones = 0
+        self.trained_size = 0
+        self._lock = threading.RLock()
+
+    @property
+    def is_trained(self) -> bool:
+        return self.centroids is not None
+
+    def __len__(self) -> int:
+        return len(self._location)
+
+    # ------------------------------------------------------------------
+    # Training
+    # ------------------------------------------------------------------
+
+    def _kmeans(self, data: np.ndarray, nlist: int) -> np.ndarray:
+        rng = np.random.default_rng(self.seed)
+        centroids = data[rng.choice(data.shape[0], nlist, replace=False)].copy()
+        for _ in range(self.kmeans_iterations):
+            assignment = np.argmax(data @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignment, data)
+            counts = np.bincount(assignment, minlength=nlist)
+            empty = counts == 0
+            if empty.any():
+                # Re-seed empty clusters with random points
+                sums[empty] = data[rng.choice(data.shape[0], int(empty.sum()), replace=False)]
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            norms[norms == 0] = 1.0
+            centroids = (sums / norms).astype(np.float32)
+        return centroids
+
+    def train(self, collection: VectorCollection) -> bool:
+        """
+        (Re)build the index from a collection's current rows.
+
+        Args:
+            collection: Collection to index
+
+        Returns:
+            bool: Whether an index was built (False if the collection is too small)
+        """
+        ids, _, matrix, _ = collection.snapshot()
+        with self._lock:
+            if len(ids) < self.min_train_size:
+                self.centroids = None
+                self.lists = []
+                self._location = {}
+                self.tombstones = 0
+                self.trained_size = 0
+                return False
+
+            nlist = self.nlist or max(1, int(np.sqrt(len(ids))))
+            nlist = min(nlist, len(ids))
+            rng = np.random.default_rng(self.seed)
+            sample_size = min(len(ids), nlist * 256)
+            sample = matrix[rng.choice(len(ids), sample_size, replace=False)] if sample_size < len(ids) else matrix
+
+            self.centroids = self._kmeans(sample, nlist)
+            self.lists = [_InvertedList(matrix.shape[1]) for _ in range(nlist)]
+            self._location = {}
+            self.tombstones = 0
+
+            assignment = np.argmax(matrix @ self.centroids.T, axis=1)
+            for row, list_no in enumerate(assignment):
+                position = self.lists[list_no].append(ids[row], matrix[row])
+                self._location[ids[row]] = (int(list_no), position)
+
+            self.trained_size = len(ids)
+            logger.info(f"Trained IVF index: {len(ids)} vectors in {nlist} lists")
+            return True
+
+    def needs_rebuild(self, collection_size: int) -> bool:
+        """Whether the index should be retrained for the current collection size."""
+        with self._lock:
+            if not self.is_trained:
+                return collection_size >= self.min_train_size
+            total = len(self._location) + self.tombstones
+            return (collection_size >= 2 * self.trained_size
+                    or (total and self.tombstones / total > self.max_tombstone_ratio))
+
+    # ------------------------------------------------------------------
+    # Incremental updates
+    # ------------------------------------------------------------------
+
+    def add(self, item_id: str, normalized_vector: np.ndarray) -> None:
+        """
+        Insert or replace one normalized vector.
+
+        Args:
+            item_id: Item identifier
+            normalized_vector: L2-normalized vector (a collection row)
+        """
+        with self._lock:
+            if not self.is_trained:
+                return
+            self.remove(item_id)
+            list_no = int(np.argmax(self.centroids @ normalized_vector))
+            position = self.lists[list_no].append(item_id, normalized_vector)
+            self._location[item_id] = (list_no, position)
+
+    def remove(self, item_id: str) -> bool:
+        """
+        Tombstone one item.
+
+        Returns:
+            bool: Whether the item was indexed
+        """
+        with self._lock:
+            location = self._location.pop(item_id, None)
+            if location is None:
+                return False
+            list_no, position = location
+            self.lists[list_no].alive[position] = False
+            self.tombstones += 1
+            return True
+
+    def sync(self, collection: VectorCollection, item_ids: Set[str]) -> None:
+        """
+        Bring specific items in line with the collection (re-add present ones, tombstone missing ones).
+
+        Args:
+            collection: Source collection
+            item_ids: Items that may have changed
+        """
+        for item_id in item_ids:
+            # Copy the row under the collection lock; index the copy after releasing it,
+            # so the lock order never inverts the one taken by search()
+            with collection._lock:
+                row = collection._row_of.get(item_id)
+                vector = collection.matrix[row].copy() if row is not None else None
+            if vector is not None:
+                self.add(item_id, vector)
+            else:
+                self.remove(item_id)
+
+    # ------------------------------------------------------------------
+    # Search
+    # ------------------------------------------------------------------
+
+    def search(self, collection: VectorCollection, query_vector: Any, limit: int = 10,
+               filters: Optional[Dict] = None, nprobe: Optional[int] = None) -> List[Tuple[str, float]]:
+        """
+        Approximate cosine-similarity top-k search.
+
+        Falls back to the collection's exact search while the index is untrained.
+
+        Args:
+            collection: Collection the index was built from (used for filters)
+            query_vector: Query embedding
+            limit: Maximum number of results
+            filters: Optional metadata equality filters; filtered queries use the
+                collection's exact masked search, since a selective filter can leave
+                fewer than ``limit`` matches in the probed lists
+            nprobe: Lists to probe for this query (defaults to the index setting)
+
+        Returns:
+            list: (item_id, similarity) tuples sorted by descending similarity
+        """
+        if filters:
+            return collection.search(query_vector, limit=limit, filters=filters)
+
+        with self._lock:
+            if not self.is_trained:
+                return collection.search(query_vector, limit=limit, filters=filters)
+            if limit <= 0:
+                return []
+
+            query = np.asarray(query_vector, dtype=np.float32).ravel()
+            if query.shape[0] != self.centroids.shape[1]:
+                raise ValueError(
+                    f"Query dimension {query.shape[0]} does not match index dimension {self.centroids.shape[1]}"
+                )
+            query_norm = np.linalg.norm(query)
+            if query_norm == 0:
+                return collection.search(query_vector, limit=limit, filters=filters)
+            query = query / query_norm
+
+            nprobe = min(nprobe or self.nprobe, len(self.lists))
+            centroid_scores = self.centroids @ query
+            if nprobe < len(self.lists):
+                probe = np.argpartition(-centroid_scores, nprobe - 1)[:nprobe]
+            else:
+                probe = np.arange(len(self.lists))
+
+            candidate_ids: List[str] = []
+            candidate_scores: List[np.ndarray] = []
+            for list_no in probe:
+                inverted = self.lists[list_no]
+                if inverted.size == 0:
+                    continue
+                positions = np.flatnonzero(inverted.alive[:inverted.size])
+                if positions.size == 0:
+                    continue
+                ids = [inverted.ids[p] for p in positions]
+                scores = inverted.vectors[positions] @ query
+                candidate_ids.extend(ids)
+                candidate_scores.append(scores)
+
+            if not candidate_ids:
+                return []
+
+            scores = np.concatenate(candidate_scores)
+            k = min(limit, scores.shape[0])
+            if k < scores.shape[0]:
+                top = np.argpartition(-scores, k - 1)[:k]
+            else:
+                top = np.arange(scores.shape[0])
+            top = top[np.argsort(-scores[top], kind="stable")]
+            return [(candidate_ids[i], float(scores[i])) for i in top]
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        """
+        Serialize the live entries of a trained index (tombstones are dropped).
+
+        Returns:
+            dict: Arrays suitable for np.savez
+        """
+        with self._lock:
+            if not self.is_trained:
+                return {}
+            ids, vectors, list_numbers = [], [], []
+            for list_no, inverted in enumerate(self.lists):
+                positions = np.flatnonzero(inverted.alive[:inverted.size])
+                ids.extend(inverted.ids[p] for p in positions)
+                vectors.append(inverted.vectors[positions])
+                list_numbers.append(np.full(positions.size, list_no, dtype=np.int32))
+            return {
+                "centroids": self.centroids,
+                "ids": np.array(ids, dtype=object).astype(str),
+                "vectors": np.concatenate(vectors) if vectors else np.zeros((0, self.centroids.shape[1]), np.float32),
+                "lists": np.concatenate(list_numbers) if list_numbers else np.zeros(0, np.int32),
+                "trained_size": np.array(self.trained_size)
+            }
+
+    def load_arrays(self, arrays: Dict[str, np.ndarray]) -> None:
+        """
+        Restore an index serialized with to_arrays().
+
+        Args:
+            arrays: Mapping of array name to array
+        """
+        with self._lock:
+            self.centroids = np.asarray(arrays["centroids"], dtype=np.float32)
+            dimension = self.centroids.shape[1]
+            self.lists = [_InvertedList(dimension) for _ in range(self.centroids.shape[0])]
+            self._location = {}
+            self.tombstones = 0
+            for item_id, vector, list_no in zip(arrays["ids"].tolist(), arrays["vectors"], arrays["lists"]):
+                position = self.lists[int(list_no)].append(item_id, vector)
+                self._location[item_id] = (int(list_no), position)
+            self.trained_size = int(arrays["trained_size"])
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get index statistics.
+
+        Returns:
+            Dictionary with list sizes and tombstone counts
+        """
+        with self._lock:
+            sizes = [inverted.size for inverted in self.lists]
+            return {
+                "type": "ivf_flat",
+                "trained": self.is_trained,
+                "nlist": len(self.lists),
+                "nprobe": self.nprobe,
+                "indexed_vectors": len(self._location),
+                "tombstones": self.tombstones,
+                "trained_size": self.trained_size,
+                "max_list_size": max(sizes) if sizes else 0
+            }
@@ -0,0 +1,363 @@
+"""
+Async Connection Manager for the Egypt Tourism Chatbot.
+
+asyncio counterpart of ConnectionManager for use from async request handlers.
+Queries run on a psycopg 3 ``AsyncConnectionPool``, so waiting on PostgreSQL
+never blocks the event loop. The API mirrors ConnectionManager (same ``%s``
+placeholders, dict rows, rowcount for writes, None on error) and adds
+transactions and pgvector type registration.
+
+When psycopg 3 is not installed, queries run on a synchronous
+ConnectionManager in a worker thread instead.
+"""
+
+import asyncio
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# psycopg 3 with its pool package (optional)
+try:
+    from psycopg.rows import dict_row
+    from psycopg_pool import AsyncConnectionPool
+    PSYCOPG_ASYNC_AVAILABLE = True
+except ImportError:
+    PSYCOPG_ASYNC_AVAILABLE = False
+
+# pgvector adapters for psycopg 3 (optional)
+try:
+    from pgvector.psycopg import register_vector_async
+    PGVECTOR_AVAILABLE = True
+except ImportError:
+    PGVECTOR_AVAILABLE = False
+
+
+class AsyncConnectionManager:
+    """
+    Manages an asyncio PostgreSQL connection pool with the ConnectionManager API.
+
+    Connections run in autocommit mode with a server-side statement timeout;
+    use ``transaction()`` for multi-statement units of work.
+    """
+
+    def __init__(self, database_uri: str = None, sync_manager: Any = None):
+        """
+        Initialize the async connection manager. The pool is opened on first use.
+
+        Args:
+            database_uri: PostgreSQL database connection string
+            sync_manager: ConnectionManager to run queries on in a worker thread
+                when psycopg 3 is not installed
+        """
+        self.database_uri = database_uri or os.environ.get("POSTGRES_URI")
+        self.sync_manager = sync_manager
+        self.pg_pool = None
+        self._init_lock: Optional[asyncio.Lock] = None
+        self._init_failed_at = 0.0
+
+        # Same timeouts as ConnectionManager: pool acquisition and per statement
+        self.operation_timeout = 2 if os.environ.get('TESTING') == 'true' else 10
+        self.statement_timeout_ms = int(os.environ.get(
+            "PG_STATEMENT_TIMEOUT_MS", str(self.operation_timeout * 1000)))
+        self.vector_enabled = False
+
+        # Initialize connection pool metrics
+        self.pool_metrics = {
+            "acquisition_times": [],
+            "query_count": 0,
+            "error_count": 0,
+            "last_metrics_time": time.time()
+        }
+
+        if not PSYCOPG_ASYNC_AVAILABLE:
+            logger.warning("⚠️ psycopg 3 not installed - async queries will run in a worker thread")
+
+    @property
+    def is_native(self) -> bool:
+        """Whether queries run on the asyncio pool (rather than in a worker thread)."""
+        return PSYCOPG_ASYNC_AVAILABLE and self.pg_pool is not None
+
+    async def initialize_connection_pool(self) -> bool:
+        """
+        Open the asyncio connection pool.
+
+        Returns:
+            True if the pool is open, False otherwise
+        """
+        if self.pg_pool is not None:
+            return True
+        if not PSYCOPG_ASYNC_AVAILABLE or not self.database_uri:
+            return False
+
+        # Don't retry a failed pool open on every query
+        if time.time() - self._init_failed_at < 30:
+            return False
+
+        if self._init_lock is None:
+            self._init_lock = asyncio.Lock()
+
+        async with self._init_lock:
+            if self.pg_pool is not None:
+                return True
+
+            min_conn = int(os.environ.get("PG_MIN_CONNECTIONS", "2"))
+            max_conn = int(os.environ.get("PG_MAX_CONNECTIONS", "20"))
+
+            # Use smaller pool for tests
+            if os.environ.get('TESTING') == 'true':
+                min_conn = 1
+                max_conn = 3
+
+            logger.info(f"Creating async PostgreSQL connection pool (min={min_conn}, max={max_conn}, "
+                        f"statement_timeout={self.statement_timeout_ms}ms)...")
+
+            pool = AsyncConnectionPool(
+                conninfo=self.database_uri,
+                min_size=min_conn,
+                max_size=max_conn,
+                timeout=self.operation_timeout,
+                kwargs={
+                    "autocommit": True,
+                    "row_factory": dict_row,
+                    "connect_timeout": 5,
+                    "keepalives": 1,
+                    "keepalives_idle": 60,
+                    "keepalives_interval": 10,
+                    "keepalives_count": 3,
+                    "options": f"-c statement_timeout={self.statement_timeout_ms}"
+                },
+                configure=self._configure_connection,
+                open=False
+            )
+
+            try:
+                await pool.open(wait=True, timeout=self.operation_timeout)
+                self.pg_pool = pool
+                logger.info("✅ Async PostgreSQL connection pool initialized successfully")
+                return True
+            except Exception as e:
+                logger.error(f"Failed to initialize async PostgreSQL connection pool: {str(e)}")
+                self._init_failed_at = time.time()
+                try:
+                    await pool.close()
+                except Exception:
+                    pass
+                return False
+
+    async def _configure_connection(self, conn) -> None:
+        """Register pgvector types on each new pooled connection."""
+        if not PGVECTOR_AVAILABLE:
+            return
+        try:
+            await register_vector_async(conn)
+            self.vector_enabled = True
+        except Exception as e:
+            # The vector extension is not installed in this database
+            logger.debug(f"pgvector types not registered: {e}")
+
+    @asynccontextmanager
+    async def connection(self) -> AsyncIterator[Any]:
+        """
+        Acquire a pooled connection, tracking acquisition time.
+
+        Yields:
+            psycopg AsyncConnection
+
+        Raises:
+            RuntimeError: If no async pool is available
+        """
+        if not await self.initialize_connection_pool():
+            raise RuntimeError("No async PostgreSQL connection pool available")
+
+        start_time = time.time()
+        async with self.pg_pool.connection() as conn:
+            acquisition_time_ms = (time.time() - start_time) * 1000
+            self.pool_metrics["acquisition_times"].append(acquisition_time_ms)
+
+            # Log slow connection acquisitions
+            if acquisition_time_ms > 100:  # More than 100ms is slow
+                logger.warning(f"Slow async connection acquisition: {acquisition_time_ms:.2f}ms")
+
+            self._record_pool_metrics()
+            yield conn
+
+    @asynccontextmanager
+    async def transaction(self) -> AsyncIterator[Any]:
+        """
+        Run several statements in one transaction (committed on exit, rolled back on error).
+
+        Yields:
+            psycopg AsyncConnection inside an open transaction
+
+        Raises:
+            RuntimeError: If no async pool is available
+        """
+        async with self.connection() as conn:
+            async with conn.transaction():
+                yield conn
+
+    async def execute_query_async(self, query: str, params: tuple = None, fetchall: bool = True):
+        """
+        Execute a query using a connection from the async pool.
+
+        Args:
+            query: SQL query to execute
+            params: Query parameters
+            fetchall: Whether to fetch all results or just one
+
+        Returns:
+            List of dict rows (or one dict row) for SELECT queries,
+            rowcount for INSERT/UPDATE/DELETE, None if an error occurred
+        """
+        if not await self.initialize_connection_pool():
+            if self.sync_manager is not None:
+                return await asyncio.to_thread(self.sync_manager.execute_query, query, params, fetchall)
+            logger.error("No connection pool available for async query execution")
+            return None
+
+        start_time = time.time()
+        try:
+            async with self.connection() as conn:
+                cursor = await conn.execute(query, params)
+                if cursor.description:  # SELECT query
+                    if fetchall:
+                        return await cursor.fetchall()
+                    return await cursor.fetchone()
+                return cursor.rowcount  # INSERT/UPDATE/DELETE (autocommit)
+
+        except Exception as e:
+            logger.error(f"Error executing async query: {str(e)}")
+            logger.debug(f"Query: {query}")
+            logger.debug(f"Params: {params}")
+            self.pool_metrics["error_count"] += 1
+            return None
+
+        finally:
+            execution_time_ms = (time.time() - start_time) * 1000
+            self.pool_metrics["query_count"] += 1
+
+            # Log slow queries
+            if execution_time_ms > 100:  # More than 100ms is slow
+                logger.warning(f"Slow async query execution: {execution_time_ms:.2f}ms")
+                logger.warning(f"Query: {query[:100]}...")
+
+    async def fetch_one(self, query: str, params: tuple = None) -> Optional[Dict[str, Any]]:
+        """
+        Execute a query and return its first row.
+
+        Returns:
+            Row as a dict, or None if there is no row or an error occurred
+        """
+        return await self.execute_query_async(query, params, fetchall=False)
+
+    async def fetch_all(self, query: str, params: tuple = None) -> List[Dict[str, Any]]:
+        """
+        Execute a query and return all rows.
+
+        Returns:
+            List of dict rows (empty if an error occurred)
+        """
+        return await self.execute_query_async(query, params, fetchall=True) or []
+
+    def _record_pool_metrics(self):
+        """Record connection pool metrics periodically."""
+        # Only record metrics every 5 minutes
+        current_time = time.time()
+        if current_time - self.pool_metrics["last_metrics_time"] < 300:  # 5 minutes
+            return
+
+        try:
+            stats = self.pg_pool.get_stats()
+
+            # Calculate average acquisition time
+            avg_acquisition_time = 0
+            if self.pool_metrics["acquisition_times"]:
+                avg_acquisition_time = sum(self.pool_metrics["acquisition_times"]) / len(self.pool_metrics["acquisition_times"])
+
+            logger.info(f"Async pool metrics - Size: {stats.get('pool_size', 0)}, "
+                        f"Available: {stats.get('pool_available', 0)}, "
+                        f"Waiting: {stats.get('requests_waiting', 0)}, "
+                        f"Avg acquisition: {avg_acquisition_time:.2f}ms, "
+                        f"Queries: {self.pool_metrics['query_count']}, "
+                        f"Errors: {self.pool_metrics['error_count']}")
+
+            # Reset metrics
+            self.pool_metrics = {
+                "acquisition_times": [],
+                "query_count": 0,
+                "error_count": 0,
+                "last_metrics_time": current_time
+            }
+
+        except Exception as e:
+            logger.error(f"Error recording async pool metrics: {e}")
+
+    async def is_connected(self) -> bool:
+        """
+        Check if the async pool is open and working.
+
+        Returns:
+            True if connected, False otherwise
+        """
+        if not self.is_native:
+            if self.sync_manager is not None:
+                return await asyncio.to_thread(self.sync_manager.is_connected)
+            return False
+        try:
+            result = await self.fetch_one("SELECT 1 AS ok")
+            return bool(result and result.get("ok") == 1)
+        except Exception as e:
+            logger.error(f"Async connection test failed: {str(e)}")
+            return False
+
+    def get_pool_status(self) -> Dict[str, Any]:
+        """
+        Get current async connection pool status.
+
+        Returns:
+            Dictionary with pool status information
+        """
+        if not self.is_native:
+            return {"status": "thread_fallback" if self.sync_manager is not None else "not_initialized"}
+
+        try:
+            stats = self.pg_pool.get_stats()
+            return {
+                "status": "active",
+                "min_connections": self.pg_pool.min_size,
+                "max_connections": self.pg_pool.max_size,
+                "used_connections": stats.get("pool_size", 0) - stats.get("pool_available", 0),
+                "available_connections": stats.get("pool_available", 0),
+                "requests_waiting": stats.get("requests_waiting", 0),
+                "statement_timeout_ms": self.statement_timeout_ms,
+                "vector_enabled": self.vector_enabled,
+                "total_queries": self.pool_metrics["query_count"],
+                "total_errors": self.pool_metrics["error_count"]
+            }
+        except Exception as e:
+            logger.error(f"Error getting async pool status: {str(e)}")
+            return {"status": "error", "error": str(e)}
+
+    async def close(self):
+        """Close the async connection pool."""
+        try:
+            if self.pg_pool is not None:
+                await self.pg_pool.close()
+                self.pg_pool = None
+                logger.info("Closed async PostgreSQL connection pool")
+        except Exception as e:
+            logger.error(f"Error closing async PostgreSQL connection pool: {e}")
+
+    async def __aenter__(self):
+        """Support async context manager pattern."""
+        await self.initialize_connection_pool()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        """Close the pool when exiting the context manager."""
+        await self.close()
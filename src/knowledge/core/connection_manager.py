@@ -11,11 +11,12 @@ import time
 import uuid
 import threading
 import logging
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Hashable, List, Optional, Tuple
 import psycopg2
 from psycopg2 import pool
 from psycopg2.extras import RealDictCursor
 
+from src.knowledge.core.statement_registry import StatementRegistry
 from src.utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -51,6 +52,10 @@ class ConnectionManager:
             "last_metrics_time": time.time()
         }
         
+        # Server-side prepared statements for hot query shapes (see execute_prepared);
+        # PG_PREPARED_STATEMENTS=false turns them off
+        self.statement_registry = StatementRegistry()
+        
         logger.debug(f"ConnectionManager initialized with URI: {self._mask_uri(self.database_uri)}")
         
         # Initialize the connection pool
@@ -289,6 +294,55 @@ class ConnectionManager:
             if conn:
                 self.return_connection(conn)
     
+    def execute_prepared(self, shape: Tuple[Hashable, ...], query: str,
+                         params: tuple = None) -> Optional[List[Dict[str, Any]]]:
+        """
+        Execute a SELECT as a server-side prepared statement keyed by query shape.
+        
+        The first call of a shape on a pooled connection prepares it; later
+        calls on that connection skip parsing and planning. Queries that
+        cannot be prepared, or that fail, run through execute_query instead.
+        
+        Args:
+            shape: Query shape, e.g. ("find", table, filter columns, order by);
+                the same shape must always produce the same SQL
+            query: SQL query to execute (%s placeholders)
+            params: Query parameters
+            
+        Returns:
+            List of result dicts or None if error occurred
+        """
+        if not self.pg_pool or not self.statement_registry.enabled:
+            return self.execute_query(query, params, fetchall=True)
+        
+        conn = self.get_connection()
+        if not conn:
+            logger.error("Failed to get connection for prepared query execution")
+            return None
+        
+        start_time = time.time()
+        try:
+            with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+                if not self.statement_registry.execute(cursor, shape, query, params):
+                    cursor.execute(query, params)
+                results = [dict(row) for row in cursor.fetchall()]
+            
+            duration_ms = (time.time() - start_time) * 1000
+            self.pool_metrics["query_count"] += 1
+            self.statement_registry.analyzer.record_query(query, params, duration_ms, len(results))
+            return results
+        
+        except Exception as e:
+            logger.warning(f"Prepared query failed, retrying unprepared: {str(e)}")
+            self.statement_registry.reset_connection(conn)
+            self.return_connection(conn)
+            conn = None
+            return self.execute_query(query, params, fetchall=True)
+        
+        finally:
+            if conn:
+                self.return_connection(conn)
+    
     def execute_postgres_query(self, query: str, params: tuple = None, 
                               fetchall: bool = True, cursor_factory=None):
         """
@@ -387,7 +441,8 @@ class ConnectionManager:
                 "used_connections": len(self.pg_pool._used) if hasattr(self.pg_pool, "_used") else 0,
                 "available_connections": len(self.pg_pool._pool) if hasattr(self.pg_pool, "_pool") else 0,
                 "total_queries": self.pool_metrics["query_count"],
-                "total_errors": self.pool_metrics["error_count"]
+                "total_errors": self.pool_metrics["error_count"],
+                "prepared_statements": self.statement_registry.get_stats()
             }
         except Exception as e:
             logger.error(f"Error getting pool status: {str(e)}")
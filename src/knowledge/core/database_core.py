@@ -8,7 +8,7 @@ full compatibility with the existing god object.
 """
 
 import json
-from typing import Any, Dict, List, Optional, Tuple, Union
+from typing import Any, Dict, Hashable, List, Optional, Tuple, Union
 from src.utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -55,6 +55,31 @@ class DatabaseCore:
             logger.debug(f"Query: {query}, Params: {params}")
             raise
     
+    def execute_prepared(self, shape: Tuple[Hashable, ...], query: str, params: tuple = ()) -> List[Dict[str, Any]]:
+        """
+        Execute a SELECT as a prepared statement keyed by query shape.
+        
+        Falls back to execute_query when the database manager does not
+        support prepared statements.
+        
+        Args:
+            shape: Query shape, e.g. ("find", table, filter columns, order by)
+            query: SQL query string
+            params: Query parameters
+            
+        Returns:
+            Query results as list of dicts
+        """
+        execute_prepared = getattr(self._db_manager, 'execute_prepared', None)
+        if not callable(execute_prepared):
+            return self.execute_query(query, params)
+        try:
+            return execute_prepared(shape, query, params)
+        except Exception as e:
+            logger.error(f"Error executing prepared query: {str(e)}")
+            logger.debug(f"Query: {query}, Params: {params}")
+            raise
+    
     def get_connection(self):
         """
         Get a database connection from the pool.
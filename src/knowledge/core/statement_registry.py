@@ -0,0 +1,193 @@
+"""
+Prepared Statement Registry for the Egypt Tourism Chatbot.
+
+Hot repository queries are built from a small number of shapes (table, filter
+columns, ordering). This registry gives each shape a server-side prepared
+statement on every connection it runs on, so PostgreSQL parses and plans the
+shape once per connection instead of on every call. Hits and misses are
+reported to QueryAnalyzer.
+
+Prepared statements belong to a database session, so they are tracked per
+backend process ID; any error resets the connection's statements
+(``DEALLOCATE ALL``) and the caller runs the query unprepared.
+"""
+
+import hashlib
+import os
+import re
+import threading
+from typing import Any, Dict, Hashable, Optional, Set, Tuple
+
+from src.utils.logger import get_logger
+from src.utils.query_analyzer import QueryAnalyzer, query_analyzer as shared_query_analyzer
+
+logger = get_logger(__name__)
+
+# %% (literal percent) or %s (positional parameter); named %(x)s parameters cannot be prepared
+_PLACEHOLDER_RE = re.compile(r"%%|%s|%\(")
+
+
+def prepared_statements_enabled() -> bool:
+    """
+    Whether server-side prepared statements are enabled (``PG_PREPARED_STATEMENTS``, default true).
+
+    Turn them off where a client session is not pinned to one backend, e.g.
+    behind PgBouncer in transaction pooling mode.
+    """
+    return os.environ.get("PG_PREPARED_STATEMENTS", "true").lower() == "true"
+
+
+def shape_label(shape: Tuple[Hashable, ...]) -> str:
+    """Readable label for a query shape, used in metrics."""
+    return ":".join(",".join(map(str, part)) if isinstance(part, (tuple, list)) else str(part) for part in shape)
+
+
+def to_positional(query: str) -> Optional[Tuple[str, int]]:
+    """
+    Convert a psycopg2 ``%s`` query to PostgreSQL ``$n`` parameters.
+
+    Args:
+        query: SQL using %s placeholders
+
+    Returns:
+        (converted SQL, parameter count), or None if the query uses named parameters
+    """
+    count = 0
+    parts = []
+    position = 0
+    for match in _PLACEHOLDER_RE.finditer(query):
+        parts.append(query[position:match.start()])
+        token = match.group()
+        if token == "%(":
+            return None
+        if token == "%%":
+            parts.append("%")
+        else:
+            count += 1
+            parts.append(f"${count}")
+        position = match.end()
+    parts.append(query[position:])
+    return "".join(parts), count
+
+
+class StatementRegistry:
+    """
+    Maps query shapes to server-side prepared statements per connection.
+    """
+
+    def __init__(self, max_statements: int = 256, analyzer: Optional[QueryAnalyzer] = None,
+                 enabled: Optional[bool] = None):
+        """
+        Initialize the statement registry.
+
+        Args:
+            max_statements: Maximum number of distinct shapes to prepare;
+                further shapes run unprepared
+            analyzer: QueryAnalyzer receiving hit/miss metrics (defaults to the shared analyzer)
+            enabled: Whether to prepare statements at all (defaults to ``PG_PREPARED_STATEMENTS``)
+        """
+        self.max_statements = max_statements
+        self.analyzer = analyzer or shared_query_analyzer
+        self.enabled = prepared_statements_enabled() if enabled is None else enabled
+
+        # (shape, query) -> (statement name, PREPARE SQL, parameter count); None if not preparable
+        self._statements: Dict[Tuple[Tuple[Hashable, ...], str], Optional[Tuple[str, str, int]]] = {}
+        # backend PID -> names prepared on that session
+        self._prepared: Dict[int, Set[str]] = {}
+        self._lock = threading.Lock()
+
+    def _statement_for(self, shape: Tuple[Hashable, ...], query: str) -> Optional[Tuple[str, str, int]]:
+        key = (shape, query)
+        with self._lock:
+            if key in self._statements:
+                return self._statements[key]
+            if len(self._statements) >= self.max_statements:
+                return None
+
+            converted = to_positional(query)
+            statement = None
+            if converted is not None:
+                sql, param_count = converted
+                digest = hashlib.sha1(f"{shape!r}|{query}".encode("utf-8")).hexdigest()[:16]
+                name = f"stmt_{digest}"
+                statement = (name, f"PREPARE {name} AS {sql}", param_count)
+            self._statements[key] = statement
+            return statement
+
+    def execute(self, cursor, shape: Tuple[Hashable, ...], query: str, params: Optional[tuple] = None) -> bool:
+        """
+        Execute a query on ``cursor`` through the shape's prepared statement.
+
+        Args:
+            cursor: psycopg2 cursor on the connection to use
+            shape: Query shape, e.g. ("find", table, filter columns, order by)
+            query: SQL using %s placeholders (must be the same for a given shape)
+            params: Query parameters
+
+        Returns:
+            True if the query was executed; False if it cannot be prepared and
+            the caller should execute it directly
+        """
+        if not self.enabled:
+            return False
+
+        statement = self._statement_for(shape, query)
+        params = tuple(params or ())
+        if statement is None or statement[2] != len(params):
+            self.analyzer.record_statement(shape_label(shape), None)
+            return False
+
+        name, prepare_sql, param_count = statement
+        pid = cursor.connection.get_backend_pid()
+        with self._lock:
+            prepared = name in self._prepared.get(pid, ())
+
+        if not prepared:
+            cursor.execute(prepare_sql)
+            with self._lock:
+                self._prepared.setdefault(pid, set()).add(name)
+
+        if param_count:
+            cursor.execute(f"EXECUTE {name} ({', '.join(['%s'] * param_count)})", params)
+        else:
+            cursor.execute(f"EXECUTE {name}")
+
+        self.analyzer.record_statement(shape_label(shape), prepared)
+        return True
+
+    def reset_connection(self, conn) -> None:
+        """
+        Forget and deallocate a connection's prepared statements after an error.
+
+        Rolls back the failed transaction first. Call before reusing ``conn``.
+        """
+        try:
+            pid = conn.get_backend_pid()
+            with self._lock:
+                self._prepared.pop(pid, None)
+            if not conn.closed:
+                conn.rollback()
+                with conn.cursor() as cursor:
+                    cursor.execute("DEALLOCATE ALL")
+                conn.commit()
+        except Exception as e:
+            logger.debug(f"Could not reset prepared statements: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get registry statistics.
+
+        Returns:
+            Dictionary with shape and connection counts plus QueryAnalyzer hit/miss totals
+        """
+        with self._lock:
+            shapes = len(self._statements)
+            preparable = sum(1 for statement in self._statements.values() if statement)
+            connections = len(self._prepared)
+        return {
+            "enabled": self.enabled,
+            "shapes": shapes,
+            "preparable_shapes": preparable,
+            "connections": connections,
+            **self.analyzer.get_statement_cache_stats(include_shapes=False)
+        }
@@ -7,6 +7,8 @@ import logging
 import json
 from typing import List, Dict, Any, Optional, Tuple
 
+from src.knowledge.text_search import TextSearchQueryBuilder, get_text_search_support, strip_search_columns
+
 logger = logging.getLogger(__name__)
 
 class CrossTableQueryManager:
@@ -76,10 +78,7 @@ class CrossTableQueryManager:
                 if not attractions or len(attractions) == 0:
                     try:
                         logger.info(f"Using direct SQL query for attraction: {attraction_name}")
-                        attractions = self.db_manager.execute_postgres_query(
-                            "SELECT * FROM attractions WHERE name->>'en' ILIKE %s OR name->>'ar' ILIKE %s LIMIT 1",
-                            (f"%{attraction_name}%", f"%{attraction_name}%")
-                        )
+                        attractions = self._find_by_name("attractions", attraction_name)
                     except Exception as e:
                         logger.warning(f"Error using direct SQL query for attraction: {str(e)}")
                 if attractions and len(attractions) > 0:
@@ -158,10 +157,7 @@ class CrossTableQueryManager:
                     if not city_results or len(city_results) == 0:
                         try:
                             # Find city ID first
-                            cities = self.db_manager.execute_postgres_query(
-                                "SELECT id FROM cities WHERE name->>'en' ILIKE %s OR name->>'ar' ILIKE %s LIMIT 1",
-                                (f"%{city_name}%", f"%{city_name}%")
-                            )
+                            cities = self._find_by_name("cities", city_name, columns="t.id")
                             if cities and len(cities) > 0:
                                 city_id = cities[0].get('id')
                                 logger.info(f"Found city ID {city_id} for {city_name}")
@@ -176,10 +172,11 @@ class CrossTableQueryManager:
                     if not city_results or len(city_results) == 0:
                         try:
                             logger.info(f"Using direct SQL query for restaurants in {city_name}")
-                            city_results = self.db_manager.execute_postgres_query(
-                                "SELECT * FROM restaurants WHERE city_id IN (SELECT id FROM cities WHERE name->>'en' ILIKE %s OR name->>'ar' ILIKE %s) LIMIT %s",
-                                (f"%{city_name}%", f"%{city_name}%", limit)
-                            )
+                            city_match, city_params = self._name_match("cities", city_name, alias="c")
+                            city_results = strip_search_columns(self.db_manager.execute_postgres_query(
+                                f"SELECT * FROM restaurants WHERE city_id IN (SELECT c.id FROM cities c WHERE {city_match}) LIMIT %s",
+                                tuple(city_params) + (limit,)
+                            ))
                         except Exception as e:
                             logger.warning(f"Error using direct SQL query for restaurants: {str(e)}")
 
@@ -304,10 +301,7 @@ class CrossTableQueryManager:
                 if not attractions or len(attractions) == 0:
                     try:
                         logger.info(f"Using direct SQL query for attraction: {attraction_name}")
-                        attractions = self.db_manager.execute_postgres_query(
-                            "SELECT * FROM attractions WHERE name->>'en' ILIKE %s OR name->>'ar' ILIKE %s LIMIT 1",
-                            (f"%{attraction_name}%", f"%{attraction_name}%")
-                        )
+                        attractions = self._find_by_name("attractions", attraction_name)
                     except Exception as e:
                         logger.warning(f"Error using direct SQL query for attraction: {str(e)}")
                 if attractions and len(attractions) > 0:
@@ -465,10 +459,7 @@ class CrossTableQueryManager:
                 itinerary = self._get_itinerary_by_id(itinerary_id)
             elif itinerary_name:
                 # Search for itinerary by name
-                itineraries = self.db_manager.execute_query(
-                    "SELECT * FROM itineraries WHERE name->>'en' ILIKE %s LIMIT 1",
-                    (f"%{itinerary_name}%",)
-                )
+                itineraries = self._find_by_name("itineraries", itinerary_name)
                 if itineraries and len(itineraries) > 0:
                     itinerary = itineraries[0]
 
@@ -527,10 +518,7 @@ class CrossTableQueryManager:
                 # First try: Use the city_id to query attractions
                 try:
                     # Find city ID first
-                    cities = self.db_manager.execute_postgres_query(
-                        "SELECT id FROM cities WHERE name->>'en' ILIKE %s OR name->>'ar' ILIKE %s LIMIT 1",
-                        (f"%{city}%", f"%{city}%")
-                    )
+                    cities = self._find_by_name("cities", city, columns="t.id")
                     if cities and len(cities) > 0:
                         city_id = cities[0].get('id')
                         logger.info(f"Found city ID {city_id} for {city}")
@@ -649,10 +637,7 @@ class CrossTableQueryManager:
                 if not attractions or len(attractions) == 0:
                     try:
                         logger.info(f"Using direct SQL query for attraction: {attraction_name}")
-                        attractions = self.db_manager.execute_postgres_query(
-                            "SELECT * FROM attractions WHERE name->>'en' ILIKE %s OR name->>'ar' ILIKE %s LIMIT 1",
-                            (f"%{attraction_name}%", f"%{attraction_name}%")
-                        )
+                        attractions = self._find_by_name("attractions", attraction_name)
                     except Exception as e:
                         logger.warning(f"Error using direct SQL query for attraction: {str(e)}")
                 if attractions and len(attractions) > 0:
@@ -813,6 +798,56 @@ class CrossTableQueryManager:
             logger.error(f"Error finding events near attraction: {str(e)}")
             return []
 
+    def _name_match(self, table: str, name: str, alias: str = "t") -> Tuple[str, List[Any]]:
+        """
+        Build a WHERE condition matching records by name (English or Arabic).
+
+        Uses the table's full-text/trigram indexes when it has them,
+        otherwise ILIKE on the name fields.
+
+        Args:
+            table: Table name
+            name: Name to look up
+            alias: Alias of the table in the query
+
+        Returns:
+            Tuple of (SQL condition, parameters)
+        """
+        indexed_tables, trigram = get_text_search_support(self.db_manager.execute_postgres_query)
+        if table in indexed_tables:
+            return TextSearchQueryBuilder(trigram=trigram).match_condition(table, name, alias=alias)
+        return (f"({alias}.name->>'en' ILIKE %s OR {alias}.name->>'ar' ILIKE %s)",
+                [f"%{name}%", f"%{name}%"])
+
+    def _find_by_name(self, table: str, name: str, columns: str = "t.*", limit: int = 1) -> List[Dict]:
+        """
+        Find the records whose name best matches ``name``.
+
+        Ranked by full-text and trigram similarity when the table has search
+        indexes, otherwise the first ILIKE matches.
+
+        Args:
+            table: Table name
+            name: Name to look up
+            columns: Select list (the table is aliased as ``t``)
+            limit: Maximum number of records
+
+        Returns:
+            List of matching records
+        """
+        indexed_tables, trigram = get_text_search_support(self.db_manager.execute_postgres_query)
+        if table in indexed_tables and name.strip():
+            query, params = TextSearchQueryBuilder(trigram=trigram).build(table, name, limit=limit, columns=columns)
+        else:
+            condition, params = self._name_match(table, name)
+            query = f"SELECT {columns} FROM {table} t WHERE {condition} LIMIT %s"
+            params = tuple(params) + (limit,)
+
+        results = strip_search_columns(self.db_manager.execute_postgres_query(query, params))
+        for result in results:
+            result.pop("search_rank", None)
+        return results
+
     def _get_attraction_by_id(self, attraction_id: int) -> Optional[Dict]:
         """Get attraction by ID."""
         try:
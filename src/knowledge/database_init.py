@@ -11,9 +11,16 @@ from psycopg2 import sql
 from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
 from typing import Dict, List, Optional, Tuple, Any
 
+from src.knowledge.text_search import (
+    TEXT_SEARCH_TABLES, arabic_normalize_function_sql, search_column_definitions, trigram_index_definitions
+)
+
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Tables searched by HybridSearchEngine (embedding <-> query ORDER BY needs an L2 index)
+HYBRID_SEARCH_TABLES = ["attractions", "hotels", "accommodations", "restaurants", "cities"]
+
 # Table definitions with dependencies
 TABLE_DEFINITIONS = {
     "users": {
@@ -502,4 +509,138 @@ def create_postgres_tables(conn: psycopg2.extensions.connection, vector_dimensio
             except Exception as e:
                 logger.warning(f"Error checking for vector extension: {str(e)}")
 
+    # Add full-text and trigram search columns and indexes
+    create_text_search_indexes(conn)
+
+    # Add L2 HNSW indexes for hybrid search candidates
+    create_hybrid_search_indexes(conn)
+
     logger.info("Database initialization completed successfully")
+
+def create_text_search_indexes(conn: psycopg2.extensions.connection) -> None:
+    """
+    Add generated tsvector search columns and GIN indexes to searchable tables.
+
+    For each table in TEXT_SEARCH_TABLES that exists with JSONB title/body
+    fields, adds stored ``search_en``/``search_ar`` columns with GIN indexes,
+    and (if pg_trgm can be installed) trigram GIN indexes on the English and
+    normalized Arabic titles. Safe to run repeatedly.
+
+    Args:
+        conn: PostgreSQL connection
+    """
+    # Enable pg_trgm for fuzzy name matching
+    trigram = False
+    with conn:
+        with conn.cursor() as cursor:
+            try:
+                cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+                trigram = True
+            except Exception as e:
+                logger.warning(f"pg_trgm extension not available, skipping trigram indexes: {str(e)}")
+
+    # Arabic normalization used by the generated columns and trigram indexes
+    with conn:
+        with conn.cursor() as cursor:
+            try:
+                cursor.execute(arabic_normalize_function_sql())
+            except Exception as e:
+                logger.warning(f"Error creating Arabic normalization function: {str(e)}")
+                return
+
+    for table_name, (title_field, body_field) in TEXT_SEARCH_TABLES.items():
+        with conn:
+            with conn.cursor() as cursor:
+                cursor.execute("""
+                    SELECT column_name FROM information_schema.columns
+                    WHERE table_schema = current_schema() AND table_name = %s AND data_type = 'jsonb'
+                """, (table_name,))
+                jsonb_columns = {row[0] for row in cursor.fetchall()}
+
+        if title_field not in jsonb_columns:
+            logger.info(f"Skipping text search columns for {table_name}: no JSONB {title_field} field")
+            continue
+
+        columns = search_column_definitions(title_field, body_field if body_field in jsonb_columns else None)
+
+        # Each table in its own transaction; adding a stored column rewrites the table
+        with conn:
+            with conn.cursor() as cursor:
+                try:
+                    for column, expression in columns.items():
+                        cursor.execute(f"""
+                            ALTER TABLE {table_name} ADD COLUMN IF NOT EXISTS {column} tsvector
+                            GENERATED ALWAYS AS ({expression}) STORED
+                        """)
+                        cursor.execute(f"""
+                            CREATE INDEX IF NOT EXISTS idx_{table_name}_{column} ON {table_name} USING gin ({column})
+                        """)
+                    logger.info(f"Created or verified text search columns for {table_name}")
+                except Exception as e:
+                    logger.warning(f"Error adding text search columns to {table_name}: {str(e)}")
+                    continue
+
+        if not trigram:
+            continue
+
+        with conn:
+            with conn.cursor() as cursor:
+                for index_name, index_expression in trigram_index_definitions(table_name, title_field):
+                    try:
+                        cursor.execute(f"""
+                            CREATE INDEX IF NOT EXISTS {index_name} ON {table_name} USING gin ({index_expression})
+                        """)
+                        logger.info(f"Created or verified trigram index: {index_name}")
+                    except Exception as e:
+                        logger.warning(f"Error creating trigram index {index_name}: {str(e)}")
+                        break
+
+def create_hybrid_search_indexes(conn: psycopg2.extensions.connection, m: int = 16, ef_construction: int = 64) -> None:
+    """
+    Create HNSW (vector_l2_ops) indexes on the hybrid search tables' embeddings.
+
+    Hybrid search takes its vector candidates with ``ORDER BY embedding <-> q
+    LIMIT k``, which only uses an index built with L2 operators. Tables that
+    already have an L2 HNSW index (e.g. from VectorOptimizer) are left alone.
+    The tsvector side comes from create_text_search_indexes.
+
+    Args:
+        conn: PostgreSQL connection
+        m: HNSW max connections per node
+        ef_construction: HNSW candidate list size during construction
+    """
+    with conn:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'vector'")
+            if not cursor.fetchone():
+                logger.info("pgvector not installed, skipping hybrid search HNSW indexes")
+                return
+
+    for table_name in HYBRID_SEARCH_TABLES:
+        with conn:
+            with conn.cursor() as cursor:
+                try:
+                    cursor.execute("""
+                        SELECT 1 FROM information_schema.columns
+                        WHERE table_schema = current_schema() AND table_name = %s AND column_name = 'embedding'
+                    """, (table_name,))
+                    if not cursor.fetchone():
+                        continue
+
+                    cursor.execute("""
+                        SELECT 1 FROM pg_indexes
+                        WHERE schemaname = current_schema() AND tablename = %s
+                          AND indexdef ILIKE '%%USING hnsw%%vector_l2_ops%%'
+                    """, (table_name,))
+                    if cursor.fetchone():
+                        logger.info(f"Verified HNSW index for {table_name}")
+                        continue
+
+                    cursor.execute(f"""
+                        CREATE INDEX IF NOT EXISTS idx_{table_name}_embedding_hnsw ON {table_name}
+                        USING hnsw (embedding vector_l2_ops)
+                        WITH (m = {m}, ef_construction = {ef_construction})
+                    """)
+                    logger.info(f"Created HNSW index for {table_name}")
+                except Exception as e:
+                    logger.warning(f"Error creating HNSW index for {table_name}: {str(e)}")
@@ -0,0 +1,307 @@
+"""
+Indexed bilingual text search for the Egypt Tourism Chatbot.
+
+Searchable tables get two stored tsvector columns generated from their
+JSONB title/body fields: ``search_en`` (english configuration) and
+``search_ar`` (simple configuration over Arabic-normalized text, see
+``normalize_arabic_text``), each with a GIN index, plus pg_trgm GIN indexes
+on the English and normalized Arabic titles for fuzzy name matching.
+``create_text_search_indexes`` in database_init creates them.
+
+``TextSearchQueryBuilder`` turns a user query into a ranked SELECT
+(``ts_rank_cd`` + trigram ``word_similarity``) that can use those indexes,
+replacing ``field->>'en' ILIKE '%q%'`` scans. ``get_text_search_support``
+reports which tables have been migrated so callers can keep the ILIKE
+path for the others.
+"""
+
+import logging
+import time
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Tuple
+
+from src.utils.text_normalization import ARABIC_DIACRITIC_RANGES, ARABIC_LETTER_FOLDS, normalize_arabic
+
+logger = logging.getLogger(__name__)
+
+# Table -> (title field, body field); both JSONB with 'en'/'ar' keys
+TEXT_SEARCH_TABLES: Dict[str, Tuple[str, str]] = {
+    "attractions": ("name", "description"),
+    "restaurants": ("name", "description"),
+    "accommodations": ("name", "description"),
+    "hotels": ("name", "description"),
+    "cities": ("name", "description"),
+    "regions": ("name", "description"),
+    "practical_info": ("title", "content"),
+    "tourism_faqs": ("question", "answer"),
+    "transportation_types": ("name", "description"),
+    "events_festivals": ("name", "description"),
+    "itineraries": ("name", "description"),
+}
+
+# Generated tsvector columns (dropped from result rows by strip_search_columns)
+SEARCH_COLUMNS = ("search_en", "search_ar")
+
+# SQL function mirroring src.utils.text_normalization.normalize_arabic
+NORMALIZE_FUNCTION = "normalize_arabic_text"
+
+# How long get_text_search_support trusts its last schema check
+SUPPORT_CHECK_INTERVAL = 300
+
+_support_cache: Dict[str, Any] = {"checked_at": 0.0, "tables": frozenset(), "trigram": False}
+
+
+def arabic_normalize_function_sql() -> str:
+    """
+    SQL creating ``normalize_arabic_text(text)``, built from the same folding
+    tables as the Python normalizer so indexed and query text agree.
+
+    The function is IMMUTABLE so generated columns and expression indexes can
+    use it; after changing the folding tables, recreate the function and
+    rewrite the search columns.
+    """
+    diacritics = "".join(first if first == last else f"{first}-{last}" for first, last in ARABIC_DIACRITIC_RANGES)
+    source = "".join(ARABIC_LETTER_FOLDS.keys())
+    target = "".join(ARABIC_LETTER_FOLDS.values())
+    return f"""
+        CREATE OR REPLACE FUNCTION {NORMALIZE_FUNCTION}(input text) RETURNS text
+        LANGUAGE sql IMMUTABLE STRICT PARALLEL SAFE
+        AS $fn$ SELECT translate(regexp_replace(input, '[{diacritics}]', '', 'g'), '{source}', '{target}') $fn$
+    """
+
+
+def _weighted_vector(config: str, field: Optional[str], language: str, weight: str) -> str:
+    text = f"coalesce({field}->>'{language}', '')"
+    if language == "ar":
+        text = f"{NORMALIZE_FUNCTION}({text})"
+    return f"setweight(to_tsvector('{config}', {text}), '{weight}')"
+
+
+def search_column_definitions(title_field: str, body_field: Optional[str] = None) -> Dict[str, str]:
+    """
+    Generated column expressions for a table's search columns.
+
+    Args:
+        title_field: JSONB title field (weight A)
+        body_field: JSONB body field (weight B), if the table has one
+
+    Returns:
+        Dictionary of column name -> generation expression
+    """
+    definitions = {}
+    for column, config, language in (("search_en", "english", "en"), ("search_ar", "simple", "ar")):
+        parts = [_weighted_vector(config, title_field, language, "A")]
+        if body_field:
+            parts.append(_weighted_vector(config, body_field, language, "B"))
+        definitions[column] = " || ".join(parts)
+    return definitions
+
+
+def trigram_index_definitions(table: str, title_field: str) -> List[Tuple[str, str]]:
+    """
+    pg_trgm GIN index definitions for a table's titles.
+
+    Returns:
+        List of (index name, indexed expression) tuples
+    """
+    return [
+        (f"idx_{table}_{title_field}_en_trgm", f"({title_field}->>'en') gin_trgm_ops"),
+        (f"idx_{table}_{title_field}_ar_trgm", f"({NORMALIZE_FUNCTION}({title_field}->>'ar')) gin_trgm_ops"),
+    ]
+
+
+def get_text_search_support(execute_query: Callable[..., Any], force: bool = False) -> Tuple[FrozenSet[str], bool]:
+    """
+    Report which tables have search columns and whether pg_trgm is installed.
+
+    The answer is cached for SUPPORT_CHECK_INTERVAL seconds; a failed check
+    is cached too, so callers fall back to ILIKE without retrying every query.
+
+    Args:
+        execute_query: Callable (query, params) returning dict rows
+        force: Re-check the schema even if the cached answer is fresh
+
+    Returns:
+        (tables with search_en and search_ar, pg_trgm available)
+    """
+    if not force and time.time() - _support_cache["checked_at"] < SUPPORT_CHECK_INTERVAL:
+        return _support_cache["tables"], _support_cache["trigram"]
+
+    tables, trigram = frozenset(), False
+    try:
+        rows = execute_query("""
+            SELECT c.table_name,
+                   EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm') AS trigram
+            FROM information_schema.columns c
+            WHERE c.table_schema = current_schema()
+              AND c.column_name IN ('search_en', 'search_ar')
+            GROUP BY c.table_name
+            HAVING COUNT(*) = 2
+        """, ()) or []
+        tables = frozenset(row["table_name"] for row in rows if row["table_name"] in TEXT_SEARCH_TABLES)
+        trigram = any(row["trigram"] for row in rows)
+    except Exception as e:
+        logger.warning(f"Could not check text search columns: {str(e)}")
+
+    _support_cache.update(checked_at=time.time(), tables=tables, trigram=trigram)
+    return tables, trigram
+
+
+def strip_search_columns(rows: Optional[List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """Remove the generated tsvector columns from result rows."""
+    rows = rows or []
+    for row in rows:
+        for column in SEARCH_COLUMNS:
+            row.pop(column, None)
+    return rows
+
+
+class TextSearchQueryBuilder:
+    """
+    Builds ranked, index-backed bilingual search queries.
+
+    A row matches if either tsvector matches ``websearch_to_tsquery`` of the
+    query, or (with pg_trgm) the query is word-similar to the English or
+    normalized Arabic title. Rows are ordered by::
+
+        rank_weight * (ts_rank_cd(search_en) + ts_rank_cd(search_ar))
+        + similarity_weight * word_similarity(query, title)
+    """
+
+    def __init__(self, rank_weight: float = 0.7, similarity_weight: float = 0.3, trigram: bool = True):
+        """
+        Initialize the query builder.
+
+        Args:
+            rank_weight: Weight of the full-text rank (ts_rank_cd, normalized to 0-1)
+            similarity_weight: Weight of the trigram title similarity (0-1)
+            trigram: Whether to use pg_trgm fuzzy title matching
+        """
+        self.rank_weight = float(rank_weight)
+        self.similarity_weight = float(similarity_weight)
+        self.trigram = trigram
+
+    def _terms(self, query: str) -> Tuple[str, str]:
+        query = " ".join(query.split())
+        return query, normalize_arabic(query)
+
+    def match_condition(self, table: str, query: str, alias: str = "t") -> Tuple[str, List[Any]]:
+        """
+        WHERE condition matching ``query`` against a table's search indexes.
+
+        Args:
+            table: Table name (must be in TEXT_SEARCH_TABLES)
+            query: User query text
+            alias: Alias of the table in the surrounding query
+
+        Returns:
+            (SQL condition, parameters)
+        """
+        title, _ = TEXT_SEARCH_TABLES[table]
+        english, arabic = self._terms(query)
+        conditions = [
+            f"{alias}.search_en @@ websearch_to_tsquery('english', %s)",
+            f"{alias}.search_ar @@ websearch_to_tsquery('simple', %s)",
+        ]
+        params: List[Any] = [english, arabic]
+        if self.trigram:
+            conditions.extend([
+                f"%s <%% ({alias}.{title}->>'en')",
+                f"%s <%% {NORMALIZE_FUNCTION}({alias}.{title}->>'ar')",
+            ])
+            params.extend([english, arabic])
+        return f"({' OR '.join(conditions)})", params
+
+    def rank_expression(self, table: str, query: str, alias: str = "t") -> Tuple[str, List[Any]]:
+        """
+        Relevance expression for ``query`` (higher is better).
+
+        Returns:
+            (SQL expression, parameters)
+        """
+        title, _ = TEXT_SEARCH_TABLES[table]
+        english, arabic = self._terms(query)
+        expression = (
+            f"{self.rank_weight} * ("
+            f"ts_rank_cd({alias}.search_en, websearch_to_tsquery('english', %s), 32) + "
+            f"ts_rank_cd({alias}.search_ar, websearch_to_tsquery('simple', %s), 32))"
+        )
+        params: List[Any] = [english, arabic]
+        if self.trigram:
+            expression += (
+                f" + {self.similarity_weight} * coalesce(GREATEST("
+                f"word_similarity(%s, {alias}.{title}->>'en'), "
+                f"word_similarity(%s, {NORMALIZE_FUNCTION}({alias}.{title}->>'ar'))), 0)"
+            )
+            params.extend([english, arabic])
+        return expression, params
+
+    def build(self, table: str, query: str, filters: Optional[Dict[str, Any]] = None,
+              limit: int = 10, offset: int = 0, columns: str = "t.*") -> Tuple[str, tuple]:
+        """
+        Build a ranked search query.
+
+        Args:
+            table: Table name (must be in TEXT_SEARCH_TABLES)
+            query: User query text
+            filters: Column equality filters
+            limit: Maximum number of results
+            offset: Offset for pagination
+            columns: Select list (the table is aliased as ``t``)
+
+        Returns:
+            (SQL, parameters); rows carry a ``search_rank`` column
+
+        Raises:
+            ValueError: If the table is not searchable or a filter column is invalid
+        """
+        if table not in TEXT_SEARCH_TABLES:
+            raise ValueError(f"Table {table} has no text search columns")
+
+        rank_sql, rank_params = self.rank_expression(table, query)
+        match_sql, match_params = self.match_condition(table, query)
+        conditions = [match_sql]
+        params = rank_params + match_params
+
+        for column, value in (filters or {}).items():
+            if not column.isidentifier():
+                raise ValueError(f"Invalid filter column: {column}")
+            conditions.append(f"t.{column} = %s")
+            params.append(value)
+
+        sql = f"""
+            SELECT {columns}, {rank_sql} AS search_rank
+            FROM {table} t
+            WHERE {' AND '.join(conditions)}
+            ORDER BY search_rank DESC
+            LIMIT %s OFFSET %s
+        """
+        params.extend([limit, offset])
+        return sql, tuple(params)
+
+    def shape(self, table: str, filters: Optional[Dict[str, Any]] = None) -> Tuple[Any, ...]:
+        """Prepared-statement shape of ``build(table, ..., filters)``."""
+        return ("text_search", table, tuple(filters or ()), self.trigram)
+
+
+def build_ilike_query(table: str, query: str, filters: Optional[Dict[str, Any]] = None,
+                      limit: int = 10, offset: int = 0) -> Tuple[str, tuple]:
+    """
+    Build the unindexed ``ILIKE '%q%'`` equivalent of TextSearchQueryBuilder.build.
+
+    Used for tables without search columns and as the benchmark baseline.
+    """
+    pattern = f"%{query}%"
+    conditions, params = [], []
+    for field in TEXT_SEARCH_TABLES.get(table, ("name", "description")):
+        conditions.extend([f"{field}->>'en' ILIKE %s", f"{field}->>'ar' ILIKE %s"])
+        params.extend([pattern, pattern])
+
+    sql = f"SELECT * FROM {table} WHERE ({' OR '.join(conditions)})"
+    for column, value in (filters or {}).items():
+        if not column.isidentifier():
+            raise ValueError(f"Invalid filter column: {column}")
+        sql += f" AND {column} = %s"
+        params.append(value)
+    sql += " LIMIT %s OFFSET %s"
+    params.extend([limit, offset])
+    return sql, tuple(params)
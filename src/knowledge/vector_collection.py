@@ -0,0 +1,415 @@
+"""
+Matrix-backed vector collection for the Egypt Tourism Chatbot.
+
+Stores a collection's vectors as one contiguous, pre-normalized float32 matrix
+with a parallel id array and metadata column store, so a similarity search is
+a single matrix-vector product followed by an argpartition top-k.
+"""
+import logging
+import threading
+from typing import Any, Dict, Hashable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Marker for metadata values that cannot be indexed (lists, dicts, ...)
+_UNINDEXABLE = object()
+
+
+def _flatten_metadata(metadata: Dict, prefix: str = "") -> Iterator[Tuple[str, Any]]:
+    """Yield (dotted_key, value) pairs for every key path in nested metadata."""
+    for key, value in metadata.items():
+        path = f"{prefix}{key}"
+        yield path, value
+        if isinstance(value, dict):
+            yield from _flatten_metadata(value, f"{path}.")
+
+
+def _index_value(value: Any) -> Any:
+    """Return a hashable form of a metadata value, or _UNINDEXABLE."""
+    if isinstance(value, Hashable):
+        try:
+            hash(value)
+            return value
+        except TypeError:
+            pass
+    return _UNINDEXABLE
+
+
+class VectorCollection:
+    """
+    Contiguous in-memory vector store for one collection.
+
+    Rows are L2-normalized on insert (original norms are kept so raw vectors can be
+    reconstructed). Deletes swap the last row into the freed slot so the matrix
+    stays dense. Metadata equality filters are answered from an inverted
+    value index as boolean masks, cached until the collection changes.
+    """
+
+    def __init__(self, dimension: Optional[int] = None, initial_capacity: int = 64):
+        """
+        Initialize an empty collection.
+
+        Args:
+            dimension: Vector dimension (inferred from the first vector if None)
+            initial_capacity: Number of rows to preallocate
+        """
+        self.dimension = dimension
+        self._capacity = initial_capacity
+        self._matrix: Optional[np.ndarray] = None
+        self._norms = np.zeros(initial_capacity, dtype=np.float32)
+        self._size = 0
+
+        self.ids: List[str] = []
+        self.metadata: List[Dict] = []
+        self._row_of: Dict[str, int] = {}
+
+        # Inverted index: dotted metadata key -> value -> set of rows
+        self._value_index: Dict[str, Dict[Any, set]] = {}
+        # Keys having at least one unindexable value need a scan to filter
+        self._unindexed_keys: Dict[str, int] = {}
+        self._mask_cache: Dict[Tuple, np.ndarray] = {}
+
+        self.version = 0
+        self._lock = threading.RLock()
+
+    @classmethod
+    def from_arrays(cls, ids: List[str], metadata: List[Dict], matrix: np.ndarray,
+                    norms: np.ndarray) -> "VectorCollection":
+        """
+        Build a collection around existing normalized rows without copying them.
+
+        ``matrix`` may be a read-only memory map; it is copied on the first write.
+
+        Args:
+            ids: Item identifiers, one per row
+            metadata: Item metadata, one per row
+            matrix: Normalized float32 rows
+            norms: Original vector norms, one per row
+
+        Returns:
+            VectorCollection: The populated collection
+        """
+        size = len(ids)
+        collection = cls(dimension=int(matrix.shape[1]) if matrix.ndim == 2 else None,
+                         initial_capacity=max(size, 1))
+        if size:
+            collection._matrix = matrix
+            collection._norms = np.array(norms, dtype=np.float32)
+            collection._size = size
+            collection.ids = list(ids)
+            collection.metadata = list(metadata)
+            collection._row_of = {item_id: row for row, item_id in enumerate(collection.ids)}
+            for row, meta in enumerate(collection.metadata):
+                collection._index_row(row, meta)
+        return collection
+
+    def snapshot(self) -> Tuple[List[str], List[Dict], np.ndarray, np.ndarray]:
+        """
+        Consistent copy of the collection contents for persistence.
+
+        Returns:
+            Tuple of (ids, metadata, normalized matrix, norms)
+        """
+        with self._lock:
+            dimension = self.dimension or 0
+            if self._matrix is None:
+                matrix = np.zeros((0, dimension), dtype=np.float32)
+            else:
+                matrix = np.array(self._matrix[:self._size], dtype=np.float32)
+            return list(self.ids), list(self.metadata), matrix, np.array(self._norms[:self._size])
+
+    # ------------------------------------------------------------------
+    # Mapping-style access (backwards compatible with the old dict layout)
+    # ------------------------------------------------------------------
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, item_id: str) -> bool:
+        return item_id in self._row_of
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self.ids))
+
+    def __getitem__(self, item_id: str) -> Dict[str, Any]:
+        row = self._row_of[item_id]
+        return {"vector": self.get_vector(item_id), "metadata": self.metadata[row]}
+
+    def get(self, item_id: str, default: Any = None) -> Any:
+        if item_id not in self._row_of:
+            return default
+        return self[item_id]
+
+    def keys(self) -> List[str]:
+        return list(self.ids)
+
+    def items(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        for item_id in list(self.ids):
+            yield item_id, self[item_id]
+
+    def get_vector(self, item_id: str) -> np.ndarray:
+        """Reconstruct the original (un-normalized) vector for an item."""
+        row = self._row_of[item_id]
+        return self._matrix[row] * self._norms[row]
+
+    @property
+    def matrix(self) -> np.ndarray:
+        """View of the normalized rows currently in use."""
+        if self._matrix is None:
+            return np.zeros((0, self.dimension or 0), dtype=np.float32)
+        return self._matrix[:self._size]
+
+    # ------------------------------------------------------------------
+    # Mutation
+    # ------------------------------------------------------------------
+
+    def _ensure_capacity(self, needed: int) -> None:
+        if self._matrix is not None and needed <= self._capacity:
+            return
+        capacity = max(self._capacity, 1)
+        while capacity < needed:
+            capacity *= 2
+        matrix = np.zeros((capacity, self.dimension), dtype=np.float32)
+        norms = np.zeros(capacity, dtype=np.float32)
+        if self._matrix is not None:
+            matrix[:self._size] = self._matrix[:self._size]
+            norms[:self._size] = self._norms[:self._size]
+        self._matrix = matrix
+        self._norms = norms
+        self._capacity = capacity
+
+    def _ensure_writable(self) -> None:
+        # Rows loaded from a read-only memory map are copied on the first in-place write
+        if self._matrix is not None and not self._matrix.flags.writeable:
+            self._matrix = np.array(self._matrix, dtype=np.float32)
+
+    def _index_row(self, row: int, metadata: Dict) -> None:
+        for key, value in _flatten_metadata(metadata):
+            indexed = _index_value(value)
+            if indexed is _UNINDEXABLE:
+                self._unindexed_keys[key] = self._unindexed_keys.get(key, 0) + 1
+            else:
+                self._value_index.setdefault(key, {}).setdefault(indexed, set()).add(row)
+
+    def _unindex_row(self, row: int, metadata: Dict) -> None:
+        for key, value in _flatten_metadata(metadata):
+            indexed = _index_value(value)
+            if indexed is _UNINDEXABLE:
+                remaining = self._unindexed_keys.get(key, 0) - 1
+                if remaining > 0:
+                    self._unindexed_keys[key] = remaining
+                else:
+                    self._unindexed_keys.pop(key, None)
+                continue
+            rows = self._value_index.get(key, {}).get(indexed)
+            if rows is not None:
+                rows.discard(row)
+                if not rows:
+                    del self._value_index[key][indexed]
+
+    def _changed(self) -> None:
+        self.version += 1
+        self._mask_cache.clear()
+
+    def _coerce(self, vector: Any) -> Optional[np.ndarray]:
+        vector = np.asarray(vector, dtype=np.float32).ravel()
+        if self.dimension is None:
+            self.dimension = vector.shape[0]
+        if vector.shape[0] != self.dimension:
+            logger.error(f"Vector dimension {vector.shape[0]} does not match collection dimension {self.dimension}")
+            return None
+        return vector
+
+    def upsert(self, item_id: str, vector: Any, metadata: Optional[Dict] = None) -> bool:
+        """
+        Insert or replace one item.
+
+        Args:
+            item_id: Item identifier
+            vector: Embedding vector
+            metadata: Item metadata
+
+        Returns:
+            bool: False if the vector dimension does not match the collection
+        """
+        with self._lock:
+            if not self._upsert_row(item_id, vector, metadata or {}):
+                return False
+            self._changed()
+            return True
+
+    def upsert_many(self, items: List[Tuple[str, Any, Optional[Dict]]]) -> List[bool]:
+        """
+        Insert or replace many items with a single capacity growth and cache invalidation.
+
+        Args:
+            items: List of (item_id, vector, metadata) tuples
+
+        Returns:
+            list: Per-item success statuses
+        """
+        if not items:
+            return []
+        with self._lock:
+            if self.dimension is None:
+                self._coerce(items[0][1])
+            self._ensure_capacity(self._size + len(items))
+            results = [self._upsert_row(item_id, vector, metadata or {}) for item_id, vector, metadata in items]
+            self._changed()
+            return results
+
+    def _upsert_row(self, item_id: str, vector: Any, metadata: Dict) -> bool:
+        vector = self._coerce(vector)
+        if vector is None:
+            return False
+
+        row = self._row_of.get(item_id)
+        if row is None:
+            self._ensure_capacity(self._size + 1)
+            row = self._size
+            self._size += 1
+            self.ids.append(item_id)
+            self.metadata.append(metadata)
+            self._row_of[item_id] = row
+        else:
+            self._ensure_writable()
+            self._unindex_row(row, self.metadata[row])
+            self.metadata[row] = metadata
+
+        norm = float(np.linalg.norm(vector))
+        self._norms[row] = norm
+        self._matrix[row] = vector / norm if norm > 0 else 0.0
+        self._index_row(row, metadata)
+        return True
+
+    def remove(self, item_id: str) -> bool:
+        """
+        Remove an item, moving the last row into its slot.
+
+        Args:
+            item_id: Item identifier
+
+        Returns:
+            bool: Whether the item existed
+        """
+        with self._lock:
+            row = self._row_of.pop(item_id, None)
+            if row is None:
+                return False
+
+            self._ensure_writable()
+            self._unindex_row(row, self.metadata[row])
+            last = self._size - 1
+            if row != last:
+                moved_id = self.ids[last]
+                self._unindex_row(last, self.metadata[last])
+                self._matrix[row] = self._matrix[last]
+                self._norms[row] = self._norms[last]
+                self.ids[row] = moved_id
+                self.metadata[row] = self.metadata[last]
+                self._row_of[moved_id] = row
+                self._index_row(row, self.metadata[row])
+
+            self.ids.pop()
+            self.metadata.pop()
+            self._size = last
+            self._changed()
+            return True
+
+    # ------------------------------------------------------------------
+    # Search
+    # ------------------------------------------------------------------
+
+    def filter_mask(self, filters: Optional[Dict]) -> Optional[np.ndarray]:
+        """
+        Boolean row mask for metadata equality filters (dotted keys address nested metadata).
+
+        Returns:
+            Mask over the current rows, or None when no filters are given
+        """
+        if not filters:
+            return None
+
+        cache_key = tuple(sorted((key, repr(value)) for key, value in filters.items()))
+        with self._lock:
+            cached = self._mask_cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+            mask = np.ones(self._size, dtype=bool)
+            for key, value in filters.items():
+                indexed = _index_value(value)
+                if indexed is not _UNINDEXABLE and key not in self._unindexed_keys:
+                    rows = self._value_index.get(key, {}).get(indexed, ())
+                    key_mask = np.zeros(self._size, dtype=bool)
+                    if rows:
+                        key_mask[np.fromiter(rows, dtype=np.int64, count=len(rows))] = True
+                else:
+                    key_mask = np.fromiter(
+                        (self._lookup_path(meta, key) == value for meta in self.metadata),
+                        dtype=bool, count=self._size
+                    )
+                mask &= key_mask
+
+            self._mask_cache[cache_key] = mask
+            return mask
+
+    @staticmethod
+    def _lookup_path(metadata: Dict, key: str) -> Any:
+        current = metadata
+        for part in key.split("."):
+            if not isinstance(current, dict) or part not in current:
+                return _UNINDEXABLE
+            current = current[part]
+        return current
+
+    def search(self, query_vector: Any, limit: int = 10,
+               filters: Optional[Dict] = None) -> List[Tuple[str, float]]:
+        """
+        Cosine-similarity top-k search.
+
+        Args:
+            query_vector: Query embedding
+            limit: Maximum number of results
+            filters: Optional metadata equality filters
+
+        Returns:
+            list: (item_id, similarity) tuples sorted by descending similarity
+        """
+        with self._lock:
+            if self._size == 0 or limit <= 0:
+                return []
+
+            query = np.asarray(query_vector, dtype=np.float32).ravel()
+            if query.shape[0] != self.dimension:
+                raise ValueError(
+                    f"Query dimension {query.shape[0]} does not match collection dimension {self.dimension}"
+                )
+
+            mask = self.filter_mask(filters)
+            if mask is not None:
+                rows = np.flatnonzero(mask)
+                if rows.size == 0:
+                    return []
+                candidates = self._matrix[rows]
+            else:
+                rows = None
+                candidates = self._matrix[:self._size]
+
+            query_norm = np.linalg.norm(query)
+            if query_norm > 0:
+                scores = candidates @ (query / query_norm)
+            else:
+                scores = np.zeros(candidates.shape[0], dtype=np.float32)
+
+            k = min(limit, scores.shape[0])
+            if k < scores.shape[0]:
+                top = np.argpartition(-scores, k - 1)[:k]
+            else:
+                top = np.arange(scores.shape[0])
+            top = top[np.argsort(-scores[top], kind="stable")]
+
+            result_rows = rows[top] if rows is not None else top
+            return [(self.ids[row], float(scores[i])) for row, i in zip(result_rows, top)]
@@ -4,7 +4,6 @@ Vector database module for the Egypt Tourism Chatbot.
 Handles embedding storage and semantic search capabilities.
 """
 import os
-import json
 import logging
 import numpy as np
 from typing import List, Dict, Any, Optional, Tuple
@@ -12,6 +11,9 @@ import uuid
 import time
 from pathlib import Path
 
+from src.knowledge.ann_index import IVFFlatIndex
+from src.knowledge.vector_collection import VectorCollection
+from src.knowledge.vector_store import VectorFileStore
 from src.utils.vector_monitor import VectorMonitor
 
 logger = logging.getLogger(__name__)
@@ -25,7 +27,12 @@ class VectorDB:
     def __init__(self, vector_db_uri: Optional[str] = None,
                 embedding_model = None,
                 dimension: int = 1536,
-                content_path: str = "./data/vectors"):
+                content_path: str = "./data/vectors",
+                wal_compaction_threshold: int = 1000,
+                index_type: str = "exact",
+                ann_nlist: Optional[int] = None,
+                ann_nprobe: int = 8,
+                ann_min_train_size: int = 1000):
         """
         Initialize the vector database.
 
@@ -34,11 +41,23 @@ class VectorDB:
             embedding_model: Model for encoding text to vectors
             dimension (int): Dimension of embedding vectors
             content_path (str): Path to store vector files if not using external DB
+            wal_compaction_threshold (int): Logged writes per collection before a background compaction
+            index_type (str): "exact" for brute-force search or "ivf" for an IVF-flat ANN index
+            ann_nlist (int, optional): IVF centroid count (defaults to ~sqrt of the collection size)
+            ann_nprobe (int): IVF lists probed per query (higher = better recall, slower)
+            ann_min_train_size (int): Collections smaller than this are always searched exactly
         """
         self.vector_db_uri = vector_db_uri
         self.dimension = dimension
         self.content_path = content_path
         self.embedding_model = embedding_model
+        self.index_type = index_type
+        self.ann_settings = {
+            "nlist": ann_nlist,
+            "nprobe": ann_nprobe,
+            "min_train_size": ann_min_train_size
+        }
+        self.ann_indexes: Dict[str, IVFFlatIndex] = {}
 
         # Initialize external vector DB connection if URI provided
         self.external_db = None
@@ -51,32 +70,35 @@ class VectorDB:
                 logger.error(f"Failed to connect to external vector database: {str(e)}")
 
         # Initialize in-memory vectors if no external DB
-        self.vectors = {}
+        # collection name -> VectorCollection (contiguous normalized matrix + metadata)
+        self.vectors: Dict[str, VectorCollection] = {}
+        self.store: Optional[VectorFileStore] = None
         if not vector_db_uri:
             # Ensure content path exists
             os.makedirs(content_path, exist_ok=True)
+            self.store = VectorFileStore(content_path, compaction_threshold=wal_compaction_threshold)
 
             # Load vectors from disk
             self._load_vectors()
+            if self.index_type == "ivf":
+                for collection in self.vectors:
+                    self._load_or_build_index(collection)
 
             logger.info(f"Using file-based vector storage at {content_path}")
 
         logger.info("Vector database initialized")
 
     def _load_vectors(self):
-        """Load vector data from disk."""
+        """Load vector data from disk, migrating a legacy index.json on first start."""
         try:
-            index_path = os.path.join(self.content_path, "index.json")
-            if os.path.exists(index_path):
-                with open(index_path, 'r', encoding='utf-8') as f:
-                    self.vectors = json.load(f)
-
-                # Convert string arrays back to numpy arrays
-                for collection in self.vectors:
-                    for item_id, item_data in self.vectors[collection].items():
-                        if "vector" in item_data and isinstance(item_data["vector"], list):
-                            item_data["vector"] = np.asarray(item_data["vector"], dtype=np.float32)
+            if self.store.exists():
+                # Matrices are memory-mapped; logged writes are replayed on top
+                self.vectors = self.store.load_all()
+            else:
+                index_path = os.path.join(self.content_path, "index.json")
+                self.vectors = self.store.migrate_from_json(index_path) or {}
 
+            if self.vectors:
                 logger.info(f"Loaded {sum(len(items) for items in self.vectors.values())} vectors")
             else:
                 self._initialize_collections()
@@ -87,39 +109,77 @@ class VectorDB:
     def _initialize_collections(self):
         """Initialize empty vector collections."""
         self.vectors = {
-            "attractions": {},
-            "accommodations": {},
-            "restaurants": {},
-            "practical_info": {}
+            "attractions": VectorCollection(),
+            "accommodations": VectorCollection(),
+            "restaurants": VectorCollection(),
+            "practical_info": VectorCollection()
         }
 
         logger.info("Initialized empty vector collections")
 
     def _save_vectors(self):
-        """Save vector data to disk."""
-        if self.external_db:
+        """Compact every collection into a fresh matrix generation on disk."""
+        if self.external_db or self.store is None:
             # No need to save locally if using external DB
             return
 
         try:
-            # Convert numpy arrays to lists for JSON serialization
-            serializable = {}
             for collection, items in self.vectors.items():
-                serializable[collection] = {}
-                for item_id, item_data in items.items():
-                    serializable[collection][item_id] = {**item_data}
-                    if "vector" in item_data and isinstance(item_data["vector"], np.ndarray):
-                        serializable[collection][item_id]["vector"] = item_data["vector"].tolist()
-
-            # Save to disk
-            index_path = os.path.join(self.content_path, "index.json")
-            with open(index_path, 'w', encoding='utf-8') as f:
-                json.dump(serializable, f)
+                self.store.write_collection(collection, items, index=self.ann_indexes.get(collection))
 
             logger.info(f"Saved {sum(len(items) for items in self.vectors.values())} vectors")
         except Exception as e:
             logger.error(f"Failed to save vectors: {str(e)}")
 
+    def _log_upserts(self, collection: str, items: List[Tuple[str, np.ndarray, Dict]]):
+        """Append written items to the collection's write log, compacting in the background when due."""
+        if self.store is None:
+            return
+        self.store.append_upserts(collection, items)
+        if self.store.should_compact(collection):
+            self.store.schedule_compaction(collection, self.vectors[collection],
+                                           index=self.ann_indexes.get(collection))
+
+    def _log_delete(self, collection: str, item_id: str):
+        """Append a deletion to the collection's write log, compacting in the background when due."""
+        if self.store is None:
+            return
+        self.store.append_delete(collection, item_id)
+        if self.store.should_compact(collection):
+            self.store.schedule_compaction(collection, self.vectors[collection],
+                                           index=self.ann_indexes.get(collection))
+
+    def _get_ann_index(self, collection: str) -> Optional[IVFFlatIndex]:
+        """Return the collection's ANN index, creating it when ANN search is enabled."""
+        if self.index_type != "ivf":
+            return None
+        index = self.ann_indexes.get(collection)
+        if index is None:
+            index = IVFFlatIndex(**self.ann_settings)
+            self.ann_indexes[collection] = index
+        return index
+
+    def _load_or_build_index(self, collection: str):
+        """Restore a persisted ANN index and catch it up with the write log, or train a new one."""
+        index = self._get_ann_index(collection)
+        arrays = self.store.load_index(collection) if self.store else None
+        if arrays is not None:
+            index.load_arrays(arrays)
+            index.sync(self.vectors[collection], self.store.replayed_ids.get(collection, set()))
+            logger.info(f"Loaded ANN index for {collection}: {len(index)} vectors")
+        if index.needs_rebuild(len(self.vectors[collection])):
+            index.train(self.vectors[collection])
+
+    def _index_upserts(self, collection: str, item_ids: List[str]):
+        """Apply written items to the collection's ANN index, retraining when it has drifted."""
+        index = self._get_ann_index(collection)
+        if index is None:
+            return
+        if index.needs_rebuild(len(self.vectors[collection])):
+            index.train(self.vectors[collection])
+        else:
+            index.sync(self.vectors[collection], set(item_ids))
+
     def add_vector(self, collection: str, item_id: str, vector: np.ndarray, metadata: Dict = None) -> bool:
         """
         Add a vector to the database.
@@ -147,16 +207,15 @@ class VectorDB:
         try:
             # Ensure collection exists
             if collection not in self.vectors:
-                self.vectors[collection] = {}
+                self.vectors[collection] = VectorCollection()
 
-            # Store vector and metadata
-            self.vectors[collection][item_id] = {
-                "vector": vector,
-                "metadata": metadata or {}
-            }
+            # Store vector and metadata (updates the collection matrix in place)
+            if not self.vectors[collection].upsert(item_id, vector, metadata or {}):
+                return False
+            self._index_upserts(collection, [item_id])
 
-            # Save to disk
-            self._save_vectors()
+            # Append to the write log instead of rewriting the collection
+            self._log_upserts(collection, [(item_id, vector, metadata or {})])
 
             logger.info(f"Added vector: {collection}/{item_id}")
             return True
@@ -188,12 +247,10 @@ class VectorDB:
         # Use in-memory/file storage
         try:
             # Check if collection and item exist
-            if collection in self.vectors and item_id in self.vectors[collection]:
-                # Remove item
-                del self.vectors[collection][item_id]
-
-                # Save to disk
-                self._save_vectors()
+            if collection in self.vectors and self.vectors[collection].remove(item_id):
+                if collection in self.ann_indexes:
+                    self.ann_indexes[collection].remove(item_id)
+                self._log_delete(collection, item_id)
 
                 logger.info(f"Deleted vector: {collection}/{item_id}")
                 return True
@@ -206,7 +263,8 @@ class VectorDB:
 
     @VectorMonitor.monitor_vector_search
     def search(self, collection: str, query_vector: np.ndarray, filters: Dict = None,
-               limit: int = 10, query_text: str = None) -> List[Tuple[str, float]]:
+               limit: int = 10, query_text: str = None, exact: bool = False,
+               nprobe: Optional[int] = None) -> List[Tuple[str, float]]:
         """
         Search for similar vectors in a collection.
 
@@ -219,6 +277,8 @@ class VectorDB:
             filters (dict, optional): Metadata filters
             limit (int): Maximum number of results
             query_text (str, optional): Original query text for logging
+            exact (bool): Bypass the ANN index and score every vector
+            nprobe (int, optional): Per-query override of the IVF lists probed
 
         Returns:
             list: List of (item_id, similarity_score) tuples
@@ -257,31 +317,14 @@ class VectorDB:
                 )
                 return results
 
-            # Compute similarities for each vector in the collection
-            for item_id, item_data in self.vectors[collection].items():
-                # Apply filters if specified
-                if filters and not self._apply_filters(item_data.get("metadata", {}), filters):
-                    continue
-
-                # Compute cosine similarity
-                item_vector = item_data["vector"]
-                if isinstance(item_vector, list):
-                    item_vector = np.asarray(item_vector, dtype=np.float32)
-
-                # Normalize vectors (if not already normalized)
-                query_norm = np.linalg.norm(query_vector)
-                item_norm = np.linalg.norm(item_vector)
-
-                if query_norm > 0 and item_norm > 0:
-                    similarity = np.dot(query_vector, item_vector) / (query_norm * item_norm)
-                else:
-                    similarity = 0.0
-
-                results.append((item_id, float(similarity)))
-
-            # Sort by similarity (descending) and limit
-            results.sort(key=lambda x: x[1], reverse=True)
-            limited_results = results[:limit]
+            index = self.ann_indexes.get(collection)
+            if index is not None and not exact:
+                # Score only the IVF lists closest to the query
+                limited_results = index.search(self.vectors[collection], query_vector, limit=limit,
+                                               filters=filters, nprobe=nprobe)
+            else:
+                # Single matrix-vector product over the packed collection, then top-k
+                limited_results = self.vectors[collection].search(query_vector, limit=limit, filters=filters)
 
             # Calculate score metrics
             if limited_results:
@@ -301,28 +344,61 @@ class VectorDB:
             logger.error(f"Failed to search vectors: {str(e)}")
             return []
 
-    def _apply_filters(self, metadata: Dict, filters: Dict) -> bool:
-        """Apply metadata filters."""
-        if not filters:
-            return True
+    def evaluate_recall(self, collection: str, queries: Optional[np.ndarray] = None, k: int = 10,
+                        nprobe: Optional[int] = None, sample_size: int = 50) -> Dict[str, Any]:
+        """
+        Measure ANN recall@k and latency against exact search.
 
-        for key, value in filters.items():
-            # Handle nested keys with dot notation
-            if "." in key:
-                parts = key.split(".")
-                current = metadata
-                for part in parts[:-1]:
-                    if part not in current:
-                        return False
-                    current = current[part]
-
-                if parts[-1] not in current or current[parts[-1]] != value:
-                    return False
-            # Handle direct keys
-            elif key not in metadata or metadata[key] != value:
-                return False
+        Args:
+            collection (str): Collection name
+            queries (ndarray, optional): Query vectors (defaults to a sample of the collection's own rows)
+            k (int): Number of neighbours compared
+            nprobe (int, optional): IVF lists probed (defaults to the index setting)
+            sample_size (int): Number of collection rows sampled when no queries are given
 
-        return True
+        Returns:
+            dict: Recall and mean latencies of ANN and exact search
+        """
+        index = self.ann_indexes.get(collection)
+        if collection not in self.vectors or index is None:
+            return {"collection": collection, "error": "No ANN index for collection"}
+
+        items = self.vectors[collection]
+        if queries is None:
+            if len(items) == 0:
+                return {"collection": collection, "error": "Collection is empty"}
+            rng = np.random.default_rng(0)
+            rows = rng.choice(len(items), min(sample_size, len(items)), replace=False)
+            queries = items.matrix[rows]
+
+        hits = 0
+        ann_time = exact_time = 0.0
+        for query in np.atleast_2d(queries):
+            start = time.time()
+            exact_ids = {item_id for item_id, _ in items.search(query, limit=k)}
+            exact_time += time.time() - start
+
+            start = time.time()
+            ann_ids = {item_id for item_id, _ in index.search(items, query, limit=k, nprobe=nprobe)}
+            ann_time += time.time() - start
+
+            hits += len(exact_ids & ann_ids)
+
+        query_count = len(np.atleast_2d(queries))
+        recall = hits / (query_count * k) if query_count and k else 0.0
+        report = {
+            "collection": collection,
+            "k": k,
+            "nprobe": nprobe or index.nprobe,
+            "queries": query_count,
+            "recall_at_k": recall,
+            "ann_avg_ms": ann_time * 1000 / query_count if query_count else 0.0,
+            "exact_avg_ms": exact_time * 1000 / query_count if query_count else 0.0,
+            "index": index.get_stats()
+        }
+        VectorMonitor.log_ann_recall(**{key: report[key] for key in (
+            "collection", "k", "nprobe", "queries", "recall_at_k", "ann_avg_ms", "exact_avg_ms")})
+        return report
 
     @VectorMonitor.monitor_vector_search
     def search_attractions(self, query: str, embedding_model, filters: Dict = None,
@@ -475,12 +551,26 @@ class VectorDB:
                 return [False] * len(items)
 
         # Use in-memory/file storage
-        results = []
-        for item_id, vector, metadata in items:
-            result = self.add_vector(collection, item_id, vector, metadata)
-            results.append(result)
+        try:
+            if collection not in self.vectors:
+                self.vectors[collection] = VectorCollection()
 
-        return results
+            results = self.vectors[collection].upsert_many(items)
+
+            # Log the batch, or compact straight away when it alone fills the log
+            written = [item for item, ok in zip(items, results) if ok]
+            self._index_upserts(collection, [item[0] for item in written])
+            if self.store is not None and len(written) >= self.store.compaction_threshold:
+                self.store.write_collection(collection, self.vectors[collection],
+                                            index=self.ann_indexes.get(collection))
+            else:
+                self._log_upserts(collection, written)
+
+            logger.info(f"Added {sum(results)}/{len(items)} vectors to {collection}")
+            return results
+        except Exception as e:
+            logger.error(f"Failed to bulk add vectors: {str(e)}")
+            return [False] * len(items)
 
     def add_documents(self, documents: List[str], metadata: List[Dict] = None) -> List[str]:
         """
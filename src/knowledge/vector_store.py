@@ -0,0 +1,408 @@
+"""
+Binary on-disk storage for VectorDB collections.
+
+Each collection lives in its own directory:
+
+    <root>/collections/<name>/
+        meta.json              compact sidecar: generation, dimension, ids, metadata
+        vectors.<gen>.npy      normalized float32 rows, opened with np.load(mmap_mode="r")
+        norms.<gen>.npy        original vector norms
+        wal.jsonl              append-only log of upserts/deletes since the last compaction
+        ivf.npz                optional ANN index saved with the generation it was built against
+
+Matrices are memory-mapped read-only, so several uvicorn workers loading the
+same store share the page cache instead of each holding a private copy; a
+worker only copies a matrix once it writes to it. ``meta.json`` is the commit
+point of a compaction: new generation files are written first and the sidecar
+is atomically replaced last, so a crash never leaves ids and rows out of step.
+Log replay is idempotent, so a log that outlives its compaction is harmless.
+Writes are expected to come from a single process.
+"""
+import base64
+import json
+import logging
+import os
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import quote, unquote
+
+import numpy as np
+
+from src.knowledge.vector_collection import VectorCollection
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 1
+
+
+def _encode_vector(vector: Any) -> str:
+    return base64.b64encode(np.asarray(vector, dtype=np.float32).ravel().tobytes()).decode("ascii")
+
+
+def _decode_vector(data: str) -> np.ndarray:
+    return np.frombuffer(base64.b64decode(data), dtype=np.float32)
+
+
+def _atomic_write_json(path: str, payload: Any) -> None:
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(payload, f, separators=(',', ':'), ensure_ascii=False)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def _atomic_save_npy(path: str, array: np.ndarray) -> None:
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        np.save(f, array)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class VectorFileStore:
+    """
+    Memory-mapped matrix files plus a per-collection write-ahead log.
+
+    Mutations are appended to the collection's log; once the log holds
+    ``compaction_threshold`` operations the collection is compacted into a
+    new matrix generation on a background thread.
+    """
+
+    def __init__(self, root_path: str, compaction_threshold: int = 1000):
+        """
+        Initialize the store.
+
+        Args:
+            root_path: Directory holding the store (the VectorDB content path)
+            compaction_threshold: Logged operations that trigger a background compaction
+        """
+        self.root_path = root_path
+        self.collections_path = os.path.join(root_path, "collections")
+        self.compaction_threshold = compaction_threshold
+
+        self._io_locks: Dict[str, threading.Lock] = {}
+        self._io_locks_guard = threading.Lock()
+        self._wal_ops: Dict[str, int] = {}
+        self._compacting: set = set()
+        # Item ids touched by the last log replay, so derived indexes can catch up
+        self.replayed_ids: Dict[str, set] = {}
+        self.generations: Dict[str, int] = {}
+
+        self.stats = {
+            'wal_appends': 0,
+            'compactions': 0,
+            'replayed_ops': 0,
+            'migrated_vectors': 0
+        }
+
+    # ------------------------------------------------------------------
+    # Paths and locks
+    # ------------------------------------------------------------------
+
+    def exists(self) -> bool:
+        """Whether the binary store has been created."""
+        return os.path.isdir(self.collections_path)
+
+    def _collection_dir(self, name: str) -> str:
+        return os.path.join(self.collections_path, quote(name, safe=''))
+
+    def _io_lock(self, name: str) -> threading.Lock:
+        with self._io_locks_guard:
+            lock = self._io_locks.get(name)
+            if lock is None:
+                lock = threading.Lock()
+                self._io_locks[name] = lock
+            return lock
+
+    def collection_names(self) -> List[str]:
+        """Names of the collections present on disk."""
+        if not self.exists():
+            return []
+        return sorted(unquote(entry) for entry in os.listdir(self.collections_path)
+                      if os.path.isdir(os.path.join(self.collections_path, entry)))
+
+    # ------------------------------------------------------------------
+    # Loading
+    # ------------------------------------------------------------------
+
+    def load_all(self) -> Dict[str, VectorCollection]:
+        """
+        Load every collection on disk.
+
+        Returns:
+            dict: Collection name -> VectorCollection
+        """
+        return {name: self.load_collection(name) for name in self.collection_names()}
+
+    def load_collection(self, name: str) -> VectorCollection:
+        """
+        Memory-map a collection's latest generation and replay its write log.
+
+        Args:
+            name: Collection name
+
+        Returns:
+            VectorCollection: The loaded collection (empty if nothing is on disk)
+        """
+        directory = self._collection_dir(name)
+        meta_path = os.path.join(directory, "meta.json")
+
+        collection = VectorCollection()
+        if os.path.exists(meta_path):
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+
+            ids = meta.get("ids", [])
+            generation = meta.get("generation", 0)
+            self.generations[name] = generation
+            if ids:
+                matrix = np.load(os.path.join(directory, f"vectors.{generation}.npy"), mmap_mode='r')
+                norms = np.load(os.path.join(directory, f"norms.{generation}.npy"))
+                collection = VectorCollection.from_arrays(ids, meta.get("metadata", []), matrix, norms)
+            else:
+                collection = VectorCollection(dimension=meta.get("dimension"))
+
+        self._wal_ops[name] = self._replay_wal(name, collection)
+        return collection
+
+    def _replay_wal(self, name: str, collection: VectorCollection) -> int:
+        wal_path = os.path.join(self._collection_dir(name), "wal.jsonl")
+        if not os.path.exists(wal_path):
+            return 0
+
+        replayed = 0
+        touched = self.replayed_ids.setdefault(name, set())
+        with open(wal_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # A torn final line from an interrupted append
+                    logger.warning(f"Skipping unreadable write-log record in collection {name}")
+                    continue
+
+                if record.get("op") == "upsert":
+                    collection.upsert(record["id"], _decode_vector(record["vector"]), record.get("metadata") or {})
+                elif record.get("op") == "delete":
+                    collection.remove(record["id"])
+                touched.add(record.get("id"))
+                replayed += 1
+
+        if replayed:
+            self.stats['replayed_ops'] += replayed
+            logger.info(f"Replayed {replayed} logged operations for collection {name}")
+        return replayed
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+
+    def append_upserts(self, name: str, items: List[Tuple[str, Any, Optional[Dict]]]) -> None:
+        """
+        Log inserted or replaced items.
+
+        Args:
+            name: Collection name
+            items: List of (item_id, vector, metadata) tuples
+        """
+        self._append(name, [
+            {"op": "upsert", "id": item_id, "vector": _encode_vector(vector), "metadata": metadata or {}}
+            for item_id, vector, metadata in items
+        ])
+
+    def append_delete(self, name: str, item_id: str) -> None:
+        """
+        Log a deleted item.
+
+        Args:
+            name: Collection name
+            item_id: Item identifier
+        """
+        self._append(name, [{"op": "delete", "id": item_id}])
+
+    def _append(self, name: str, records: List[Dict[str, Any]]) -> None:
+        if not records:
+            return
+        directory = self._collection_dir(name)
+        with self._io_lock(name):
+            os.makedirs(directory, exist_ok=True)
+            with open(os.path.join(directory, "wal.jsonl"), 'a', encoding='utf-8') as f:
+                f.write("".join(json.dumps(record, separators=(',', ':'), ensure_ascii=False) + "\n"
+                                for record in records))
+            self._wal_ops[name] = self._wal_ops.get(name, 0) + len(records)
+            self.stats['wal_appends'] += len(records)
+
+    def should_compact(self, name: str) -> bool:
+        """Whether a collection's write log has reached the compaction threshold."""
+        return self._wal_ops.get(name, 0) >= self.compaction_threshold
+
+    def schedule_compaction(self, name: str, collection: VectorCollection, index: Any = None) -> None:
+        """
+        Compact a collection on a background thread unless a compaction is already running.
+
+        Args:
+            name: Collection name
+            collection: The live collection to snapshot
+            index: Optional ANN index to persist alongside the new generation
+        """
+        with self._io_locks_guard:
+            if name in self._compacting:
+                return
+            self._compacting.add(name)
+
+        def compact_worker():
+            try:
+                self.write_collection(name, collection, index=index)
+            except Exception as e:
+                logger.error(f"Background compaction of collection {name} failed: {str(e)}")
+            finally:
+                with self._io_locks_guard:
+                    self._compacting.discard(name)
+
+        threading.Thread(target=compact_worker, daemon=True, name=f"vector-compaction-{name}").start()
+
+    def write_collection(self, name: str, collection: VectorCollection, index: Any = None) -> None:
+        """
+        Write a new matrix generation for a collection and truncate its write log.
+
+        The snapshot is taken while holding the collection's I/O lock, so every
+        mutation either lands in the snapshot or is logged after the truncation.
+
+        Args:
+            name: Collection name
+            collection: The collection to persist
+            index: Optional ANN index (with ``to_arrays()``) to persist alongside
+        """
+        directory = self._collection_dir(name)
+        meta_path = os.path.join(directory, "meta.json")
+
+        with self._io_lock(name):
+            os.makedirs(directory, exist_ok=True)
+            ids, metadata, matrix, norms = collection.snapshot()
+
+            previous_generation = None
+            if os.path.exists(meta_path):
+                with open(meta_path, 'r', encoding='utf-8') as f:
+                    previous_generation = json.load(f).get("generation")
+            generation = (previous_generation or 0) + 1
+
+            if ids:
+                _atomic_save_npy(os.path.join(directory, f"vectors.{generation}.npy"), matrix)
+                _atomic_save_npy(os.path.join(directory, f"norms.{generation}.npy"), norms.astype(np.float32))
+
+            _atomic_write_json(meta_path, {
+                "format_version": FORMAT_VERSION,
+                "generation": generation,
+                "dimension": collection.dimension,
+                "ids": ids,
+                "metadata": metadata
+            })
+
+            # The sidecar now points at the new generation; the log and old files are obsolete
+            open(os.path.join(directory, "wal.jsonl"), 'w').close()
+            self._wal_ops[name] = 0
+            self.generations[name] = generation
+            if index is not None:
+                self._save_index(directory, generation, index)
+            if previous_generation is not None:
+                for prefix in ("vectors", "norms"):
+                    old_path = os.path.join(directory, f"{prefix}.{previous_generation}.npy")
+                    if os.path.exists(old_path):
+                        # Workers that still map the old file keep their pages until they reload
+                        os.remove(old_path)
+
+            self.stats['compactions'] += 1
+            logger.info(f"Compacted collection {name}: {len(ids)} vectors (generation {generation})")
+
+    def _save_index(self, directory: str, generation: int, index: Any) -> None:
+        arrays = index.to_arrays()
+        if not arrays:
+            return
+        index_path = os.path.join(directory, "ivf.npz")
+        tmp_path = f"{index_path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, generation=np.array(generation), **arrays)
+        os.replace(tmp_path, index_path)
+
+    def load_index(self, name: str) -> Optional[Dict[str, np.ndarray]]:
+        """
+        Load a persisted ANN index if it was built against the collection's current generation.
+
+        Entries written after that generation are in the write log and are
+        listed in ``replayed_ids[name]`` for the caller to re-sync.
+
+        Args:
+            name: Collection name
+
+        Returns:
+            dict: Index arrays, or None if missing or stale
+        """
+        index_path = os.path.join(self._collection_dir(name), "ivf.npz")
+        if not os.path.exists(index_path):
+            return None
+        try:
+            with np.load(index_path) as data:
+                arrays = {key: data[key] for key in data.files}
+        except Exception as e:
+            logger.warning(f"Failed to read ANN index for collection {name}: {str(e)}")
+            return None
+        if int(arrays.pop("generation", -1)) != self.generations.get(name):
+            logger.info(f"Persisted ANN index for collection {name} is stale; it will be rebuilt")
+            return None
+        return arrays
+
+    # ------------------------------------------------------------------
+    # Migration
+    # ------------------------------------------------------------------
+
+    def migrate_from_json(self, index_path: str) -> Optional[Dict[str, VectorCollection]]:
+        """
+        One-shot migration from the legacy ``index.json`` format.
+
+        The legacy file is renamed to ``index.json.migrated`` once every
+        collection has been written, so the migration runs only once.
+
+        Args:
+            index_path: Path of the legacy index.json
+
+        Returns:
+            dict: Migrated collections, or None if there is nothing to migrate
+        """
+        if not os.path.exists(index_path):
+            return None
+
+        with open(index_path, 'r', encoding='utf-8') as f:
+            raw_vectors = json.load(f)
+
+        collections = {}
+        for name, items in raw_vectors.items():
+            collection = VectorCollection()
+            collection.upsert_many([
+                (item_id, item_data["vector"], item_data.get("metadata", {}))
+                for item_id, item_data in items.items()
+                if "vector" in item_data
+            ])
+            self.write_collection(name, collection)
+            collections[name] = collection
+
+        os.replace(index_path, f"{index_path}.migrated")
+
+        migrated = sum(len(collection) for collection in collections.values())
+        self.stats['migrated_vectors'] += migrated
+        logger.info(f"Migrated {migrated} vectors from {index_path} to the binary vector store")
+        return collections
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get store statistics.
+
+        Returns:
+            Dictionary with write-log and compaction counters
+        """
+        return {
+            **self.stats,
+            "pending_wal_ops": dict(self._wal_ops),
+            "compactions_running": len(self._compacting)
+        }
@@ -3,6 +3,7 @@ Main FastAPI application entry point for the Egypt Tourism Chatbot.
 Phase 4: Added performance monitoring and comprehensive health checks.
 """
 import os
+import inspect
 import sys
 import logging
 import time
@@ -69,6 +70,7 @@ from src.api.auth import router as auth_router
 from src.api.routes.db_routes import router as database_router
 # Import enhanced session manager
 from src.session.enhanced_session_manager import EnhancedSessionManager
+from src.session.write_behind import WriteBehindSessionManager
 from src.session.integration import SessionMiddleware
 # Phase 4: Health check router
 try:
@@ -274,6 +276,10 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     total_preload_time = time.time() - preload_start_time
     logger.info(f"🚀 PHASE 2 COMPLETE: Total preload time {total_preload_time:.2f}s")
 
+    # Start the background session flusher on the application event loop
+    if isinstance(getattr(chatbot_instance, 'session_manager', None), WriteBehindSessionManager):
+        chatbot_instance.session_manager.start()
+
     app.state.chatbot = chatbot_instance # Assign to app.state
     app.state.models_preloaded = True  # Flag to indicate models are ready
     logger.info("Chatbot components initialized successfully and attached to app state.")
@@ -284,10 +290,32 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     # Shutdown: Clean up resources
     logger.info("Application shutdown: Cleaning up resources...")
 
+    # Flush write-behind session state before anything else shuts down
+    chat_sessions = getattr(chatbot_instance, 'session_manager', None)
+    if isinstance(chat_sessions, WriteBehindSessionManager):
+        try:
+            await chat_sessions.close()
+        except Exception as e:
+            logger.error(f"Error flushing sessions on shutdown: {e}")
+
+    # Close asyncio Redis connection pools
+    try:
+        from src.session.redis_connection import RedisConnectionManager
+        await RedisConnectionManager.close_async_clients()
+    except Exception as e:
+        logger.error(f"Error closing asyncio Redis clients: {e}")
+
     # Close DB connections
     if chatbot_instance and hasattr(chatbot_instance, 'db_manager'):
         db_manager = chatbot_instance.db_manager
-        if hasattr(db_manager, 'close'):
+        close_async = getattr(db_manager, 'close_async', None)
+        if inspect.iscoroutinefunction(close_async):
+            try:
+                await close_async()
+                logger.info("Database connections closed (async and sync pools).")
+            except Exception as e:
+                logger.error(f"Error closing database manager: {e}")
+        elif hasattr(db_manager, 'close'):
             try:
                 db_manager.close()
                 logger.info("Database connections closed.")
@@ -296,6 +324,13 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
         else:
             logger.info("No close() method found on db_manager; skipping DB shutdown.")
 
+    # Close the shared async Anthropic HTTP connection pool
+    try:
+        from src.services.anthropic_service import close_shared_async_http_client
+        await close_shared_async_http_client()
+    except Exception as e:
+        logger.error(f"Error closing Anthropic HTTP connection pool: {e}")
+
     logger.info("Application shutdown complete.")
 
 # Create FastAPI app instance with lifespan
@@ -422,7 +457,7 @@ if should_enable_auth:
                 "/docs", "/redoc", "/openapi.json", "/api/health",
                 "/api/v1/auth/session", "/api/v1/auth/validate-session",
                 "/api/v1/auth/refresh-session", "/api/v1/auth/end-session",
-                "/api/chat", "/api/reset", "/api/suggestions",
+                "/api/chat", "/api/chat/stream", "/api/reset", "/api/suggestions",
                 "/api/languages", "/api/feedback",
                 "/", "/static", "/{full_path:path}"  # Keep essential paths public
             ],
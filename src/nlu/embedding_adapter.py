@@ -2,11 +2,17 @@
 Simple embedding adapter for NLU layer.
 Provides embedding functionality without violating architectural layers.
 """
+import asyncio
+import time
 import numpy as np
 import torch
 import logging
 from typing import Optional, Dict, Any, List
 
+from src.nlu.embedding_batcher import (
+    BatchThroughputTracker, EmbeddingMicroBatcher, plan_length_sorted_batches
+)
+
 logger = logging.getLogger(__name__)
 
 
@@ -18,10 +24,14 @@ class InfrastructureEmbeddingService:
     CRITICAL FIX: Auto-loads essential models to ensure real AI functionality
     """
     
-    def __init__(self, models: Dict[str, Any] = None, tokenizers: Dict[str, Any] = None, cache=None):
+    def __init__(self, models: Dict[str, Any] = None, tokenizers: Dict[str, Any] = None, cache=None,
+                 batching_config: Dict[str, Any] = None):
         self.models = models or {}
         self.tokenizers = tokenizers or {}
         self.cache = cache
+        self.batching_config = batching_config or {}
+        self._batcher: Optional[EmbeddingMicroBatcher] = None
+        self.batch_throughput = BatchThroughputTracker()
         self._stats = {"embeddings_generated": 0, "cache_hits": 0}
         
         # CRITICAL FIX: Auto-load essential models if none provided
@@ -141,26 +151,177 @@ class InfrastructureEmbeddingService:
         logger.warning("⚠️  Falling back to zero embedding")
         return np.zeros(768, dtype=np.float32)
     
+    def _cache_get(self, text: str, language: Optional[str]) -> Optional[np.ndarray]:
+        """Return a cached embedding or None (handles dict-like and LRUCache-like caches)."""
+        if not self.cache:
+            return None
+        cache_key = f"emb_{hash(text)}_{language}"
+        try:
+            if hasattr(self.cache, 'get'):
+                cached = self.cache.get(cache_key)
+            elif hasattr(self.cache, '__getitem__'):
+                try:
+                    cached = self.cache[cache_key]
+                except KeyError:
+                    cached = None
+            else:
+                cached = None
+        except Exception as cache_error:
+            logger.debug(f"Cache access error: {cache_error}")
+            return None
+        if cached is None:
+            return None
+        self._stats["cache_hits"] += 1
+        return np.array(cached)
+
+    def _cache_set(self, text: str, language: Optional[str], embedding: np.ndarray):
+        """Store an embedding in the cache, ignoring cache errors."""
+        if not self.cache:
+            return
+        cache_key = f"emb_{hash(text)}_{language}"
+        try:
+            if hasattr(self.cache, 'set'):
+                self.cache.set(cache_key, embedding.tolist())
+            elif hasattr(self.cache, '__setitem__'):
+                self.cache[cache_key] = embedding.tolist()
+        except Exception as cache_error:
+            logger.debug(f"Cache set error: {cache_error}")
+
+    def _forward_batch(self, texts: List[str], model_key: str) -> np.ndarray:
+        """
+        Run one batched forward pass and mean-pool over real (non-padding) tokens.
+
+        Matches generate_embedding(), whose single unpadded input makes the plain
+        mean over all tokens the same masked mean.
+        """
+        model = self.models[model_key]
+        tokenizer = self.tokenizers[model_key]
+        start_time = time.time()
+        inputs = tokenizer(texts, return_tensors="pt", padding=True, truncation=True, max_length=512)
+        with torch.no_grad():
+            outputs = model(**inputs)
+            mask = inputs["attention_mask"].unsqueeze(-1).to(outputs.last_hidden_state.dtype)
+            summed = (outputs.last_hidden_state * mask).sum(dim=1)
+            embeddings = (summed / mask.sum(dim=1).clamp(min=1e-9)).numpy()
+        self.batch_throughput.record(
+            texts=len(texts),
+            tokens=int(inputs["attention_mask"].sum()),
+            padded_tokens=int(inputs["attention_mask"].numel()),
+            seconds=time.time() - start_time
+        )
+        return embeddings
+
+    def embed_uncached_batch(self, texts: List[str], language: Optional[str] = None) -> List[np.ndarray]:
+        """
+        Embed texts with a single forward pass, bypassing cache lookups but filling the cache.
+
+        Used as the micro-batcher's batch function.
+
+        Args:
+            texts: Texts to embed
+            language: Target language
+
+        Returns:
+            Embeddings in input order
+        """
+        model_key = self.select_best_model(language)
+        if not model_key or model_key not in self.models or not self.tokenizers.get(model_key):
+            logger.warning(f"❌ No suitable model found for language: {language}")
+            return [np.zeros(768, dtype=np.float32) for _ in texts]
+
+        embeddings = self._forward_batch(texts, model_key)
+        results = []
+        for text, embedding in zip(texts, embeddings):
+            self._cache_set(text, language, embedding)
+            results.append(embedding)
+        self._stats["embeddings_generated"] += len(texts)
+        return results
+
     def generate_batch_embeddings(self, texts: List[str], language: Optional[str] = None) -> List[np.ndarray]:
         """
         CRITICAL FIX: Generate embeddings for multiple texts in batch.
         Expected by intent classifier for processing intent examples.
+
+        Uncached texts are sorted by token length and embedded in sub-batches of
+        at most ``sub_batch_size`` texts and ``max_tokens_per_batch`` padded
+        tokens; failed sub-batches fall back to per-text generation.
         """
         logger.debug(f"🔧 Generating batch embeddings for {len(texts)} texts")
-        
-        embeddings = []
-        for text in texts:
+
+        embeddings: List[Optional[np.ndarray]] = [self._cache_get(text, language) for text in texts]
+        uncached = [i for i, embedding in enumerate(embeddings) if embedding is None]
+
+        model_key = self.select_best_model(language)
+        tokenizer = self.tokenizers.get(model_key) if model_key else None
+        if uncached and tokenizer is not None:
             try:
-                embedding = self.generate_embedding(text, language)
-                embeddings.append(embedding)
+                lengths = [len(ids) for ids in tokenizer(
+                    [texts[i] for i in uncached], truncation=True, max_length=512)["input_ids"]]
             except Exception as e:
-                logger.warning(f"❌ Failed to generate embedding for text: {text[:50]}... - {e}")
-                # Use zero embedding as fallback for failed items
-                embeddings.append(np.zeros(768, dtype=np.float32))
-        
+                logger.debug(f"Token length estimation failed, using character lengths: {e}")
+                lengths = [len(texts[i]) for i in uncached]
+            sub_batches = plan_length_sorted_batches(
+                lengths,
+                max_batch_size=self.batching_config.get("sub_batch_size", 32),
+                max_tokens_per_batch=self.batching_config.get("max_tokens_per_batch", 8192)
+            )
+        else:
+            sub_batches = [list(range(len(uncached)))] if uncached else []
+
+        for positions in sub_batches:
+            chunk = [uncached[p] for p in positions]
+            chunk_texts = [texts[i] for i in chunk]
+            try:
+                for i, embedding in zip(chunk, self.embed_uncached_batch(chunk_texts, language)):
+                    embeddings[i] = embedding
+            except Exception as e:
+                logger.warning(f"❌ Batched embedding failed, falling back to single texts: {e}")
+                for i in chunk:
+                    try:
+                        embeddings[i] = self.generate_embedding(texts[i], language)
+                    except Exception as single_error:
+                        logger.warning(f"❌ Failed to generate embedding for text: {texts[i][:50]}... - {single_error}")
+                        # Use zero embedding as fallback for failed items
+                        embeddings[i] = np.zeros(768, dtype=np.float32)
+
         logger.debug(f"✅ Generated {len(embeddings)} batch embeddings")
         return embeddings
-    
+
+    @property
+    def batcher(self) -> EmbeddingMicroBatcher:
+        """Micro-batcher shared by concurrent async embedding requests."""
+        if self._batcher is None:
+            self._batcher = EmbeddingMicroBatcher(
+                self.embed_uncached_batch,
+                max_batch_size=self.batching_config.get("max_batch_size", 32),
+                max_wait_ms=self.batching_config.get("max_wait_ms", 5.0),
+                length_bucket_size=self.batching_config.get("length_bucket_size", 64),
+                name="nlu_embedding"
+            )
+        return self._batcher
+
+    async def generate_embedding_async(self, text: str, language: Optional[str] = None) -> np.ndarray:
+        """
+        Generate an embedding without blocking the event loop.
+
+        Concurrent calls are coalesced into batched forward passes by the
+        micro-batcher (unless batching is disabled in the config).
+        """
+        cached = self._cache_get(text, language)
+        if cached is not None:
+            return cached
+
+        if not self.batching_config.get("enabled", True):
+            return await asyncio.to_thread(self.generate_embedding, text, language)
+
+        try:
+            embedding = await self.batcher.embed(text, language)
+            return embedding.reshape(1) if embedding.shape == () else embedding
+        except Exception as e:
+            logger.error(f"❌ Error generating embedding: {e}")
+            logger.warning("⚠️  Falling back to zero embedding")
+            return np.zeros(768, dtype=np.float32)
+
     def select_best_model(self, language: Optional[str] = None) -> Optional[str]:
         """Select best model for language."""
         if not self.models:
@@ -180,6 +341,8 @@ class InfrastructureEmbeddingService:
         """Get service statistics."""
         stats = self._stats.copy()
         stats.update({
+            "micro_batching": self._batcher.get_stats() if self._batcher else None,
+            "batch_throughput": self.batch_throughput.get_stats(),
             "models_loaded": len(self.models),
             "model_names": list(self.models.keys()),
             "is_ready": self.is_ready()
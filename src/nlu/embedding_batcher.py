@@ -0,0 +1,281 @@
+"""
+Dynamic micro-batching for embedding generation.
+
+Concurrent requests are collected for up to ``max_wait_ms`` or until
+``max_batch_size`` texts are waiting, grouped into length buckets so short
+texts are not padded to the longest one, and embedded with one batched
+forward pass per bucket on a dedicated worker thread. Each caller awaits its
+own future.
+
+Also provides the length-sorted sub-batch planning and throughput tracking
+used by the services' synchronous generate_batch_embeddings.
+"""
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingMicroBatcher:
+    """
+    Coalesces single-text embedding requests into batched model calls.
+
+    Requests are partitioned by language because each language may map to a
+    different model.
+    """
+
+    def __init__(self,
+                 embed_batch_fn: Callable[[List[str], Optional[str]], Sequence[np.ndarray]],
+                 max_batch_size: int = 32,
+                 max_wait_ms: float = 5.0,
+                 length_bucket_size: int = 64,
+                 max_workers: int = 1,
+                 name: str = "embedding"):
+        """
+        Initialize the micro-batcher.
+
+        Args:
+            embed_batch_fn: Blocking ``(texts, language) -> embeddings`` callable that runs
+                one batched forward pass and returns embeddings in input order
+            max_batch_size: Flush as soon as this many texts are waiting
+            max_wait_ms: Maximum time the first request of a batch waits for company
+            length_bucket_size: Width (in characters) of the length buckets used to limit padding
+            max_workers: Worker threads running forward passes
+            name: Name used in logs and stats
+        """
+        self.embed_batch_fn = embed_batch_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.length_bucket_size = max(1, length_bucket_size)
+        self.name = name
+
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"{name}-batcher")
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._pending: Dict[Optional[str], List[Tuple[str, asyncio.Future]]] = {}
+        self._timers: Dict[Optional[str], asyncio.TimerHandle] = {}
+        self._tasks: set = set()
+
+        self.stats = {
+            'requests': 0,
+            'batches': 0,
+            'forward_passes': 0,
+            'texts_embedded': 0,
+            'deduplicated': 0,
+            'max_batch_size_seen': 0,
+            'total_forward_time': 0.0,
+            'errors': 0
+        }
+
+    async def embed(self, text: str, language: Optional[str] = None) -> np.ndarray:
+        """
+        Embed one text as part of the next micro-batch.
+
+        Args:
+            text: Text to embed
+            language: Target language (selects the model)
+
+        Returns:
+            Embedding vector
+
+        Raises:
+            Exception: Whatever the batched forward pass raised
+        """
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            # Futures and timers belong to one event loop
+            self._loop = loop
+            self._pending = {}
+            self._timers = {}
+
+        future = loop.create_future()
+        batch = self._pending.setdefault(language, [])
+        batch.append((text, future))
+        self.stats['requests'] += 1
+
+        if len(batch) >= self.max_batch_size:
+            self._dispatch(language)
+        elif language not in self._timers:
+            self._timers[language] = loop.call_later(self.max_wait, self._dispatch, language)
+
+        return await future
+
+    def _dispatch(self, language: Optional[str]) -> None:
+        timer = self._timers.pop(language, None)
+        if timer is not None:
+            timer.cancel()
+        items = self._pending.pop(language, None)
+        if not items:
+            return
+        task = asyncio.ensure_future(self._run_batch(language, items))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def _length_buckets(self, texts: List[str]) -> List[List[str]]:
+        """Sort texts by length and split them wherever the length bucket changes."""
+        buckets: List[List[str]] = []
+        current_bucket = None
+        for text in sorted(texts, key=len):
+            bucket = len(text) // self.length_bucket_size
+            if bucket != current_bucket:
+                buckets.append([])
+                current_bucket = bucket
+            buckets[-1].append(text)
+        return buckets
+
+    async def _run_batch(self, language: Optional[str], items: List[Tuple[str, asyncio.Future]]) -> None:
+        waiters: Dict[str, List[asyncio.Future]] = {}
+        for text, future in items:
+            waiters.setdefault(text, []).append(future)
+
+        self.stats['batches'] += 1
+        self.stats['deduplicated'] += len(items) - len(waiters)
+        self.stats['max_batch_size_seen'] = max(self.stats['max_batch_size_seen'], len(waiters))
+
+        loop = asyncio.get_running_loop()
+        for texts in self._length_buckets(list(waiters)):
+            start_time = time.time()
+            try:
+                embeddings = await loop.run_in_executor(self._executor, self.embed_batch_fn, texts, language)
+                if len(embeddings) != len(texts):
+                    raise ValueError(f"Expected {len(texts)} embeddings, got {len(embeddings)}")
+            except Exception as e:
+                self.stats['errors'] += 1
+                logger.error(f"❌ {self.name} micro-batch of {len(texts)} failed: {str(e)}")
+                for text in texts:
+                    for future in waiters[text]:
+                        if not future.done():
+                            future.set_exception(e)
+                continue
+
+            self.stats['forward_passes'] += 1
+            self.stats['texts_embedded'] += len(texts)
+            self.stats['total_forward_time'] += time.time() - start_time
+            for text, embedding in zip(texts, embeddings):
+                for future in waiters[text]:
+                    if not future.done():
+                        future.set_result(embedding)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get batching statistics.
+
+        Returns:
+            Dictionary with request, batch and throughput counters
+        """
+        forward_passes = self.stats['forward_passes']
+        return {
+            **self.stats,
+            "average_batch_size": self.stats['texts_embedded'] / forward_passes if forward_passes else 0.0,
+            "average_forward_time_ms": (
+                self.stats['total_forward_time'] * 1000 / forward_passes if forward_passes else 0.0
+            ),
+            "texts_per_second": (
+                self.stats['texts_embedded'] / self.stats['total_forward_time']
+                if self.stats['total_forward_time'] else 0.0
+            ),
+            "pending": sum(len(items) for items in self._pending.values()),
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000
+        }
+
+    def shutdown(self) -> None:
+        """Stop the worker thread pool."""
+        self._executor.shutdown(wait=False)
+
+
+def plan_length_sorted_batches(lengths: Sequence[int], max_batch_size: int = 32,
+                               max_tokens_per_batch: int = 8192) -> List[List[int]]:
+    """
+    Group item indices into sub-batches of similar token length.
+
+    Items are sorted by length so each sub-batch pads only to its own longest
+    item, and a sub-batch is closed when it reaches ``max_batch_size`` items or
+    when its padded size (items x longest length) would exceed
+    ``max_tokens_per_batch``. An item longer than the token budget gets a
+    sub-batch of its own.
+
+    Args:
+        lengths: Token length of each item
+        max_batch_size: Maximum items per sub-batch
+        max_tokens_per_batch: Maximum padded tokens per sub-batch
+
+    Returns:
+        List of sub-batches, each a list of indices into ``lengths``
+    """
+    batches: List[List[int]] = []
+    current: List[int] = []
+    for index in sorted(range(len(lengths)), key=lambda i: lengths[i]):
+        # Sorted ascending, so the new item is the longest in the sub-batch
+        padded_tokens = (len(current) + 1) * lengths[index]
+        if current and (len(current) >= max_batch_size or padded_tokens > max_tokens_per_batch):
+            batches.append(current)
+            current = []
+        current.append(index)
+    if current:
+        batches.append(current)
+    return batches
+
+
+class BatchThroughputTracker:
+    """Aggregate and recent per-sub-batch throughput of batched embedding runs."""
+
+    def __init__(self, history_size: int = 50):
+        self.recent: "deque[Dict[str, Any]]" = deque(maxlen=history_size)
+        self._lock = threading.Lock()
+        self.totals = {
+            'sub_batches': 0,
+            'texts': 0,
+            'tokens': 0,
+            'padded_tokens': 0,
+            'seconds': 0.0
+        }
+
+    def record(self, texts: int, tokens: int, padded_tokens: int, seconds: float) -> None:
+        """
+        Record one sub-batch forward pass.
+
+        Args:
+            texts: Texts in the sub-batch
+            tokens: Real (unpadded) tokens in the sub-batch
+            padded_tokens: Tokens after padding to the longest text
+            seconds: Wall time of tokenization plus forward pass
+        """
+        with self._lock:
+            self.totals['sub_batches'] += 1
+            self.totals['texts'] += texts
+            self.totals['tokens'] += tokens
+            self.totals['padded_tokens'] += padded_tokens
+            self.totals['seconds'] += seconds
+            self.recent.append({
+                "texts": texts,
+                "padded_tokens": padded_tokens,
+                "seconds": seconds,
+                "texts_per_second": texts / seconds if seconds else 0.0,
+                "tokens_per_second": tokens / seconds if seconds else 0.0
+            })
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get throughput statistics.
+
+        Returns:
+            Dictionary with totals, padding efficiency and recent sub-batches
+        """
+        with self._lock:
+            seconds = self.totals['seconds']
+            return {
+                **self.totals,
+                "texts_per_second": self.totals['texts'] / seconds if seconds else 0.0,
+                "tokens_per_second": self.totals['tokens'] / seconds if seconds else 0.0,
+                "padding_efficiency": (
+                    self.totals['tokens'] / self.totals['padded_tokens'] if self.totals['padded_tokens'] else 1.0
+                ),
+                "recent_sub_batches": list(self.recent)
+            }
@@ -108,7 +108,8 @@ class NLUEngine:
         # Initialize language detector
         self.language_detector = LanguageDetector(
             model_path=self.models_config.get("language_detection", {}).get("model_path"),
-            confidence_threshold=self.models_config.get("language_detection", {}).get("confidence_threshold", 0.8)
+            confidence_threshold=self.models_config.get("language_detection", {}).get("confidence_threshold", 0.8),
+            cache_size=self.models_config.get("language_detection", {}).get("cache_size", 4096)
         )
         
         # Initialize language-specific NLP models
@@ -142,7 +143,8 @@ class NLUEngine:
         self.embedding_service = InfrastructureEmbeddingService(
             models=self.transformer_models,
             tokenizers=self.transformer_tokenizers,
-            cache=self.embedding_cache
+            cache=self.embedding_cache,
+            batching_config=self.models_config.get("embedding_batching", {})
         )
         
         # Initialize intent classifier (Phase 1 Fix: Use AdvancedIntentClassifier)
@@ -372,6 +374,28 @@ class NLUEngine:
         total_load_time = time.time() - total_start_time
         loaded_count = len(self.transformer_models)
         logger.info(f"🎯 Transformer model loading complete: {loaded_count}/{len(transformer_configs)} models loaded in {total_load_time:.2f}s")
+        
+        self._apply_embedding_backend()
+
+    def _apply_embedding_backend(self):
+        """Swap loaded transformer models for ONNX Runtime sessions when configured."""
+        backend_config = self.models_config.get("embedding_backend", {})
+        self.embedding_backend_report = {}
+        if backend_config.get("type", "torch") != "onnx" or not self.transformer_models:
+            return
+        
+        from src.nlu.onnx_backend import build_onnx_models
+        start_time = time.time()
+        self.transformer_models, self.embedding_backend_report = build_onnx_models(
+            self.transformer_models,
+            self.transformer_tokenizers,
+            self.models_config.get("transformer_models", {}),
+            backend_config
+        )
+        # The embedding service may already hold the previous dictionary
+        if getattr(self, 'embedding_service', None) is not None:
+            self.embedding_service.models = self.transformer_models
+        logger.info(f"🎯 ONNX embedding backend prepared in {time.time() - start_time:.2f}s")
 
     async def _load_transformer_models_async(self):
         """
@@ -438,6 +462,8 @@ class NLUEngine:
         logger.info(f"🎯 Phase 3: Async transformer loading complete: {success_count}/{len(transformer_configs)} models loaded in {total_load_time:.2f}s")
         logger.info(f"⚡ Performance improvement: Parallel loading vs sequential")
         
+        await asyncio.to_thread(self._apply_embedding_backend)
+        
         # Mark models as loaded
         self._models_loaded = True
 
@@ -562,15 +588,90 @@ class NLUEngine:
         supported_languages = entity_config.get("supported_languages", ["en", "ar"])
         
         for lang in supported_languages:
-            lang_config = entity_config.get(lang, {})
+            lang_config = {"gazetteer": entity_config.get("gazetteer", {}), **entity_config.get(lang, {})}
             self.entity_extractors[lang] = EnhancedEntityExtractor(
                 language=lang,
                 config=lang_config,
                 nlp_model=self.nlp_models.get(lang),
                 knowledge_base=self.knowledge_base,
-                embedding_model=self._get_embedding_model
+                embedding_model=self._get_embedding_model,
+                batch_embedding_model=self._get_batch_embedding_model,
+                model_id=self._embedding_model_id(lang)
             )
             logger.info(f"Initialized enhanced entity extractor for {lang}")
+            
+            # Precompute entity vectors at startup (reused from disk when unchanged)
+            if self.embedding_service is not None and self.embedding_service.is_ready():
+                self.entity_extractors[lang].build_entity_vectors()
+    
+    def refresh_entity_vectors(self) -> Dict[str, Any]:
+        """
+        Reload known entities from the knowledge base and refresh entity vectors.
+        
+        Call after the knowledge base changes; only new entity names are embedded.
+        
+        Returns:
+            Dict: Rebuild statistics per language
+        """
+        return {lang: extractor.refresh_entity_lists() for lang, extractor in self.entity_extractors.items()}
+    
+    def get_entity_vector_stats(self) -> Dict[str, Any]:
+        """
+        Get entity vector store rebuild statistics and freshness per language.
+        
+        Returns:
+            Dict: Statistics per language
+        """
+        return {
+            lang: extractor.entity_vectors.get_stats()
+            for lang, extractor in self.entity_extractors.items()
+            if getattr(extractor, "entity_vectors", None) is not None
+        }
+    
+    def _embedding_model_id(self, language: Optional[str] = None) -> str:
+        """Identify the embedding model used for a language (keys persisted vectors)."""
+        if self.embedding_service is None:
+            return "none"
+        model_key = self.embedding_service.select_best_model(language)
+        model = self.embedding_service.models.get(model_key) if model_key else None
+        model_name = (
+            getattr(model, 'name_or_path', None)
+            or getattr(getattr(model, 'config', None), '_name_or_path', None)
+        )
+        return f"{model_key}:{model_name}"
+    
+    def _get_batch_embedding_model(self, texts: List[str], language: Optional[str] = None) -> List[np.ndarray]:
+        """Embed several texts with length-sorted batched forward passes."""
+        return self.embedding_service.generate_batch_embeddings(texts, language)
+    
+    def _extract_entities(self, text: str, language: str, intent: Optional[str],
+                          context: Optional[Dict] = None) -> Dict[str, Any]:
+        """
+        Extract entities for a processed message.
+        
+        Uses the extractor's gazetteer fast path unless entity_extraction.fast_path
+        is disabled in the models config.
+        
+        Args:
+            text (str): Preprocessed message text
+            language (str): Language code
+            intent (str): Classified intent
+            context (dict, optional): Current conversation context
+            
+        Returns:
+            dict: Entities, confidence scores and optional relationships
+        """
+        extractor = self.entity_extractors.get(language) or self.entity_extractors.get("en")
+        if extractor is None:
+            return {"entities": {}, "confidence": {}}
+        
+        try:
+            if self.models_config.get("entity_extraction", {}).get("fast_path", True):
+                return extractor.extract_fast(text, intent=intent, context=context)
+            return extractor.extract(text, intent=intent, context=context)
+        except Exception as e:
+            logger.error(f"❌ Entity extraction failed: {str(e)}")
+            return {"entities": {}, "confidence": {}}
     
     def _get_embedding_model(self, text, language=None):
         """Get embeddings for text using optimized model with Phase 2 batch processing."""
@@ -584,15 +685,8 @@ class NLUEngine:
             logger.debug(f"🎯 Async cache hit for embedding: {text[:50]}...")
             return self.embedding_cache[cache_key]
 
-        # CRITICAL FIX: Use StandardizedEmbeddingService instead of broken _generate_embedding_sync
-        # Run in thread pool to avoid blocking
-        loop = asyncio.get_event_loop()
-        embedding = await loop.run_in_executor(
-            None,
-            self.embedding_service.generate_embedding,  # Use StandardizedEmbeddingService
-            text,
-            language
-        )
+        # Concurrent requests are coalesced into batched forward passes by the micro-batcher
+        embedding = await self.embedding_service.generate_embedding_async(text, language)
 
         self.embedding_cache[cache_key] = embedding
         
@@ -717,8 +811,8 @@ class NLUEngine:
                 context=context
             )
             
-            # PERFORMANCE FIX: Skip entity extraction (was taking 19-44s)
-            entity_result = {"entities": {}, "confidence": {}}
+            # Extract entities (indexed gazetteer fast path)
+            entity_result = self._extract_entities(processed_text, language, intent_result.get("intent"), context)
             
             # Combine intent and entity results
             result = {
@@ -822,15 +916,15 @@ class NLUEngine:
             embedding = await self.get_embedding_async(processed_text, language)
             
             # Classify intent
-            intent_result = self.intent_classifier.classify(
+            intent_result = await self.intent_classifier.classify_async(
                 text=processed_text,
                 embedding=embedding,
                 language=language,
                 context=context
             )
             
-            # PERFORMANCE FIX: Skip entity extraction (was taking 19-44s)
-            entity_result = {"entities": {}, "confidence": {}}
+            # Extract entities (indexed gazetteer fast path)
+            entity_result = self._extract_entities(processed_text, language, intent_result.get("intent"), context)
             
             # Combine intent and entity results
             result = {
@@ -992,7 +1086,8 @@ class NLUEngine:
             def load_language_detector():
                 return LanguageDetector(
                     model_path=self.models_config.get("language_detection", {}).get("model_path"),
-                    confidence_threshold=self.models_config.get("language_detection", {}).get("confidence_threshold", 0.8)
+                    confidence_threshold=self.models_config.get("language_detection", {}).get("confidence_threshold", 0.8),
+                    cache_size=self.models_config.get("language_detection", {}).get("cache_size", 4096)
                 )
             self.model_manager.register_model_loader('language_detector', load_language_detector, priority=15)
             
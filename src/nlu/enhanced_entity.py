@@ -7,10 +7,11 @@ import logging
 import spacy
 import numpy as np
 from typing import Dict, List, Any, Optional, Set, Tuple
-from difflib import SequenceMatcher
-from sklearn.metrics.pairwise import cosine_similarity
 import time
 
+from src.nlu.entity_gazetteer import EntityGazetteer
+from src.nlu.entity_vector_store import EntityVectorStore
+
 logger = logging.getLogger(__name__)
 
 class EnhancedEntityExtractor:
@@ -19,7 +20,8 @@ class EnhancedEntityExtractor:
     Extracts entities such as locations, attractions, dates, and more.
     """
     
-    def __init__(self, language: str, config: Dict, nlp_model, knowledge_base, embedding_model=None):
+    def __init__(self, language: str, config: Dict, nlp_model, knowledge_base, embedding_model=None,
+                 batch_embedding_model=None, model_id: str = "default"):
         """
         Initialize entity extractor for a specific language.
         
@@ -29,12 +31,16 @@ class EnhancedEntityExtractor:
             nlp_model: SpaCy language model
             knowledge_base: Knowledge base for entity resolution
             embedding_model: Model for creating text embeddings
+            batch_embedding_model: Batched ``(texts, language) -> embeddings`` used to
+                precompute entity vectors (optional)
+            model_id: Embedding model identifier for the persisted entity vectors
         """
         self.language = language
         self.config = config
         self.nlp_model = nlp_model
         self.knowledge_base = knowledge_base
         self.embedding_model = embedding_model
+        self.batch_embedding_model = batch_embedding_model
         
         # Compile entity detection patterns
         self.patterns = self._compile_patterns()
@@ -42,6 +48,20 @@ class EnhancedEntityExtractor:
         # Load entity lists from knowledge base
         self.entity_lists = self._load_entity_lists()
         
+        # PERFORMANCE FIX: Index the gazetteer once (n-gram candidates + bounded edit distance)
+        # instead of comparing every message against every known entity
+        self.gazetteer = self._build_gazetteer()
+        
+        # PERFORMANCE FIX: Entity embeddings precomputed into one persisted matrix per type
+        self.entity_vectors = None
+        if embedding_model or batch_embedding_model:
+            self.entity_vectors = EntityVectorStore(
+                language=language,
+                embed_batch_fn=batch_embedding_model or self._embed_entities_one_by_one,
+                cache_dir=self.config.get("entity_vectors", {}).get("cache_dir", "data/cache/entity_vectors"),
+                model_id=model_id
+            )
+        
         # Entity type mapping
         self.entity_type_mapping = {
             "GPE": "location",
@@ -446,7 +466,7 @@ class EnhancedEntityExtractor:
         
         # Stage 3: Fuzzy matching (Medium cost, only if needed)
         if extraction_time < 0.3:  # Time budget check
-            self._extract_fuzzy_entities(text, entities, confidence_scores)
+            self._extract_fuzzy_entities(text, entities, confidence_scores, entity_types=relevant_entities)
         else:
             logger.debug("⏭️ Skipping fuzzy extraction due to time budget")
         
@@ -492,9 +512,67 @@ class EnhancedEntityExtractor:
         # Add entity relationships if found
         if entity_relationships:
             result["relationships"] = entity_relationships
-            
+
         return result
-        
+
+    def extract_fast(self, text: str, intent: Optional[str] = None, context: Optional[Dict] = None) -> Dict[str, Any]:
+        """
+        Low-latency entity extraction for the per-message NLU pipeline.
+
+        Uses only the regex patterns and the indexed gazetteer (whose values are
+        already canonical knowledge base names), skipping spaCy, semantic
+        matching and knowledge base lookups.
+
+        Args:
+            text (str): Input text to extract entities from
+            intent (str, optional): Intent for context-aware extraction
+            context (Dict, optional): Conversation context
+
+        Returns:
+            Dict: Extracted entities with confidence scores
+        """
+        start_time = time.time()
+
+        fast_path_entities = self._check_fast_path_entities(text, intent)
+        if fast_path_entities:
+            return fast_path_entities
+
+        relevant_entities = self._get_intent_relevant_entities(intent)
+        if not relevant_entities:
+            return {"entities": {}, "confidence": {}}
+
+        entities = {}
+        confidence_scores = {}
+
+        self._extract_regex_entities(text, entities, confidence_scores)
+        self._extract_fuzzy_entities(text, entities, confidence_scores, entity_types=relevant_entities)
+
+        if context:
+            self._resolve_coreferences(text, entities, confidence_scores, context)
+
+        # Drop empty types and low confidence entities (below 0.6)
+        for entity_type in list(entities.keys()):
+            kept = [(value, conf) for value, conf in zip(entities[entity_type], confidence_scores[entity_type])
+                    if conf >= 0.6]
+            self.metrics['low_confidence_entities'] += len(entities[entity_type]) - len(kept)
+            if kept:
+                entities[entity_type] = [value for value, _ in kept]
+                confidence_scores[entity_type] = [conf for _, conf in kept]
+            else:
+                del entities[entity_type]
+                del confidence_scores[entity_type]
+
+        result = {"entities": entities, "confidence": confidence_scores}
+        if entities:
+            relationships = self._extract_entity_relationships(text, entities)
+            if relationships:
+                result["relationships"] = relationships
+
+        self._update_metrics(entities)
+        logger.debug(f"⚡ Fast entity extraction completed in {(time.time() - start_time) * 1000:.2f}ms")
+
+        return result
+
     def _extract_spacy_entities(self, doc, entities: Dict[str, List[str]], confidence: Dict[str, List[float]]):
         """Extract entities using spaCy NER."""
         for ent in doc.ents:
@@ -543,41 +621,12 @@ class EnhancedEntityExtractor:
                         # Single match
                         self._add_entity(entities, confidence, entity_type, match.strip(), pattern_confidence)
                         
-    def _extract_fuzzy_entities(self, text: str, entities: Dict[str, List[str]], confidence: Dict[str, List[float]]):
-        """Extract entities using fuzzy matching against known entities."""
-        # Minimum similarity ratio
-        min_ratio = 0.85
-        
-        # Check each entity list
-        for entity_type, entity_list in self.entity_lists.items():
-            # Skip if already processed or empty list
-            if not entity_list:
-                continue
-                
-            # Initialize entity type if not present
-            if entity_type not in entities:
-                entities[entity_type] = []
-                confidence[entity_type] = []
-                
-            # Check each known entity
-            for known_entity in entity_list:
-                # Only consider entities with length > 3 to avoid false positives
-                if len(known_entity) <= 3:
-                    continue
-                    
-                # Calculate similarity ratio
-                ratio = SequenceMatcher(None, text.lower(), known_entity.lower()).ratio()
-                
-                # Partial match for longer entities
-                if len(known_entity) > 5:
-                    # Try to find as substring
-                    if known_entity.lower() in text.lower():
-                        ratio = max(ratio, 0.95)  # High confidence for exact substring match
-                        
-                # If similar enough, add the entity
-                if ratio >= min_ratio:
-                    # Add with confidence proportional to match quality
-                    self._add_entity(entities, confidence, entity_type, known_entity, ratio)
+    def _extract_fuzzy_entities(self, text: str, entities: Dict[str, List[str]], confidence: Dict[str, List[float]],
+                                entity_types: Optional[List[str]] = None):
+        """Extract known entities via the indexed gazetteer (exact and bounded-edit-distance matches)."""
+        for match in self.gazetteer.match(text, entity_types=entity_types):
+            # Add with confidence proportional to match quality
+            self._add_entity(entities, confidence, match.entity_type, match.value, match.score)
                     
     def _extract_semantic_entities(self, text: str, entities: Dict[str, List[str]], 
                                confidence: Dict[str, List[float]], intent: Optional[str] = None):
@@ -605,38 +654,28 @@ class EnhancedEntityExtractor:
                     entities[entity_type] = []
                     confidence[entity_type] = []
                     
-                # Encode known entities
-                known_embeddings = []
-                for entity in entity_list:
-                    try:
-                        embedding = self.embedding_model(entity)
-                        known_embeddings.append(embedding)
-                    except Exception as embed_err:
-                        logger.debug(f"Failed to generate embedding for entity '{entity}': {embed_err}")
-                        continue
-                
-                # Skip if no valid embeddings
-                if not known_embeddings:
+                # Known entities are embedded once per type and reused
+                vectors = self._get_entity_embedding_matrix(entity_type)
+                if vectors is None:
                     continue
+                known_matrix, known_entities = vectors
                     
                 # Calculate similarity to each known entity
                 try:
-                    # Reshape for cosine_similarity: needs 2D arrays
-                    text_embed_2d = text_embedding.reshape(1, -1)
-                    known_embed_2d = np.array(known_embeddings)
-                    
-                    # Calculate cosine similarity
-                    similarities = cosine_similarity(text_embed_2d, known_embed_2d)[0]
+                    query = np.asarray(text_embedding, dtype=np.float32).reshape(-1)
+                    query_norm = np.linalg.norm(query)
+                    if query_norm == 0:
+                        continue
+                    similarities = known_matrix @ (query / query_norm)
                     
                     # Find entities with high similarity (threshold: 0.8)
                     high_sim_indices = np.where(similarities > 0.8)[0]
                     
                     for idx in high_sim_indices:
-                        similarity = similarities[idx]
+                        similarity = float(similarities[idx])
                         
                         # Get the corresponding entity
-                        if idx < len(entity_list):
-                            self._add_entity(entities, confidence, entity_type, entity_list[idx], similarity)
+                        self._add_entity(entities, confidence, entity_type, known_entities[idx], similarity)
                                 
                 except Exception as sim_err:
                     logger.debug(f"Failed to calculate similarities for entity type '{entity_type}': {sim_err}")
@@ -645,6 +684,71 @@ class EnhancedEntityExtractor:
         except Exception as e:
             logger.debug(f"Error in semantic entity extraction: {str(e)}")  # Changed to debug level
             
+    def _get_entity_embedding_matrix(self, entity_type: str) -> Optional[Tuple[np.ndarray, List[str]]]:
+        """
+        Get the precomputed, L2-normalized embedding matrix of an entity type.
+        
+        The vector store is built on first use if it was not built at startup.
+        
+        Returns:
+            Tuple of (matrix, entity names per row), or None
+        """
+        if self.entity_vectors is None:
+            return None
+        if not self.entity_vectors.is_built():
+            self.build_entity_vectors()
+        return self.entity_vectors.get(entity_type)
+        
+    def _embed_entities_one_by_one(self, texts: List[str], language: Optional[str] = None) -> List[Optional[np.ndarray]]:
+        """Fallback batch embedding when only a single-text embedding model is available."""
+        embeddings = []
+        for text in texts:
+            try:
+                embeddings.append(self.embedding_model(text))
+            except Exception as embed_err:
+                logger.debug(f"Failed to generate embedding for entity '{text}': {embed_err}")
+                embeddings.append(None)
+        return embeddings
+        
+    def build_entity_vectors(self) -> Dict[str, Any]:
+        """
+        Build (or refresh) the entity vector store from the current entity lists.
+        
+        Returns:
+            Dict: Rebuild statistics and freshness
+        """
+        if self.entity_vectors is None:
+            return {}
+        try:
+            # Semantic matching only uses types with enough examples
+            return self.entity_vectors.build(self.entity_lists, min_entities=5)
+        except Exception as e:
+            logger.error(f"❌ Failed to build entity vectors for {self.language}: {str(e)}")
+            return self.entity_vectors.get_stats()
+        
+    def refresh_entity_lists(self) -> Dict[str, Any]:
+        """
+        Reload known entities from the knowledge base and refresh the gazetteer and entity vectors.
+        
+        Only entity names that are new since the last build are embedded.
+        
+        Returns:
+            Dict: Entity vector rebuild statistics and freshness
+        """
+        self.entity_lists = self._load_entity_lists()
+        self.gazetteer = self._build_gazetteer()
+        return self.build_entity_vectors()
+
+    def _build_gazetteer(self) -> EntityGazetteer:
+        """Index ``entity_lists`` for exact and fuzzy matching, with the configured gazetteer settings."""
+        gazetteer_config = self.config.get("gazetteer", {})
+        return EntityGazetteer(
+            self.entity_lists,
+            ngram_size=gazetteer_config.get("ngram_size", 3),
+            min_ratio=gazetteer_config.get("min_ratio", 0.85),
+            min_length=gazetteer_config.get("min_length", 4)
+        )
+        
     def _is_relevant_to_intent(self, entity_type: str, intent: str) -> bool:
         """Check if entity type is relevant to the given intent."""
         # Define relevant entity types for each intent
@@ -721,21 +825,8 @@ class EnhancedEntityExtractor:
             if entity_type in self.entity_lists:
                 for i, entity_value in enumerate(entities[entity_type]):
                     # Find best match in knowledge base
-                    best_match = None
-                    best_score = 0
-                    
-                    for known_entity in self.entity_lists[entity_type]:
-                        # Check exact match
-                        if entity_value.lower() == known_entity.lower():
-                            best_match = known_entity
-                            best_score = 1.0
-                            break
-                            
-                        # Check fuzzy match
-                        score = SequenceMatcher(None, entity_value.lower(), known_entity.lower()).ratio()
-                        if score > 0.85 and score > best_score:
-                            best_match = known_entity
-                            best_score = score
+                    resolved = self.gazetteer.best_match(entity_value, entity_type)
+                    best_match = resolved[1] if resolved else None
                             
                     # Update to canonical form if found
                     if best_match and best_match != entity_value:
@@ -1010,18 +1101,13 @@ class EnhancedEntityExtractor:
                                     
                             # If not found in entity list, check using fuzzy matching
                             if not found:
-                                for e_type, e_list in self.entity_lists.items():
-                                    for known_entity in e_list:
-                                        if SequenceMatcher(None, entity.lower(), known_entity.lower()).ratio() > 0.85:
-                                            # Add relationship with canonical name
-                                            relationships[rel_type].append({
-                                                "entity": known_entity,
-                                                "type": e_type
-                                            })
-                                            found = True
-                                            break
-                                    if found:
-                                        break
+                                resolved = self.gazetteer.best_match(entity)
+                                if resolved:
+                                    # Add relationship with canonical name
+                                    relationships[rel_type].append({
+                                        "entity": resolved[1],
+                                        "type": resolved[0]
+                                    })
                     elif rel_type == "between" and len(match.groups()) >= 2:
                         # Relationship between two entities
                         entity1 = match.group(1).strip()
@@ -0,0 +1,253 @@
+"""
+Indexed gazetteer matching for entity extraction.
+
+Known entity names (attractions, hotels, restaurants, ...) are normalized and
+indexed once: an exact phrase table for direct hits and a character n-gram
+inverted index for fuzzy candidate generation. Only the few candidates that
+share enough n-grams with a text window are checked with a bounded edit
+distance, instead of comparing the message against every known entity.
+"""
+import logging
+import re
+from collections import Counter, defaultdict
+from itertools import chain
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from src.utils.text_normalization import normalize_text
+
+logger = logging.getLogger(__name__)
+
+_TOKEN_PATTERN = re.compile(r'\w+', re.UNICODE)
+
+
+class GazetteerMatch(NamedTuple):
+    """A known entity found in a text; ``score`` is the normalized similarity."""
+    entity_type: str
+    value: str
+    score: float
+    start_token: int
+    end_token: int
+
+
+def bounded_edit_distance(a: str, b: str, max_distance: int, substitution_cost: int = 1) -> Optional[int]:
+    """
+    Levenshtein distance, computed only inside a diagonal band.
+
+    Args:
+        a: First string
+        b: Second string
+        max_distance: Largest distance of interest
+        substitution_cost: Cost of a substitution (2 gives the insert/delete
+            distance, ``len(a) + len(b) - 2 * LCS``)
+
+    Returns:
+        The distance, or None if it exceeds ``max_distance``
+    """
+    if abs(len(a) - len(b)) > max_distance:
+        return None
+    if a == b:
+        return 0
+    if len(a) > len(b):
+        a, b = b, a
+
+    too_far = max_distance + 1
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        low = max(1, i - max_distance)
+        high = min(len(b), i + max_distance)
+        current = [too_far] * (len(b) + 1)
+        current[0] = i if i <= max_distance else too_far
+        row_min = current[0]
+        char_a = a[i - 1]
+        for j in range(low, high + 1):
+            cost = 0 if char_a == b[j - 1] else substitution_cost
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            current[j] = value if value <= max_distance else too_far
+            if current[j] < row_min:
+                row_min = current[j]
+        if row_min > max_distance:
+            return None
+        previous = current
+
+    return previous[len(b)] if previous[len(b)] <= max_distance else None
+
+
+class EntityGazetteer:
+    """
+    Inverted-index gazetteer over known entity names.
+
+    Texts are scanned in token windows up to the longest entity length: first
+    for exact phrases, then, on the tokens left over, for fuzzy matches whose
+    candidates come from the character n-gram index and are verified with a
+    bounded edit distance.
+    """
+
+    def __init__(self, entity_lists: Dict[str, List[str]], ngram_size: int = 3,
+                 min_ratio: float = 0.85, min_length: int = 4, min_ngram_overlap: float = 0.5):
+        """
+        Build the gazetteer indexes.
+
+        Args:
+            entity_lists: Entity type -> known entity names
+            ngram_size: Character n-gram size for the fuzzy index
+            min_ratio: Minimum similarity for a fuzzy match, on the scale of
+                difflib's SequenceMatcher ratio (see ``_similarity``)
+            min_length: Entities shorter than this only match exactly
+            min_ngram_overlap: Minimum fraction of a window's n-grams an entity must share
+        """
+        self.ngram_size = ngram_size
+        self.min_ratio = min_ratio
+        self.min_length = min_length
+        self.min_ngram_overlap = min_ngram_overlap
+
+        # Entry id -> (entity type, canonical value, normalized value)
+        self.entries: List[Tuple[str, str, str]] = []
+        self.phrase_index: Dict[str, List[int]] = defaultdict(list)
+        self.ngram_index: Dict[str, Set[int]] = defaultdict(set)
+        self.max_tokens = 1
+
+        seen = set()
+        for entity_type, names in entity_lists.items():
+            for name in names:
+                normalized = normalize_text(name)
+                if not normalized or (entity_type, normalized) in seen:
+                    continue
+                seen.add((entity_type, normalized))
+                entry_id = len(self.entries)
+                self.entries.append((entity_type, name, normalized))
+                self.phrase_index[normalized].append(entry_id)
+                self.max_tokens = max(self.max_tokens, len(normalized.split()))
+                if len(normalized) >= self.min_length:
+                    for ngram in self._ngrams(normalized):
+                        self.ngram_index[ngram].add(entry_id)
+
+        logger.debug(f"📚 Gazetteer indexed {len(self.entries)} entities, "
+                     f"{len(self.ngram_index)} {ngram_size}-grams")
+
+    def _ngrams(self, text: str) -> Set[str]:
+        padded = f" {text} "
+        if len(padded) <= self.ngram_size:
+            return {padded}
+        return {padded[i:i + self.ngram_size] for i in range(len(padded) - self.ngram_size + 1)}
+
+    def _fuzzy_candidates(self, window: str, entity_types: Optional[Set[str]]) -> List[int]:
+        ngrams = self._ngrams(window)
+        # Counter over the chained posting lists counts shared n-grams in C
+        counts = Counter(chain.from_iterable(self.ngram_index.get(ngram, ()) for ngram in ngrams))
+        required = max(1, int(len(ngrams) * self.min_ngram_overlap))
+        # _similarity is at most 2 * shorter / total length, so entries whose length
+        # alone rules out min_ratio are dropped before the edit distance is computed
+        window_length = len(window)
+        return [
+            entry_id for entry_id, shared in counts.items()
+            if shared >= required
+            and 2 * min(window_length, len(self.entries[entry_id][2]))
+            >= self.min_ratio * (window_length + len(self.entries[entry_id][2]))
+            and (entity_types is None or self.entries[entry_id][0] in entity_types)
+        ]
+
+    def _similarity(self, window: str, normalized: str) -> Optional[float]:
+        # 2 * LCS / total length, i.e. 1 - insert/delete edits / total length: the
+        # SequenceMatcher-style ratio the min_ratio threshold was calibrated on.
+        # A missing letter ("luxr") or swapped pair ("alexandira") stays above 0.85.
+        total = len(window) + len(normalized)
+        max_distance = int(total * (1.0 - self.min_ratio) + 1e-9)
+        distance = bounded_edit_distance(window, normalized, max_distance, substitution_cost=2)
+        if distance is None:
+            return None
+        return 1.0 - distance / total
+
+    def match(self, text: str, entity_types: Optional[Iterable[str]] = None,
+              exact_score: float = 0.95, fuzzy: bool = True) -> List[GazetteerMatch]:
+        """
+        Find known entities mentioned in a text.
+
+        Exact (normalized) phrases are matched first over every window size;
+        fuzzy matching then runs only on the tokens no exact match covers, so
+        an exact "luxor temple" is never hidden by a fuzzy "visit luxor temple".
+        Within each pass longer windows win and their tokens are not reused, so
+        "Valley of the Kings" wins over "Kings".
+
+        Args:
+            text: Message text
+            entity_types: Restrict matching to these entity types (optional)
+            exact_score: Score reported for exact (normalized) matches
+            fuzzy: Whether to try fuzzy matching on tokens without an exact hit
+
+        Returns:
+            List of GazetteerMatch in text order
+        """
+        types = set(entity_types) if entity_types is not None else None
+        tokens = _TOKEN_PATTERN.findall(normalize_text(text))
+        used = [False] * len(tokens)
+        matches: List[GazetteerMatch] = []
+
+        def scan(lookup) -> None:
+            for size in range(min(self.max_tokens, len(tokens)), 0, -1):
+                for start in range(len(tokens) - size + 1):
+                    end = start + size
+                    if any(used[start:end]):
+                        continue
+                    found = lookup(" ".join(tokens[start:end]))
+                    if found:
+                        for entry_id, score in found:
+                            entity_type, value, _ = self.entries[entry_id]
+                            matches.append(GazetteerMatch(entity_type, value, score, start, end))
+                        for i in range(start, end):
+                            used[i] = True
+
+        def exact(window: str) -> List[Tuple[int, float]]:
+            return [
+                (entry_id, exact_score) for entry_id in self.phrase_index.get(window, ())
+                if types is None or self.entries[entry_id][0] in types
+            ]
+
+        def approximate(window: str) -> List[Tuple[int, float]]:
+            if len(window) < self.min_length:
+                return []
+            found = []
+            for entry_id in self._fuzzy_candidates(window, types):
+                score = self._similarity(window, self.entries[entry_id][2])
+                if score is not None and score >= self.min_ratio:
+                    found.append((entry_id, score))
+            return found
+
+        scan(exact)
+        if fuzzy and not all(used):
+            scan(approximate)
+
+        matches.sort(key=lambda match: (match.start_token, -match.score))
+        return matches
+
+    def best_match(self, value: str, entity_type: Optional[str] = None) -> Optional[Tuple[str, str, float]]:
+        """
+        Resolve a single value to its closest known entity.
+
+        Args:
+            value: Entity value to resolve
+            entity_type: Restrict to one entity type (optional)
+
+        Returns:
+            Tuple of (entity type, canonical value, score), or None
+        """
+        normalized = normalize_text(value)
+        if not normalized:
+            return None
+        types = {entity_type} if entity_type else None
+
+        for entry_id in self.phrase_index.get(normalized, ()):
+            if types is None or self.entries[entry_id][0] in types:
+                entry_type, canonical, _ = self.entries[entry_id]
+                return entry_type, canonical, 1.0
+
+        best = None
+        if len(normalized) >= self.min_length:
+            for entry_id in self._fuzzy_candidates(normalized, types):
+                score = self._similarity(normalized, self.entries[entry_id][2])
+                if score is not None and score >= self.min_ratio and (best is None or score > best[2]):
+                    entry_type, canonical, _ = self.entries[entry_id]
+                    best = (entry_type, canonical, score)
+        return best
+
+    def __len__(self) -> int:
+        return len(self.entries)
@@ -0,0 +1,220 @@
+"""
+Precomputed entity-embedding matrices for semantic entity extraction.
+
+Known entity names are embedded once with batched forward passes and kept as
+one L2-normalized float32 matrix per entity type, so semantic matching is a
+single matrix-vector product per type. Matrices are persisted per language
+and type; a rebuild reuses stored vectors and only embeds names that were
+added since the last build (e.g. after a knowledge base update).
+"""
+import hashlib
+import logging
+import os
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Bump when the layout of the persisted entity vector files changes
+ENTITY_VECTOR_FORMAT_VERSION = 1
+
+
+class EntityVectorStore:
+    """
+    Per-type entity embedding matrices for one language, persisted to disk.
+    """
+
+    def __init__(self, language: str, embed_batch_fn: Callable[[List[str], Optional[str]], Any],
+                 cache_dir: str = "data/cache/entity_vectors", model_id: str = "default"):
+        """
+        Initialize the store.
+
+        Args:
+            language: Language code of the entity names
+            embed_batch_fn: ``(texts, language) -> embeddings`` returning a list in
+                input order or a dict keyed by text
+            cache_dir: Directory holding ``<language>/<entity type>.npz`` files
+            model_id: Embedding model identifier; vectors from another model are never reused
+        """
+        self.language = language
+        self.embed_batch_fn = embed_batch_fn
+        self.cache_dir = os.path.join(cache_dir, language)
+        self.model_id = model_id
+
+        # Entity type -> (normalized matrix, names, fingerprint)
+        self._matrices: Dict[str, Tuple[np.ndarray, List[str], str]] = {}
+
+        self.built_at: Optional[float] = None
+        self.stats = {
+            'rebuilds': 0,
+            'entities_embedded': 0,
+            'entities_reused': 0,
+            'last_rebuild_seconds': 0.0,
+            'errors': 0,
+            'types': {}
+        }
+
+    def _fingerprint(self, names: Sequence[str]) -> str:
+        digest = hashlib.sha1(f"{ENTITY_VECTOR_FORMAT_VERSION}\x1f{self.model_id}".encode("utf-8"))
+        for name in names:
+            digest.update(b"\x1e")
+            digest.update(name.encode("utf-8"))
+        return digest.hexdigest()
+
+    def _path(self, entity_type: str) -> str:
+        return os.path.join(self.cache_dir, f"{entity_type}.npz")
+
+    def _load(self, entity_type: str) -> Optional[Tuple[np.ndarray, List[str], str]]:
+        path = self._path(entity_type)
+        if not os.path.exists(path):
+            return None
+        try:
+            with np.load(path) as data:
+                if str(data["model_id"]) != self.model_id:
+                    return None
+                return (np.asarray(data["matrix"], dtype=np.float32),
+                        data["names"].tolist(), str(data["fingerprint"]))
+        except Exception as e:
+            logger.warning(f"Failed to load entity vectors from {path}: {e}")
+            return None
+
+    def _save(self, entity_type: str, matrix: np.ndarray, names: List[str], fingerprint: str):
+        path = self._path(entity_type)
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, 'wb') as f:
+                np.savez(
+                    f,
+                    matrix=matrix,
+                    names=np.array(names),
+                    fingerprint=np.array(fingerprint),
+                    model_id=np.array(self.model_id),
+                    built_at=np.array(time.time())
+                )
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.warning(f"Failed to save entity vectors to {path}: {e}")
+
+    def _embed(self, names: List[str]) -> List[Optional[np.ndarray]]:
+        generated = self.embed_batch_fn(names, self.language)
+        if isinstance(generated, dict):
+            generated = [generated.get(name) for name in names]
+        return [
+            np.asarray(vector, dtype=np.float32).reshape(-1) if vector is not None else None
+            for vector in generated
+        ]
+
+    def _build_type(self, entity_type: str, names: List[str]) -> Dict[str, Any]:
+        fingerprint = self._fingerprint(names)
+        current = self._matrices.get(entity_type)
+        if current and current[2] == fingerprint:
+            return {"count": len(current[1]), "source": "memory", "embedded": 0, "reused": len(current[1])}
+
+        stored = self._load(entity_type)
+        if stored and stored[2] == fingerprint:
+            self._matrices[entity_type] = stored
+            return {"count": len(stored[1]), "source": "disk", "embedded": 0, "reused": len(stored[1])}
+
+        # Reuse rows for names that were already embedded (in memory or on disk)
+        known: Dict[str, np.ndarray] = {}
+        for previous in (stored, current):
+            if previous:
+                known.update(zip(previous[1], previous[0]))
+
+        missing = [name for name in names if name not in known]
+        if missing:
+            for name, vector in zip(missing, self._embed(missing)):
+                if vector is not None and vector.size and np.any(vector):
+                    norm = np.linalg.norm(vector)
+                    known[name] = vector / norm
+
+        kept = [name for name in names if name in known]
+        if not kept or len({known[name].shape for name in kept}) != 1:
+            self._matrices.pop(entity_type, None)
+            return {"count": 0, "source": "failed", "embedded": 0, "reused": 0}
+
+        embedded = sum(1 for name in missing if name in known)
+        matrix = np.ascontiguousarray(np.vstack([known[name] for name in kept]), dtype=np.float32)
+        self._matrices[entity_type] = (matrix, kept, fingerprint)
+        self._save(entity_type, matrix, kept, fingerprint)
+        return {"count": len(kept), "source": "embedded", "embedded": embedded, "reused": len(kept) - embedded}
+
+    def build(self, entity_lists: Dict[str, List[str]], min_entities: int = 1) -> Dict[str, Any]:
+        """
+        Build (or refresh) the matrices for all entity types.
+
+        Unchanged types are kept as they are; changed types only embed new names.
+
+        Args:
+            entity_lists: Entity type -> known entity names
+            min_entities: Skip types with fewer names than this
+
+        Returns:
+            Rebuild statistics
+        """
+        start_time = time.time()
+        type_stats = {}
+
+        for entity_type, names in entity_lists.items():
+            names = list(dict.fromkeys(name for name in names if name))
+            if len(names) < min_entities:
+                self._matrices.pop(entity_type, None)
+                continue
+            try:
+                type_stats[entity_type] = self._build_type(entity_type, names)
+            except Exception as e:
+                self.stats['errors'] += 1
+                logger.error(f"❌ Failed to build entity vectors for '{entity_type}': {str(e)}")
+                type_stats[entity_type] = {"count": 0, "source": "failed", "embedded": 0, "reused": 0}
+
+        for entity_type in set(self._matrices) - set(type_stats):
+            del self._matrices[entity_type]
+
+        elapsed = time.time() - start_time
+        embedded = sum(stats["embedded"] for stats in type_stats.values())
+        self.built_at = time.time()
+        self.stats['rebuilds'] += 1
+        self.stats['entities_embedded'] += embedded
+        self.stats['entities_reused'] += sum(stats["reused"] for stats in type_stats.values())
+        self.stats['last_rebuild_seconds'] = elapsed
+        self.stats['types'] = type_stats
+
+        logger.info(f"🧭 Entity vectors ({self.language}) ready: {len(self._matrices)} types, "
+                    f"{embedded} entities embedded in {elapsed:.2f}s")
+        return self.get_stats()
+
+    def get(self, entity_type: str) -> Optional[Tuple[np.ndarray, List[str]]]:
+        """
+        Get the normalized matrix and row names for an entity type.
+
+        Returns:
+            Tuple of (matrix, names) or None if the type has no vectors
+        """
+        entry = self._matrices.get(entity_type)
+        return (entry[0], entry[1]) if entry else None
+
+    def is_built(self) -> bool:
+        """Whether ``build`` has completed at least once."""
+        return self.built_at is not None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get rebuild statistics and freshness.
+
+        Returns:
+            Dictionary with rebuild counters, per-type details and freshness timestamp
+        """
+        return {
+            **self.stats,
+            "language": self.language,
+            "model_id": self.model_id,
+            "entity_types": {
+                entity_type: {"count": len(names), "dimension": int(matrix.shape[1])}
+                for entity_type, (matrix, names, _) in self._matrices.items()
+            },
+            "built_at": self.built_at,
+            "age_seconds": time.time() - self.built_at if self.built_at else None
+        }
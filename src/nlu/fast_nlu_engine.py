@@ -10,6 +10,8 @@ import logging
 from typing import Dict, Any, Optional, List
 import numpy as np
 
+from .keyword_router import KeywordMatchSet, get_keyword_automaton
+
 logger = logging.getLogger(__name__)
 
 
@@ -23,37 +25,14 @@ class FastNLUEngine:
         """Initialize fast NLU engine with pattern-based processing."""
         logger.info("🚀 Phase 3: Initializing FastNLUEngine for immediate responses...")
         
-        # PHASE 4: RESTRICTED Fast-path patterns - ONLY social interactions
-        # All content queries should go through database-first routing
-        self.simple_patterns = {
-            # Basic Social Interactions (Keep these for instant UX)
-            r'\b(hi|hello|hey|greetings|مرحبا|أهلا|السلام عليكم)\b': 'greeting',
-            r'\b(bye|goodbye|farewell|وداعا|مع السلامة|إلى اللقاء)\b': 'farewell',
-            r'\b(thanks?|thank you|شكرا|متشكر|ممنون)\b': 'gratitude',
-            
-            # Essential Help & Capabilities (Keep for UX, but very specific)
-            r'^(help|معلومات|مساعدة)$': 'help_request',  # Only exact matches
-            r'\b(what can you do|what do you know|ايه اللي تقدر|ايه خدماتك)\b': 'capabilities',
-            
-            # REMOVED: All content-based patterns - these should use database
-            # - Major Attractions: Let database provide rich content
-            # - Tourism Services: Let database provide specific recommendations  
-            # - Cities & Destinations: Let database provide detailed info
-            # - Practical Information: Let database provide accurate data
-            #
-            # Philosophy: Fast-path for social interaction speed, 
-            #           Database for content richness and accuracy
-        }
-        
-        # PHASE 4: MINIMAL entity extraction patterns - only for social interaction context
-        self.entity_patterns = {
-            # Keep minimal entity extraction for basic conversation context
-            # All detailed entity extraction should happen in full NLU pipeline
-            'greeting_type': [
-                r'\b(morning|afternoon|evening)\b',
-                r'\b(صباح|مساء|ليل)\b'
-            ]
-        }
+        # PHASE 4: RESTRICTED Fast-path keywords - ONLY social interactions
+        # All content queries should go through database-first routing.
+        # Intent and entity keywords live in configs/keyword_routes.json ("fast_path")
+        # and are compiled into one automaton, so a message is scanned once.
+        #
+        # Philosophy: Fast-path for social interaction speed,
+        #           Database for content richness and accuracy
+        self.keyword_automaton = get_keyword_automaton("fast_path")
         
         # PHASE 4: RESTRICTED Fast response templates - ONLY social interactions
         self.quick_responses = {
@@ -103,11 +82,14 @@ class FastNLUEngine:
         if not language:
             language = self._detect_language_fast(text)
         
-        # Fast intent classification using patterns
-        intent = self._classify_intent_fast(text)
+        # One keyword pass serves both intent classification and entity extraction
+        matches = self.keyword_automaton.search(text)
+        
+        # Fast intent classification using keywords
+        intent = self._classify_intent_fast(text, matches)
         
         # Fast entity extraction
-        entities = self._extract_entities_fast(text)
+        entities = self._extract_entities_fast(text, matches)
         
         # Generate quick response
         response_text = self._generate_quick_response(intent, language)
@@ -141,35 +123,31 @@ class FastNLUEngine:
             return "ar"
         return "en"
     
-    def _classify_intent_fast(self, text: str) -> str:
-        """Fast intent classification using regex patterns."""
-        text_lower = text.lower()
+    def _classify_intent_fast(self, text: str, matches: Optional[KeywordMatchSet] = None) -> str:
+        """Fast intent classification using the compiled keyword automaton."""
+        if matches is None:
+            matches = self.keyword_automaton.search(text)
         
-        # Check patterns in order of specificity
-        for pattern, intent in self.simple_patterns.items():
-            if re.search(pattern, text_lower, re.IGNORECASE):
-                logger.debug(f"🎯 Fast intent match: '{intent}' for pattern: {pattern}")
-                return intent
+        # Intents are checked in configuration order of specificity
+        match = matches.first("intent")
+        if match:
+            logger.debug(f"🎯 Fast intent match: '{match.label}' for keyword: {match.keyword}")
+            return match.label
         
         # Default fallback intent
         return "general_query"
     
-    def _extract_entities_fast(self, text: str) -> Dict[str, List[str]]:
-        """Fast entity extraction using regex patterns."""
-        entities = {}
-        text_lower = text.lower()
+    def _extract_entities_fast(self, text: str, matches: Optional[KeywordMatchSet] = None) -> Dict[str, List[str]]:
+        """Fast entity extraction using the compiled keyword automaton."""
+        if matches is None:
+            matches = self.keyword_automaton.search(text)
         
-        for entity_type, patterns in self.entity_patterns.items():
-            matches = []
-            for pattern in patterns:
-                found = re.findall(pattern, text_lower, re.IGNORECASE)
-                matches.extend([match.title() for match in found])
-            
-            if matches:
-                # Remove duplicates while preserving order
-                entities[entity_type] = list(dict.fromkeys(matches))
+        entities = {}
+        for match in matches.in_group("entity"):
+            entities.setdefault(match.label, []).append(text[match.start:match.end].lower().title())
         
-        return entities
+        # Remove duplicates while preserving order
+        return {entity_type: list(dict.fromkeys(found)) for entity_type, found in entities.items()}
     
     def _generate_quick_response(self, intent: str, language: str) -> str:
         """Generate a quick response based on intent and language."""
@@ -9,6 +9,7 @@ import logging
 from typing import Dict, List, Tuple, Optional, Any
 import numpy as np
 from .intent_classifier import AdvancedIntentClassifier
+from .keyword_router import KeywordAutomaton, KeywordMatchSet, normalize_keyword
 
 logger = logging.getLogger(__name__)
 
@@ -26,6 +27,16 @@ class HierarchicalIntentClassifier(AdvancedIntentClassifier):
         self.disambiguation_rules = self.hierarchy_config.get('disambiguation_rules', {})
         self.confidence_thresholds = self.hierarchy_config.get('confidence_thresholds', {})
         
+        # All disambiguation indicator keywords compiled once; each text is scanned a single time
+        self.disambiguation_automaton = KeywordAutomaton.from_spec("disambiguation", {
+            "indicator": sorted({
+                keyword
+                for rule in self.disambiguation_rules.values()
+                for keywords in rule.get('keywords', {}).values()
+                for keyword in keywords
+            })
+        })
+        
         # Context tracking
         self.conversation_context = {}
         self.context_history = []
@@ -71,6 +82,21 @@ class HierarchicalIntentClassifier(AdvancedIntentClassifier):
         
         return final_result
     
+    def classify_batch(self, texts: List[str], embeddings=None, language=None, context=None) -> List[Dict[str, Any]]:
+        """
+        Batch classification: one packed-matrix scoring pass, then hierarchy and disambiguation per text
+        """
+        base_results = super().classify_batch(texts, embeddings, language, context)
+        
+        final_results = []
+        for text, base_result in zip(texts, base_results):
+            enhanced_result = self._apply_hierarchical_classification(text, base_result, context)
+            final_result = self._apply_disambiguation(text, enhanced_result)
+            self._update_context(final_result, context)
+            final_results.append(final_result)
+        
+        return final_results
+    
     def _apply_hierarchical_classification(self, text: str, base_result: Dict, context: Optional[Dict]) -> Dict:
         """Apply hierarchical classification logic"""
         intent = base_result.get('intent')
@@ -123,12 +149,15 @@ class HierarchicalIntentClassifier(AdvancedIntentClassifier):
             
             # Find applicable disambiguation rule
             logger.debug(f"   Checking {len(self.disambiguation_rules)} disambiguation rules...")
+            matches = None
             for rule_name, rule in self.disambiguation_rules.items():
                 rule_applies = self._rule_applies(intent, top_intents[1].get('intent'), rule, similarity_difference)
                 logger.debug(f"   Rule '{rule_name}': {rule_applies}")
 
                 if rule_applies:
-                    disambiguated_intent = self._apply_disambiguation_rule(text, rule, top_intents)
+                    if matches is None:
+                        matches = self.disambiguation_automaton.search(text)
+                    disambiguated_intent = self._apply_disambiguation_rule(text, rule, top_intents, matches)
 
                     # CRITICAL FIX: Apply disambiguation even if intent doesn't change (for confirmation)
                     logger.info(f"🎯 Disambiguation applied ({rule_name}): {intent} → {disambiguated_intent}")
@@ -170,24 +199,28 @@ class HierarchicalIntentClassifier(AdvancedIntentClassifier):
         
         return intents_match and condition_met
     
-    def _apply_disambiguation_rule(self, text: str, rule: Dict, top_intents: List[Dict]) -> str:
+    def _apply_disambiguation_rule(self, text: str, rule: Dict, top_intents: List[Dict],
+                                   matches: Optional[KeywordMatchSet] = None) -> str:
         """Apply specific disambiguation rule"""
         resolution = rule.get('resolution', 'keyword_based')
         
         if resolution == 'keyword_based':
-            return self._keyword_based_disambiguation(text, rule)
+            return self._keyword_based_disambiguation(text, rule, matches)
         
         # Default: return original intent
         return top_intents[0].get('intent', 'general_query')
     
-    def _keyword_based_disambiguation(self, text: str, rule: Dict) -> str:
-        """Perform keyword-based disambiguation"""
+    def _keyword_based_disambiguation(self, text: str, rule: Dict,
+                                      matches: Optional[KeywordMatchSet] = None) -> str:
+        """Perform keyword-based disambiguation against the text's indicator keyword matches"""
         keywords = rule.get('keywords', {})
-        text_lower = text.lower()
+        if matches is None:
+            matches = self.disambiguation_automaton.search(text)
+        matched_keywords = matches.keywords("indicator")
         
         scores = {}
         for intent_type, intent_keywords in keywords.items():
-            score = sum(1 for keyword in intent_keywords if keyword.lower() in text_lower)
+            score = sum(1 for keyword in intent_keywords if normalize_keyword(keyword) in matched_keywords)
             if score > 0:
                 scores[intent_type] = score
         
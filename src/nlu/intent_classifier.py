@@ -5,10 +5,116 @@ Uses embeddings and contextual information for accurate intent detection.
 import logging
 import numpy as np
 from typing import Dict, List, Any, Optional, Tuple
-from sklearn.metrics.pairwise import cosine_similarity
+
+from .keyword_router import get_keyword_automaton
 
 logger = logging.getLogger(__name__)
 
+# Bump when the layout of the intent embedding cache file changes
+INTENT_CACHE_FORMAT_VERSION = 2
+
+
+class PackedIntentMatrix:
+    """
+    All intent example embeddings packed into one pre-normalized float32 matrix.
+
+    Rows are grouped by intent; ``intent_ids`` maps each row to its intent and
+    ``offsets`` marks where each intent's rows start, so scoring a query is one
+    matrix-vector product followed by a segmented max (``np.maximum.reduceat``).
+    """
+
+    def __init__(self, intent_embeddings: Dict[str, np.ndarray]):
+        """
+        Pack per-intent example embeddings.
+
+        Args:
+            intent_embeddings: Intent name -> (n_examples, dim) array
+        """
+        blocks = {
+            name: np.atleast_2d(np.asarray(embeddings, dtype=np.float32))
+            for name, embeddings in intent_embeddings.items()
+            if embeddings is not None and len(embeddings) > 0
+        }
+        # Only intents embedded with the current model (same dimension) are comparable
+        dimension = next(iter(blocks.values())).shape[1] if blocks else 0
+        blocks = {name: block for name, block in blocks.items() if block.shape[1] == dimension}
+
+        self.intent_names: List[str] = list(blocks)
+        self.source_size = len(intent_embeddings)
+        self.dimension = dimension
+
+        if blocks:
+            counts = np.array([block.shape[0] for block in blocks.values()])
+            matrix = np.vstack(list(blocks.values()))
+            norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+            norms[norms == 0] = 1.0
+            self.matrix = np.ascontiguousarray(matrix / norms, dtype=np.float32)
+            self.intent_ids = np.repeat(np.arange(len(blocks), dtype=np.int32), counts)
+            self.offsets = np.concatenate(([0], np.cumsum(counts)[:-1])).astype(np.intp)
+        else:
+            self.matrix = np.zeros((0, 0), dtype=np.float32)
+            self.intent_ids = np.zeros(0, dtype=np.int32)
+            self.offsets = np.zeros(0, dtype=np.intp)
+
+        self._bias_vectors: Dict[Tuple[str, ...], np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return len(self.intent_names)
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+    def score(self, embedding: np.ndarray) -> np.ndarray:
+        """
+        Best cosine similarity per intent for one query.
+
+        Args:
+            embedding: Query embedding
+
+        Returns:
+            Array of scores aligned with ``intent_names``
+        """
+        query = self._normalize(np.asarray(embedding, dtype=np.float32).ravel())
+        return np.maximum.reduceat(self.matrix @ query, self.offsets)
+
+    def score_batch(self, embeddings: np.ndarray) -> np.ndarray:
+        """
+        Best cosine similarity per intent for many queries at once.
+
+        Args:
+            embeddings: (n_queries, dim) query embeddings
+
+        Returns:
+            (n_queries, n_intents) score matrix
+        """
+        queries = self._normalize(np.atleast_2d(np.asarray(embeddings, dtype=np.float32)))
+        return np.maximum.reduceat(queries @ self.matrix.T, self.offsets, axis=1)
+
+    def bias_vector(self, related_intents: List[str], bias: float) -> np.ndarray:
+        """
+        Additive context-bias vector for a set of related intents (cached).
+
+        Args:
+            related_intents: Intents that receive the bias
+            bias: Bias added to their scores
+
+        Returns:
+            Array aligned with ``intent_names``
+        """
+        key = tuple(sorted(related_intents))
+        vector = self._bias_vectors.get(key)
+        if vector is None:
+            related = set(related_intents)
+            vector = np.array(
+                [bias if name in related else 0.0 for name in self.intent_names], dtype=np.float32
+            )
+            self._bias_vectors[key] = vector
+        return vector
+
+
 class AdvancedIntentClassifier:
     """
     Advanced intent classifier with confidence scoring and contextual awareness.
@@ -41,8 +147,12 @@ class AdvancedIntentClassifier:
         # Contextual bias - gives preference to intents related to current context
         self.context_bias = self.config.get("context_bias", 0.1)
 
-        # PERFORMANCE FIX: Persistent cache for intent embeddings
-        self.intent_embeddings_cache_path = "data/cache/intent_embeddings.pkl"
+        # PERFORMANCE FIX: Persistent cache of example vectors keyed by content hash
+        self.intent_embeddings_cache_path = "data/cache/intent_embeddings.npz"
+        self._example_vectors: Dict[str, np.ndarray] = {}
+
+        # Packed example matrix for single-matmul scoring, rebuilt when embeddings change
+        self._packed_intents: Optional[PackedIntentMatrix] = None
 
         # Initialize intent examples
         self._prepare_intent_examples()
@@ -129,20 +239,9 @@ class AdvancedIntentClassifier:
             return {}
         
     def _prepare_intent_examples(self):
-        """Process and prepare intent examples for classification with retry logic."""
+        """Process and prepare intent examples, re-embedding only examples missing from the cache."""
         logger.info("🧠 Preparing intent examples with standardized embedding service")
 
-        # PERFORMANCE FIX: Try to load cached embeddings first
-        if self._load_cached_intent_embeddings():
-            logger.info("🚀 PERFORMANCE: Loaded intent embeddings from cache - skipping generation")
-            # Still need to populate intent_examples
-            for intent_name, intent_data in self.intents.items():
-                examples = intent_data.get("examples", [])
-                if examples:
-                    self.intent_examples[intent_name] = examples
-            return
-
-        logger.info("🔄 Cache miss - generating intent embeddings from scratch")
         for intent_name, intent_data in self.intents.items():
             examples = intent_data.get("examples", [])
 
@@ -152,44 +251,111 @@ class AdvancedIntentClassifier:
 
             self.intent_examples[intent_name] = examples
 
-            # Cache embeddings if embedding service is available
-            if self.embedding_service and self.embedding_service.is_ready():
-                self._generate_intent_embeddings_with_retry(intent_name, examples)
-            else:
-                logger.warning(f"⚠️ Embedding service not ready for intent '{intent_name}' - will retry later")
+        # PERFORMANCE FIX: Reuse cached example vectors; only changed or added examples are embedded
+        self._load_cached_intent_embeddings()
+        if self._refresh_intent_embeddings():
+            self._save_cached_intent_embeddings()
+
+    def _embedding_model_id(self) -> str:
+        """Identify the model behind the embedding service, so a model change invalidates cached vectors."""
+        service = self.embedding_service
+        if service is None:
+            return "none"
+        model_key = service.select_best_model('en') if hasattr(service, 'select_best_model') else None
+        model = getattr(service, 'models', {}).get(model_key) if model_key else None
+        model_name = (
+            getattr(model, 'name_or_path', None)
+            or getattr(getattr(model, 'config', None), '_name_or_path', None)
+            or getattr(model, 'model_path', None)
+        )
+        return f"{type(service).__name__}:{model_key}:{model_name}"
+
+    @staticmethod
+    def _example_key(model_id: str, example: str) -> str:
+        """Content hash of an example phrase under a given embedding model."""
+        import hashlib
+
+        return hashlib.sha1(f"{model_id}\x1f{example}".encode("utf-8")).hexdigest()
+
+    def _record_example_embedding(self, example: str, embedding: np.ndarray):
+        """Remember an example's vector so it can be persisted and reused."""
+        if embedding is not None and embedding.size > 0 and np.any(embedding != 0):
+            key = self._example_key(self._embedding_model_id(), example)
+            self._example_vectors[key] = np.asarray(embedding, dtype=np.float32).ravel()
+
+    def _refresh_intent_embeddings(self) -> bool:
+        """
+        Embed examples that have no cached vector, then rebuild per-intent embedding arrays.
+
+        Returns:
+            bool: Whether the vector cache changed and should be saved
+        """
+        model_id = self._embedding_model_id()
+        keys = {
+            example: self._example_key(model_id, example)
+            for examples in self.intent_examples.values()
+            for example in examples
+        }
+        missing = [example for example, key in keys.items() if key not in self._example_vectors]
+        reused = len(keys) - len(missing)
+
+        embedded = 0
+        if missing and self.embedding_service and self.embedding_service.is_ready():
+            logger.info(f"🔄 Embedding {len(missing)} new or changed intent examples (reusing {reused})")
+            try:
+                generated = self.embedding_service.generate_batch_embeddings(missing, language='en')
+                if isinstance(generated, dict):
+                    generated = [generated.get(example) for example in missing]
+                for example, embedding in zip(missing, generated):
+                    if embedding is not None:
+                        self._record_example_embedding(example, np.asarray(embedding))
+                        embedded += 1
+            except Exception as e:
+                logger.error(f"❌ Failed to embed intent examples: {str(e)}")
+        elif missing:
+            logger.warning(f"⚠️ Embedding service not ready - {len(missing)} intent examples not embedded yet")
+        else:
+            logger.info(f"🚀 PERFORMANCE: All {reused} intent example embeddings loaded from cache")
+
+        current_keys = set(keys.values())
+        stale = [key for key in self._example_vectors if key not in current_keys]
+        for key in stale:
+            del self._example_vectors[key]
+
+        self.intent_embeddings = {}
+        for intent_name, examples in self.intent_examples.items():
+            vectors = [self._example_vectors[keys[example]] for example in examples
+                       if keys[example] in self._example_vectors]
+            if vectors and len({vector.shape for vector in vectors}) == 1:
+                self.intent_embeddings[intent_name] = np.stack(vectors, axis=0)
+        self._invalidate_packed_intents()
 
-        # PERFORMANCE FIX: Save embeddings to cache after generation
-        self._save_cached_intent_embeddings()
+        return embedded > 0 or bool(stale)
 
     def _load_cached_intent_embeddings(self) -> bool:
-        """Load intent embeddings from persistent cache."""
+        """
+        Load cached example vectors from the versioned store.
+
+        Vectors are keyed by a hash of the embedding model id and the example
+        text, so edited examples and model changes simply miss the cache.
+        """
         import os
-        import pickle
 
+        self._example_vectors = {}
         if not os.path.exists(self.intent_embeddings_cache_path):
             logger.info("No cached intent embeddings found")
             return False
 
         try:
-            with open(self.intent_embeddings_cache_path, 'rb') as f:
-                cached_data = pickle.load(f)
-
-            # Validate cache structure
-            if not isinstance(cached_data, dict) or 'embeddings' not in cached_data:
-                logger.warning("Invalid cache structure - regenerating embeddings")
-                return False
-
-            # Check if cache matches current intents
-            cached_intents = set(cached_data['embeddings'].keys())
-            current_intents = set(self.intents.keys())
-
-            if cached_intents != current_intents:
-                logger.info(f"Intent mismatch - cached: {len(cached_intents)}, current: {len(current_intents)} - regenerating")
-                return False
+            with np.load(self.intent_embeddings_cache_path) as data:
+                if int(data["format_version"]) != INTENT_CACHE_FORMAT_VERSION:
+                    logger.info("Intent embedding cache format changed - regenerating")
+                    return False
+                keys = data["keys"].tolist()
+                vectors = np.asarray(data["embeddings"], dtype=np.float32)
 
-            # Load cached embeddings
-            self.intent_embeddings = cached_data['embeddings']
-            logger.info(f"✅ Loaded {len(self.intent_embeddings)} intent embeddings from cache")
+            self._example_vectors = dict(zip(keys, vectors))
+            logger.info(f"✅ Loaded {len(keys)} cached intent example embeddings")
             return True
 
         except Exception as e:
@@ -197,12 +363,11 @@ class AdvancedIntentClassifier:
             return False
 
     def _save_cached_intent_embeddings(self):
-        """Save intent embeddings to persistent cache."""
+        """Atomically write cached example vectors to the versioned store."""
         import os
-        import pickle
         import time
 
-        if not self.intent_embeddings:
+        if not self._example_vectors:
             logger.warning("No embeddings to cache")
             return
 
@@ -210,16 +375,25 @@ class AdvancedIntentClassifier:
             # Ensure cache directory exists
             os.makedirs(os.path.dirname(self.intent_embeddings_cache_path), exist_ok=True)
 
-            cache_data = {
-                'embeddings': self.intent_embeddings,
-                'timestamp': time.time(),
-                'intent_count': len(self.intent_embeddings)
-            }
-
-            with open(self.intent_embeddings_cache_path, 'wb') as f:
-                pickle.dump(cache_data, f)
-
-            logger.info(f"💾 Saved {len(self.intent_embeddings)} intent embeddings to cache")
+            dimensions = {vector.shape for vector in self._example_vectors.values()}
+            if len(dimensions) != 1:
+                logger.warning(f"Mixed embedding shapes {dimensions} - not caching")
+                return
+
+            keys = list(self._example_vectors)
+            tmp_path = f"{self.intent_embeddings_cache_path}.tmp"
+            with open(tmp_path, 'wb') as f:
+                np.savez(
+                    f,
+                    format_version=np.array(INTENT_CACHE_FORMAT_VERSION),
+                    keys=np.array(keys),
+                    embeddings=np.stack([self._example_vectors[key] for key in keys]),
+                    timestamp=np.array(time.time())
+                )
+            # Readers (other workers) only ever see a complete file
+            os.replace(tmp_path, self.intent_embeddings_cache_path)
+
+            logger.info(f"💾 Saved {len(keys)} intent example embeddings to cache")
 
         except Exception as e:
             logger.warning(f"Failed to save embeddings cache: {e}")
@@ -241,6 +415,7 @@ class AdvancedIntentClassifier:
                         # CRITICAL FIX: Ensure embedding is valid and not all zeros
                         if embedding is not None and embedding.size > 0 and np.any(embedding != 0):
                             embeddings.append(embedding)
+                            self._record_example_embedding(example, embedding)
                         else:
                             logger.warning(f"Invalid embedding for example: {example}")
                             # Generate fallback embedding
@@ -279,6 +454,7 @@ class AdvancedIntentClassifier:
                         try:
                             embeddings_array = np.stack(valid_embeddings, axis=0)
                             self.intent_embeddings[intent_name] = embeddings_array
+                            self._invalidate_packed_intents()
                             logger.info(f"✅ Cached {len(valid_embeddings)} embeddings for intent '{intent_name}' (shape: {embeddings_array.shape})")
                             return True
                         except Exception as stack_error:
@@ -321,6 +497,31 @@ class AdvancedIntentClassifier:
 
         return success_count == len(self.intent_examples)
     
+    async def classify_async(self, text: str, embedding=None, language=None, context=None) -> Dict[str, Any]:
+        """
+        Classify intent, generating the query embedding through the micro-batched async path.
+        
+        Args:
+            text (str): User input text
+            embedding: Pre-computed text embedding (optional)
+            language (str): Language code (optional)
+            context (Dict): Current conversation context (optional)
+            
+        Returns:
+            Dict: Intent classification result with scores and confidence
+        """
+        if (text and embedding is None and self.embedding_service
+                and hasattr(self.embedding_service, 'generate_embedding_async')
+                and not self._keyword_based_classification(text)
+                and self.embedding_service.is_ready()):
+            try:
+                embedding = await self.embedding_service.generate_embedding_async(text, language)
+            except Exception as e:
+                logger.error(f"Failed to generate embedding: {str(e)}")
+                return self._get_fallback_result()
+        
+        return self.classify(text, embedding=embedding, language=language, context=context)
+    
     def classify(self, text: str, embedding=None, language=None, context=None) -> Dict[str, Any]:
         """
         Classify the intent of user text input with transportation debugging.
@@ -364,6 +565,71 @@ class AdvancedIntentClassifier:
         # Calculate similarity with all intent examples
         intent_scores = self._calculate_intent_scores(embedding, context)
         
+        return self._result_from_scores(intent_scores)
+    
+    def classify_batch(self, texts: List[str], embeddings=None, language=None,
+                       context=None) -> List[Dict[str, Any]]:
+        """
+        Classify several texts, scoring all embedding-based ones with one matrix product.
+        
+        Args:
+            texts (List[str]): User input texts
+            embeddings: Pre-computed (n_texts, dim) embeddings (optional)
+            language (str): Language code (optional)
+            context (Dict): Conversation context shared by the texts (optional)
+            
+        Returns:
+            List[Dict]: Classification result per text
+        """
+        results: List[Optional[Dict[str, Any]]] = [None] * len(texts)
+        pending = []
+        for i, text in enumerate(texts):
+            if not text:
+                results[i] = self._get_empty_result()
+                continue
+            keyword_result = self._keyword_based_classification(text)
+            if keyword_result:
+                results[i] = keyword_result
+            else:
+                pending.append(i)
+        
+        if pending:
+            if embeddings is not None:
+                pending_embeddings = [embeddings[i] for i in pending]
+            elif self.embedding_service and self.embedding_service.is_ready():
+                try:
+                    generated = self.embedding_service.generate_batch_embeddings(
+                        [texts[i] for i in pending], language
+                    )
+                    if isinstance(generated, dict):
+                        generated = [generated[texts[i]] for i in pending]
+                    pending_embeddings = list(generated)
+                except Exception as e:
+                    logger.error(f"Failed to generate batch embeddings: {str(e)}")
+                    pending_embeddings = None
+            else:
+                pending_embeddings = None
+            
+            if pending_embeddings is None:
+                for i in pending:
+                    results[i] = self._get_fallback_result()
+            else:
+                batch_scores = self._calculate_intent_scores_batch(np.stack(pending_embeddings), context)
+                for i, intent_scores in zip(pending, batch_scores):
+                    results[i] = self._result_from_scores(intent_scores)
+        
+        return results
+    
+    def _result_from_scores(self, intent_scores: Dict[str, float]) -> Dict[str, Any]:
+        """
+        Turn per-intent scores into a classification result.
+        
+        Args:
+            intent_scores (Dict): Intent names mapped to similarity scores
+            
+        Returns:
+            Dict: Intent classification result with scores and confidence
+        """
         # Get top 3 intents for detailed analysis
         top_intents = sorted(intent_scores.items(), key=lambda x: x[1], reverse=True)[:3]
         
@@ -398,10 +664,34 @@ class AdvancedIntentClassifier:
             "needs_disambiguation": confidence_diff < 0.1 and top_score < 0.8
         }
     
+    def _invalidate_packed_intents(self):
+        """Drop the packed example matrix so it is rebuilt on the next classification."""
+        self._packed_intents = None
+
+    def _get_packed_intents(self) -> PackedIntentMatrix:
+        """Return the packed example matrix, rebuilding it if the intent embeddings changed."""
+        packed = self._packed_intents
+        if packed is None or packed.source_size != len(self.intent_embeddings):
+            packed = PackedIntentMatrix(self.intent_embeddings)
+            self._packed_intents = packed
+        return packed
+
+    def _context_bias_vector(self, packed: PackedIntentMatrix, context: Optional[Dict]) -> Optional[np.ndarray]:
+        """Context bias for the current dialog state as a vector over packed intents."""
+        if not context or "dialog_state" not in context:
+            return None
+        related_intents = self.config.get("state_intent_map", {}).get(context["dialog_state"], [])
+        if not related_intents:
+            return None
+        return packed.bias_vector(related_intents, self.context_bias)
+
     def _calculate_intent_scores(self, embedding: np.ndarray, context: Optional[Dict] = None) -> Dict[str, float]:
         """
         Calculate similarity scores for all intents.
         
+        One matrix-vector product against the packed example matrix, a segmented
+        max per intent, and the context bias added as a vector.
+        
         Args:
             embedding (np.ndarray): Input text embedding
             context (Dict): Conversation context
@@ -409,28 +699,39 @@ class AdvancedIntentClassifier:
         Returns:
             Dict: Intent names mapped to similarity scores
         """
-        intent_scores = {}
+        packed = self._get_packed_intents()
+        if not len(packed):
+            return {}
         
-        for intent_name, intent_embeddings in self.intent_embeddings.items():
-            # Calculate cosine similarity with all examples
-            similarities = cosine_similarity([embedding], intent_embeddings)[0]
-            
-            # Use the highest similarity score
-            max_similarity = np.max(similarities)
-            intent_scores[intent_name] = max_similarity
+        scores = packed.score(embedding)
+        bias = self._context_bias_vector(packed, context)
+        if bias is not None:
+            scores = scores + bias
+        
+        return dict(zip(packed.intent_names, scores.tolist()))
+
+    def _calculate_intent_scores_batch(self, embeddings: np.ndarray,
+                                       context: Optional[Dict] = None) -> List[Dict[str, float]]:
+        """
+        Calculate intent scores for several query embeddings with one matrix product.
+        
+        Args:
+            embeddings (np.ndarray): (n_queries, dim) query embeddings
+            context (Dict): Conversation context shared by the queries
             
-            # Apply context bias if context exists and has dialog_state
-            if context and "dialog_state" in context:
-                current_state = context["dialog_state"]
-                
-                # Get related intents for current state
-                related_intents = self.config.get("state_intent_map", {}).get(current_state, [])
-                
-                # Apply bias to related intents
-                if intent_name in related_intents:
-                    intent_scores[intent_name] += self.context_bias
+        Returns:
+            List[Dict]: Intent scores per query
+        """
+        packed = self._get_packed_intents()
+        if not len(packed):
+            return [{} for _ in range(len(embeddings))]
+        
+        scores = packed.score_batch(embeddings)
+        bias = self._context_bias_vector(packed, context)
+        if bias is not None:
+            scores = scores + bias
         
-        return intent_scores
+        return [dict(zip(packed.intent_names, row)) for row in scores.tolist()]
 
     def _keyword_based_classification(self, text: str) -> Optional[Dict[str, Any]]:
         """
@@ -442,74 +743,25 @@ class AdvancedIntentClassifier:
         Returns:
             Optional[Dict]: Classification result if keyword match found, None otherwise
         """
-        text_lower = text.lower()
-
-        # Hotel queries - specific patterns
-        hotel_patterns = [
-            ("فنادق على النيل", "hotel_query", 0.95),
-            ("فنادق", "hotel_query", 0.9),
-            ("hotels on the nile", "hotel_query", 0.95),
-            ("nile view hotels", "hotel_query", 0.95),
-            ("hotels with nile view", "hotel_query", 0.95)
-        ]
-
-        # Restaurant queries - specific patterns
-        restaurant_patterns = [
-            ("vegetarian restaurants near my hotel", "restaurant_query", 0.95),
-            ("vegetarian restaurants near", "restaurant_query", 0.9),
-            ("restaurants near my hotel", "restaurant_query", 0.9),
-            ("vegetarian food near hotel", "restaurant_query", 0.9)
-        ]
-
-        # Tour queries - specific patterns
-        tour_patterns = [
-            ("nile cruise packages", "tour_query", 0.95),
-            ("photography tours of ancient sites", "tour_query", 0.95),
-            ("جولات مرشدة للمعابد", "tour_query", 0.95),
-            ("guided tours", "tour_query", 0.9),
-            ("photography tours", "tour_query", 0.9),
-            ("cruise packages", "tour_query", 0.9),
-            ("guided temple tours", "tour_query", 0.9)
-        ]
-
-        # Attraction info - specific patterns
-        attraction_patterns = [
-            ("pyramid opening hours and tickets", "attraction_info", 0.95),
-            ("alexandria library information", "attraction_info", 0.95),
-            ("citadel of saladin cairo", "attraction_info", 0.95),
-            ("آثار الإسكندرية القديمة", "attraction_info", 0.95),
-            ("pyramid opening hours", "attraction_info", 0.9),
-            ("pyramid tickets", "attraction_info", 0.9),
-            ("alexandria library", "attraction_info", 0.9),
-            ("citadel of saladin", "attraction_info", 0.9),
-            ("saladin citadel", "attraction_info", 0.9)
-        ]
-
-        # Booking queries - specific patterns
-        booking_patterns = [
-            ("عايز أحجز جولة للأهرامات", "booking_query", 0.95),
-            ("عايز أحجز", "booking_query", 0.9),
-            ("أحجز جولة", "booking_query", 0.9),
-            ("i want to book", "booking_query", 0.9),
-            ("book a tour", "booking_query", 0.9)
-        ]
-
-        # Check all patterns
-        all_patterns = hotel_patterns + restaurant_patterns + tour_patterns + attraction_patterns + booking_patterns
-
-        for pattern, intent, confidence in all_patterns:
-            if pattern in text_lower:
-                logger.debug(f"Keyword match: '{pattern}' → {intent} ({confidence})")
-                return {
-                    "intent": intent,
-                    "confidence": confidence,
-                    "top_intents": [{"intent": intent, "score": confidence}],
-                    "needs_disambiguation": False,
-                    "classification_method": "keyword_based"
-                }
+        # One pass over the text finds every configured keyword
+        matches = get_keyword_automaton("intent_classifier").search(text)
+        if not matches:
+            return None
+
+        # Phrases are checked in configuration order, most specific first
+        phrase = matches.first("phrase")
+        if phrase:
+            logger.debug(f"Keyword match: '{phrase.keyword}' → {phrase.label} ({phrase.priority})")
+            return {
+                "intent": phrase.label,
+                "confidence": phrase.priority,
+                "top_intents": [{"intent": phrase.label, "score": phrase.priority}],
+                "needs_disambiguation": False,
+                "classification_method": "keyword_based"
+            }
 
         # Check for Arabic hotel keywords with Nile
-        if any(word in text for word in ["فنادق", "فندق"]) and "النيل" in text:
+        if matches.has("hotel_term") and matches.has("nile_term"):
             return {
                 "intent": "hotel_query",
                 "confidence": 0.9,
@@ -519,7 +771,7 @@ class AdvancedIntentClassifier:
             }
 
         # Check for explicit booking requests in Arabic
-        if any(phrase in text for phrase in ["عايز أحجز", "أحجز", "احجز"]):
+        if matches.has("booking_term"):
             return {
                 "intent": "booking_query",
                 "confidence": 0.9,
@@ -610,6 +862,7 @@ class AdvancedIntentClassifier:
                     self.intent_embeddings[intent] = np.asarray([new_embedding])
                 else:
                     self.intent_embeddings[intent] = np.vstack([self.intent_embeddings[intent], new_embedding])
+                self._invalidate_packed_intents()
                     
                 logger.info(f"Added new example to intent '{intent}'")
                 return True
@@ -0,0 +1,342 @@
+"""
+Compiled multi-pattern keyword matching for the Egypt Tourism Chatbot.
+
+Keyword tables (configs/keyword_routes.json) are compiled once into an
+Aho-Corasick automaton over normalized text, so a message is scanned in a
+single pass no matter how many keywords the intent, routing and fast-path
+classifiers check. Each match carries its keyword group, label, priority,
+configuration order and position in the original text.
+"""
+import json
+import logging
+import os
+import unicodedata
+from functools import lru_cache
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from src.utils.text_normalization import normalize_arabic
+
+logger = logging.getLogger(__name__)
+
+KEYWORD_ROUTES_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "configs", "keyword_routes.json"
+)
+
+# Match modes: anywhere in the text, on word boundaries, or the whole (stripped) text
+MATCH_MODES = ("substring", "word", "exact")
+
+
+class KeywordMatch(NamedTuple):
+    """One keyword occurrence; ``start``/``end`` index the original text."""
+    keyword: str
+    group: str
+    label: str
+    priority: float
+    order: int
+    start: int
+    end: int
+
+
+@lru_cache(maxsize=4096)
+def _fold_char(char: str) -> str:
+    """Normalize one character: NFKC, lowercase, Arabic folding and diacritic removal."""
+    return normalize_arabic(unicodedata.normalize('NFKC', char).lower())
+
+
+def normalize_with_offsets(text: str) -> Tuple[str, List[int]]:
+    """
+    Normalize text for keyword matching, keeping a map back to the original.
+
+    Whitespace runs collapse to a single space. Punctuation is kept so
+    keywords such as "5-star" still match.
+
+    Args:
+        text: Text to normalize
+
+    Returns:
+        Tuple of (normalized text, original index of each normalized character)
+    """
+    chars: List[str] = []
+    offsets: List[int] = []
+    for index, char in enumerate(text or ""):
+        if char.isspace():
+            if chars and chars[-1] != ' ':
+                chars.append(' ')
+                offsets.append(index)
+            continue
+        for folded in _fold_char(char):
+            chars.append(folded)
+            offsets.append(index)
+    while chars and chars[-1] == ' ':
+        chars.pop()
+        offsets.pop()
+    return ''.join(chars), offsets
+
+
+def normalize_keyword(keyword: str) -> str:
+    """Normalize a keyword exactly as message text is normalized."""
+    return normalize_with_offsets(keyword)[0]
+
+
+def _is_word_char(char: str) -> bool:
+    return char.isalnum() or char == '_'
+
+
+class KeywordMatchSet:
+    """All keyword matches found in one message, with lookup helpers for classifiers."""
+
+    def __init__(self, matches: List[KeywordMatch]):
+        self.matches = matches
+
+    def __iter__(self) -> Iterator[KeywordMatch]:
+        return iter(self.matches)
+
+    def __len__(self) -> int:
+        return len(self.matches)
+
+    def __bool__(self) -> bool:
+        return bool(self.matches)
+
+    def in_group(self, group: str) -> List[KeywordMatch]:
+        """Matches belonging to a keyword group, in text order."""
+        return [match for match in self.matches if match.group == group]
+
+    def has(self, group: str) -> bool:
+        """Whether any keyword of the group matched."""
+        return any(match.group == group for match in self.matches)
+
+    def keywords(self, group: Optional[str] = None) -> set:
+        """Distinct normalized keywords that matched (optionally within one group)."""
+        return {match.keyword for match in self.matches if group is None or match.group == group}
+
+    def first(self, group: Optional[str] = None) -> Optional[KeywordMatch]:
+        """The match whose keyword comes first in configuration order."""
+        candidates = [match for match in self.matches if group is None or match.group == group]
+        return min(candidates, key=lambda match: match.order) if candidates else None
+
+    def best(self, group: Optional[str] = None) -> Optional[KeywordMatch]:
+        """The highest-priority match, ties broken by configuration order."""
+        candidates = [match for match in self.matches if group is None or match.group == group]
+        return min(candidates, key=lambda match: (-match.priority, match.order)) if candidates else None
+
+
+class KeywordAutomaton:
+    """
+    Aho-Corasick automaton over normalized keywords.
+
+    Keywords are added with a group, label, priority and match mode, then
+    compiled once with ``build``. ``search`` returns every match in one pass,
+    plus a match for each configured keyword sequence (keywords that must
+    all occur, in order, like the regex ``.*a.*b.*``).
+    """
+
+    def __init__(self, name: str = "keywords"):
+        self.name = name
+        self._entries: List[Tuple[str, str, str, float, str]] = []
+        self._sequences: List[Tuple[List[str], str, str, float, int]] = []
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[int]] = [[]]
+        self._built = False
+
+    def add(self, keyword: str, group: str = "default", label: Optional[str] = None,
+            priority: float = 0.0, mode: str = "substring") -> None:
+        """
+        Register a keyword.
+
+        Args:
+            keyword: Keyword or phrase (normalized before insertion)
+            group: Keyword group used by consumers to select matches
+            label: Value reported with the match (defaults to the group)
+            priority: Priority or confidence reported with the match
+            mode: "substring", "word" (word boundaries) or "exact" (whole text)
+        """
+        if mode not in MATCH_MODES:
+            raise ValueError(f"Unknown keyword match mode '{mode}'")
+        normalized = normalize_keyword(keyword)
+        if not normalized:
+            return
+        self._entries.append((normalized, group, label or group, priority, mode))
+        self._built = False
+
+    def add_sequence(self, keywords: List[str], group: str = "default", label: Optional[str] = None,
+                     priority: float = 0.0) -> None:
+        """
+        Register keywords that must all occur, in order and without overlapping.
+
+        Args:
+            keywords: Ordered keywords
+            group: Keyword group used by consumers to select matches
+            label: Value reported with the match (defaults to the group)
+            priority: Priority or confidence reported with the match
+        """
+        terms = [normalize_keyword(keyword) for keyword in keywords]
+        terms = [term for term in terms if term]
+        if not terms:
+            return
+        order = len(self._entries) + len(self._sequences)
+        self._sequences.append((terms, group, label or group, priority, order))
+        for term in terms:
+            self.add(term, group=f"{group}:sequence_term", label=label, priority=priority)
+
+    def build(self) -> "KeywordAutomaton":
+        """Compile the trie, failure links and merged outputs."""
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [[]]
+
+        for entry_index, (keyword, *_rest) in enumerate(self._entries):
+            state = 0
+            for char in keyword:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append([])
+                state = next_state
+            self._output[state].append(entry_index)
+
+        # Breadth-first failure links; outputs of the failure state are inherited
+        queue = list(self._goto[0].values())
+        for state in queue:
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(char, 0)
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+
+        self._built = True
+        return self
+
+    def search(self, text: str) -> KeywordMatchSet:
+        """
+        Find all keyword and sequence matches in one pass over the text.
+
+        Args:
+            text: Message text (normalized internally)
+
+        Returns:
+            KeywordMatchSet with matches in text order
+        """
+        if not self._built:
+            self.build()
+
+        normalized, offsets = normalize_with_offsets(text)
+        matches: List[KeywordMatch] = []
+        state = 0
+        for position, char in enumerate(normalized):
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+            for entry_index in self._output[state]:
+                keyword, group, label, priority, mode = self._entries[entry_index]
+                start = position - len(keyword) + 1
+                end = position + 1
+                if mode == "exact" and (start != 0 or end != len(normalized)):
+                    continue
+                if mode == "word" and (
+                    (start > 0 and _is_word_char(normalized[start - 1]))
+                    or (end < len(normalized) and _is_word_char(normalized[end]))
+                ):
+                    continue
+                matches.append(KeywordMatch(
+                    keyword, group, label, priority, entry_index, offsets[start], offsets[end - 1] + 1
+                ))
+
+        matches.sort(key=lambda match: (match.start, match.order))
+        if self._sequences:
+            matches.extend(self._match_sequences(matches))
+        return KeywordMatchSet(matches)
+
+    def _match_sequences(self, matches: List[KeywordMatch]) -> List[KeywordMatch]:
+        sequence_matches = []
+        for terms, group, label, priority, order in self._sequences:
+            term_group = f"{group}:sequence_term"
+            position = 0
+            first_start = None
+            for term in terms:
+                occurrence = next(
+                    (match for match in matches
+                     if match.group == term_group and match.keyword == term and match.start >= position),
+                    None
+                )
+                if occurrence is None:
+                    break
+                if first_start is None:
+                    first_start = occurrence.start
+                position = occurrence.end
+            else:
+                sequence_matches.append(KeywordMatch(
+                    " … ".join(terms), group, label, priority, order, first_start, position
+                ))
+        return sequence_matches
+
+    @classmethod
+    def from_spec(cls, name: str, spec: Dict[str, List[Any]]) -> "KeywordAutomaton":
+        """
+        Build an automaton from a configuration section.
+
+        The section maps group names to entries. An entry is a keyword string
+        or a dict with ``keyword`` (or ``sequence``), and optional ``label``,
+        ``priority`` and ``mode``.
+
+        Args:
+            name: Automaton name used in logs
+            spec: Group name -> list of entries
+
+        Returns:
+            Compiled KeywordAutomaton
+        """
+        automaton = cls(name)
+        for group, entries in spec.items():
+            for entry in entries:
+                if isinstance(entry, str):
+                    automaton.add(entry, group=group)
+                elif "sequence" in entry:
+                    automaton.add_sequence(entry["sequence"], group=group, label=entry.get("label"),
+                                           priority=entry.get("priority", 0.0))
+                else:
+                    automaton.add(entry["keyword"], group=group, label=entry.get("label"),
+                                  priority=entry.get("priority", 0.0), mode=entry.get("mode", "substring"))
+        return automaton.build()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+@lru_cache(maxsize=None)
+def _load_keyword_routes(config_path: str) -> Dict[str, Any]:
+    try:
+        with open(config_path, 'r', encoding='utf-8') as f:
+            routes = json.load(f)
+        logger.info(f"✅ Loaded keyword routes from {config_path}")
+        return routes
+    except Exception as e:
+        logger.error(f"❌ Error loading keyword routes from {config_path}: {e}")
+        return {}
+
+
+@lru_cache(maxsize=None)
+def get_keyword_automaton(section: str, config_path: str = KEYWORD_ROUTES_PATH) -> KeywordAutomaton:
+    """
+    Get the compiled automaton for a keyword routes section, built once per process.
+
+    Args:
+        section: Section name in configs/keyword_routes.json
+        config_path: Path to the keyword routes file
+
+    Returns:
+        Compiled KeywordAutomaton (empty if the section is missing)
+    """
+    spec = _load_keyword_routes(config_path).get(section)
+    if not spec:
+        logger.warning(f"⚠️ Keyword routes section '{section}' not found - keyword matching disabled")
+        return KeywordAutomaton(section).build()
+
+    automaton = KeywordAutomaton.from_spec(section, spec)
+    logger.info(f"🔤 Compiled keyword automaton '{section}' with {len(automaton)} keywords")
+    return automaton
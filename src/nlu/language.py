@@ -3,15 +3,20 @@
 Language detection module for the Egypt Tourism Chatbot.
 """
 import os
+import re
 import logging
+import threading
 import warnings
-from typing import Tuple, Optional
+from typing import Any, Dict, Tuple, Optional
 import requests
 from pathlib import Path
 
+from src.utils.cache import LRUCache
+from src.utils.text_normalization import normalize_text
+
 # CRITICAL FIX: Use langdetect instead of FastText for NumPy 2.0 compatibility
 try:
-    from langdetect import detect, detect_langs, LangDetectException
+    from langdetect import detect_langs, LangDetectException
     LANGDETECT_AVAILABLE = True
 except ImportError:
     LANGDETECT_AVAILABLE = False
@@ -27,24 +32,41 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+_WORD_PATTERN = re.compile(r"[a-z']+")
+
 class LanguageDetector:
     """
     Detects the language of input text.
     Supports English, Modern Standard Arabic, and Egyptian Arabic dialect.
     """
     
-    def __init__(self, model_path: Optional[str] = None, confidence_threshold: float = 0.8):
+    def __init__(self, model_path: Optional[str] = None, confidence_threshold: float = 0.8,
+                 cache_size: int = 4096, script_confidence: float = 0.99):
         """
         Initialize language detector with the specified model.
 
         Args:
             model_path (str, optional): Path to the FastText language detection model
             confidence_threshold (float): Threshold for language detection confidence
+            cache_size (int): Maximum number of memoized detection results
+            script_confidence (float): Confidence reported for Arabic-script text and
+                unambiguous English text resolved without the model
         """
         self.model_path = model_path
         self.confidence_threshold = confidence_threshold
+        self.script_confidence = script_confidence
         self.model = None
 
+        # PERFORMANCE FIX: Memoize results keyed by normalized text
+        self._cache = LRUCache(max_size=cache_size)
+        self._cache_lock = threading.Lock()
+        self.stats = {
+            'detections': 0,
+            'cache_hits': 0,
+            'script_short_circuits': 0,
+            'model_detections': 0
+        }
+
         # CRITICAL FIX: Define supported language codes for Egypt Tourism
         self.supported_languages = ["en", "ar", "ar_eg"]
 
@@ -56,6 +78,15 @@ class LanguageDetector:
             "بقى", "كمان", "برضو", "علطول", "خلاص", "ماشي"
         ]
 
+        # English function words: Latin text only skips the model when enough of these
+        # appear, so "hola" or Franco-Arabic "ezayak" are not reported as confident English
+        self.english_markers = {
+            "the", "an", "is", "are", "was", "be", "of", "for", "from", "with", "and",
+            "what", "where", "when", "how", "which", "who", "can", "could", "would",
+            "you", "we", "my", "me", "your", "do", "does", "there", "this", "that",
+            "it", "please", "want", "need", "should", "have", "has"
+        }
+
         self._load_model()
         logger.info(f"✅ Language detector initialized (Model: {'Loaded' if self.model else 'Fallback'})")
     
@@ -111,6 +142,9 @@ class LanguageDetector:
         """
         Detect the language of the given text.
 
+        Results are memoized by normalized text; Arabic-script text and
+        unambiguous English are resolved without running the model.
+
         Args:
             text (str): Text to analyze
 
@@ -120,15 +154,89 @@ class LanguageDetector:
         if not text or len(text.strip()) < 2:
             return "en", 1.0  # Default to English for very short text
 
+        self.stats['detections'] += 1
+        cache_key = normalize_text(text) or text
+        with self._cache_lock:
+            cached = self._cache.get(cache_key)
+        if cached is not None:
+            self.stats['cache_hits'] += 1
+            return cached
+
+        result = self._detect_by_script(text)
+        if result is not None:
+            self.stats['script_short_circuits'] += 1
+        else:
+            self.stats['model_detections'] += 1
+            result = self._detect_with_model(text)
+
+        with self._cache_lock:
+            self._cache[cache_key] = result
+        return result
+
+    def _detect_by_script(self, text: str) -> Optional[Tuple[str, float]]:
+        """
+        Resolve Arabic-script text and unambiguous English without the model.
+
+        Latin script alone does not identify English ("hola", "bonjour le caire",
+        Franco-Arabic "ezayak"), so Latin text only short-circuits when it is long
+        enough and contains enough English function words.
+
+        Returns:
+            tuple or None: (language_code, confidence) or None when the model should decide
+        """
+        has_arabic = has_latin = False
+        for char in text:
+            if not char.isalpha():
+                continue
+            if '\u0600' <= char <= '\u06FF' or '\u0750' <= char <= '\u077F' or '\uFB50' <= char <= '\uFEFF':
+                has_arabic = True
+            elif char < '\u0250':
+                has_latin = True
+            else:
+                return None  # Another script: let the model decide
+            if has_arabic and has_latin:
+                return None
+
+        if has_arabic:
+            if self._is_egyptian_dialect(text):
+                return "ar_eg", self.script_confidence
+            return "ar", self.script_confidence
+        if has_latin and self._is_unambiguous_english(text):
+            return "en", self.script_confidence
+        return None
+
+    def _is_unambiguous_english(self, text: str) -> bool:
+        """
+        Check if Latin-script text is clearly English.
+
+        Args:
+            text (str): Latin-script text to check
+
+        Returns:
+            bool: True if at least three words with two or more distinct English
+            function words making up a third of them
+        """
+        words = _WORD_PATTERN.findall(text.lower())
+        markers = self.english_markers.intersection(words)
+        return len(words) >= 3 and len(markers) >= 2 and 3 * len(markers) >= len(words)
+
+    def _detect_with_model(self, text: str) -> Tuple[str, float]:
+        """
+        Detect the language of mixed-script text with the loaded model (one pass).
+
+        Args:
+            text (str): Text to analyze
+
+        Returns:
+            tuple: (language_code, confidence_score)
+        """
         # CRITICAL FIX: Use langdetect if available (NumPy 2.0 compatible)
         if self.model == "langdetect" and LANGDETECT_AVAILABLE:
             try:
-                # Use langdetect for clean, warning-free detection
-                detected_lang = detect(text)
-
-                # Get confidence using detect_langs
+                # One probabilistic pass: the top candidate is what detect() would return
                 lang_probs = detect_langs(text)
-                confidence = max(prob.prob for prob in lang_probs if prob.lang == detected_lang)
+                detected_lang = lang_probs[0].lang
+                confidence = lang_probs[0].prob
 
                 # Normalize language code and handle Arabic variants
                 if detected_lang == 'ar':
@@ -143,7 +251,10 @@ class LanguageDetector:
                         if self._is_egyptian_dialect(text):
                             return "ar_eg", 0.7
                         return "ar", 0.8
-                    return "en", confidence
+                    # Unsupported language: still answered in English, but report how
+                    # likely the text is English rather than the other language's score
+                    en_prob = next((candidate.prob for candidate in lang_probs if candidate.lang == 'en'), 0.0)
+                    return "en", en_prob
 
             except (LangDetectException, Exception) as e:
                 logger.debug(f"langdetect failed: {e}, falling back to pattern matching")
@@ -283,4 +394,19 @@ class LanguageDetector:
 
         # Default to English with low confidence
         logger.debug("Defaulting to English in fallback")
-        return "en", 0.5
\ No newline at end of file
+        return "en", 0.5
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get detection statistics.
+
+        Returns:
+            Dictionary with detection, cache hit and short-circuit counters
+        """
+        detections = self.stats['detections']
+        return {
+            **self.stats,
+            "cache_hit_rate": self.stats['cache_hits'] / detections if detections else 0.0,
+            "cache_size": len(self._cache.cache),
+            "cache_max_size": self._cache.max_size
+        }
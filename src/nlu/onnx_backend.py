@@ -0,0 +1,371 @@
+"""
+ONNX Runtime inference backend for transformer embedding models.
+
+Exports the configured PyTorch models to ONNX (optionally with int8 dynamic
+quantization), loads them with onnxruntime using tuned thread settings and
+wraps each session in OnnxEmbeddingModel, which is called like a
+``transformers`` model (``model(**inputs)``) so the embedding services work
+unchanged. An exported model only replaces its PyTorch counterpart after
+it passes a parity check on sample texts.
+"""
+import logging
+import os
+import time
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import torch
+
+try:
+    import onnxruntime as ort
+    ONNXRUNTIME_AVAILABLE = True
+except ImportError:
+    ONNXRUNTIME_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PARITY_TEXTS = [
+    "hello",
+    "pyramids of giza",
+    "What are the opening hours of the Egyptian Museum in Cairo?",
+    "مرحبا",
+    "ما هي أفضل الفنادق في الأقصر؟"
+]
+
+
+class OnnxEmbeddingModel:
+    """
+    ONNX Runtime session exposing the ``transformers`` call convention.
+
+    ``model(**inputs)`` accepts the tokenizer's torch tensors and returns an
+    object with ``last_hidden_state`` and ``pooler_output`` torch tensors.
+    """
+
+    def __init__(self, model_path: str, intra_op_threads: Optional[int] = None,
+                 inter_op_threads: int = 1):
+        """
+        Load an exported model.
+
+        Args:
+            model_path: Path of the .onnx file
+            intra_op_threads: Threads used inside one operator (defaults to the CPU count)
+            inter_op_threads: Threads used across independent operators
+        """
+        if not ONNXRUNTIME_AVAILABLE:
+            raise ImportError("onnxruntime is not installed (pip install -r requirements-onnx.txt)")
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.intra_op_num_threads = intra_op_threads or os.cpu_count() or 1
+        options.inter_op_num_threads = inter_op_threads
+        options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+
+        self.model_path = model_path
+        self.session = ort.InferenceSession(model_path, sess_options=options, providers=["CPUExecutionProvider"])
+        self.input_names = [model_input.name for model_input in self.session.get_inputs()]
+        self.output_names = [model_output.name for model_output in self.session.get_outputs()]
+
+    def __call__(self, **inputs) -> SimpleNamespace:
+        feed = {}
+        for name in self.input_names:
+            value = inputs.get(name)
+            if value is None:
+                continue
+            if isinstance(value, torch.Tensor):
+                value = value.cpu().numpy()
+            feed[name] = np.asarray(value, dtype=np.int64)
+
+        outputs = dict(zip(self.output_names, self.session.run(self.output_names, feed)))
+        pooler_output = outputs.get("pooler_output")
+        return SimpleNamespace(
+            last_hidden_state=torch.from_numpy(outputs["last_hidden_state"]),
+            pooler_output=torch.from_numpy(pooler_output) if pooler_output is not None else None
+        )
+
+    def to(self, *args, **kwargs) -> "OnnxEmbeddingModel":
+        """No-op kept for code that moves models to a device."""
+        return self
+
+    def eval(self) -> "OnnxEmbeddingModel":
+        """No-op kept for code that switches models to inference mode."""
+        return self
+
+
+def export_to_onnx(model: Any, tokenizer: Any, output_path: str, opset: int = 14) -> str:
+    """
+    Export a PyTorch transformer model to ONNX with dynamic batch and sequence axes.
+
+    Args:
+        model: ``transformers`` model
+        tokenizer: Matching tokenizer (used to build the example input)
+        output_path: Destination .onnx path
+        opset: ONNX opset version
+
+    Returns:
+        str: The output path
+    """
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    model.eval()
+
+    sample = tokenizer(["export sample", "a second, longer export sample"], return_tensors="pt", padding=True)
+    input_names = [name for name in ("input_ids", "attention_mask", "token_type_ids") if name in sample]
+
+    with torch.no_grad():
+        has_pooler = getattr(model(**sample), "pooler_output", None) is not None
+    output_names = ["last_hidden_state"] + (["pooler_output"] if has_pooler else [])
+
+    class _Wrapper(torch.nn.Module):
+        def __init__(self, inner):
+            super().__init__()
+            self.inner = inner
+
+        def forward(self, *args):
+            outputs = self.inner(**dict(zip(input_names, args)))
+            if has_pooler:
+                return outputs.last_hidden_state, outputs.pooler_output
+            return outputs.last_hidden_state
+
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    dynamic_axes["last_hidden_state"] = {0: "batch", 1: "sequence"}
+    if has_pooler:
+        dynamic_axes["pooler_output"] = {0: "batch"}
+
+    torch.onnx.export(
+        _Wrapper(model),
+        tuple(sample[name] for name in input_names),
+        output_path,
+        input_names=input_names,
+        output_names=output_names,
+        dynamic_axes=dynamic_axes,
+        opset_version=opset,
+        do_constant_folding=True
+    )
+    logger.info(f"📦 Exported ONNX model to {output_path}")
+    return output_path
+
+
+def quantize_int8(onnx_path: str, output_path: str) -> str:
+    """
+    Apply int8 dynamic quantization to the weights of an exported model.
+
+    Args:
+        onnx_path: Source .onnx path
+        output_path: Destination .onnx path
+
+    Returns:
+        str: The output path
+    """
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    quantize_dynamic(onnx_path, output_path, weight_type=QuantType.QInt8)
+    logger.info(f"📦 Quantized ONNX model to int8: {output_path}")
+    return output_path
+
+
+def _pooled_embeddings(model: Any, tokenizer: Any, texts: List[str]) -> np.ndarray:
+    """Attention-masked mean-pooled embeddings, comparable across backends."""
+    return _model_embeddings(model, tokenizer, texts)["mean"]
+
+
+def _model_embeddings(model: Any, tokenizer: Any, texts: List[str]) -> Dict[str, np.ndarray]:
+    """
+    Embeddings in every pooling mode the embedding services can serve.
+
+    Returns:
+        dict: "mean" (attention-masked mean of last_hidden_state) and, when the
+        model has a pooler, "pooler" (pooler_output, which the services prefer)
+    """
+    inputs = tokenizer(texts, return_tensors="pt", padding=True, truncation=True, max_length=512)
+    with torch.no_grad():
+        outputs = model(**inputs)
+    mask = inputs["attention_mask"].unsqueeze(-1).to(outputs.last_hidden_state.dtype)
+    summed = (outputs.last_hidden_state * mask).sum(dim=1)
+    embeddings = {"mean": (summed / mask.sum(dim=1).clamp(min=1e-9)).numpy()}
+    pooler_output = getattr(outputs, "pooler_output", None)
+    if pooler_output is not None:
+        embeddings["pooler"] = pooler_output.numpy()
+    return embeddings
+
+
+def check_parity(torch_model: Any, onnx_model: Any, tokenizer: Any,
+                 texts: Optional[List[str]] = None, threshold: float = 0.99) -> Dict[str, Any]:
+    """
+    Compare ONNX and PyTorch embeddings on sample texts.
+
+    Every pooling mode the reference model produces is checked, including
+    ``pooler_output``, which the embedding services serve when it exists.
+
+    Args:
+        torch_model: Reference PyTorch model
+        onnx_model: OnnxEmbeddingModel to validate
+        tokenizer: Shared tokenizer
+        texts: Sample texts (defaults to mixed English/Arabic tourism queries)
+        threshold: Minimum cosine similarity required for every text
+
+    Returns:
+        dict: min/mean cosine similarity over all modes, per-mode minimums
+        and whether the check passed
+    """
+    texts = texts or DEFAULT_PARITY_TEXTS
+    reference = _model_embeddings(torch_model, tokenizer, texts)
+    candidate = _model_embeddings(onnx_model, tokenizer, texts)
+
+    cosines = {}
+    for mode, expected in reference.items():
+        actual = candidate.get(mode)
+        if actual is None:
+            # The served output is missing from the export: no parity
+            cosines[mode] = np.zeros(len(texts))
+            continue
+        norms = np.linalg.norm(expected, axis=1) * np.linalg.norm(actual, axis=1)
+        cosines[mode] = np.sum(expected * actual, axis=1) / np.maximum(norms, 1e-12)
+
+    all_cosines = np.concatenate(list(cosines.values()))
+    return {
+        "min_cosine": float(all_cosines.min()),
+        "mean_cosine": float(all_cosines.mean()),
+        "min_cosine_by_mode": {mode: float(values.min()) for mode, values in cosines.items()},
+        "threshold": threshold,
+        "passed": bool(all_cosines.min() > threshold)
+    }
+
+
+def benchmark_backends(torch_model: Any, onnx_model: Any, tokenizer: Any,
+                       texts: Optional[List[str]] = None, batch_size: int = 8,
+                       iterations: int = 10) -> Dict[str, Any]:
+    """
+    Measure embedding latency of the PyTorch and ONNX backends on the same inputs.
+
+    Args:
+        torch_model: PyTorch model
+        onnx_model: OnnxEmbeddingModel
+        tokenizer: Shared tokenizer
+        texts: Sample texts (defaults to the parity texts)
+        batch_size: Texts per forward pass
+        iterations: Timed repetitions per backend
+
+    Returns:
+        dict: Per-backend mean/p95 latency per batch and the ONNX speedup
+    """
+    texts = texts or DEFAULT_PARITY_TEXTS
+    batch = (texts * (batch_size // len(texts) + 1))[:batch_size]
+
+    def measure(model: Any) -> Dict[str, float]:
+        _pooled_embeddings(model, tokenizer, batch)  # warmup
+        timings = []
+        for _ in range(iterations):
+            start = time.perf_counter()
+            _pooled_embeddings(model, tokenizer, batch)
+            timings.append((time.perf_counter() - start) * 1000)
+        timings.sort()
+        return {
+            "mean_ms": float(np.mean(timings)),
+            "p95_ms": float(timings[min(len(timings) - 1, int(len(timings) * 0.95))]),
+            "texts_per_second": batch_size / (np.mean(timings) / 1000)
+        }
+
+    torch_stats = measure(torch_model)
+    onnx_stats = measure(onnx_model)
+    return {
+        "batch_size": batch_size,
+        "iterations": iterations,
+        "torch": torch_stats,
+        "onnx": onnx_stats,
+        "speedup": torch_stats["mean_ms"] / onnx_stats["mean_ms"] if onnx_stats["mean_ms"] else None
+    }
+
+
+def build_onnx_models(models: Dict[str, Any], tokenizers: Dict[str, Any], model_names: Dict[str, str],
+                      config: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    Export (or reuse previously exported) ONNX versions of loaded models.
+
+    Each model is replaced only if its ONNX version passes the parity check;
+    otherwise the PyTorch model is kept.
+
+    Args:
+        models: Loaded PyTorch models {key: model}
+        tokenizers: Matching tokenizers {key: tokenizer}
+        model_names: Model identifiers {key: name} from configs/models.json (used for file names)
+        config: ``embedding_backend`` section of configs/models.json
+
+    Returns:
+        Tuple of (models with ONNX replacements, per-model report)
+    """
+    if not ONNXRUNTIME_AVAILABLE:
+        logger.warning("⚠️ onnxruntime not installed (requirements-onnx.txt), keeping PyTorch embedding backend")
+        return models, {}
+
+    export_dir = config.get("export_dir", "data/models/onnx")
+    quantize = config.get("quantize_int8", True)
+    result = dict(models)
+    report: Dict[str, Any] = {}
+
+    for key, torch_model in models.items():
+        tokenizer = tokenizers.get(key)
+        if tokenizer is None:
+            continue
+        base_name = model_names.get(key, key).replace("/", "__")
+        fp32_path = os.path.join(export_dir, f"{base_name}.onnx")
+        model_path = os.path.join(export_dir, f"{base_name}.int8.onnx") if quantize else fp32_path
+
+        try:
+            if not os.path.exists(model_path):
+                if not os.path.exists(fp32_path):
+                    export_to_onnx(torch_model, tokenizer, fp32_path, opset=config.get("opset", 14))
+                if quantize:
+                    quantize_int8(fp32_path, model_path)
+
+            onnx_model = OnnxEmbeddingModel(
+                model_path,
+                intra_op_threads=config.get("intra_op_threads"),
+                inter_op_threads=config.get("inter_op_threads", 1)
+            )
+            parity = check_parity(torch_model, onnx_model, tokenizer,
+                                  texts=config.get("parity_texts"),
+                                  threshold=config.get("parity_threshold", 0.99))
+            report[key] = {"model_path": model_path, "quantized": quantize, "parity": parity}
+
+            if parity["passed"]:
+                result[key] = onnx_model
+                logger.info(f"✅ Using ONNX backend for {key} (min cosine {parity['min_cosine']:.4f})")
+            else:
+                logger.warning(
+                    f"⚠️ ONNX parity check failed for {key} (min cosine {parity['min_cosine']:.4f}), "
+                    f"keeping PyTorch model"
+                )
+        except Exception as e:
+            logger.error(f"❌ ONNX backend setup failed for {key}: {str(e)}")
+            report[key] = {"error": str(e)}
+
+    return result, report
+
+
+def main():
+    """Export the configured models, then run the parity check and backend benchmark."""
+    import json
+
+    from transformers import AutoModel, AutoTokenizer
+
+    with open("configs/models.json", "r", encoding="utf-8") as f:
+        models_config = json.load(f)
+    backend_config = models_config.get("embedding_backend", {})
+    model_names = models_config.get("transformer_models", {})
+
+    models, tokenizers = {}, {}
+    for key, model_name in model_names.items():
+        print(f"Loading {model_name}...")
+        tokenizers[key] = AutoTokenizer.from_pretrained(model_name)
+        models[key] = AutoModel.from_pretrained(model_name).to("cpu")
+
+    onnx_models, report = build_onnx_models(models, tokenizers, model_names, backend_config)
+    for key, entry in report.items():
+        if isinstance(onnx_models.get(key), OnnxEmbeddingModel):
+            entry["benchmark"] = benchmark_backends(models[key], onnx_models[key], tokenizers[key])
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
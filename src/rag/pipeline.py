@@ -5,13 +5,33 @@ Enhances responses with knowledge base information by semantic search and retrie
 import logging
 import re
 import json
+import inspect
+import threading
+from contextlib import nullcontext
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from typing import Dict, List, Any, Optional, Tuple
 import numpy as np
 import time
 import hashlib
 
+from src.utils.cache import LRUCache
+
 logger = logging.getLogger(__name__)
 
+# Content type -> table, for single-query UNION ALL retrieval
+RETRIEVAL_TABLES = {
+    "attractions": "attractions",
+    "restaurants": "restaurants",
+    "hotels": "hotels",
+    "cities": "cities",
+    "practical_info": "practical_info",
+}
+
+DEFAULT_CONTENT_TYPES = ['attractions', 'restaurants', 'hotels', 'cities', 'practical_info']
+
+# How long the UNION ALL table check is trusted before the schema is re-read
+RETRIEVAL_TABLE_CHECK_INTERVAL = 300
+
 class RAGPipeline:
     """
     Retrieval-Augmented Generation (RAG) pipeline for generating responses
@@ -19,7 +39,7 @@ class RAGPipeline:
     """
 
     def __init__(self, knowledge_base, vector_db=None, embedding_model=None,
-               llm_service=None, config: Optional[Dict] = None):
+               llm_service=None, config: Optional[Dict] = None, db_manager=None):
         """
         Initialize the RAG pipeline.
 
@@ -29,12 +49,15 @@ class RAGPipeline:
             embedding_model: Model for embedding queries
             llm_service: LLM service for generation
             config (Dict, optional): Configuration options
+            db_manager: Database manager with per-content-type search methods
+                (defaults to the knowledge base's db_manager)
         """
         self.knowledge_base = knowledge_base
         self.vector_db = vector_db
         self.embedding_model = embedding_model
         self.llm_service = llm_service
         self.config = config or {}
+        self.db_manager = db_manager or getattr(knowledge_base, "db_manager", None)
 
         # Configuration options
         self.max_chunks = self.config.get("max_chunks", 5)
@@ -42,6 +65,20 @@ class RAGPipeline:
         self.context_window = self.config.get("context_window", 2000)
         self.cache_enabled = self.config.get("cache_enabled", True)
 
+        # Retrieval fan-out options: "parallel" (one task per content type) or "union_all" (one query)
+        self.retrieval_mode = self.config.get("retrieval_mode", "parallel")
+        self.retrieval_max_workers = self.config.get("retrieval_max_workers", 6)
+        self.retrieval_timeout = self.config.get("retrieval_timeout", 2.0)  # Seconds per source
+        self.source_timeouts = self.config.get("source_timeouts", {})  # Per content type overrides
+
+        self._retrieval_executor = None
+        self._executor_lock = threading.Lock()
+        self._stalled_sources: set = set()  # Content types with a timed-out search still running
+        self._union_tables: Tuple[float, frozenset] = (0.0, frozenset())
+        self._retrieval_cache = LRUCache(max_size=self.config.get("cache_size", 500),
+                                         ttl=self.config.get("cache_ttl", 300))
+        self.last_retrieval_metadata: Dict[str, Any] = {}
+
     def generate_response(self, query: str, session_id: str, language: str = "en") -> Dict[str, Any]:
         """
         Main method for generating a response using the RAG pipeline.
@@ -476,12 +513,326 @@ class RAGPipeline:
         # If it's not a dictionary or string, return empty string
         return ""
 
+    def get_query_embedding(self, query: str) -> Optional[List[float]]:
+        """Embed the query with the configured embedding model (None if unavailable)."""
+        if not self.embedding_model:
+            return None
+        try:
+            return [float(value) for value in self.embedding_model.encode([query])[0]]
+        except Exception as e:
+            logger.error(f"Error embedding query: {str(e)}")
+            return None
+
+    def get_from_cache(self, cache_key: str) -> Optional[List[Dict]]:
+        """Get cached retrieval results."""
+        return self._retrieval_cache.get(cache_key)
+
+    def save_to_cache(self, cache_key: str, results: List[Dict]) -> None:
+        """Cache retrieval results."""
+        self._retrieval_cache[cache_key] = results
+
+    def _get_retrieval_executor(self) -> ThreadPoolExecutor:
+        """Shared bounded thread pool for per-source retrieval."""
+        if self._retrieval_executor is None:
+            with self._executor_lock:
+                if self._retrieval_executor is None:
+                    self._retrieval_executor = ThreadPoolExecutor(
+                        max_workers=self.retrieval_max_workers, thread_name_prefix="rag-retrieval")
+        return self._retrieval_executor
+
+    @staticmethod
+    def _call_search(search_method, **kwargs) -> List[Dict]:
+        """Call a search method with only the keyword arguments it accepts."""
+        try:
+            parameters = inspect.signature(search_method).parameters
+        except (TypeError, ValueError):
+            return search_method(**kwargs)
+        if not any(p.kind == inspect.Parameter.VAR_KEYWORD for p in parameters.values()):
+            kwargs = {key: value for key, value in kwargs.items() if key in parameters}
+        return search_method(**kwargs)
+
+    def _source_connection(self):
+        """
+        Connection scope for one source's search.
+
+        Uses the db manager's ``pooled_connection`` when it has one, so each
+        concurrent source runs on its own connection; managers that take a
+        pooled connection per query need no scope.
+        """
+        pooled_connection = getattr(self.db_manager, "pooled_connection", None)
+        return pooled_connection() if pooled_connection is not None else nullcontext()
+
+    def _can_search_concurrently(self) -> bool:
+        """False if the db manager runs every query on one shared connection."""
+        return (hasattr(self.db_manager, "pooled_connection")
+                or getattr(self.db_manager, "connection", None) is None)
+
+    def _search_source(self, content_type: str, query: str, query_embedding: Optional[List[float]],
+                       limit: int, use_hybrid: bool, search_threshold: float) -> Optional[List[Dict]]:
+        """
+        Search one content type.
+
+        Returns:
+            Results tagged with their source, or None if the content type has no search method
+        """
+        search_method = None
+        if use_hybrid:
+            # Use hybrid search combining vector and keyword search
+            search_method = getattr(self.db_manager, f"hybrid_search_{content_type}", None)
+            if search_method is None:
+                # Fallback to basic vector search if hybrid not implemented
+                logger.debug(f"Hybrid search not implemented for {content_type}, falling back to vector search")
+
+        if search_method is not None:
+            results = self._call_search(search_method, query=query, embedding=query_embedding,
+                                        limit=limit, threshold=search_threshold)
+        else:
+            search_method = getattr(self.db_manager, f"vector_search_{content_type}", None)
+            if search_method is None:
+                logger.warning(f"Vector search not implemented for {content_type}")
+                return None
+            results = self._call_search(search_method, embedding=query_embedding,
+                                        limit=limit, threshold=search_threshold)
+
+        # Tag results with their source
+        results = results or []
+        for result in results:
+            result['source'] = content_type
+            result['source_type'] = 'database'
+        return results
+
+    def _retrieve_parallel(self, content_types: List[str], query: str, query_embedding: Optional[List[float]],
+                           limit: int, use_hybrid: bool, search_threshold: float) -> Tuple[List[Dict], Dict[str, Dict]]:
+        """
+        Search all content types concurrently on the bounded retrieval pool.
+
+        Each source has its own timeout (``source_timeouts`` or ``retrieval_timeout``);
+        sources that time out or fail are reported in the breakdown and left out
+        of the results, so the total latency is that of the slowest source that
+        finished in time.
+
+        A timed-out search cannot be interrupted and keeps its pool worker until
+        the database returns. Such a source is skipped (status "busy") until that
+        search finishes, so a hanging source holds at most one worker.
+
+        Each search runs inside ``_source_connection`` so sources do not share
+        a database connection. If the db manager only has one shared connection,
+        the sources are searched one after another instead (see
+        ``_retrieve_sequential``).
+
+        Returns:
+            Tuple of (results, per-source breakdown)
+        """
+        if not self._can_search_concurrently():
+            return self._retrieve_sequential(content_types, query, query_embedding, limit, use_hybrid,
+                                             search_threshold)
+
+        executor = self._get_retrieval_executor()
+        submitted_at = time.time()
+        sources: Dict[str, Dict[str, Any]] = {}
+
+        def run(content_type):
+            started = time.time()
+            with self._source_connection():
+                results = self._search_source(content_type, query, query_embedding, limit, use_hybrid,
+                                              search_threshold)
+            return results, (time.time() - started) * 1000
+
+        futures = {}
+        for content_type in content_types:
+            with self._executor_lock:
+                stalled = content_type in self._stalled_sources
+            if stalled:
+                logger.warning(f"Skipping {content_type}: a previous search is still running")
+                sources[content_type] = {"status": "busy", "latency_ms": 0.0, "count": 0}
+            else:
+                futures[executor.submit(run, content_type)] = content_type
+        deadlines = {
+            future: submitted_at + self.source_timeouts.get(content_type, self.retrieval_timeout)
+            for future, content_type in futures.items()
+        }
+
+        all_results = []
+        pending = set(futures)
+        while pending:
+            timeout = max(0.0, min(deadlines[future] for future in pending) - time.time())
+            done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                content_type = futures[future]
+                try:
+                    results, latency_ms = future.result()
+                    if results is None:
+                        sources[content_type] = {"status": "unsupported", "latency_ms": latency_ms, "count": 0}
+                    else:
+                        sources[content_type] = {"status": "ok", "latency_ms": latency_ms, "count": len(results)}
+                        all_results.extend(results)
+                except Exception as e:
+                    logger.error(f"Error retrieving {content_type} content: {str(e)}")
+                    sources[content_type] = {"status": "error", "latency_ms": (time.time() - submitted_at) * 1000,
+                                             "count": 0, "error": str(e)}
+
+            # Give up on sources past their deadline; their threads finish in the background
+            now = time.time()
+            for future in [future for future in pending if deadlines[future] <= now]:
+                content_type = futures[future]
+                pending.discard(future)
+                if not future.cancel():
+                    self._mark_stalled(content_type, future)
+                logger.warning(f"Retrieval from {content_type} timed out after "
+                               f"{deadlines[future] - submitted_at:.2f}s")
+                sources[content_type] = {"status": "timeout", "latency_ms": (now - submitted_at) * 1000, "count": 0}
+
+        return all_results, {content_type: sources[content_type] for content_type in content_types}
+
+    def _retrieve_sequential(self, content_types: List[str], query: str, query_embedding: Optional[List[float]],
+                             limit: int, use_hybrid: bool, search_threshold: float) -> Tuple[List[Dict], Dict[str, Dict]]:
+        """
+        Search content types one at a time on the db manager's shared connection.
+
+        Queries on one psycopg2 connection run one at a time anyway, and a failed
+        query aborts the connection's transaction, so a failing source is rolled
+        back before the next one runs. No per-source timeouts apply.
+
+        Returns:
+            Tuple of (results, per-source breakdown)
+        """
+        all_results = []
+        sources: Dict[str, Dict[str, Any]] = {}
+        for content_type in content_types:
+            started = time.time()
+            try:
+                results = self._search_source(content_type, query, query_embedding, limit, use_hybrid,
+                                              search_threshold)
+            except Exception as e:
+                logger.error(f"Error retrieving {content_type} content: {str(e)}")
+                self._rollback_db()
+                sources[content_type] = {"status": "error", "latency_ms": (time.time() - started) * 1000,
+                                         "count": 0, "error": str(e)}
+                continue
+            latency_ms = (time.time() - started) * 1000
+            if results is None:
+                sources[content_type] = {"status": "unsupported", "latency_ms": latency_ms, "count": 0}
+            else:
+                sources[content_type] = {"status": "ok", "latency_ms": latency_ms, "count": len(results)}
+                all_results.extend(results)
+        return all_results, sources
+
+    def _mark_stalled(self, content_type: str, future) -> None:
+        """Skip a content type until its timed-out search releases its worker."""
+        def release(_):
+            with self._executor_lock:
+                self._stalled_sources.discard(content_type)
+
+        with self._executor_lock:
+            self._stalled_sources.add(content_type)
+        future.add_done_callback(release)
+
+    def _get_union_all_tables(self) -> frozenset:
+        """
+        Tables that exist and have an ``embedding`` column.
+
+        Cached for RETRIEVAL_TABLE_CHECK_INTERVAL seconds; a failed check is
+        cached as empty, so UNION ALL mode falls back without retrying every query.
+        """
+        checked_at, tables = self._union_tables
+        if time.time() - checked_at < RETRIEVAL_TABLE_CHECK_INTERVAL:
+            return tables
+
+        tables = frozenset()
+        try:
+            rows = self.db_manager.execute_query("""
+                SELECT table_name FROM information_schema.columns
+                WHERE table_schema = current_schema() AND column_name = 'embedding'
+            """, ()) or []
+            tables = frozenset(row["table_name"] for row in rows) & frozenset(RETRIEVAL_TABLES.values())
+        except Exception as e:
+            logger.warning(f"Could not check retrieval tables: {str(e)}")
+            self._rollback_db()
+
+        self._union_tables = (time.time(), tables)
+        return tables
+
+    def _rollback_db(self) -> None:
+        """Roll back the database manager's shared connection after a failed query."""
+        connection = getattr(self.db_manager, "connection", None)
+        if connection is None:
+            return
+        try:
+            connection.rollback()
+        except Exception as e:
+            logger.warning(f"Rollback after failed retrieval query failed: {str(e)}")
+
+    def _retrieve_union_all(self, content_types: List[str], query_embedding: Optional[List[float]],
+                            limit: int) -> Tuple[List[Dict], Dict[str, Dict]]:
+        """
+        Search all content types with a single UNION ALL vector query (one round-trip).
+
+        Each branch takes its own top ``limit`` rows by ``embedding <-> q`` so it
+        can use that table's vector index; rows come back as JSONB records.
+
+        Returns:
+            Tuple of (results, per-source breakdown)
+
+        Raises:
+            ValueError: If no embedding or no known content type is available
+        """
+        if query_embedding is None:
+            raise ValueError("UNION ALL retrieval needs a query embedding")
+        available = self._get_union_all_tables()
+        tables = [(content_type, RETRIEVAL_TABLES[content_type]) for content_type in content_types
+                  if RETRIEVAL_TABLES.get(content_type) in available]
+        if not tables:
+            raise ValueError("UNION ALL retrieval has no tables with an embedding column")
+
+        branches = []
+        params: List[Any] = []
+        for content_type, table in tables:
+            branches.append(f"""
+                (SELECT %s AS source,
+                        to_jsonb(t) - 'embedding' - 'search_en' - 'search_ar' AS record,
+                        t.embedding <-> %s::vector AS distance
+                 FROM {table} t
+                 WHERE t.embedding IS NOT NULL
+                 ORDER BY distance
+                 LIMIT %s)""")
+            params.extend([content_type, query_embedding, limit])
+
+        started = time.time()
+        rows = self.db_manager.execute_query(" UNION ALL ".join(branches), tuple(params)) or []
+        latency_ms = (time.time() - started) * 1000
+
+        all_results = []
+        for row in rows:
+            record = row["record"]
+            if isinstance(record, str):
+                record = json.loads(record)
+            record['distance'] = row["distance"]
+            record['similarity'] = 1.0 - row["distance"]
+            record['source'] = row["source"]
+            record['source_type'] = 'database'
+            all_results.append(record)
+
+        sources = {
+            content_type: {"status": "ok", "latency_ms": latency_ms,
+                           "count": sum(1 for result in all_results if result['source'] == content_type)}
+            for content_type, _ in tables
+        }
+        for content_type in content_types:
+            if content_type not in sources:
+                sources[content_type] = {"status": "unsupported", "latency_ms": 0.0, "count": 0}
+        return all_results, sources
+
     def retrieve_content(self, query: str, limit: int = 5, use_hybrid: bool = True,
                          content_types: List[str] = None, rerank: bool = True,
-                         search_threshold: float = 0.65) -> List[Dict]:
+                         search_threshold: float = 0.65, mode: Optional[str] = None,
+                         return_metadata: bool = False):
         """
         Enhanced retrieval function that leverages hybrid search and optional reranking
 
+        Content types are searched concurrently, so retrieval latency is that
+        of the slowest source rather than the sum of all of them.
+
         Args:
             query: The user query to search for
             limit: Maximum number of results to return
@@ -489,19 +840,23 @@ class RAGPipeline:
             content_types: List of content types to search (e.g., ['restaurants', 'hotels'])
             rerank: Whether to rerank results after retrieval
             search_threshold: Minimum similarity score threshold
+            mode: "parallel" (per-source searches with timeouts) or "union_all"
+                (one multi-table vector query); defaults to the configured retrieval_mode
+            return_metadata: Also return the retrieval metadata
 
         Returns:
-            List of relevant content items
+            List of relevant content items, or (items, metadata) if return_metadata is set.
+            Metadata has the mode, total latency, whether results are partial and a
+            per-source breakdown of status, latency_ms and result count; it is also
+            kept in ``last_retrieval_metadata``.
         """
         start_time = time.time()
-
-        # Get embedding for the query
-        query_embedding = self.get_query_embedding(query)
+        mode = mode or self.retrieval_mode
 
         if not content_types:
-            content_types = ['attractions', 'restaurants', 'hotels', 'cities', 'tours', 'practical_info']
+            content_types = DEFAULT_CONTENT_TYPES
 
-        all_results = []
+        metadata: Dict[str, Any] = {"mode": mode, "cache_hit": False, "partial": False, "sources": {}}
 
         # Set cache key
         cache_key = f"rag_{hashlib.md5(query.encode()).hexdigest()}_{'_'.join(content_types)}"
@@ -511,60 +866,28 @@ class RAGPipeline:
             cached_results = self.get_from_cache(cache_key)
             if cached_results:
                 logger.info(f"Retrieved results for '{query}' from cache")
-                return cached_results
+                metadata.update(cache_hit=True, total_ms=(time.time() - start_time) * 1000)
+                self.last_retrieval_metadata = metadata
+                return (cached_results, metadata) if return_metadata else cached_results
 
-        for content_type in content_types:
-            try:
-                # Determine search method based on content type and use_hybrid flag
-                if use_hybrid:
-                    # Use hybrid search combining vector and keyword search
-                    method_name = f"hybrid_search_{content_type}"
-                    search_method = getattr(self.db_manager, method_name, None)
-
-                    if search_method:
-                        results = search_method(
-                            query=query,
-                            embedding=query_embedding,
-                            limit=limit,
-                            threshold=search_threshold
-                        )
-                    else:
-                        # Fallback to basic vector search if hybrid not implemented
-                        logger.warning(f"Hybrid search not implemented for {content_type}, falling back to vector search")
-                        method_name = f"vector_search_{content_type}"
-                        search_method = getattr(self.db_manager, method_name, None)
-                        if search_method:
-                            results = search_method(
-                                embedding=query_embedding,
-                                limit=limit,
-                                threshold=search_threshold
-                            )
-                        else:
-                            logger.warning(f"Vector search not implemented for {content_type}")
-                            continue
-                else:
-                    # Use pure vector search
-                    method_name = f"vector_search_{content_type}"
-                    search_method = getattr(self.db_manager, method_name, None)
-                    if search_method:
-                        results = search_method(
-                            embedding=query_embedding,
-                            limit=limit,
-                            threshold=search_threshold
-                        )
-                    else:
-                        logger.warning(f"Vector search not implemented for {content_type}")
-                        continue
+        # Get embedding for the query
+        query_embedding = self.get_query_embedding(query)
 
-                # Tag results with their source
-                for result in results:
-                    result['source'] = content_type
-                    result['source_type'] = 'database'
+        all_results = None
+        if mode == "union_all":
+            try:
+                all_results, metadata["sources"] = self._retrieve_union_all(content_types, query_embedding, limit)
+            except Exception as e:
+                logger.warning(f"UNION ALL retrieval failed, falling back to parallel retrieval: {str(e)}")
+                self._rollback_db()
+                metadata["mode"] = "parallel"
 
-                all_results.extend(results)
+        if all_results is None:
+            all_results, metadata["sources"] = self._retrieve_parallel(
+                content_types, query, query_embedding, limit, use_hybrid, search_threshold)
 
-            except Exception as e:
-                logger.error(f"Error retrieving {content_type} content: {str(e)}")
+        metadata["partial"] = any(source["status"] in ("timeout", "error", "busy")
+                                  for source in metadata["sources"].values())
 
         # Rerank results if requested
         if rerank and all_results and len(all_results) > 1:
@@ -576,14 +899,20 @@ class RAGPipeline:
         # Limit total results
         all_results = all_results[:limit]
 
-        # Save to cache if enabled
-        if self.cache_enabled:
+        # Save to cache if enabled (partial results are not cached)
+        if self.cache_enabled and not metadata["partial"]:
             self.save_to_cache(cache_key, all_results)
 
         duration = time.time() - start_time
-        logger.info(f"RAG retrieval completed in {duration:.2f}s with {len(all_results)} results")
+        metadata["total_ms"] = duration * 1000
+        self.last_retrieval_metadata = metadata
+
+        breakdown = ", ".join(f"{content_type}={source['status']}/{source['latency_ms']:.0f}ms"
+                              for content_type, source in metadata["sources"].items())
+        logger.info(f"RAG retrieval completed in {duration:.2f}s with {len(all_results)} results "
+                    f"({metadata['mode']}: {breakdown})")
 
-        return all_results
+        return (all_results, metadata) if return_metadata else all_results
 
     def rerank_results(self, query: str, results: List[Dict]) -> List[Dict]:
         """
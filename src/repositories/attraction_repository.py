@@ -112,10 +112,11 @@ class AttractionRepository(BaseRepository):
             params = []
 
             # Apply filters
+            rank_order, rank_params = "", []
             if query:
-                base_query += f" AND (name->>'{language}' ILIKE %s OR description->>'{language}' ILIKE %s)"
-                query_pattern = f"%{query}%"
-                params.extend([query_pattern, query_pattern])
+                condition, condition_params, rank_order, rank_params = self._text_search_clauses(query, language)
+                base_query += f" AND {condition}"
+                params.extend(condition_params)
 
             if type_id:
                 base_query += " AND type_id = %s"
@@ -129,20 +130,17 @@ class AttractionRepository(BaseRepository):
                 base_query += " AND region_id = %s"
                 params.append(region_id)
 
+            # Best text matches first
+            if rank_order:
+                base_query += f" ORDER BY {rank_order}id"
+                params.extend(rank_params)
+
             # Add limit and offset
             base_query += " LIMIT %s OFFSET %s"
             params.extend([limit, offset])
 
             # Execute the query
-            results = self.db.execute_query(base_query, tuple(params))
-
-            # Parse JSON fields
-            if results:
-                for result in results:
-                    for field in self.jsonb_fields:
-                        self._parse_json_field(result, field)
-
-            return results or []
+            return self._process_results(self.db.execute_query(base_query, tuple(params)))
         except Exception as e:
             return self._handle_error("search_attractions", e, return_empty_list=True)
 
@@ -203,14 +201,6 @@ class AttractionRepository(BaseRepository):
                 params = (longitude, latitude, longitude, latitude, radius_km, limit)
 
             # Execute the query
-            results = self.db.execute_query(sql, params)
-
-            # Parse JSON fields
-            if results:
-                for result in results:
-                    for field in self.jsonb_fields:
-                        self._parse_json_field(result, field)
-
-            return results or []
+            return self._process_results(self.db.execute_query(sql, params))
         except Exception as e:
             return self._handle_error("find_attractions_near_location", e, return_empty_list=True)
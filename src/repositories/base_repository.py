@@ -8,6 +8,9 @@ import json
 from typing import Any, Dict, List, Optional, Tuple, Union
 
 from src.knowledge.core.database_core import DatabaseCore
+from src.knowledge.text_search import (
+    TEXT_SEARCH_TABLES, TextSearchQueryBuilder, get_text_search_support, strip_search_columns
+)
 from src.utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -49,10 +52,7 @@ class BaseRepository:
             result = self.db.execute_query(sql, (record_id,), fetchall=False)
 
             if result:
-                # Parse JSON fields
-                for field in self.jsonb_fields:
-                    self._parse_json_field(result, field)
-                return result
+                return self._process_results([result])[0]
             return None
         except Exception as e:
             return self._handle_error(f"get_{self.table_name}_{record_id}", e)
@@ -76,6 +76,7 @@ class BaseRepository:
             # Build the base query
             query = f"SELECT * FROM {self.table_name} WHERE 1=1"
             params = []
+            filter_columns = []
 
             # Apply filters
             if filters:
@@ -86,6 +87,7 @@ class BaseRepository:
                         continue
                     query += f" AND {key} = %s"
                     params.append(value)
+                    filter_columns.append(key)
 
             # Add ordering
             if order_by:
@@ -99,16 +101,10 @@ class BaseRepository:
             query += " LIMIT %s OFFSET %s"
             params.extend([limit, offset])
 
-            # Execute the query
-            results = self.db.execute_query(query, tuple(params))
-
-            # Parse JSON fields
-            if results:
-                for result in results:
-                    for field in self.jsonb_fields:
-                        self._parse_json_field(result, field)
-
-            return results or []
+            # Execute as a prepared statement for this shape (table, filter columns, ordering)
+            shape = ("find", self.table_name, tuple(filter_columns), order_by)
+            results = self.db.execute_prepared(shape, query, tuple(params))
+            return self._process_results(results)
         except Exception as e:
             return self._handle_error(f"find_{self.table_name}", e, return_empty_list=True)
 
@@ -255,6 +251,12 @@ class BaseRepository:
                 logger.warning(f"Invalid language '{language}', defaulting to 'en'")
                 language = "en"
 
+            # Use the full-text/trigram indexes when this table has been migrated
+            if query and query.strip():
+                indexed_tables, trigram = get_text_search_support(self.db.execute_query)
+                if self.table_name in indexed_tables:
+                    return self._indexed_search(query, trigram, limit, offset)
+
             # Build the search query based on JSONB fields
             search_conditions = []
             params = []
@@ -280,19 +282,75 @@ class BaseRepository:
             """
             params.extend([limit, offset])
 
-            # Execute the query
-            results = self.db.execute_query(sql, tuple(params))
-
-            # Parse JSON fields
-            if results:
-                for result in results:
-                    for field in self.jsonb_fields:
-                        self._parse_json_field(result, field)
-
-            return results or []
+            # Execute as a prepared statement; the shape is fixed by the table's JSONB fields
+            shape = ("search", self.table_name, tuple(self.jsonb_fields))
+            results = self.db.execute_prepared(shape, sql, tuple(params))
+            return self._process_results(results)
         except Exception as e:
             return self._handle_error(f"search_{self.table_name}", e, return_empty_list=True)
 
+    def _indexed_search(self, query: str, trigram: bool, limit: int, offset: int) -> List[Dict[str, Any]]:
+        """
+        Search through the table's tsvector and trigram indexes, best matches first.
+
+        Args:
+            query: Text query to search for (English or Arabic)
+            trigram: Whether pg_trgm fuzzy title matching is available
+            limit: Maximum number of results to return
+            offset: Offset for pagination
+
+        Returns:
+            list: Matching records ordered by relevance
+        """
+        builder = TextSearchQueryBuilder(trigram=trigram)
+        sql, params = builder.build(self.table_name, query, limit=limit, offset=offset)
+        return self._process_results(self.db.execute_prepared(builder.shape(self.table_name), sql, params))
+
+    def _text_search_clauses(self, query: str, language: str = "en") -> Tuple[str, List[Any], str, List[Any]]:
+        """
+        Build the text-match condition and ordering for a filtered search query.
+
+        Uses the table's full-text/trigram indexes (bilingual, ranked) once the
+        table has search columns; otherwise ILIKE on its title and body fields
+        in the given language. Columns are qualified with the table name.
+
+        Args:
+            query: Text query to search for
+            language: Language code (en, ar) for the ILIKE fallback
+
+        Returns:
+            tuple: (condition, condition params, ORDER BY prefix ending in ", "
+                   or "" if unranked, ORDER BY params)
+        """
+        indexed_tables, trigram = get_text_search_support(self.db.execute_query)
+        if self.table_name in indexed_tables and query.strip():
+            builder = TextSearchQueryBuilder(trigram=trigram)
+            condition, condition_params = builder.match_condition(self.table_name, query, alias=self.table_name)
+            rank, rank_params = builder.rank_expression(self.table_name, query, alias=self.table_name)
+            return condition, condition_params, f"{rank} DESC, ", rank_params
+
+        title_field, body_field = TEXT_SEARCH_TABLES.get(self.table_name, ("name", "description"))
+        query_pattern = f"%{query}%"
+        condition = f"({title_field}->>'{language}' ILIKE %s OR {body_field}->>'{language}' ILIKE %s)"
+        return condition, [query_pattern, query_pattern], "", []
+
+    def _process_results(self, results: Optional[List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """
+        Shared post-processing for ``SELECT *`` rows: drop the generated
+        search columns and parse the JSONB fields.
+
+        Args:
+            results: Rows returned by the query (may be None)
+
+        Returns:
+            list: The processed rows
+        """
+        results = strip_search_columns(results)
+        for result in results:
+            for field in self.jsonb_fields:
+                self._parse_json_field(result, field)
+        return results
+
     def _parse_json_field(self, record: dict, field_name: str) -> dict:
         """
         Parse a JSON field in a record safely.
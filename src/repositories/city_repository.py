@@ -77,29 +77,22 @@ class CityRepository(BaseRepository):
             params = []
 
             # Apply filters
+            rank_order, rank_params = "", []
             if query:
-                base_query += f" AND (name->>'{language}' ILIKE %s OR description->>'{language}' ILIKE %s)"
-                query_pattern = f"%{query}%"
-                params.extend([query_pattern, query_pattern])
+                condition, condition_params, rank_order, rank_params = self._text_search_clauses(query, language)
+                base_query += f" AND {condition}"
+                params.extend(condition_params)
 
             if region_id:
                 base_query += " AND region_id = %s"
                 params.append(region_id)
 
             # Add ordering and pagination
-            base_query += " ORDER BY name->>%s LIMIT %s OFFSET %s"
-            params.extend([language, limit, offset])
+            base_query += f" ORDER BY {rank_order}name->>%s LIMIT %s OFFSET %s"
+            params.extend(rank_params + [language, limit, offset])
 
             # Execute the query
-            results = self.db.execute_query(base_query, tuple(params))
-
-            # Parse JSON fields
-            if results:
-                for result in results:
-                    for field in self.jsonb_fields:
-                        self._parse_json_field(result, field)
-
-            return results or []
+            return self._process_results(self.db.execute_query(base_query, tuple(params)))
         except Exception as e:
             return self._handle_error("search_cities", e, return_empty_list=True)
 
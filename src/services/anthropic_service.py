@@ -2,11 +2,60 @@
 Anthropic Claude API service for the Egypt Tourism Chatbot.
 Provides natural language generation capabilities.
 """
+import asyncio
 import logging
-from anthropic import Anthropic
+from typing import AsyncIterator, Optional
+
+import httpx
+from anthropic import Anthropic, AsyncAnthropic
+
+from src.utils.single_flight import SingleFlight, make_prompt_key
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_MODEL = "claude-3-7-sonnet-20250219"
+
+# Returned instead of raising when an API call fails
+GENERIC_FALLBACK_TEXT = "I'm your Egypt tourism expert! I can help you with information about pyramids, temples, hotels, restaurants, and attractions throughout Egypt. What would you like to know?"
+
+# Shared async HTTP connection pool used by every AsyncAnthropic client in the
+# process, so concurrent chats reuse keep-alive connections instead of opening
+# a new TLS session per request.
+_shared_async_http_client: Optional[httpx.AsyncClient] = None
+
+
+def get_shared_async_http_client(max_connections: int = 100,
+                                 max_keepalive_connections: int = 20) -> httpx.AsyncClient:
+    """
+    Get (or lazily create) the process-wide async HTTP client for Anthropic calls.
+
+    Args:
+        max_connections: Maximum number of concurrent connections in the pool
+        max_keepalive_connections: Maximum number of idle keep-alive connections
+
+    Returns:
+        Shared httpx.AsyncClient instance
+    """
+    global _shared_async_http_client
+    if _shared_async_http_client is None or _shared_async_http_client.is_closed:
+        _shared_async_http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections
+            )
+        )
+    return _shared_async_http_client
+
+
+async def close_shared_async_http_client() -> None:
+    """Close the shared async HTTP connection pool (called on application shutdown)."""
+    global _shared_async_http_client
+    if _shared_async_http_client is not None and not _shared_async_http_client.is_closed:
+        await _shared_async_http_client.aclose()
+        logger.info("Closed shared Anthropic async HTTP connection pool")
+    _shared_async_http_client = None
+
+
 class AnthropicService:
     def __init__(self, config):
         """
@@ -19,9 +68,34 @@ class AnthropicService:
         api_key = config.get("anthropic_api_key", "")
         if not api_key:
             logger.warning("No Anthropic API key provided")
+        self.api_key = api_key
         self.client = Anthropic(api_key=api_key)
+        self.request_timeout = float(config.get("request_timeout", 30.0))
+        self._async_client = None
+        self._async_http_client = None
+        # Identical prompts in flight at the same time share one API call
+        self.single_flight = SingleFlight(name="anthropic_generate")
+
+    @property
+    def async_client(self) -> AsyncAnthropic:
+        """
+        Async Anthropic client bound to the shared HTTP connection pool.
+
+        Created lazily so that the underlying pool is opened inside the running event loop.
+        """
+        if self._async_client is None or self._async_http_client.is_closed:
+            self._async_http_client = get_shared_async_http_client(
+                max_connections=int(self.config.get("max_connections", 100)),
+                max_keepalive_connections=int(self.config.get("max_keepalive_connections", 20))
+            )
+            self._async_client = AsyncAnthropic(
+                api_key=self.api_key,
+                http_client=self._async_http_client,
+                timeout=self.request_timeout
+            )
+        return self._async_client
 
-    def generate_response(self, prompt, max_tokens=150, model="claude-3-7-sonnet-20250219"):
+    def generate_response(self, prompt, max_tokens=150, model=DEFAULT_MODEL):
         """
         Generate a response using the Anthropic Claude API.
 
@@ -46,7 +120,94 @@ class AnthropicService:
         except Exception as e:
             logger.error(f"Anthropic API error: {str(e)}")
             # Return a helpful Egypt tourism response instead of generic error
-            return "I'm your Egypt tourism expert! I can help you with information about pyramids, temples, hotels, restaurants, and attractions throughout Egypt. What would you like to know?"
+            return GENERIC_FALLBACK_TEXT
+
+    async def generate_response_async(self, prompt, max_tokens=150, model=DEFAULT_MODEL,
+                                      timeout: Optional[float] = None):
+        """
+        Generate a response using the async Anthropic client without blocking the event loop.
+
+        Concurrent calls with the same normalized prompt, model and max_tokens are
+        coalesced onto a single API request. Each caller still waits at most its
+        own timeout, even when it joins a request started with a longer one.
+
+        Args:
+            prompt: The user's message or a crafted prompt
+            max_tokens: Maximum tokens in the response
+            model: Claude model to use
+            timeout: Per-call timeout in seconds (defaults to the service request timeout)
+
+        Returns:
+            Generated text response
+
+        Raises:
+            asyncio.CancelledError: If the calling task is cancelled; the shared
+                request keeps running for any other waiters
+        """
+        key = make_prompt_key(prompt, model=model, max_tokens=max_tokens)
+        timeout = timeout or self.request_timeout
+        try:
+            return await self.single_flight.do(
+                key, lambda: self._generate_response_async_uncoalesced(prompt, max_tokens, model, timeout),
+                timeout=timeout
+            )
+        except asyncio.TimeoutError:
+            logger.error(f"Anthropic API request timed out after {timeout:.1f}s")
+            return GENERIC_FALLBACK_TEXT
+
+    async def _generate_response_async_uncoalesced(self, prompt, max_tokens, model,
+                                                   timeout: Optional[float] = None):
+        """Issue one async Messages API call (see generate_response_async)."""
+        try:
+            logger.info(f"Sending async request to Anthropic API with prompt length: {len(prompt)}")
+            response = await self.async_client.messages.create(
+                model=model,
+                max_tokens=max_tokens,
+                messages=[
+                    {"role": "user", "content": prompt}
+                ],
+                timeout=timeout or self.request_timeout
+            )
+            return response.content[0].text
+        except asyncio.CancelledError:
+            logger.info("Async Anthropic request cancelled")
+            raise
+        except Exception as e:
+            logger.error(f"Anthropic API error: {str(e)}")
+            return GENERIC_FALLBACK_TEXT
+
+    def get_coalescing_stats(self):
+        """Get request-coalescing statistics for generate_response_async."""
+        return self.single_flight.get_stats()
+
+    async def stream_response_async(self, prompt, max_tokens=150, model=DEFAULT_MODEL,
+                                    timeout: Optional[float] = None) -> AsyncIterator[str]:
+        """
+        Stream a response token-by-token using the streaming Messages API.
+
+        Unlike generate_response_async, errors are raised to the caller so that
+        partially streamed output can be handled explicitly.
+
+        Args:
+            prompt: The user's message or a crafted prompt
+            max_tokens: Maximum tokens in the response
+            model: Claude model to use
+            timeout: Per-call timeout in seconds (defaults to the service request timeout)
+
+        Yields:
+            Text deltas as they arrive from the API
+        """
+        logger.info(f"Opening Anthropic stream with prompt length: {len(prompt)}")
+        async with self.async_client.messages.stream(
+            model=model,
+            max_tokens=max_tokens,
+            messages=[
+                {"role": "user", "content": prompt}
+            ],
+            timeout=timeout or self.request_timeout
+        ) as stream:
+            async for text in stream.text_stream:
+                yield text
 
     def execute_service(self, method="generate", params=None):
         """
@@ -69,7 +230,7 @@ class AnthropicService:
             prompt = params.get("prompt", "")
             max_tokens = params.get("max_tokens", 150)
             temperature = params.get("temperature", 0.7)
-            model = params.get("model", "claude-3-7-sonnet-20250219")
+            model = params.get("model", DEFAULT_MODEL)
 
             try:
                 response = self.client.messages.create(
@@ -92,13 +253,13 @@ class AnthropicService:
             except Exception as e:
                 logger.error(f"Anthropic API error in execute_service: {str(e)}")
                 return {
-                    "text": "I'm your Egypt tourism expert! I can help you with information about pyramids, temples, hotels, restaurants, and attractions throughout Egypt. What would you like to know?",
+                    "text": GENERIC_FALLBACK_TEXT,
                     "error": str(e)
                 }
         else:
             logger.error(f"Unknown method: {method}")
             return {
-                "text": "I'm your Egypt tourism expert! I can help you with information about pyramids, temples, hotels, restaurants, and attractions throughout Egypt. What would you like to know?",
+                "text": GENERIC_FALLBACK_TEXT,
                 "error": f"Unknown method: {method}"
             }
 
@@ -149,6 +310,30 @@ Provide detailed, helpful, and accurate information. Be conversational and enthu
 
         return prompt
 
+    def _build_fallback_prompt(self, query, language="en", session_data=None):
+        """Build the Egypt tourism prompt used by the fallback generators."""
+        context = {}
+        if session_data:
+            context["conversation_history"] = session_data.get("conversation_history", [])
+
+        return self.create_egypt_tourism_prompt(
+            user_message=query,
+            language=language,
+            context=context
+        )
+
+    def _fallback_error_response(self, language, error):
+        """Build the localized Egypt tourism message returned when fallback generation fails."""
+        if language == "ar":
+            fallback_text = "مرحباً! أنا خبير السياحة المصرية. يمكنني مساعدتك في معلومات عن الأهرامات، المعابد، الفنادق، المطاعم، والأماكن السياحية في مصر. ما الذي تود معرفته عن مصر؟"
+        else:
+            fallback_text = "Hello! I'm your Egypt tourism expert. I can help you with information about the Pyramids of Giza, ancient temples, hotels, restaurants, Red Sea resorts, and all the amazing attractions Egypt has to offer. What would you like to know about Egypt?"
+
+        return {
+            "text": fallback_text,
+            "error": str(error)
+        }
+
     def generate_fallback_response(self, query, language="en", session_data=None):
         """
         Generate a fallback response when database searches fail.
@@ -164,20 +349,10 @@ Provide detailed, helpful, and accurate information. Be conversational and enthu
         logger.info(f"Generating fallback response using Anthropic for query: {query}")
 
         try:
-            # Create context from session data if available
-            context = {}
-            if session_data:
-                context["conversation_history"] = session_data.get("conversation_history", [])
-
-            # Create specialized prompt for Egypt tourism
-            prompt = self.create_egypt_tourism_prompt(
-                user_message=query,
-                language=language,
-                context=context
-            )
+            prompt = self._build_fallback_prompt(query, language, session_data)
 
             # Default model from config or use fallback
-            model = self.config.get("claude_model", "claude-3-7-sonnet-20250219")
+            model = self.config.get("claude_model", DEFAULT_MODEL)
 
             # Generate response
             response = self.client.messages.create(
@@ -189,10 +364,8 @@ Provide detailed, helpful, and accurate information. Be conversational and enthu
                 ]
             )
 
-            response_text = response.content[0].text
-
             return {
-                "text": response_text,
+                "text": response.content[0].text,
                 "source": "anthropic_llm",
                 "model": model,
                 "usage": {
@@ -202,14 +375,49 @@ Provide detailed, helpful, and accurate information. Be conversational and enthu
             }
         except Exception as e:
             logger.error(f"Error generating fallback response: {str(e)}")
+            return self._fallback_error_response(language, e)
+
+    async def generate_fallback_response_async(self, query, language="en", session_data=None,
+                                               timeout: Optional[float] = None):
+        """
+        Async variant of generate_fallback_response using the shared async client.
+
+        Args:
+            query: The user's original query
+            language: The language code (en, ar)
+            session_data: Optional session data containing conversation history
+            timeout: Per-call timeout in seconds (defaults to the service request timeout)
+
+        Returns:
+            Dict containing the response
+        """
+        logger.info(f"Generating async fallback response using Anthropic for query: {query}")
 
-            # Return a helpful Egypt tourism message in the appropriate language
-            if language == "ar":
-                fallback_text = "مرحباً! أنا خبير السياحة المصرية. يمكنني مساعدتك في معلومات عن الأهرامات، المعابد، الفنادق، المطاعم، والأماكن السياحية في مصر. ما الذي تود معرفته عن مصر؟"
-            else:
-                fallback_text = "Hello! I'm your Egypt tourism expert. I can help you with information about the Pyramids of Giza, ancient temples, hotels, restaurants, Red Sea resorts, and all the amazing attractions Egypt has to offer. What would you like to know about Egypt?"
+        try:
+            prompt = self._build_fallback_prompt(query, language, session_data)
+            model = self.config.get("claude_model", DEFAULT_MODEL)
+
+            response = await self.async_client.messages.create(
+                model=model,
+                max_tokens=150,
+                temperature=0.7,
+                messages=[
+                    {"role": "user", "content": prompt}
+                ],
+                timeout=timeout or self.request_timeout
+            )
 
             return {
-                "text": fallback_text,
-                "error": str(e)
-            }
\ No newline at end of file
+                "text": response.content[0].text,
+                "source": "anthropic_llm",
+                "model": model,
+                "usage": {
+                    "input_tokens": response.usage.input_tokens,
+                    "output_tokens": response.usage.output_tokens
+                }
+            }
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Error generating async fallback response: {str(e)}")
+            return self._fallback_error_response(language, e)
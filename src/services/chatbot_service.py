@@ -5,9 +5,10 @@ Provides the core chatbot functionality with dependency injection.
 import logging
 import json
 import re
-from typing import Dict, List, Any, Optional
+from typing import AsyncIterator, Dict, List, Any, Optional, Tuple
 import os
 import importlib
+import inspect
 import time
 import asyncio
 import uuid
@@ -17,6 +18,7 @@ from datetime import datetime, timedelta
 
 from src.utils.exceptions import ChatbotError, ResourceNotFoundError, ServiceError, ConfigurationError
 from src.config_unified import settings # Import unified configuration
+from src.nlu.keyword_router import get_keyword_automaton
 
 # Professional polish: suppress dependency warnings for clean output
 warnings.filterwarnings("ignore", message="Unable to avoid copy while creating an array")
@@ -25,6 +27,87 @@ warnings.filterwarnings("ignore", category=UserWarning, module="transformers")
 
 logger = logging.getLogger(__name__)
 
+
+def clean_markdown_line(line: str) -> str:
+    """
+    Markdown cleaning rule for one line, shared by the batch and streaming cleaners.
+
+    Headings lose their ``#`` markers, ``- `` and ``* `` bullets become ``• ``, and
+    emphasis markers (``*``) are removed.
+
+    Args:
+        line: Line to clean (without its newline)
+
+    Returns:
+        Cleaned line
+    """
+    stripped = line.lstrip()
+    if stripped.startswith("- ") or stripped.startswith("* "):
+        return "• " + stripped[2:].replace("*", "")
+    if stripped.startswith("#"):
+        return stripped.lstrip("#").lstrip().replace("*", "")
+    return line.replace("*", "")
+
+
+class StreamingMarkdownCleaner:
+    """
+    Incremental counterpart of Chatbot._clean_markdown_formatting for streamed text.
+
+    Chunks are fed as they arrive; each line's leading marker characters are held
+    back until the first other character shows whether they form a heading or
+    bullet, then resolved with ``clean_markdown_line``; the remainder of the line
+    is emitted immediately with emphasis markers removed.
+    """
+
+    _MARKER_CHARS = "#*- \t"
+
+    def __init__(self):
+        self._line_prefix = ""
+        self._at_line_start = True
+        self._started = False
+
+    def feed(self, chunk: str) -> str:
+        """Consume a chunk of raw model output and return the cleaned text that is safe to emit."""
+        output = []
+        for char in chunk:
+            if not self._started:
+                # Mirror the leading strip() of the batch cleaner
+                if char.isspace():
+                    continue
+                self._started = True
+
+            if char == "\n":
+                output.append(self._resolve_prefix())
+                output.append("\n")
+                self._at_line_start = True
+                continue
+
+            if self._at_line_start:
+                self._line_prefix += char
+                if char not in self._MARKER_CHARS:
+                    output.append(self._resolve_prefix())
+                continue
+
+            if char != "*":
+                output.append(char)
+
+        return "".join(output)
+
+    def flush(self) -> str:
+        """Emit any text still held back at the end of the stream."""
+        # Mirror the trailing strip() of the batch cleaner for the held-back prefix
+        self._line_prefix = self._line_prefix.rstrip()
+        return self._resolve_prefix()
+
+    def _resolve_prefix(self) -> str:
+        prefix = self._line_prefix
+        self._line_prefix = ""
+        self._at_line_start = False
+        if not prefix:
+            return ""
+        return clean_markdown_line(prefix)
+
+
 class Chatbot:
     """
     Egypt Tourism Chatbot with dependency injection.
@@ -38,7 +121,8 @@ class Chatbot:
                  response_generator: Any,
                  service_hub: Any,
                  session_manager: Any,
-                 db_manager: Any):
+                 db_manager: Any,
+                 response_cache: Any = None):
         """
         Initialize the chatbot with injected components.
         """
@@ -50,6 +134,8 @@ class Chatbot:
         self.service_hub = service_hub
         self.session_manager = session_manager
         self.db_manager = db_manager # Keep for logging
+        self.response_cache = response_cache  # Optional SemanticResponseCache in front of the LLM
+        self._background_tasks = set()
 
         # Basic check to ensure core components are present
         # PHASE 0 FIX: Allow None knowledge_base temporarily to fix hanging issue
@@ -74,6 +160,17 @@ class Chatbot:
         self._initialized = True # Consider if this flag is still needed
         logger.info("Egypt Tourism Chatbot initialized successfully")
 
+    def get_response_cache_stats(self) -> Dict[str, Any]:
+        """
+        Report the semantic response cache: hit rate, hits, misses and estimated cost saved.
+
+        Returns:
+            Dict with ``enabled`` plus SemanticResponseCache.get_stats() when a cache is configured
+        """
+        if self.response_cache is None:
+            return {"enabled": False}
+        return {"enabled": True, **self.response_cache.get_stats()}
+
     def _ensure_response_fields(self, resp: dict, session_id: str, language: str, default_type: str = "text") -> dict:
         # Guarantee required fields for ChatbotResponse
         resp = dict(resp) if resp else {}
@@ -102,49 +199,21 @@ class Chatbot:
         start_time = time.time()
         logger.info(f"🚀 LLM-ONLY Processing: '{user_message}'")
 
-        # Create session if needed
-        if not session_id:
-            session_id = str(uuid.uuid4())
-            logger.info(f"Created new session: {session_id}")
-
-        # Detect language if not provided
-        if not language:
-            language = self._detect_language(user_message)
-            logger.info(f"Detected language: {language}")
+        session_id, language, session = await self._prepare_llm_turn(user_message, session_id, language)
 
-        # Get or create session data
-        session = await self.get_or_create_session(session_id)
-        session["language"] = language
+        # Serve near-identical questions from the semantic response cache
+        cached = await self._lookup_cached_response(user_message, language, session)
+        if cached:
+            await self._finalize_llm_turn(session_id, session, user_message, cached["text"])
+            processing_time = time.time() - start_time
+            logger.info(f"⚡ Served {cached['match_type']} cache hit in {processing_time:.2f}s")
+            return self._build_cached_response(cached, session_id, language, processing_time)
 
         # DIRECT LLM PROCESSING - NO ROUTING, NO CONDITIONALS, NO FALLBACKS
         logger.info("🎯 DIRECT LLM PROCESSING - 100% reliability mode")
 
         try:
-            # Get Anthropic service
-            anthropic_service = None
-            try:
-                from src.core.container import container
-                anthropic_service = container.get("anthropic_service")
-                logger.info("✅ Retrieved Anthropic service from container")
-            except Exception as e:
-                logger.error(f"❌ Failed to get Anthropic service from container: {e}")
-                # Try direct creation as fallback
-                try:
-                    from src.services.anthropic_service import AnthropicService
-                    from src.config_unified import settings
-                    api_key = settings.anthropic_api_key.get_secret_value() if settings.anthropic_api_key else ""
-                    anthropic_service = AnthropicService({"anthropic_api_key": api_key})
-                    logger.info("✅ Created Anthropic service directly")
-                except Exception as direct_e:
-                    logger.error(f"❌ Failed to create Anthropic service directly: {direct_e}")
-                    raise Exception("Anthropic service unavailable")
-
-            if not anthropic_service:
-                raise Exception("Anthropic service is None")
-
-            # Ensure session has conversation_history
-            if "conversation_history" not in session:
-                session["conversation_history"] = []
+            anthropic_service = self._get_anthropic_service()
 
             # Create comprehensive Egypt tourism expert prompt
             prompt = self._create_comprehensive_egypt_tourism_prompt(
@@ -154,21 +223,20 @@ class Chatbot:
             )
 
             # Generate response with increased token limit for comprehensive answers
-            response_text = anthropic_service.generate_response(
+            response_text = await self._generate_llm_text(
+                anthropic_service,
                 prompt=prompt,
                 max_tokens=400  # Increased for comprehensive tourism responses
             )
 
             # Validate response
-            if not response_text or "Sorry, I encountered an error" in response_text:
+            if self._is_cacheable_llm_text(response_text):
+                self._schedule_response_cache_store(user_message, response_text, language, session)
+            elif not response_text or "Sorry, I encountered an error" in response_text:
                 logger.warning("Response was empty or contained error, trying fallback generation")
-                # Try the fallback method
-                fallback_response = anthropic_service.generate_fallback_response(
-                    query=user_message,
-                    language=language,
-                    session_data=session
+                response_text = await self._generate_llm_fallback_text(
+                    anthropic_service, user_message, language, session
                 )
-                response_text = fallback_response.get("text", "")
 
             # Final validation - if still no good response, create emergency response
             if not response_text or "Sorry, I encountered an error" in response_text:
@@ -180,36 +248,12 @@ class Chatbot:
             # Clean up response text
             response_text = self._clean_markdown_formatting(response_text)
 
-            # Update conversation history
-            session["conversation_history"].append({
-                "user": user_message,
-                "assistant": response_text,
-                "timestamp": time.time()
-            })
-
-            # Keep only last 10 exchanges to prevent session bloat
-            if len(session["conversation_history"]) > 10:
-                session["conversation_history"] = session["conversation_history"][-10:]
-
-            # Save updated session
-            await self._save_session(session_id, session)
+            await self._finalize_llm_turn(session_id, session, user_message, response_text)
 
             # Calculate processing time
             processing_time = time.time() - start_time
 
-            # Create response object
-            response = {
-                "text": response_text,
-                "response_type": "direct_llm_response",
-                "suggestions": [],
-                "session_id": session_id,
-                "language": language,
-                "source": "anthropic_llm_direct",
-                "processing_time": processing_time,
-                "timestamp": time.time(),
-                "success": True,
-                "fallback": False
-            }
+            response = self._build_llm_response(response_text, session_id, language, processing_time)
 
             logger.info(f"✅ LLM-ONLY processing completed successfully in {processing_time:.2f}s")
             return response
@@ -219,29 +263,346 @@ class Chatbot:
 
             # EMERGENCY FALLBACK - Always provide a helpful Egypt tourism response
             processing_time = time.time() - start_time
+            response = self._build_emergency_response(session_id, language, processing_time)
 
-            # Language-specific emergency responses
-            if language == "ar":
-                emergency_text = "مرحباً! أنا مساعد السياحة المصرية. يمكنني مساعدتك في معلومات عن الأهرامات، المعابد، الفنادق، المطاعم، والأماكن السياحية في مصر. كيف يمكنني مساعدتك اليوم؟"
+            logger.info(f"⚠️ Used emergency fallback response in {processing_time:.2f}s")
+            return response
+
+    async def process_message_stream(self, user_message: str, session_id: str = None,
+                                     language: str = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream a response to a user message token-by-token through the streaming Messages API.
+
+        Yields events of the form ``{"event": "start" | "delta" | "done", ...}``. Deltas carry
+        incrementally cleaned text; the final ``done`` event carries the complete response
+        (identical in shape to :meth:`process_message`) and is emitted only after the session
+        and conversation history have been saved. If the consumer closes the stream early
+        (client disconnect), the turn is saved with the text generated so far; the save is
+        shielded from the cancellation that usually accompanies the disconnect. If processing
+        fails, the emergency response is streamed only when no text has been sent yet.
+
+        Args:
+            user_message: User's message text
+            session_id: Session identifier (created if None)
+            language: Language code (detected if None)
+
+        Yields:
+            Stream event dictionaries
+        """
+        start_time = time.time()
+        logger.info(f"🚀 LLM-STREAM Processing: '{user_message}'")
+
+        session_id, language, session = await self._prepare_llm_turn(user_message, session_id, language)
+        yield {"event": "start", "session_id": session_id, "language": language}
+
+        raw_chunks: List[str] = []
+        cleaner = StreamingMarkdownCleaner()
+        finalized = False
+        streamed = False  # Whether any delta has reached the consumer
+
+        try:
+            cached = await self._lookup_cached_response(user_message, language, session)
+            if cached:
+                streamed = True
+                yield {"event": "delta", "text": cached["text"]}
+                await self._finalize_llm_turn(session_id, session, user_message, cached["text"])
+                finalized = True
+                processing_time = time.time() - start_time
+                yield {"event": "done", "response": self._build_cached_response(cached, session_id, language, processing_time)}
+                return
+
+            anthropic_service = self._get_anthropic_service()
+
+            prompt = self._create_comprehensive_egypt_tourism_prompt(
+                user_message=user_message,
+                language=language,
+                session_context=session
+            )
+
+            if hasattr(anthropic_service, "stream_response_async"):
+                try:
+                    async for chunk in anthropic_service.stream_response_async(prompt=prompt, max_tokens=400):
+                        raw_chunks.append(chunk)
+                        cleaned = cleaner.feed(chunk)
+                        if cleaned:
+                            streamed = True
+                            yield {"event": "delta", "text": cleaned}
+                except Exception as stream_error:
+                    if not raw_chunks:
+                        raise
+                    # Keep whatever was already delivered rather than discarding it
+                    logger.warning(f"⚠️ Anthropic stream interrupted after partial output: {stream_error}")
             else:
-                emergency_text = "Hello! I'm your Egypt tourism assistant. I can help you with information about pyramids, temples, hotels, restaurants, and tourist attractions in Egypt. How can I help you today?"
+                # Service without streaming support: deliver the full completion as one delta
+                raw_chunks.append(await self._generate_llm_text(anthropic_service, prompt=prompt, max_tokens=400))
+                cleaned = cleaner.feed(raw_chunks[-1])
+                if cleaned:
+                    streamed = True
+                    yield {"event": "delta", "text": cleaned}
+
+            response_text = "".join(raw_chunks)
+            if self._is_cacheable_llm_text(response_text):
+                self._schedule_response_cache_store(user_message, response_text, language, session)
+            elif not response_text.strip():
+                logger.warning("Streamed response was empty, trying fallback generation")
+                response_text = await self._generate_llm_fallback_text(
+                    anthropic_service, user_message, language, session
+                )
+                cleaned = cleaner.feed(response_text)
+                if cleaned:
+                    streamed = True
+                    yield {"event": "delta", "text": cleaned}
 
-            response = {
-                "text": emergency_text,
-                "response_type": "emergency_fallback",
-                "suggestions": [],
-                "session_id": session_id,
-                "language": language,
-                "source": "emergency_fallback",
-                "processing_time": processing_time,
-                "timestamp": time.time(),
-                "success": True,
-                "error_handled": True,
-                "fallback": True
-            }
+            tail = cleaner.flush()
+            if tail:
+                streamed = True
+                yield {"event": "delta", "text": tail}
 
-            logger.info(f"⚠️ Used emergency fallback response in {processing_time:.2f}s")
-            return response
+            response_text = self._clean_markdown_formatting(response_text)
+            await self._finalize_llm_turn(session_id, session, user_message, response_text)
+            finalized = True
+
+            processing_time = time.time() - start_time
+            response = self._build_llm_response(response_text, session_id, language, processing_time)
+            response["response_type"] = "streamed_llm_response"
+            response["source"] = "anthropic_llm_stream"
+
+            logger.info(f"✅ LLM-STREAM processing completed successfully in {processing_time:.2f}s")
+            yield {"event": "done", "response": response}
+
+        except (GeneratorExit, asyncio.CancelledError):
+            # The client disconnected mid-stream: keep the turn with what was generated so far.
+            # The task is usually being cancelled too, so the save runs as its own task behind
+            # a shield; if this await is cancelled again, the save still completes.
+            if not finalized:
+                partial_text = self._clean_markdown_formatting("".join(raw_chunks))
+                if partial_text:
+                    save = self._finalize_llm_turn(session_id, session, user_message, partial_text)
+                else:
+                    save = self._save_session(session_id, session)
+                save_task = asyncio.ensure_future(save)
+                self._background_tasks.add(save_task)
+                save_task.add_done_callback(self._background_tasks.discard)
+                await asyncio.shield(save_task)
+                logger.info(f"Chat stream for session {session_id} closed early, session saved")
+            raise
+
+        except Exception as e:
+            logger.error(f"❌ CRITICAL ERROR in LLM stream processing: {str(e)}")
+
+            processing_time = time.time() - start_time
+            if not streamed:
+                response = self._build_emergency_response(session_id, language, processing_time)
+                yield {"event": "delta", "text": response["text"]}
+                yield {"event": "done", "response": response}
+                return
+
+            # The client already has part of the answer: end the stream on that text
+            # instead of appending the unrelated emergency greeting
+            response_text = self._clean_markdown_formatting("".join(raw_chunks))
+            if not finalized:
+                try:
+                    await self._finalize_llm_turn(session_id, session, user_message, response_text)
+                except Exception as save_error:
+                    logger.error(f"Error saving partial streamed turn: {save_error}")
+            response = self._build_llm_response(response_text, session_id, language, processing_time)
+            response["response_type"] = "streamed_llm_response"
+            response["source"] = "anthropic_llm_stream"
+            response["partial"] = True
+            yield {"event": "done", "response": response}
+
+    def _is_cacheable_turn(self, session: Dict) -> bool:
+        """
+        Whether an LLM answer for this turn depends only on the message and language.
+
+        The comprehensive prompt injects recent ``history`` messages when present, so
+        those turns are neither served from nor stored in the response cache.
+        """
+        return self.response_cache is not None and not session.get("history")
+
+    @staticmethod
+    def _is_cacheable_llm_text(response_text: Optional[str]) -> bool:
+        """Whether LLM output is a genuine answer rather than an empty or error placeholder."""
+        from src.services.anthropic_service import GENERIC_FALLBACK_TEXT
+        return bool(
+            response_text and response_text.strip()
+            and response_text != GENERIC_FALLBACK_TEXT
+            and "Sorry, I encountered an error" not in response_text
+        )
+
+    async def _lookup_cached_response(self, user_message: str, language: str,
+                                      session: Dict) -> Optional[Dict[str, Any]]:
+        """Look up the semantic response cache off the event loop (embedding is CPU-bound)."""
+        if not self._is_cacheable_turn(session):
+            return None
+        try:
+            cached = await asyncio.to_thread(self.response_cache.lookup, user_message, language)
+        except Exception as e:
+            logger.warning(f"Response cache lookup failed: {e}")
+            return None
+        if cached:
+            cached["text"] = self._clean_markdown_formatting(cached["text"])
+        return cached
+
+    def _schedule_response_cache_store(self, user_message: str, response_text: str,
+                                       language: str, session: Dict) -> None:
+        """Store an LLM answer in the response cache in the background, off the response path."""
+        if not self._is_cacheable_turn(session):
+            return
+
+        async def _store():
+            try:
+                await asyncio.to_thread(self.response_cache.store_response, user_message, response_text, language)
+            except Exception as e:
+                logger.warning(f"Response cache store failed: {e}")
+
+        task = asyncio.create_task(_store())
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+
+    def _build_cached_response(self, cached: Dict[str, Any], session_id: str, language: str,
+                               processing_time: float) -> Dict[str, Any]:
+        """Build the response object for a turn served from the response cache."""
+        response = self._build_llm_response(cached["text"], session_id, language, processing_time)
+        response["response_type"] = "cached_llm_response"
+        response["source"] = "semantic_response_cache"
+        response["cache"] = {
+            "match_type": cached["match_type"],
+            "similarity": cached["similarity"]
+        }
+        return response
+
+    async def _prepare_llm_turn(self, user_message: str, session_id: Optional[str],
+                                language: Optional[str]) -> tuple:
+        """
+        Resolve the session id, language and session data for an LLM turn.
+
+        Returns:
+            Tuple of (session_id, language, session)
+        """
+        # Create session if needed
+        if not session_id:
+            session_id = str(uuid.uuid4())
+            logger.info(f"Created new session: {session_id}")
+
+        # Detect language once per request; the result is threaded through the turn
+        language_confidence = 1.0
+        if not language:
+            language, language_confidence = self._detect_language_with_confidence(user_message)
+            logger.info(f"Detected language: {language} (confidence: {language_confidence:.2f})")
+
+        # Get or create session data
+        session = await self.get_or_create_session(session_id)
+        session["language"] = language
+        session["language_confidence"] = language_confidence
+
+        # Ensure session has conversation_history
+        if "conversation_history" not in session:
+            session["conversation_history"] = []
+
+        return session_id, language, session
+
+    def _get_anthropic_service(self):
+        """
+        Get the Anthropic service from the container, creating one directly as a fallback.
+
+        Raises:
+            Exception: If no Anthropic service can be obtained
+        """
+        anthropic_service = None
+        try:
+            from src.core.container import container
+            anthropic_service = container.get("anthropic_service")
+            logger.info("✅ Retrieved Anthropic service from container")
+        except Exception as e:
+            logger.error(f"❌ Failed to get Anthropic service from container: {e}")
+            # Try direct creation as fallback
+            try:
+                from src.services.anthropic_service import AnthropicService
+                api_key = settings.anthropic_api_key.get_secret_value() if settings.anthropic_api_key else ""
+                anthropic_service = AnthropicService({"anthropic_api_key": api_key})
+                logger.info("✅ Created Anthropic service directly")
+            except Exception as direct_e:
+                logger.error(f"❌ Failed to create Anthropic service directly: {direct_e}")
+                raise Exception("Anthropic service unavailable")
+
+        if not anthropic_service:
+            raise Exception("Anthropic service is None")
+
+        return anthropic_service
+
+    async def _generate_llm_fallback_text(self, anthropic_service, user_message: str,
+                                          language: str, session: Dict) -> str:
+        """Generate text through the service's fallback prompt without blocking the event loop."""
+        if hasattr(anthropic_service, "generate_fallback_response_async"):
+            fallback_response = await anthropic_service.generate_fallback_response_async(
+                query=user_message,
+                language=language,
+                session_data=session
+            )
+        else:
+            fallback_response = await asyncio.to_thread(
+                anthropic_service.generate_fallback_response,
+                query=user_message,
+                language=language,
+                session_data=session
+            )
+        return fallback_response.get("text", "")
+
+    async def _finalize_llm_turn(self, session_id: str, session: Dict, user_message: str,
+                                 response_text: str) -> None:
+        """Append the exchange to the conversation history and save the session."""
+        session["conversation_history"].append({
+            "user": user_message,
+            "assistant": response_text,
+            "timestamp": time.time()
+        })
+
+        # Keep only last 10 exchanges to prevent session bloat
+        if len(session["conversation_history"]) > 10:
+            session["conversation_history"] = session["conversation_history"][-10:]
+
+        # Save updated session
+        await self._save_session(session_id, session)
+
+    def _build_llm_response(self, response_text: str, session_id: str, language: str,
+                            processing_time: float) -> Dict[str, Any]:
+        """Build the response object for a successful LLM turn."""
+        return {
+            "text": response_text,
+            "response_type": "direct_llm_response",
+            "suggestions": [],
+            "session_id": session_id,
+            "language": language,
+            "source": "anthropic_llm_direct",
+            "processing_time": processing_time,
+            "timestamp": time.time(),
+            "success": True,
+            "fallback": False
+        }
+
+    def _build_emergency_response(self, session_id: str, language: str,
+                                  processing_time: float) -> Dict[str, Any]:
+        """Build the emergency Egypt tourism response used when LLM processing fails."""
+        # Language-specific emergency responses
+        if language == "ar":
+            emergency_text = "مرحباً! أنا مساعد السياحة المصرية. يمكنني مساعدتك في معلومات عن الأهرامات، المعابد، الفنادق، المطاعم، والأماكن السياحية في مصر. كيف يمكنني مساعدتك اليوم؟"
+        else:
+            emergency_text = "Hello! I'm your Egypt tourism assistant. I can help you with information about pyramids, temples, hotels, restaurants, and tourist attractions in Egypt. How can I help you today?"
+
+        return {
+            "text": emergency_text,
+            "response_type": "emergency_fallback",
+            "suggestions": [],
+            "session_id": session_id,
+            "language": language,
+            "source": "emergency_fallback",
+            "processing_time": processing_time,
+            "timestamp": time.time(),
+            "success": True,
+            "error_handled": True,
+            "fallback": True
+        }
 
     async def _handle_service_calls(self, service_calls: List[Dict], context: Dict) -> Dict[str, Any]:
         """
@@ -613,7 +974,8 @@ class Chatbot:
                         """
 
                         # Call the LLM service directly using generate_response method
-                        response_text = anthropic_service.generate_response(
+                        response_text = await self._generate_llm_text(
+                            anthropic_service,
                             prompt=prompt,
                             max_tokens=100  # REDUCED FROM 300
                         )
@@ -657,10 +1019,7 @@ class Chatbot:
         """
         try:
             # Get session data for context
-            if hasattr(self.session_manager.get_session, "__await__"):
-                session_data = await self.session_manager.get_session(session_id)
-            else:
-                session_data = self.session_manager.get_session(session_id)
+            session_data = await self._call_session_manager("get_session", session_id)
 
             # Use async NLU processing if available (Phase 3.3)
             if hasattr(self.nlu_engine, 'process_async'):
@@ -1461,7 +1820,8 @@ class Chatbot:
                     """
 
                     # Call the LLM service directly using generate_response method
-                    response_text = anthropic_service.generate_response(
+                    response_text = await self._generate_llm_text(
+                        anthropic_service,
                         prompt=prompt,
                         max_tokens=300
                     )
@@ -1505,20 +1865,12 @@ class Chatbot:
             content: Message content
         """
         try:
-            if hasattr(self.session_manager.add_message_to_session, "__await__"):
-                # Async version
-                await self.session_manager.add_message_to_session(
-                    session_id=session_id,
-                    role=role,
-                    content=content
-                )
-            else:
-                # Sync version
-                self.session_manager.add_message_to_session(
-                    session_id=session_id,
-                    role=role,
-                    content=content
-                )
+            await self._call_session_manager(
+                "add_message_to_session",
+                session_id=session_id,
+                role=role,
+                content=content
+            )
         except Exception as e:
             logger.error(f"Error adding message to session {session_id}: {str(e)}")
 
@@ -1535,36 +1887,9 @@ class Chatbot:
         if not text:
             return ""
 
-        # Strip whitespace
+        # Strip whitespace, then clean line by line with the rules the stream cleaner uses
         text = text.strip()
-
-        # Remove Markdown headings (# Heading)
-        text = text.replace("\n#", "\n").replace("\n##", "\n").replace("\n###", "\n")
-        if text.startswith("# "):
-            text = text[2:]
-        elif text.startswith("## "):
-            text = text[3:]
-        elif text.startswith("### "):
-            text = text[4:]
-
-        # Remove bold formatting (**text**)
-        text = text.replace("**", "")
-
-        # Remove italic formatting (*text*)
-        text = text.replace("*", "")
-
-        # Replace bullet points with plain text
-        lines = text.split("\n")
-        for i in range(len(lines)):
-            if lines[i].strip().startswith("- "):
-                lines[i] = "• " + lines[i].strip()[2:]
-            elif lines[i].strip().startswith("* "):
-                lines[i] = "• " + lines[i].strip()[2:]
-
-        # Rejoin the text
-        text = "\n".join(lines)
-
-        return text
+        return "\n".join(clean_markdown_line(line) for line in text.split("\n"))
 
     def _should_trigger_llm_fallback(self, response: Dict[str, Any], nlu_result: Dict[str, Any]) -> bool:
         """
@@ -1818,6 +2143,31 @@ User question: "{user_message}"
 
 Please provide a helpful and accurate response about Egypt tourism:"""
 
+    async def _generate_llm_text(self, anthropic_service, prompt: str, max_tokens: int,
+                                 timeout: Optional[float] = None) -> str:
+        """
+        Generate LLM text without blocking the event loop.
+
+        Uses the service's native async client when available and falls back to
+        running the synchronous client in a worker thread otherwise.
+
+        Args:
+            anthropic_service: Anthropic service instance
+            prompt: Prompt to send
+            max_tokens: Maximum tokens in response
+            timeout: Optional per-call timeout in seconds
+
+        Returns:
+            Generated response text
+        """
+        if hasattr(anthropic_service, "generate_response_async"):
+            return await anthropic_service.generate_response_async(
+                prompt=prompt, max_tokens=max_tokens, timeout=timeout
+            )
+        return await asyncio.to_thread(
+            anthropic_service.generate_response, prompt=prompt, max_tokens=max_tokens
+        )
+
     async def _call_anthropic_with_retry(self, anthropic_service, prompt: str, max_tokens: int = 200,
                                        timeout_seconds: int = 10, max_retries: int = 2) -> str:
         """
@@ -1833,20 +2183,14 @@ Please provide a helpful and accurate response about Egypt tourism:"""
         Returns:
             Generated response text
         """
-        import asyncio
-
         for attempt in range(max_retries + 1):
             try:
                 logger.info(f"🔄 Calling Anthropic API (attempt {attempt + 1}/{max_retries + 1})")
 
-                # Create async wrapper for the sync generate_response method
-                loop = asyncio.get_event_loop()
-
-                # Use asyncio.wait_for to implement timeout
+                # wait_for cancels the in-flight request on timeout
                 response_text = await asyncio.wait_for(
-                    loop.run_in_executor(
-                        None,
-                        lambda: anthropic_service.generate_response(prompt, max_tokens)
+                    self._generate_llm_text(
+                        anthropic_service, prompt, max_tokens, timeout=timeout_seconds
                     ),
                     timeout=timeout_seconds
                 )
@@ -1991,14 +2335,27 @@ Please provide a helpful and accurate response about Egypt tourism:"""
         Returns:
             Language code (e.g., 'en', 'ar')
         """
+        return self._detect_language_with_confidence(text)[0]
+
+    def _detect_language_with_confidence(self, text: str) -> Tuple[str, float]:
+        """
+        Detect the language of a text string together with its confidence.
+        
+        Args:
+            text: Text string to analyze
+            
+        Returns:
+            Tuple of (language code, confidence)
+        """
         try:
-            # Try to use the NLU engine's language detector
-            if hasattr(self.nlu_engine, 'language_detector'):
+            # Try to use the NLU engine's language detector (memoized, single pass)
+            language_detector = getattr(self.nlu_engine, 'language_detector', None)
+            if language_detector is not None:
                 with warnings.catch_warnings():
                     warnings.simplefilter("ignore", category=UserWarning)
-                    language, confidence = self.nlu_engine.language_detector.detect(text)
+                    language, confidence = language_detector.detect(text)
                     if confidence > 0.5:
-                        return language
+                        return language, confidence
         except Exception as e:
             # Don't log every language detection error - it's expected to fall back
             logger.debug(f"Language detection failed, using fallback: {str(e)}")
@@ -2006,10 +2363,10 @@ Please provide a helpful and accurate response about Egypt tourism:"""
         # Fallback: check for Arabic characters
         arabic_pattern = r'[\u0600-\u06FF]'
         if re.search(arabic_pattern, text):
-            return 'ar'
+            return 'ar', 0.5
         
         # Default to English
-        return 'en'
+        return 'en', 0.5
 
     async def _handle_quick_response(self, intent: str, user_message: str, session_id: str = None, language: str = None) -> Dict[str, Any]:
         """
@@ -2148,6 +2505,28 @@ Please provide a helpful and accurate response about Egypt tourism:"""
             "language": language
         }
 
+    async def _call_session_manager(self, method_name: str, *args, **kwargs) -> Any:
+        """
+        Call a session manager method without blocking the event loop.
+
+        Prefers the manager's asyncio backend (``async_manager``) when it has one,
+        and awaits the result of managers whose methods are coroutines.
+
+        Args:
+            method_name: Session manager method to call
+
+        Returns:
+            The method's result
+        """
+        async_manager = getattr(self.session_manager, "async_manager", None)
+        if async_manager is not None and hasattr(async_manager, method_name):
+            return await getattr(async_manager, method_name)(*args, **kwargs)
+
+        result = getattr(self.session_manager, method_name)(*args, **kwargs)
+        if inspect.isawaitable(result):
+            result = await result
+        return result
+
     async def _save_session(self, session_id: str, session_data: Dict) -> None:
         """
         Save session data, handling both sync and async session managers.
@@ -2157,12 +2536,7 @@ Please provide a helpful and accurate response about Egypt tourism:"""
             session_data: Session data to save
         """
         try:
-            if hasattr(self.session_manager.save_session, "__await__"):
-                # Async version
-                await self.session_manager.save_session(session_id, session_data)
-            else:
-                # Sync version
-                self.session_manager.save_session(session_id, session_data)
+            await self._call_session_manager("save_session", session_id, session_data)
         except Exception as e:
             logger.error(f"Error saving session {session_id}: {str(e)}")
 
@@ -2180,10 +2554,7 @@ Please provide a helpful and accurate response about Egypt tourism:"""
             # Try to get existing session
             session = None
             try:
-                if hasattr(self.session_manager.get_session, "__await__"):
-                    session = await self.session_manager.get_session(session_id)
-                else:
-                    session = self.session_manager.get_session(session_id)
+                session = await self._call_session_manager("get_session", session_id)
             except Exception as e:
                 logger.error(f"Error getting session {session_id}: {str(e)}")
                 session = None
@@ -2307,171 +2678,13 @@ Please provide a helpful and accurate response about Egypt tourism:"""
         if hasattr(self, '_disable_database_routing') and self._disable_database_routing:
             logger.info(f"🚀 DEMO MODE: Database routing DISABLED - forcing LLM-first for: '{query}'")
             return False
-        query_lower = query.lower().strip()
-
-        # CRITICAL FIX: Core tourism keywords that should ALWAYS go to database
-        core_tourism_keywords = [
-            'pyramid', 'pyramids', 'sphinx', 'giza',
-            'hotel', 'hotels', 'accommodation', 'stay', 'resort', 'lodge',
-            'restaurant', 'restaurants', 'food', 'eat', 'dining', 'cuisine',
-            'museum', 'museums', 'temple', 'temples', 'attraction', 'attractions',
-            'cairo', 'luxor', 'alexandria', 'aswan', 'hurghada', 'sharm',
-            'egypt', 'egyptian', 'nile', 'pharaoh', 'ancient',
-            'tour', 'tours', 'visit', 'see', 'show', 'find', 'tell me about',
-            'luxury', 'budget', '5-star', 'traditional', 'authentic',
-            'مصر', 'القاهرة', 'الأقصر', 'الإسكندرية', 'أسوان', 'هرم', 'أهرامات',
-            'فندق', 'فنادق', 'مطعم', 'مطاعم', 'متحف', 'معبد'
-        ]
-
-        # If query contains ANY core tourism keyword, route to database
-        for keyword in core_tourism_keywords:
-            if keyword in query_lower:
-                logger.info(f"🎯 Database-first: Core tourism keyword '{keyword}' found in: '{query}'")
-                return True
+        # Core tourism keywords, co-occurring keyword sequences and standalone
+        # practical queries (configs/keyword_routes.json) matched in one pass
+        route = get_keyword_automaton("database_routing").search(query).first("route")
+        if route:
+            logger.info(f"🎯 Database-first: keyword '{route.keyword}' found in: '{query}'")
+            return True
 
-        # 1. Transportation queries - Always use database for rich content
-        transportation_patterns = [
-            r".*airport.*transfer.*",
-            r".*transfer.*airport.*",
-            r".*taxi.*airport.*",
-            r".*airport.*taxi.*",
-            r".*bus.*airport.*",
-            r".*airport.*bus.*",
-            r".*transport.*egypt.*",
-            r".*egypt.*transport.*",
-            r".*how to get.*airport.*",
-            r".*airport.*options.*",
-            r".*airport.*shuttle.*",
-            r".*metro.*cairo.*",
-            r".*cairo.*metro.*",
-        ]
-
-        # 2. EXPANDED Accommodation queries - Catch ALL hotel/accommodation queries
-        accommodation_patterns = [
-            # Specific location patterns (keep existing)
-            r".*hotel.*in (cairo|luxor|aswan|alexandria|hurghada|sharm).*",
-            r".*accommodation.*in (cairo|luxor|aswan|alexandria|hurghada|sharm).*",
-            r".*places to stay.*in (cairo|luxor|aswan|alexandria|hurghada|sharm).*",
-            r".*resort.*in (cairo|luxor|aswan|alexandria|hurghada|sharm).*",
-            r".*where to stay.*in (cairo|luxor|aswan|alexandria|hurghada|sharm).*",
-            # EXPANDED: General hotel queries (no location required)
-            r".*hotel.*",
-            r".*hotels.*",
-            r".*accommodation.*",
-            r".*resort.*",
-            r".*lodge.*",
-            r".*stay.*",
-            r".*luxury.*hotel.*",
-            r".*budget.*hotel.*",
-            r".*5.*star.*",
-            r".*four.*star.*",
-            r".*three.*star.*",
-            r".*booking.*",
-            r".*reservation.*",
-        ]
-        
-        # 3. EXPANDED Attraction queries - Catch ALL attraction-related queries
-        complex_attraction_patterns = [
-            # Detailed info patterns (keep existing)
-            r".*opening hours.*",
-            r".*ticket prices.*",
-            r".*entry fee.*",
-            r".*how to get.*",
-            r".*how much.*cost.*",
-            r".*price.*ticket.*",
-            r".*visiting hours.*",
-            r".*entrance fee.*",
-            r".*near (pyramid|sphinx|luxor|temple|museum).*",
-            r".*(pyramid|sphinx|luxor|temple|museum).*near.*",
-            r".*best time.*visit.*",
-            r".*guided tour.*",
-            # EXPANDED: General attraction queries
-            r".*attraction.*",
-            r".*attractions.*",
-            r".*site.*",
-            r".*sites.*",
-            r".*monument.*",
-            r".*monuments.*",
-            r".*ancient.*",
-            r".*historical.*",
-            r".*pharaoh.*",
-            r".*tomb.*",
-            r".*tombs.*",
-            r".*valley.*",
-            r".*what.*see.*",
-            r".*what.*visit.*",
-            r".*show.*me.*",
-            r".*tell.*me.*about.*",
-            r".*find.*",
-            # Standalone queries (expanded)
-            r"^(pyramid|pyramids)$",
-            r"^(sphinx)$",
-            r"^(luxor)$",
-            r"^(temple|temples)$",
-            r"^(museum|museums)$",
-            r"^(attraction|attractions)$",
-            r"^(monument|monuments)$",
-            r"^(ancient)$",
-            r"^(historical)$",
-        ]
-        
-        # 4. EXPANDED Restaurant/food queries - Catch ALL food-related queries
-        restaurant_patterns = [
-            # Specific location patterns (keep existing)
-            r".*restaurant.*in (cairo|luxor|aswan|alexandria|hurghada|sharm).*",
-            r".*food.*in (cairo|luxor|aswan|alexandria|hurghada|sharm).*",
-            r".*eat.*in (cairo|luxor|aswan|alexandria|hurghada|sharm).*",
-            r".*dining.*in (cairo|luxor|aswan|alexandria|hurghada|sharm).*",
-            # EXPANDED: General restaurant queries (no location required)
-            r".*restaurant.*",
-            r".*restaurants.*",
-            r".*food.*",
-            r".*eat.*",
-            r".*dining.*",
-            r".*cuisine.*",
-            r".*meal.*",
-            r".*lunch.*",
-            r".*dinner.*",
-            r".*breakfast.*",
-            r".*traditional.*",
-            r".*local.*",
-            r".*authentic.*",
-            r".*egyptian.*food.*",
-            r".*egyptian.*cuisine.*",
-            r".*best.*restaurant.*",
-            r".*fine.*dining.*",
-            r".*street.*food.*",
-            r".*seafood.*",
-        ]
-        
-        # 5. Practical info with location/specificity
-        practical_patterns = [
-            r".*tip.*restaurant.*",
-            r".*tipping.*egypt.*",
-            r".*currency.*exchange.*",
-            r".*money.*egypt.*",
-            r".*safety.*egypt.*",
-            r".*visa.*egypt.*",
-            r".*weather.*in (cairo|luxor|aswan|alexandria|hurghada|sharm).*",
-            # Add standalone practical queries for database routing
-            r"^(weather)$",
-            r"^(climate)$",
-            r"^(temperature)$",
-            r"^(visa)$",
-            r"^(currency)$",
-            r"^(money)$",
-            r"^(safety)$",
-        ]
-        
-        # Check all patterns
-        all_patterns = (transportation_patterns + accommodation_patterns + 
-                       complex_attraction_patterns + restaurant_patterns + practical_patterns)
-        
-        for pattern in all_patterns:
-            if re.search(pattern, query_lower):
-                logger.info(f"🎯 Database-first match: '{pattern}' for query: '{query}'")
-                return True
-        
         return False
 
     def _classify_database_intent(self, query: str, language: str) -> Dict[str, Any]:
@@ -2482,67 +2695,15 @@ Please provide a helpful and accurate response about Egypt tourism:"""
         This bypasses the problematic NLU that classifies everything as 'general_query'
         and instead uses keyword-based classification for reliable database routing.
         """
-        query_lower = query.lower().strip()
-
-        # Hotel/Accommodation intent - FIXED: Use correct intent name
-        hotel_keywords = ['hotel', 'hotels', 'accommodation', 'stay', 'resort', 'lodge', 'luxury', 'budget', 'star', 'booking']
-        if any(keyword in query_lower for keyword in hotel_keywords):
-            return {
-                "text": query,
-                "intent": "hotel_query",  # FIXED: Changed from hotel_search to hotel_query
-                "entities": {"search_term": query},
-                "confidence": 0.9,
-                "language": language
-            }
-
-        # Restaurant/Food intent - FIXED: Use correct intent name
-        restaurant_keywords = ['restaurant', 'restaurants', 'food', 'eat', 'dining', 'cuisine', 'meal', 'egyptian', 'traditional', 'authentic']
-        if any(keyword in query_lower for keyword in restaurant_keywords):
-            return {
-                "text": query,
-                "intent": "restaurant_query",  # FIXED: Changed from restaurant_search to restaurant_query
-                "entities": {"search_term": query},
-                "confidence": 0.9,
-                "language": language
-            }
-
-        # Attraction intent - FIXED: Use correct intent name
-        attraction_keywords = ['pyramid', 'pyramids', 'sphinx', 'museum', 'museums', 'temple', 'temples', 'attraction', 'attractions', 'monument', 'ancient', 'historical', 'pharaoh', 'tomb', 'valley', 'site', 'sites']
-        if any(keyword in query_lower for keyword in attraction_keywords):
-            return {
-                "text": query,
-                "intent": "attraction_info",  # FIXED: Changed from attraction_search to attraction_info
-                "entities": {"search_term": query},
-                "confidence": 0.9,
-                "language": language
-            }
-
-        # Arabic keywords - FIXED: Use correct intent names
-        arabic_keywords = ['هرم', 'أهرامات', 'متحف', 'معبد', 'فندق', 'فنادق', 'مطعم', 'مطاعم']
-        if any(keyword in query_lower for keyword in arabic_keywords):
-            if any(word in query_lower for word in ['فندق', 'فنادق']):
-                intent = "hotel_query"  # FIXED: Changed from hotel_search
-            elif any(word in query_lower for word in ['مطعم', 'مطاعم']):
-                intent = "restaurant_query"  # FIXED: Changed from restaurant_search
-            else:
-                intent = "attraction_info"  # FIXED: Changed from attraction_search
-
-            return {
-                "text": query,
-                "intent": intent,
-                "entities": {"search_term": query},
-                "confidence": 0.9,
-                "language": language
-            }
-
-        # City/Location queries - default to attraction info
-        city_keywords = ['cairo', 'luxor', 'alexandria', 'aswan', 'giza', 'hurghada', 'sharm', 'egypt', 'egyptian']
-        if any(keyword in query_lower for keyword in city_keywords):
+        # Keyword groups are ordered hotel > restaurant > attraction > Arabic > city,
+        # so the first keyword in configuration order decides the intent
+        match = get_keyword_automaton("database_routing").search(query).first("intent")
+        if match:
             return {
                 "text": query,
-                "intent": "attraction_info",  # FIXED: Changed from attraction_search
+                "intent": match.label,
                 "entities": {"search_term": query},
-                "confidence": 0.8,
+                "confidence": match.priority,
                 "language": language
             }
 
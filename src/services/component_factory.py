@@ -148,7 +148,10 @@ class ComponentFactory:
             try:
                 anthropic_api_key = settings.anthropic_api_key.get_secret_value() if settings.anthropic_api_key else ""
                 self.register_component("anthropic_service", AnthropicService({
-                    "anthropic_api_key": anthropic_api_key
+                    "anthropic_api_key": anthropic_api_key,
+                    "request_timeout": settings.anthropic_timeout_seconds,
+                    "max_connections": settings.anthropic_max_connections,
+                    "max_keepalive_connections": settings.anthropic_max_keepalive_connections
                 }))
                 logger.debug("✅ Registered AnthropicService")
             except Exception as e:
@@ -308,8 +311,9 @@ class ComponentFactory:
         knowledge_base = self.create_knowledge_base()
         response_generator = self.create_response_generator()
         service_hub = self.create_service_hub()
-        session_manager = self.create_session_manager()
+        session_manager = self.create_chat_session_manager()
         db_manager = self.create_database_manager()
+        response_cache = self.create_response_cache(nlu_engine)
 
         creation_time = time.time() - start_time
         logger.info(f"✅ Chatbot dependencies created in {creation_time:.3f}s")
@@ -338,8 +342,38 @@ class ComponentFactory:
             response_generator=response_generator,
             service_hub=service_hub,
             session_manager=session_manager,
-            db_manager=db_manager
+            db_manager=db_manager,
+            response_cache=response_cache
+        )
+
+    def create_response_cache(self, nlu_engine: Any = None) -> Any:
+        """
+        Create the semantic LLM response cache.
+
+        Uses the NLU engine's embedding service for semantic matching when it has
+        models loaded; otherwise the cache serves exact (normalized) matches only.
+        """
+        if not settings.feature_flags.enable_caching:
+            logger.info("Response caching disabled by feature flag")
+            return None
+
+        from src.services.semantic_response_cache import SemanticResponseCache
+
+        embedding_fn = None
+        embedding_service = getattr(nlu_engine, "embedding_service", None)
+        if embedding_service is not None and embedding_service.is_ready():
+            embedding_fn = embedding_service.generate_embedding
+
+        redis_uri = settings.redis_url if settings.feature_flags.use_redis else None
+        cache = SemanticResponseCache(
+            embedding_fn=embedding_fn,
+            similarity_threshold=settings.response_cache_similarity_threshold,
+            ttl=settings.response_cache_ttl,
+            max_entries_per_language=settings.response_cache_max_entries,
+            redis_uri=redis_uri
         )
+        cache.warm_from_store()
+        return cache
 
     def create_database_manager(self) -> Any:
         """Create or return the shared database manager component (SINGLETON PATTERN)."""
@@ -563,13 +597,32 @@ class ComponentFactory:
 
             return RedisSessionManager(
                 redis_uri=redis_uri,
-                session_ttl=settings.session_ttl
+                session_ttl=settings.session_ttl,
+                max_messages=settings.session_max_messages
             )
 
         except Exception as e:
             logger.warning(f"Failed to create Redis session manager: {e}. Falling back to memory-based session manager")
             return MemorySessionManager(session_ttl=settings.session_ttl)
 
+    def create_chat_session_manager(self) -> Any:
+        """
+        Create the session manager used on the chat hot path.
+
+        Wraps the session manager in the write-behind layer (reads and writes
+        served from memory, flushed in the background) when enabled.
+        """
+        session_manager = self.create_session_manager()
+        if not settings.session_write_behind or not hasattr(session_manager, "save_session"):
+            return session_manager
+
+        from src.session.write_behind import WriteBehindSessionManager
+        return WriteBehindSessionManager(
+            session_manager,
+            flush_interval_ms=settings.session_flush_interval_ms,
+            batch_size=settings.session_flush_batch_size
+        )
+
     def create_search_service(self) -> Any:
         """Create the search service component."""
         from src.services.search_service import SearchService
@@ -6,6 +6,7 @@ while delegating operations to the new Phase 2.5 services. This allows
 for gradual migration with zero breaking changes.
 """
 import os
+import json
 import logging
 import time
 from typing import Any, Dict, List, Optional, Tuple, Union
@@ -21,8 +22,11 @@ from src.services.search_service import UnifiedSearchService
 # Legacy imports no longer needed - using clean facade architecture
 # from src.knowledge.database_god_object_ARCHIVED import DatabaseManager, DatabaseType
 from src.knowledge.core.connection_manager import ConnectionManager
+from src.knowledge.core.async_connection_manager import AsyncConnectionManager
 # REMOVED: from src.repositories.repository_factory import RepositoryFactory  # Archived - using unified service provider
 from src.core.container import container
+from src.knowledge.text_search import strip_search_columns
+from src.utils.exceptions import DatabaseError
 
 logger = logging.getLogger(__name__)
 
@@ -71,6 +75,9 @@ class DatabaseManagerService:
         self._connection_manager = ConnectionManager(database_uri)
         self._connection_manager.initialize_connection_pool()
         
+        # asyncio pool for async callers (opened on first use; falls back to the sync pool in a thread)
+        self._async_connection_manager = AsyncConnectionManager(database_uri, sync_manager=self._connection_manager)
+        
         # Create adapter for service compatibility
         self._db_adapter = self._create_db_adapter()
         
@@ -96,6 +103,9 @@ class DatabaseManagerService:
             def execute_postgres_query(self, query, params=None, fetchall=True, cursor_factory=None):
                 return self.connection_manager.execute_query(query, params, fetchall, cursor_factory)
             
+            def execute_prepared(self, shape, query, params=None):
+                return self.connection_manager.execute_prepared(shape, query, params)
+            
             def _get_pg_connection(self):
                 return self.connection_manager.get_connection()
             
@@ -192,6 +202,12 @@ class DatabaseManagerService:
         if hasattr(self, '_connection_manager'):
             self._connection_manager.close()
     
+    async def close_async(self):
+        """Close the asyncio connection pool and the sync pool."""
+        if hasattr(self, '_async_connection_manager'):
+            await self._async_connection_manager.close()
+        self.close()
+    
     def connect(self):
         """Establish database connection."""
         return self._connection_manager.initialize_connection_pool()
@@ -554,6 +570,8 @@ class DatabaseManagerService:
             'new_service_percentage': (metrics['new_service_calls'] / total_ops) * 100,
             'legacy_fallback_percentage': (metrics['legacy_fallbacks'] / total_ops) * 100,
             'error_rate': (metrics['error_count'] / total_ops) * 100,
+            'async_pool': self._async_connection_manager.get_pool_status(),
+            'prepared_statements': self._connection_manager.statement_registry.get_stats(),
             'service_status': {
                 'extension_manager': self._should_use_service('USE_NEW_EXTENSION_MANAGER'),
                 'schema_manager': self._should_use_service('USE_NEW_SCHEMA_MANAGER'),
@@ -589,15 +607,7 @@ class DatabaseManagerService:
                 if not results:
                     result = None
                 else:
-                    result = results[0]
-                    # Parse JSONB fields
-                    for field in jsonb_fields:
-                        if field in result and result[field]:
-                            import json
-                            try:
-                                result[field] = json.loads(result[field]) if isinstance(result[field], str) else result[field]
-                            except (json.JSONDecodeError, TypeError):
-                                pass
+                    result = self._parse_jsonb_fields(results[:1], jsonb_fields)[0]
             
             duration_ms = (time.time() - start_time) * 1000
             self._track_operation('generic_get', use_service, duration_ms, True)
@@ -638,42 +648,10 @@ class DatabaseManagerService:
                 if jsonb_fields is None:
                     jsonb_fields = []
                 
-                # Build query
-                query = f"SELECT * FROM {table}"
-                params = []
-                
-                if filters:
-                    where_conditions = []
-                    for field, value in filters.items():
-                        if value is not None:
-                            where_conditions.append(f"{field} = %s")
-                            params.append(value)
-                    
-                    if where_conditions:
-                        query += " WHERE " + " AND ".join(where_conditions)
-                
-                # Add LIMIT and OFFSET clauses
-                query += f" LIMIT %s OFFSET %s"
-                # Ensure limit and offset are integers to prevent SQL type errors
-                try:
-                    params.extend([int(limit), int(offset)])
-                except (TypeError, ValueError):
-                    logger.warning(f"Invalid limit/offset values: {limit}/{offset}, using defaults")
-                    params.extend([10, 0])  # Default values
-                
-                results = self._connection_manager.execute_query(query, tuple(params), fetchall=True)
-                
-                # Parse JSONB fields
-                for result in results:
-                    for field in jsonb_fields:
-                        if field in result and result[field]:
-                            import json
-                            try:
-                                result[field] = json.loads(result[field]) if isinstance(result[field], str) else result[field]
-                            except (json.JSONDecodeError, TypeError):
-                                pass
-                
-                result = results
+                query, params = self._build_generic_search_query(table, filters, limit, offset)
+                results = self._connection_manager.execute_prepared(
+                    self._generic_search_shape(table, filters), query, params)
+                result = self._parse_jsonb_fields(results, jsonb_fields)
             
             duration_ms = (time.time() - start_time) * 1000
             self._track_operation('generic_search', use_service, duration_ms, True)
@@ -688,53 +666,82 @@ class DatabaseManagerService:
                 logger.warning("Search service failed, falling back to direct query")
                 # Force fallback to legacy path by recursing with use_service=False
                 try:
-                    # Direct database query (copy of the else block above)
+                    # Direct database query
                     if filters is None:
                         filters = {}
                     if jsonb_fields is None:
                         jsonb_fields = []
                     
-                    # Build query
-                    query = f"SELECT * FROM {table}"
-                    params = []
-                    
-                    if filters:
-                        where_conditions = []
-                        for field, value in filters.items():
-                            if value is not None:
-                                where_conditions.append(f"{field} = %s")
-                                params.append(value)
-                        
-                        if where_conditions:
-                            query += " WHERE " + " AND ".join(where_conditions)
-                    
-                    # Add LIMIT and OFFSET clauses
-                    query += f" LIMIT %s OFFSET %s"
-                    try:
-                        params.extend([int(limit), int(offset)])
-                    except (TypeError, ValueError):
-                        logger.warning(f"Invalid limit/offset values: {limit}/{offset}, using defaults")
-                        params.extend([10, 0])  # Default values
-                    
-                    results = self._connection_manager.execute_query(query, tuple(params), fetchall=True)
-                    
-                    # Parse JSONB fields
-                    for result in results:
-                        for field in jsonb_fields:
-                            if field in result and result[field]:
-                                import json
-                                try:
-                                    result[field] = json.loads(result[field]) if isinstance(result[field], str) else result[field]
-                                except (json.JSONDecodeError, TypeError):
-                                    pass
-                    
-                    return results
+                    query, params = self._build_generic_search_query(table, filters, limit, offset)
+                    results = self._connection_manager.execute_prepared(
+                        self._generic_search_shape(table, filters), query, params)
+                    return self._parse_jsonb_fields(results, jsonb_fields)
                     
                 except Exception as fallback_error:
                     logger.error(f"Fallback query also failed: {fallback_error}")
                     return []
             raise
     
+    def _build_generic_search_query(self, table: str, filters: Optional[Dict[str, Any]],
+                                    limit: int, offset: int) -> Tuple[str, tuple]:
+        """Build the equality-filter SELECT used by generic_search and generic_search_async."""
+        query = f"SELECT * FROM {table}"
+        params = []
+        
+        if filters:
+            where_conditions = []
+            for field, value in filters.items():
+                if value is not None:
+                    where_conditions.append(f"{field} = %s")
+                    params.append(value)
+            
+            if where_conditions:
+                query += " WHERE " + " AND ".join(where_conditions)
+        
+        # Add LIMIT and OFFSET clauses
+        query += " LIMIT %s OFFSET %s"
+        # Ensure limit and offset are integers to prevent SQL type errors
+        try:
+            params.extend([int(limit), int(offset)])
+        except (TypeError, ValueError):
+            logger.warning(f"Invalid limit/offset values: {limit}/{offset}, using defaults")
+            params.extend([10, 0])  # Default values
+        
+        return query, tuple(params)
+    
+    @staticmethod
+    def _generic_search_shape(table: str, filters: Optional[Dict[str, Any]]) -> Tuple[str, ...]:
+        """Prepared statement shape of a generic_search query: table and filtered columns."""
+        columns = tuple(field for field, value in (filters or {}).items() if value is not None)
+        return ("generic_search", table, columns)
+    
+    @staticmethod
+    def _parse_jsonb_fields(rows: Optional[List[Dict[str, Any]]], jsonb_fields: Optional[List[str]]) -> List[Dict[str, Any]]:
+        """Drop the generated search columns and decode JSONB fields that came back as strings, in place."""
+        rows = strip_search_columns(rows)
+        for row in rows:
+            for field in jsonb_fields or []:
+                if field in row and row[field] and isinstance(row[field], str):
+                    try:
+                        row[field] = json.loads(row[field])
+                    except (json.JSONDecodeError, TypeError):
+                        pass
+        return rows
+    
+    @staticmethod
+    def _plain_vectors(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Convert pgvector values to lists, in place.
+
+        The async pool registers pgvector, so ``embedding`` columns come back
+        as numpy arrays, which FastAPI cannot serialize.
+        """
+        for row in rows:
+            for field, value in row.items():
+                if hasattr(value, "tolist"):
+                    row[field] = value.tolist()
+        return rows
+
     def generic_create(self, table: str, data: Dict[str, Any]) -> Optional[int]:
         """Create a new record in any table."""
         start_time = time.time()
@@ -845,7 +852,111 @@ class DatabaseManagerService:
                 logger.warning("Batch service failed, falling back to direct query")
                 return self.generic_delete(table, record_id)
             raise
-    
+
+    # ============================================================================
+    # ASYNC QUERY METHODS (asyncio pool, for async request handlers)
+    # ============================================================================
+
+    @property
+    def async_connection_manager(self) -> AsyncConnectionManager:
+        """The asyncio connection manager sharing this service's database."""
+        return self._async_connection_manager
+
+    async def execute_query_async(self, query: str, params: tuple = None, fetchall: bool = True):
+        """
+        Execute a query without blocking the event loop.
+
+        Args:
+            query: SQL query to execute
+            params: Query parameters
+            fetchall: Whether to fetch all results or just one
+
+        Returns:
+            Query results, rowcount for writes, or None if an error occurred
+        """
+        return await self._async_connection_manager.execute_query_async(query, params, fetchall)
+
+    def transaction_async(self):
+        """Async context manager yielding a connection inside a transaction."""
+        return self._async_connection_manager.transaction()
+
+    async def is_connected_async(self) -> bool:
+        """Check the database connection without blocking the event loop."""
+        return await self._async_connection_manager.is_connected()
+
+    async def generic_get_async(self, table: str, record_id: int, jsonb_fields: List[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Get a record by ID from any table (async).
+
+        Raises:
+            DatabaseError: If the query failed (a missing record returns None)
+        """
+        start_time = time.time()
+        query = f"SELECT * FROM {table} WHERE id = %s"
+        # fetchall distinguishes "no row" ([]) from a failed query (None)
+        results = await self._async_connection_manager.execute_query_async(query, (record_id,), fetchall=True)
+
+        duration_ms = (time.time() - start_time) * 1000
+        self._track_operation('generic_get_async', False, duration_ms, results is not None)
+        if results is None:
+            raise DatabaseError(f"Failed to get {table} record {record_id}")
+        if not results:
+            return None
+        return self._plain_vectors(self._parse_jsonb_fields(results[:1], jsonb_fields))[0]
+
+    async def generic_search_async(self, table: str, filters: Dict[str, Any] = None,
+                                   limit: int = 10, offset: int = 0,
+                                   jsonb_fields: List[str] = None,
+                                   language: str = "en") -> List[Dict[str, Any]]:
+        """
+        Search records in any table with equality filters (async).
+
+        Raises:
+            DatabaseError: If the query failed
+        """
+        start_time = time.time()
+        query, params = self._build_generic_search_query(table, filters, limit, offset)
+        results = await self._async_connection_manager.execute_query_async(query, params, fetchall=True)
+
+        duration_ms = (time.time() - start_time) * 1000
+        self._track_operation('generic_search_async', False, duration_ms, results is not None)
+        if results is None:
+            raise DatabaseError(f"Failed to search {table}")
+        return self._plain_vectors(self._parse_jsonb_fields(results, jsonb_fields))
+
+    async def find_similar_async(self, table: str, embedding: List[float], limit: int = 10,
+                                 additional_filters: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+        """
+        Find similar records using pgvector cosine distance (async).
+
+        Raises:
+            DatabaseError: If the query failed
+        """
+        start_time = time.time()
+        vector_literal = "[" + ",".join(str(float(value)) for value in embedding) + "]"
+
+        # Order by the distance expression itself so a vector index can serve the query
+        query = (f"SELECT *, embedding <=> %s::vector AS distance FROM {table} "
+                 f"WHERE embedding IS NOT NULL")
+        params: List[Any] = [vector_literal]
+        for field, value in (additional_filters or {}).items():
+            if value is not None:
+                query += f" AND {field} = %s"
+                params.append(value)
+        query += " ORDER BY embedding <=> %s::vector LIMIT %s"
+        params.extend([vector_literal, int(limit)])
+
+        results = await self._async_connection_manager.execute_query_async(query, tuple(params), fetchall=True)
+        duration_ms = (time.time() - start_time) * 1000
+        self._track_operation('find_similar_async', False, duration_ms, results is not None)
+        if results is None:
+            raise DatabaseError(f"Failed to find similar {table} records")
+
+        results = self._plain_vectors(strip_search_columns(results))
+        for record in results:
+            record['similarity_score'] = 1 - float(record['distance'])
+        return results
+
     # ============================================================================
     # ADDITIONAL COMPATIBILITY METHODS
     # ============================================================================
@@ -5,13 +5,19 @@ This module provides a unified interface for generating embeddings across the en
 All embedding generation should go through this service to ensure consistency.
 """
 
+import asyncio
 import numpy as np
 import torch
 import time
 import logging
-from typing import Union, List, Optional, Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import Union, List, Optional, Dict, Any, Tuple
 from transformers import AutoModel, AutoTokenizer
 
+from src.nlu.embedding_batcher import (
+    BatchThroughputTracker, EmbeddingMicroBatcher, plan_length_sorted_batches
+)
+
 logger = logging.getLogger(__name__)
 
 class StandardizedEmbeddingService:
@@ -20,7 +26,8 @@ class StandardizedEmbeddingService:
     Handles model selection, fallback logic, caching, and standardization.
     """
     
-    def __init__(self, models: Dict[str, Any] = None, tokenizers: Dict[str, Any] = None, cache=None):
+    def __init__(self, models: Dict[str, Any] = None, tokenizers: Dict[str, Any] = None, cache=None,
+                 batching_config: Dict[str, Any] = None):
         """
         Initialize the standardized embedding service.
         
@@ -28,10 +35,17 @@ class StandardizedEmbeddingService:
             models: Dictionary of loaded transformer models {key: model} (optional)
             tokenizers: Dictionary of loaded tokenizers {key: tokenizer} (optional)
             cache: Optional cache for embeddings
+            batching_config: Batching settings: micro-batching for generate_embedding_async
+                (enabled, max_batch_size, max_wait_ms, length_bucket_size) and sub-batching for
+                generate_batch_embeddings (sub_batch_size, max_tokens_per_batch, max_length,
+                batch_workers)
         """
         self.models = models or {}
         self.tokenizers = tokenizers or {}
         self.cache = cache
+        self.batching_config = batching_config or {}
+        self._batcher: Optional[EmbeddingMicroBatcher] = None
+        self.batch_throughput = BatchThroughputTracker()
         self.standard_dimension = 768  # Standard embedding dimension
         
         # Model priority order for fallback
@@ -43,6 +57,22 @@ class StandardizedEmbeddingService:
         """Check if the service is ready to generate embeddings."""
         return len(self.models) > 0 and len(self.tokenizers) > 0
     
+    def use_onnx_backend(self, model_names: Dict[str, str], config: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Replace loaded PyTorch models with ONNX Runtime sessions that pass the parity check.
+        
+        Args:
+            model_names: Model identifiers {key: name} (the transformer_models section of configs/models.json)
+            config: The embedding_backend section of configs/models.json
+            
+        Returns:
+            Per-model export/parity report
+        """
+        from src.nlu.onnx_backend import build_onnx_models
+        
+        self.models, report = build_onnx_models(self.models, self.tokenizers, model_names, config)
+        return report
+    
     def get_available_models(self) -> List[str]:
         """Get list of available model keys."""
         return list(self.models.keys())
@@ -175,6 +205,11 @@ class StandardizedEmbeddingService:
         """
         Generate embeddings for multiple texts efficiently.
         
+        Uncached texts are sorted by token length and embedded in fixed-size
+        sub-batches capped at ``max_tokens_per_batch`` padded tokens, so one long
+        text no longer pads the whole list and memory stays bounded. Sub-batches
+        can optionally run on a small worker pool (``batch_workers``).
+        
         Args:
             texts: List of texts to embed
             language: Target language (optional)
@@ -213,6 +248,7 @@ class StandardizedEmbeddingService:
         
         if not uncached_texts:
             return results
+        uncached_texts = list(dict.fromkeys(uncached_texts))
             
         # Select appropriate model
         model_key = self.select_best_model(language)
@@ -229,56 +265,145 @@ class StandardizedEmbeddingService:
             logger.info(f"🔥 Batch generating {len(uncached_texts)} embeddings using {model_key}")
             start_time = time.time()
             
-            # Batch tokenization
-            inputs = tokenizer(
-                uncached_texts,
-                return_tensors="pt",
-                padding=True,
-                truncation=True,
-                max_length=512
+            # Token lengths (no padding) decide the sort order and sub-batch boundaries
+            max_length = self.batching_config.get("max_length", 512)
+            lengths = [
+                len(ids) for ids in tokenizer(uncached_texts, truncation=True, max_length=max_length)["input_ids"]
+            ]
+            sub_batches = plan_length_sorted_batches(
+                lengths,
+                max_batch_size=self.batching_config.get("sub_batch_size", 32),
+                max_tokens_per_batch=self.batching_config.get("max_tokens_per_batch", 8192)
             )
             
-            # Generate batch embeddings
-            with torch.no_grad():
-                outputs = model(**inputs)
+            def run_sub_batch(indices: List[int]) -> List[Tuple[str, np.ndarray]]:
+                texts = [uncached_texts[i] for i in indices]
+                try:
+                    embeddings = self._embed_sub_batch(model, tokenizer, texts, [lengths[i] for i in indices])
+                    return [(text, self._standardize_embedding(embedding)) for text, embedding in zip(texts, embeddings)]
+                except Exception as e:
+                    logger.error(f"❌ Sub-batch of {len(texts)} failed with {model_key}: {str(e)}")
+                    return [(text, self.generate_embedding(text, language)) for text in texts]
             
-            # Extract embeddings
-            if hasattr(outputs, "pooler_output") and outputs.pooler_output is not None:
-                batch_embeddings = outputs.pooler_output.cpu().numpy()
+            workers = self.batching_config.get("batch_workers", 1)
+            if workers > 1 and len(sub_batches) > 1:
+                with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="embedding-batch") as executor:
+                    sub_batch_results = list(executor.map(run_sub_batch, sub_batches))
             else:
-                # Mean pooling for batch
-                attention_mask = inputs["attention_mask"]
-                token_embeddings = outputs.last_hidden_state
-                input_mask_expanded = attention_mask.unsqueeze(-1).expand(token_embeddings.size()).float()
-                sum_embeddings = torch.sum(token_embeddings * input_mask_expanded, 1)
-                sum_mask = torch.clamp(input_mask_expanded.sum(1), min=1e-9)
-                batch_embeddings = (sum_embeddings / sum_mask).cpu().numpy()
+                sub_batch_results = [run_sub_batch(indices) for indices in sub_batches]
             
-            # Process each embedding
-            for i, text in enumerate(uncached_texts):
-                embedding = batch_embeddings[i]
-                standardized = self._standardize_embedding(embedding)
-                results[text] = standardized
-                
-                # Cache the result
-                if self.cache:
-                    cache_key = f"{text}_{language}"
-                    if hasattr(self.cache, '__setitem__'):
-                        self.cache[cache_key] = standardized
-                    elif hasattr(self.cache, 'set'):
-                        self.cache.set(cache_key, standardized)
+            # Collect and cache the results
+            for sub_batch in sub_batch_results:
+                for text, standardized in sub_batch:
+                    results[text] = standardized
+                    if self.cache:
+                        cache_key = f"{text}_{language}"
+                        if hasattr(self.cache, '__setitem__'):
+                            self.cache[cache_key] = standardized
+                        elif hasattr(self.cache, 'set'):
+                            self.cache.set(cache_key, standardized)
             
             duration = time.time() - start_time
-            logger.info(f"✅ Batch generated {len(uncached_texts)} embeddings in {duration:.3f}s")
+            logger.info(
+                f"✅ Batch generated {len(uncached_texts)} embeddings in {duration:.3f}s "
+                f"({len(sub_batches)} sub-batches)"
+            )
             
         except Exception as e:
             logger.error(f"❌ Batch embedding generation failed with {model_key}: {str(e)}")
             # Fallback to individual generation
             for text in uncached_texts:
-                results[text] = self.generate_embedding(text, language)
+                if text not in results:
+                    results[text] = self.generate_embedding(text, language)
         
         return results
     
+    def _embed_sub_batch(self, model, tokenizer, texts: List[str], lengths: List[int]) -> np.ndarray:
+        """
+        Run one forward pass over a length-sorted sub-batch.
+        
+        Args:
+            model: Transformer model
+            tokenizer: Matching tokenizer
+            texts: Texts of the sub-batch
+            lengths: Unpadded token length of each text
+            
+        Returns:
+            Array of raw embeddings, one row per text
+        """
+        start_time = time.time()
+        inputs = tokenizer(
+            texts,
+            return_tensors="pt",
+            padding=True,
+            truncation=True,
+            max_length=self.batching_config.get("max_length", 512)
+        )
+        
+        with torch.no_grad():
+            outputs = model(**inputs)
+        
+        # Extract embeddings
+        if hasattr(outputs, "pooler_output") and outputs.pooler_output is not None:
+            embeddings = outputs.pooler_output.cpu().numpy()
+        else:
+            # Mean pooling for batch
+            attention_mask = inputs["attention_mask"]
+            token_embeddings = outputs.last_hidden_state
+            input_mask_expanded = attention_mask.unsqueeze(-1).expand(token_embeddings.size()).float()
+            sum_embeddings = torch.sum(token_embeddings * input_mask_expanded, 1)
+            sum_mask = torch.clamp(input_mask_expanded.sum(1), min=1e-9)
+            embeddings = (sum_embeddings / sum_mask).cpu().numpy()
+        
+        self.batch_throughput.record(
+            texts=len(texts),
+            tokens=sum(lengths),
+            padded_tokens=len(texts) * inputs["input_ids"].shape[1],
+            seconds=time.time() - start_time
+        )
+        return embeddings
+    
+    def _generate_ordered_batch(self, texts: List[str], language: Optional[str] = None) -> List[np.ndarray]:
+        """Batch function for the micro-batcher: embeddings in input order."""
+        results = self.generate_batch_embeddings(texts, language)
+        return [results[text] for text in texts]
+    
+    @property
+    def batcher(self) -> EmbeddingMicroBatcher:
+        """Micro-batcher shared by concurrent async embedding requests."""
+        if self._batcher is None:
+            self._batcher = EmbeddingMicroBatcher(
+                self._generate_ordered_batch,
+                max_batch_size=self.batching_config.get("max_batch_size", 32),
+                max_wait_ms=self.batching_config.get("max_wait_ms", 5.0),
+                length_bucket_size=self.batching_config.get("length_bucket_size", 64),
+                name="standardized_embedding"
+            )
+        return self._batcher
+    
+    async def generate_embedding_async(self, text: str, language: Optional[str] = None) -> np.ndarray:
+        """
+        Generate a standardized embedding without blocking the event loop.
+        
+        Concurrent requests are collected by the micro-batcher and embedded with
+        one batched forward pass per length bucket instead of one pass each.
+        
+        Args:
+            text: Text to embed
+            language: Target language (optional)
+            
+        Returns:
+            Numpy array with standardized dimensions
+        """
+        if not text or not self.batching_config.get("enabled", True):
+            return await asyncio.to_thread(self.generate_embedding, text, language)
+        
+        try:
+            return await self.batcher.embed(text, language)
+        except Exception as e:
+            logger.error(f"❌ Micro-batched embedding failed: {str(e)}")
+            return await asyncio.to_thread(self.generate_embedding, text, language)
+    
     def _standardize_embedding(self, embedding: Union[np.ndarray, List[float]]) -> np.ndarray:
         """
         Standardize an embedding to consistent format and dimensions.
@@ -352,5 +477,7 @@ class StandardizedEmbeddingService:
             'available_models': self.get_available_models(),
             'standard_dimension': self.standard_dimension,
             'is_ready': self.is_ready(),
-            'cache_available': self.cache is not None
+            'cache_available': self.cache is not None,
+            'micro_batching': self._batcher.get_stats() if self._batcher else None,
+            'batch_throughput': self.batch_throughput.get_stats()
         } 
\ No newline at end of file
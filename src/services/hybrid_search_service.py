@@ -3,14 +3,19 @@ Hybrid Search Utilities
 
 This module provides enhanced hybrid search capabilities that combine vector similarity
 with text-based searching for improved retrieval quality in the RAG pipeline.
+
+Hybrid queries run as a two-stage plan in a single statement: a top-K ANN
+candidate CTE (``ORDER BY embedding <-> q LIMIT k``, served by the HNSW
+index) and a top-K full-text CTE over the stored ``search_en``/``search_ar``
+tsvector columns (served by their GIN indexes), fused with reciprocal-rank
+fusion (RRF): ``score = w_v / (k + vector_rank) + w_t / (k + text_rank)``.
 """
 
 import logging
 from typing import Dict, List, Any, Optional, Tuple, Union
-import numpy as np
-from sklearn.preprocessing import MinMaxScaler
 
 from src.utils.logger import get_logger
+from src.knowledge.text_search import TextSearchQueryBuilder, get_text_search_support, strip_search_columns
 from src.services.postgres_database_service import PostgresqlDatabaseManager
 
 logger = get_logger(__name__)
@@ -18,7 +23,7 @@ logger = get_logger(__name__)
 class HybridSearchEngine:
     """
     Enhanced hybrid search engine that combines vector similarity with text search.
-    Uses a weighted combination of vector similarity scores and text match scores.
+    Fuses the vector and text rankings with weighted reciprocal-rank fusion.
     """
 
     def __init__(self, db_manager: PostgresqlDatabaseManager):
@@ -31,6 +36,39 @@ class HybridSearchEngine:
         self.db_manager = db_manager
         self.default_text_weight = 0.3  # Default weight for text search component
         self.default_vector_weight = 0.7  # Default weight for vector search component
+        self.default_rrf_k = 60  # RRF rank constant (higher = flatter rank contributions)
+        self.default_candidate_k = 50  # Candidates taken from each index before fusion
+        self.ef_search = 100  # HNSW search list size (raised to candidate_k if smaller)
+
+    def _text_candidates(self, query: str, table: str, text_fields: Optional[List[str]]) -> Tuple[str, str, List[Any]]:
+        """
+        Text match condition and rank for the full-text candidate CTE.
+
+        Uses the stored tsvector columns (GIN-indexed) unless the table has
+        not been migrated or custom text fields are requested, in which case
+        the fields are tokenized inline.
+
+        Returns:
+            Tuple of (rank expression, match condition, parameters in that order)
+        """
+        indexed_tables, _ = get_text_search_support(self.db_manager.execute_query)
+        if not text_fields and table in indexed_tables:
+            builder = TextSearchQueryBuilder(trigram=False)
+            rank_sql, rank_params = builder.rank_expression(table, query)
+            match_sql, match_params = builder.match_condition(table, query)
+            return rank_sql, match_sql, rank_params + match_params
+
+        if not text_fields:
+            text_fields = ["name", "description", "history"] if table == "cities" else ["name", "description"]
+        logger.debug(f"No stored search columns for '{table}', tokenizing {text_fields} per row")
+
+        rank_sql = " + ".join(
+            f"ts_rank(to_tsvector('english', t.{field}), plainto_tsquery('english', %s))" for field in text_fields
+        )
+        match_sql = "(" + " OR ".join(
+            f"to_tsvector('english', t.{field}) @@ plainto_tsquery('english', %s)" for field in text_fields
+        ) + ")"
+        return rank_sql, match_sql, [query] * (2 * len(text_fields))
 
     def hybrid_search(
         self,
@@ -42,7 +80,9 @@ class HybridSearchEngine:
         text_weight: float = None,
         vector_weight: float = None,
         limit: int = 10,
-        min_text_score: float = 0.1
+        min_text_score: float = 0.1,
+        rrf_k: int = None,
+        candidate_k: int = None
     ) -> List[Dict[str, Any]]:
         """
         Perform hybrid search combining vector similarity with text search.
@@ -51,15 +91,18 @@ class HybridSearchEngine:
             query: Text query string for text search component
             table: Table name to search
             embedding: Query vector embedding for vector similarity component
-            text_fields: List of text fields to search in
+            text_fields: Text fields to tokenize per row instead of the stored search columns
             filters: Additional filters to apply
             text_weight: Weight for text search component (0.0 to 1.0)
             vector_weight: Weight for vector search component (0.0 to 1.0)
             limit: Maximum number of results to return
-            min_text_score: Minimum text score for considering text matches
+            min_text_score: Unused; kept for backward compatibility (fusion uses ranks, not raw scores)
+            rrf_k: RRF rank constant (defaults to default_rrf_k)
+            candidate_k: Candidates taken from each index (defaults to default_candidate_k)
 
         Returns:
-            List of results with combined scores
+            List of results with vector_score, text_score, their ranks and the
+            fused combined_score, best first
         """
         text_weight = text_weight if text_weight is not None else self.default_text_weight
         vector_weight = vector_weight if vector_weight is not None else self.default_vector_weight
@@ -69,132 +112,116 @@ class HybridSearchEngine:
         text_weight = text_weight / total_weight
         vector_weight = vector_weight / total_weight
 
-        if filters is None:
-            filters = {}
-
-        # Default text fields if not provided
-        if not text_fields:
-            if table in ["attractions", "hotels", "restaurants"]:
-                text_fields = ["name", "description"]
-            elif table == "cities":
-                text_fields = ["name", "description", "history"]
-            else:
-                # Generic fallback
-                text_fields = ["name", "description"]
-
-        logger.debug(f"Hybrid search on table '{table}' with weights: text={text_weight}, vector={vector_weight}")
-
-        # Construct text search condition using tsvector
-        text_conditions = []
-        for field in text_fields:
-            text_conditions.append(f"to_tsvector('english', {field}) @@ plainto_tsquery('english', %s)")
-
-        text_search_condition = " OR ".join(text_conditions)
+        rrf_k = rrf_k if rrf_k is not None else self.default_rrf_k
+        candidate_k = max(candidate_k or self.default_candidate_k, limit)
 
-        # Calculate text search rank
-        rank_expressions = []
-        for field in text_fields:
-            rank_expressions.append(f"ts_rank(to_tsvector('english', {field}), plainto_tsquery('english', %s))")
-
-        text_rank = " + ".join(rank_expressions)
+        use_vector = embedding is not None and len(embedding) > 0
+        use_text = bool(query and query.strip())
+        if not use_vector and not use_text:
+            logger.error("Either query or embedding must be provided for hybrid search")
+            return []
 
-        # Construct filter conditions
-        filter_conditions = []
+        # Construct filter conditions (applied inside both candidate CTEs)
+        filter_sql = ""
         filter_params = []
-
-        for key, value in filters.items():
-            filter_conditions.append(f"{key} = %s")
+        for key, value in (filters or {}).items():
+            if not key.isidentifier():
+                logger.warning(f"Skipping invalid filter column: {key}")
+                continue
+            filter_sql += f" AND t.{key} = %s"
             filter_params.append(value)
 
-        # Combine all conditions
-        where_clause = ""
-        if text_search_condition and query:
-            where_clause = f"({text_search_condition})"
-            filter_params = [query] * len(text_fields) + filter_params
-
-        if filter_conditions:
-            if where_clause:
-                where_clause += " AND "
-            where_clause += " AND ".join(filter_conditions)
-
-        if where_clause:
-            where_clause = f"WHERE {where_clause}"
-
-        # Vector distance calculation using HNSW index
-        # Note: The HNSW index is automatically used when the <-> operator is used in ORDER BY
-        vector_distance = f"embedding <-> %s as vector_distance"
-
-        # Text rank calculation (only if query is provided)
-        text_rank_calc = ""
-        if query:
-            text_rank_calc = f", ({text_rank}) as text_score"
-            filter_params += [query] * len(text_fields)
-
-        # Combined scoring function
-        combined_score = f"(1.0 - (embedding <-> %s)) as vector_score"
-        filter_params.append(embedding)
-
-        # Set ef_search parameter for HNSW index (higher values = more accurate but slower)
-        # This is set at query time and doesn't affect the index itself
-        set_ef_search = "SET hnsw.ef_search = 100;"
+        logger.debug(f"Hybrid search on table '{table}' with weights: text={text_weight}, vector={vector_weight}, "
+                     f"rrf_k={rrf_k}, candidate_k={candidate_k}")
+
+        ctes = []
+        params: List[Any] = []
+
+        # Stage 1a: ANN candidates; ORDER BY distance LIMIT k is served by the HNSW index
+        if use_vector:
+            ctes.append(f"""
+                ann AS (
+                    SELECT t.id, t.embedding <-> %s::vector AS vector_distance
+                    FROM {table} t
+                    WHERE t.embedding IS NOT NULL{filter_sql}
+                    ORDER BY vector_distance
+                    LIMIT %s
+                ),
+                ann_ranked AS (
+                    SELECT id, vector_distance, row_number() OVER (ORDER BY vector_distance) AS vector_rank
+                    FROM ann
+                )""")
+            params += [embedding] + filter_params + [candidate_k]
+
+        # Stage 1b: full-text candidates from the GIN-indexed tsvector columns
+        if use_text:
+            rank_sql, match_sql, text_params = self._text_candidates(query, table, text_fields)
+            ctes.append(f"""
+                text_hits AS (
+                    SELECT t.id, {rank_sql} AS text_score
+                    FROM {table} t
+                    WHERE {match_sql}{filter_sql}
+                    ORDER BY text_score DESC
+                    LIMIT %s
+                ),
+                text_ranked AS (
+                    SELECT id, text_score, row_number() OVER (ORDER BY text_score DESC) AS text_rank
+                    FROM text_hits
+                )""")
+            params += text_params + filter_params + [candidate_k]
+
+        # Stage 2: weighted reciprocal-rank fusion
+        if use_vector and use_text:
+            fused = """
+                fused AS (
+                    SELECT COALESCE(a.id, x.id) AS id, a.vector_distance, a.vector_rank, x.text_score, x.text_rank,
+                           COALESCE(%s::float8 / (%s::float8 + a.vector_rank), 0)
+                           + COALESCE(%s::float8 / (%s::float8 + x.text_rank), 0) AS rrf_score
+                    FROM ann_ranked a
+                    FULL OUTER JOIN text_ranked x ON a.id = x.id
+                )"""
+            params += [vector_weight, rrf_k, text_weight, rrf_k]
+        elif use_vector:
+            fused = """
+                fused AS (
+                    SELECT id, vector_distance, vector_rank, NULL::float8 AS text_score, NULL::bigint AS text_rank,
+                           %s::float8 / (%s::float8 + vector_rank) AS rrf_score
+                    FROM ann_ranked
+                )"""
+            params += [vector_weight, rrf_k]
+        else:
+            fused = """
+                fused AS (
+                    SELECT id, NULL::float8 AS vector_distance, NULL::bigint AS vector_rank, text_score, text_rank,
+                           %s::float8 / (%s::float8 + text_rank) AS rrf_score
+                    FROM text_ranked
+                )"""
+            params += [text_weight, rrf_k]
+        ctes.append(fused)
 
-        # Build the main query
         main_query = f"""
-            SELECT *,
-                {vector_distance},
-                {combined_score}
-                {text_rank_calc}
-            FROM {table}
-            {where_clause}
-            ORDER BY
-                CASE
-                    WHEN {text_rank_calc != ""}
-                    THEN ({vector_weight} * (1.0 - (embedding <-> %s))) +
-                         ({text_weight} * GREATEST(({text_rank}), {min_text_score}))
-                    ELSE (1.0 - (embedding <-> %s))
-                END DESC
-            LIMIT {limit}
+            WITH {",".join(ctes)}
+            SELECT t.*,
+                f.vector_distance,
+                1.0 - f.vector_distance AS vector_score,
+                f.text_score,
+                f.vector_rank,
+                f.text_rank,
+                f.rrf_score AS combined_score
+            FROM fused f
+            JOIN {table} t ON t.id = f.id
+            ORDER BY f.rrf_score DESC
+            LIMIT %s
         """
+        params.append(limit)
 
-        # Combine the SET command with the main query
-        query = f"{set_ef_search} {main_query}"
-
-        # Add final vector parameters for the ORDER BY clause
-        if text_rank_calc != "":
-            filter_params.append(embedding)
-            filter_params += [query] * len(text_fields)
-            filter_params.append(embedding)
-        else:
-            filter_params.append(embedding)
+        # HNSW returns at most ef_search rows per scan, so it must cover the candidate pool.
+        # SET LOCAL keeps the setting to this transaction instead of the pooled session.
+        if use_vector:
+            main_query = f"SET LOCAL hnsw.ef_search = {int(max(self.ef_search, candidate_k))}; {main_query}"
 
         try:
-            results = self.db_manager.execute_query(query, filter_params)
-
-            # Post-process results to normalize scores
-            if results and len(results) > 0:
-                # Extract scores
-                if "text_score" in results[0]:
-                    text_scores = [result.get("text_score", 0) for result in results]
-                    # Normalize text scores to 0-1 range if we have multiple scores
-                    if len(text_scores) > 1 and max(text_scores) > min(text_scores):
-                        scaler = MinMaxScaler()
-                        normalized_text_scores = scaler.fit_transform(np.asarray(text_scores).reshape(-1, 1)).flatten()
-                        for i, result in enumerate(results):
-                            result["text_score_normalized"] = float(normalized_text_scores[i])
-                    else:
-                        # If all scores are the same, normalize to 0.5
-                        for result in results:
-                            result["text_score_normalized"] = 0.5 if result.get("text_score", 0) > 0 else 0
-
-                # Calculate final combined scores
-                for result in results:
-                    vector_score = result.get("vector_score", 0)
-                    text_score_norm = result.get("text_score_normalized", 0)
-
-                    # Calculate combined score
-                    result["combined_score"] = (vector_weight * vector_score +
-                                              text_weight * text_score_norm)
-
+            results = strip_search_columns(self.db_manager.execute_query(main_query, tuple(params)))
             return results
 
         except Exception as e:
@@ -248,10 +275,15 @@ class HybridSearchEngine:
         sample_queries: List[str],
         embeddings: List[List[float]],
         relevant_ids: List[List[int]],
-        vector_weights: List[float] = None
+        vector_weights: List[float] = None,
+        rrf_ks: List[int] = None,
+        candidate_ks: List[int] = None
     ) -> Dict[str, Any]:
         """
-        Find optimal weights for hybrid search using a set of sample queries.
+        Find optimal fusion constants for hybrid search using a set of sample queries.
+
+        Grid-searches the vector/text weights, the RRF rank constant and the
+        per-index candidate count, and keeps the combination with the best F1.
 
         Args:
             table: Table to optimize for
@@ -259,71 +291,89 @@ class HybridSearchEngine:
             embeddings: List of query embeddings (one per query)
             relevant_ids: List of lists of relevant item IDs for each query
             vector_weights: List of vector weights to try
+            rrf_ks: List of RRF rank constants to try
+            candidate_ks: List of candidate counts to try
 
         Returns:
             Dictionary with optimization results
         """
         if vector_weights is None:
             vector_weights = [0.0, 0.2, 0.4, 0.5, 0.6, 0.8, 1.0]
+        if rrf_ks is None:
+            rrf_ks = [10, 30, 60, 100]
+        if candidate_ks is None:
+            candidate_ks = [self.default_candidate_k]
 
         results = {}
         best_score = 0.0
         best_vector_weight = 0.5
-
-        # Try different weight combinations
-        for vector_weight in vector_weights:
-            text_weight = 1.0 - vector_weight
-
-            precision_at_k = []
-            recall_at_k = []
-
-            # Test each query
-            for i, query in enumerate(sample_queries):
-                hybrid_results = self.hybrid_search(
-                    query=query,
-                    table=table,
-                    embedding=embeddings[i],
-                    text_weight=text_weight,
-                    vector_weight=vector_weight,
-                    limit=10
-                )
-
-                # Calculate precision and recall
-                result_ids = [r.get("id") for r in hybrid_results]
-                relevant_for_query = set(relevant_ids[i])
-
-                relevant_retrieved = len([rid for rid in result_ids if rid in relevant_for_query])
-                precision = relevant_retrieved / len(result_ids) if result_ids else 0
-                recall = relevant_retrieved / len(relevant_for_query) if relevant_for_query else 0
-
-                precision_at_k.append(precision)
-                recall_at_k.append(recall)
-
-            # Calculate average metrics
-            avg_precision = sum(precision_at_k) / len(precision_at_k) if precision_at_k else 0
-            avg_recall = sum(recall_at_k) / len(recall_at_k) if recall_at_k else 0
-
-            # Calculate F1 score
-            f1_score = 2 * (avg_precision * avg_recall) / (avg_precision + avg_recall) if (avg_precision + avg_recall) > 0 else 0
-
-            results[f"vector_{vector_weight}_text_{text_weight}"] = {
-                "precision": avg_precision,
-                "recall": avg_recall,
-                "f1": f1_score
-            }
-
-            # Track best weights
-            if f1_score > best_score:
-                best_score = f1_score
-                best_vector_weight = vector_weight
-
-        # Set class defaults to the best weights
+        best_rrf_k = self.default_rrf_k
+        best_candidate_k = self.default_candidate_k
+
+        # Try different constant combinations
+        for candidate_k in candidate_ks:
+            for rrf_k in rrf_ks:
+                for vector_weight in vector_weights:
+                    text_weight = 1.0 - vector_weight
+
+                    precision_at_k = []
+                    recall_at_k = []
+
+                    # Test each query
+                    for i, query in enumerate(sample_queries):
+                        hybrid_results = self.hybrid_search(
+                            query=query,
+                            table=table,
+                            embedding=embeddings[i],
+                            text_weight=text_weight,
+                            vector_weight=vector_weight,
+                            limit=10,
+                            rrf_k=rrf_k,
+                            candidate_k=candidate_k
+                        )
+
+                        # Calculate precision and recall
+                        result_ids = [r.get("id") for r in hybrid_results]
+                        relevant_for_query = set(relevant_ids[i])
+
+                        relevant_retrieved = len([rid for rid in result_ids if rid in relevant_for_query])
+                        precision = relevant_retrieved / len(result_ids) if result_ids else 0
+                        recall = relevant_retrieved / len(relevant_for_query) if relevant_for_query else 0
+
+                        precision_at_k.append(precision)
+                        recall_at_k.append(recall)
+
+                    # Calculate average metrics
+                    avg_precision = sum(precision_at_k) / len(precision_at_k) if precision_at_k else 0
+                    avg_recall = sum(recall_at_k) / len(recall_at_k) if recall_at_k else 0
+
+                    # Calculate F1 score
+                    f1_score = 2 * (avg_precision * avg_recall) / (avg_precision + avg_recall) if (avg_precision + avg_recall) > 0 else 0
+
+                    results[f"vector_{vector_weight}_text_{text_weight}_k_{rrf_k}_candidates_{candidate_k}"] = {
+                        "precision": avg_precision,
+                        "recall": avg_recall,
+                        "f1": f1_score
+                    }
+
+                    # Track best constants
+                    if f1_score > best_score:
+                        best_score = f1_score
+                        best_vector_weight = vector_weight
+                        best_rrf_k = rrf_k
+                        best_candidate_k = candidate_k
+
+        # Set class defaults to the best constants
         self.default_vector_weight = best_vector_weight
         self.default_text_weight = 1.0 - best_vector_weight
+        self.default_rrf_k = best_rrf_k
+        self.default_candidate_k = best_candidate_k
 
         return {
             "best_vector_weight": best_vector_weight,
             "best_text_weight": 1.0 - best_vector_weight,
+            "best_rrf_k": best_rrf_k,
+            "best_candidate_k": best_candidate_k,
             "best_f1_score": best_score,
             "all_results": results
         }
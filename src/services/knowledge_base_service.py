@@ -4,6 +4,8 @@ KnowledgeBaseService - Provides backward compatibility while using new repositor
 This facade maintains the same API as the original KnowledgeBase class while
 internally using the new repository pattern and services.
 """
+import asyncio
+import inspect
 import logging
 import time
 from typing import Any, Dict, List, Optional
@@ -606,6 +608,65 @@ class KnowledgeBaseService:
             logger.error(f"Error searching itineraries: {str(e)}")
             return []
 
+    # ============================================================================
+    # ASYNC METHODS (non-blocking variants for async request handlers)
+    # ============================================================================
+
+    async def _call_db_async(self, method_name: str, *args, **kwargs) -> Any:
+        """Await db_manager's ``<method_name>_async`` when it has one, else run the sync method in a worker thread."""
+        async_method = getattr(self.db_manager, f"{method_name}_async", None)
+        if inspect.iscoroutinefunction(async_method):
+            return await async_method(*args, **kwargs)
+        return await asyncio.to_thread(getattr(self.db_manager, method_name), *args, **kwargs)
+
+    async def get_record_by_id_async(self, table_name: str, record_id: Any) -> Optional[Dict]:
+        """Get a record by table and ID (async)."""
+        start_time = time.time()
+
+        try:
+            result = await self._call_db_async('generic_get', table_name, int(record_id))
+
+            duration_ms = (time.time() - start_time) * 1000
+            self._track_operation('get_record_by_id_async', duration_ms, True)
+            return result
+
+        except Exception as e:
+            duration_ms = (time.time() - start_time) * 1000
+            self._track_operation('get_record_by_id_async', duration_ms, False)
+            logger.error(f"Error getting {table_name} record {record_id}: {str(e)}")
+            raise
+
+    async def get_attraction_by_id_async(self, attraction_id: int) -> Optional[Dict]:
+        """Get attraction by ID (async)."""
+        return await self.get_record_by_id_async("attractions", attraction_id)
+
+    async def get_restaurant_by_id_async(self, restaurant_id: str) -> Optional[Dict]:
+        """Get restaurant by ID (async)."""
+        return await self.get_record_by_id_async("restaurants", restaurant_id)
+
+    async def get_hotel_by_id_async(self, hotel_id: str) -> Optional[Dict]:
+        """Get hotel by ID (async)."""
+        return await self.get_record_by_id_async("accommodations", hotel_id)
+
+    async def search_records_async(self, table_name: str, filters: Optional[Dict[str, Any]] = None,
+                                   limit: int = 10, offset: int = 0, language: str = "en") -> List[Dict]:
+        """Search any table with equality filters (async)."""
+        start_time = time.time()
+
+        try:
+            result = await self._call_db_async('generic_search', table_name, filters, limit, offset,
+                                               language=language)
+
+            duration_ms = (time.time() - start_time) * 1000
+            self._track_operation('search_records_async', duration_ms, True)
+            return result or []
+
+        except Exception as e:
+            duration_ms = (time.time() - start_time) * 1000
+            self._track_operation('search_records_async', duration_ms, False)
+            logger.error(f"Error searching {table_name}: {str(e)}")
+            return []
+
     # ============================================================================
     # LEGACY API DELEGATION
     # ============================================================================
@@ -8,11 +8,16 @@ vector embeddings and geospatial queries.
 import os
 import json
 import logging
+import threading
 import psycopg2
 import numpy as np
+from contextlib import contextmanager
+from psycopg2 import pool
 from psycopg2.extras import DictCursor, execute_values
-from typing import Any, Dict, List, Optional, Tuple, Union
+from typing import Any, Dict, Hashable, List, Optional, Tuple, Union
 
+from src.knowledge.core.statement_registry import StatementRegistry
+from src.knowledge.text_search import strip_search_columns
 from src.utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -54,7 +59,12 @@ class PostgresqlDatabaseManager:
         )
 
         self.connection = None
+        self.pg_pool = None  # Created on first pooled_connection()
+        self._pool_lock = threading.Lock()
+        self._local = threading.local()
         self.db_type = "postgresql"
+        # Same PG_PREPARED_STATEMENTS switch as ConnectionManager
+        self.statement_registry = StatementRegistry()
         logger.info(f"PostgresqlDatabaseManager initialized with {self.db_type}")
 
     def connect(self) -> None:
@@ -87,15 +97,67 @@ class PostgresqlDatabaseManager:
         """
         Get a database connection.
 
-        This method returns an existing connection or creates a new one.
+        This method returns the connection bound to the calling thread by
+        ``pooled_connection``, or the shared connection (created if needed).
 
         Returns:
             PostgreSQL connection
         """
+        bound = getattr(self._local, "connection", None)
+        if bound is not None:
+            return bound
         if not self.connection:
             self.connect()
         return self.connection
 
+    def _get_pool(self) -> pool.ThreadedConnectionPool:
+        """Connection pool for ``pooled_connection``, created on first use."""
+        if self.pg_pool is None:
+            with self._pool_lock:
+                if self.pg_pool is None:
+                    self.pg_pool = pool.ThreadedConnectionPool(
+                        minconn=1,
+                        maxconn=int(os.environ.get("PG_MAX_CONNECTIONS", "20")),
+                        dsn=self.database_uri
+                    )
+                    logger.info("Created PostgreSQL connection pool for concurrent queries")
+        return self.pg_pool
+
+    @contextmanager
+    def pooled_connection(self):
+        """
+        Run the calling thread's queries on a connection of its own.
+
+        Inside the block ``get_connection`` returns a connection taken from the
+        pool instead of the shared one, so concurrent callers (e.g. parallel RAG
+        retrieval) neither wait for each other nor abort each other's
+        transactions. The connection is rolled back and returned to the pool on
+        exit. Nested blocks reuse the outer connection.
+
+        Yields:
+            PostgreSQL connection bound to the calling thread
+        """
+        bound = getattr(self._local, "connection", None)
+        if bound is not None:
+            yield bound
+            return
+
+        connection_pool = self._get_pool()
+        conn = connection_pool.getconn()
+        self._local.connection = conn
+        try:
+            yield conn
+        finally:
+            self._local.connection = None
+            broken = bool(conn.closed)
+            if not broken:
+                try:
+                    conn.rollback()
+                except Exception as e:
+                    logger.warning(f"Rollback of pooled connection failed: {str(e)}")
+                    broken = True
+            connection_pool.putconn(conn, close=broken)
+
     def execute_query(
         self, query: str, params: tuple = None
     ) -> List[Dict[str, Any]]:
@@ -107,7 +169,8 @@ class PostgresqlDatabaseManager:
             params: Query parameters
 
         Returns:
-            List of dictionaries representing the query results
+            List of dictionaries representing the query results (without the
+            generated search_en/search_ar columns that ``SELECT *`` picks up)
         """
         try:
             conn = self.get_connection()
@@ -119,7 +182,7 @@ class PostgresqlDatabaseManager:
                     cursor.execute(query)
 
                 # Fetch results
-                results = [dict(row) for row in cursor.fetchall()]
+                results = strip_search_columns([dict(row) for row in cursor.fetchall()])
 
                 return results
         except Exception as e:
@@ -128,6 +191,38 @@ class PostgresqlDatabaseManager:
             logger.error(f"Params: {params}")
             raise
 
+    def _execute_prepared(
+        self, shape: Tuple[Hashable, ...], query: str, params: tuple = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Execute a SELECT as a server-side prepared statement keyed by query shape.
+
+        Args:
+            shape: Query shape (the same shape must always produce the same SQL)
+            query: SQL query to execute
+            params: Query parameters
+
+        Returns:
+            List of dictionaries representing the query results
+        """
+        conn = self.get_connection()
+        try:
+            with conn.cursor(cursor_factory=DictCursor) as cursor:
+                if not self.statement_registry.execute(cursor, shape, query, params):
+                    cursor.execute(query, params)
+                return strip_search_columns([dict(row) for row in cursor.fetchall()])
+        except Exception as e:
+            logger.warning(f"Prepared query failed, retrying unprepared: {str(e)}")
+            self.statement_registry.reset_connection(conn)
+            return self.execute_query(query, params)
+
+    @staticmethod
+    def _vector_search_shape(
+        table: str, filters: Optional[Dict[str, Any]], columns: Tuple[str, ...]
+    ) -> Tuple[Hashable, ...]:
+        """Prepared statement shape of a vector search: table and the filter columns applied."""
+        return ("vector_search", table, tuple(column for column in columns if column in (filters or {})))
+
     def execute_update(
         self, query: str, params: tuple = None
     ) -> int:
@@ -279,8 +374,9 @@ class PostgresqlDatabaseManager:
         query += " ORDER BY distance LIMIT %s"
         params.append(limit)
 
-        # Execute the query
-        results = self.execute_query(query, tuple(params))
+        # Execute as a prepared statement for this shape (table and filter columns)
+        shape = self._vector_search_shape("attractions", filters, ("city_id", "type"))
+        results = self._execute_prepared(shape, query, tuple(params))
 
         # Parse JSON data fields
         for attraction in results:
@@ -419,8 +515,9 @@ class PostgresqlDatabaseManager:
         query += " ORDER BY distance LIMIT %s"
         params.append(limit)
 
-        # Execute the query
-        results = self.execute_query(query, tuple(params))
+        # Execute as a prepared statement for this shape (table and filter columns)
+        shape = self._vector_search_shape("cities", filters, ("name",))
+        results = self._execute_prepared(shape, query, tuple(params))
 
         # Parse JSON data fields
         for city in results:
@@ -572,8 +669,9 @@ class PostgresqlDatabaseManager:
         query += " ORDER BY distance LIMIT %s"
         params.append(limit)
 
-        # Execute the query
-        results = self.execute_query(query, tuple(params))
+        # Execute as a prepared statement for this shape (table and filter columns)
+        shape = self._vector_search_shape("hotels", filters, ("city_id", "stars"))
+        results = self._execute_prepared(shape, query, tuple(params))
 
         # Parse JSON data fields
         for hotel in results:
@@ -725,8 +823,9 @@ class PostgresqlDatabaseManager:
         query += " ORDER BY distance LIMIT %s"
         params.append(limit)
 
-        # Execute the query
-        results = self.execute_query(query, tuple(params))
+        # Execute as a prepared statement for this shape (table and filter columns)
+        shape = self._vector_search_shape("restaurants", filters, ("city_id", "cuisine"))
+        results = self._execute_prepared(shape, query, tuple(params))
 
         # Parse JSON data fields
         for restaurant in results:
@@ -13,6 +13,7 @@ from collections import defaultdict
 from datetime import datetime, timedelta
 
 from src.utils.error_handler import UnifiedErrorHandler, reliability_tracker
+from src.utils.single_flight import SingleFlight, make_prompt_key
 
 logger = logging.getLogger(__name__)
 
@@ -34,6 +35,7 @@ class RateLimitedAnthropicService:
     - Timeout handling with retries
     - Graceful degradation
     - Usage analytics
+    - Coalescing of identical concurrent prompts
     """
     
     def __init__(self, anthropic_service, config: Optional[Dict[str, Any]] = None):
@@ -45,6 +47,7 @@ class RateLimitedAnthropicService:
             config: Configuration for rate limits and costs
         """
         self.anthropic_service = anthropic_service
+        self.single_flight = SingleFlight(name="anthropic_rate_limited")
         
         # Default configuration
         default_config = {
@@ -184,6 +187,9 @@ class RateLimitedAnthropicService:
         """
         Generate API response with rate limiting, timeout handling, and fallbacks.
         
+        Concurrent calls with the same normalized prompt and parameters share one
+        rate-limited call, so duplicates count once against rate and cost limits.
+        
         Args:
             prompt: The prompt to send to the API
             max_tokens: Maximum tokens in response
@@ -193,6 +199,19 @@ class RateLimitedAnthropicService:
         Returns:
             API response or graceful error response
         """
+        key = make_prompt_key(prompt, max_tokens=max_tokens, language=language, **kwargs)
+        response, coalesced = await self.single_flight.do_with_info(
+            key, lambda: self._generate_response_safe_uncoalesced(prompt, max_tokens, language, **kwargs)
+        )
+        
+        # Every waiter gets its own copy; followers are flagged as coalesced
+        response = dict(response)
+        response["coalesced"] = coalesced
+        return response
+    
+    async def _generate_response_safe_uncoalesced(self, prompt: str, max_tokens: int,
+                                                 language: str, **kwargs) -> Dict[str, Any]:
+        """Perform one rate-limited call with retries (see generate_response_safe)."""
         start_time = time.time()
         
         try:
@@ -295,15 +314,16 @@ class RateLimitedAnthropicService:
         Returns:
             Response text from API
         """
-        # Call the underlying Anthropic service
-        if hasattr(self.anthropic_service, 'generate_response'):
-            # Synchronous method
-            return self.anthropic_service.generate_response(
+        # Prefer the native async client so the event loop is never blocked
+        if hasattr(self.anthropic_service, 'generate_response_async'):
+            kwargs.setdefault('timeout', self.config['timeout_seconds'])
+            return await self.anthropic_service.generate_response_async(
                 prompt=prompt, max_tokens=max_tokens, **kwargs
             )
-        elif hasattr(self.anthropic_service, 'generate_response_async'):
-            # Asynchronous method
-            return await self.anthropic_service.generate_response_async(
+        elif hasattr(self.anthropic_service, 'generate_response'):
+            # Synchronous method - run in a worker thread
+            return await asyncio.to_thread(
+                self.anthropic_service.generate_response,
                 prompt=prompt, max_tokens=max_tokens, **kwargs
             )
         else:
@@ -322,7 +342,7 @@ class RateLimitedAnthropicService:
         hour_ago = now - 3600
         recent_calls = [t for t in self.call_timestamps['api_calls'] if t > hour_ago]
         
-        return {
+        analytics = {
             "rate_limits": {
                 "calls_this_hour": len(recent_calls),
                 "hourly_limit": self.config['max_calls_per_hour'],
@@ -360,6 +380,10 @@ class RateLimitedAnthropicService:
             },
             "timestamp": datetime.now().isoformat()
         }
+        
+        analytics["coalescing"] = self.single_flight.get_stats()
+        
+        return analytics
     
     def reset_tracking(self):
         """Reset all tracking data (for testing or manual reset)."""
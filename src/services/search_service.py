@@ -21,6 +21,7 @@ from typing import Dict, List, Optional, Any, Tuple, Union
 import numpy as np
 
 from src.services.base_service import BaseService
+from src.knowledge.text_search import TextSearchQueryBuilder, get_text_search_support, strip_search_columns
 
 logger = logging.getLogger(__name__)
 
@@ -166,7 +167,7 @@ class VectorSearchService(BaseService):
             params.append(limit)
             
             # Execute query
-            results = self.db_manager.execute_postgres_query(base_query, tuple(params))
+            results = strip_search_columns(self.db_manager.execute_postgres_query(base_query, tuple(params)))
             
             # Update stats
             self._search_stats['total_searches'] += 1
@@ -212,7 +213,7 @@ class VectorSearchService(BaseService):
             query += " LIMIT %s"
             params.append(limit)
             
-            return self.db_manager.execute_postgres_query(query, tuple(params)) or []
+            return strip_search_columns(self.db_manager.execute_postgres_query(query, tuple(params)))
             
         except Exception as e:
             logger.error(f"Fallback search failed: {e}")
@@ -433,7 +434,7 @@ class UnifiedSearchService(BaseService):
             params.extend([limit, offset])
             
             # Execute query using the database manager
-            results = self.db_manager.execute_postgres_query(query, tuple(params))
+            results = strip_search_columns(self.db_manager.execute_postgres_query(query, tuple(params)))
             
             # Parse JSONB fields if specified
             if jsonb_fields:
@@ -481,6 +482,12 @@ class UnifiedSearchService(BaseService):
         try:
             self._validate_table(table)
             
+            # Ranked search over the full-text/trigram indexes when the table has them
+            if query and query.strip() and all(key.isidentifier() for key in (filters or {})):
+                indexed_tables, trigram = get_text_search_support(self.db_manager.execute_postgres_query)
+                if table in indexed_tables:
+                    return self._indexed_text_search(table, query, filters, limit, trigram)
+            
             # Build text search query based on table
             if table == 'attractions':
                 search_fields = ['name_en', 'name_ar', 'description_en', 'description_ar']
@@ -551,6 +558,17 @@ class UnifiedSearchService(BaseService):
             logger.error(f"Text search failed: {e}")
             return []
 
+    def _indexed_text_search(self, table: str, query: str, filters: Optional[Dict[str, Any]],
+                             limit: int, trigram: bool) -> List[SearchResult]:
+        """Text search through the table's tsvector and trigram indexes, scored by search rank."""
+        builder = TextSearchQueryBuilder(trigram=trigram)
+        sql, params = builder.build(table, query, filters=filters, limit=limit)
+        results = strip_search_columns(self.db_manager.execute_postgres_query(sql, params))
+        return [
+            SearchResult(record=result, score=float(result.pop('search_rank', 0) or 0), search_type='text')
+            for result in results
+        ]
+
     def geo_search(self, table: str, latitude: float, longitude: float,
                   radius_km: float, filters: Optional[Dict[str, Any]] = None,
                   limit: int = 10) -> List[SearchResult]:
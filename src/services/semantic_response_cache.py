@@ -0,0 +1,352 @@
+"""
+Semantic LLM Response Cache
+
+Caches LLM answers keyed on the normalized query and looks up near-identical
+questions by cosine similarity of their embeddings. Entries are partitioned by
+language, expire after a TTL and are evicted least-recently-used. Entries can
+optionally be persisted to Redis through TieredCache so that workers share and
+survive restarts with a warm cache.
+"""
+
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+from src.utils.text_normalization import normalize_text
+from src.utils.tiered_cache import TieredCache
+
+logger = logging.getLogger(__name__)
+
+
+class _LanguagePartition:
+    """LRU-ordered cache entries for one language plus a packed, normalized embedding matrix."""
+
+    def __init__(self):
+        self.entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._matrix: Optional[np.ndarray] = None
+        self._matrix_keys: List[str] = []
+        self._dirty = True
+
+    def mark_dirty(self):
+        self._dirty = True
+
+    def matrix(self):
+        """Return (keys, matrix) for entries that have embeddings, rebuilding only when changed."""
+        if self._dirty:
+            keys = [key for key, entry in self.entries.items() if entry.get("embedding") is not None]
+            if keys:
+                # Only entries from the current embedding model (same dimension) are comparable
+                dimension = self.entries[keys[-1]]["embedding"].shape[0]
+                keys = [key for key in keys if self.entries[key]["embedding"].shape[0] == dimension]
+            if keys:
+                self._matrix = np.vstack([self.entries[key]["embedding"] for key in keys]).astype(np.float32)
+            else:
+                self._matrix = None
+            self._matrix_keys = keys
+            self._dirty = False
+        return self._matrix_keys, self._matrix
+
+
+class SemanticResponseCache:
+    """
+    Language-partitioned semantic cache for LLM responses.
+
+    Lookup order:
+    1. Exact match on the normalized query text (no embedding needed)
+    2. Cosine similarity against cached query embeddings, accepted above
+       ``similarity_threshold``
+    """
+
+    def __init__(self,
+                 embedding_fn: Optional[Callable[[str, Optional[str]], np.ndarray]] = None,
+                 similarity_threshold: float = 0.92,
+                 ttl: int = 86400,
+                 max_entries_per_language: int = 1000,
+                 redis_uri: Optional[str] = None,
+                 estimated_cost_per_call: float = 0.01):
+        """
+        Initialize the semantic response cache.
+
+        Args:
+            embedding_fn: Callable ``(text, language) -> np.ndarray`` such as
+                ``StandardizedEmbeddingService.generate_embedding``. Without it only
+                exact (normalized) matches are served.
+            similarity_threshold: Minimum cosine similarity for a semantic hit
+            ttl: Time to live of cached responses in seconds
+            max_entries_per_language: LRU capacity of each language partition
+            redis_uri: Optional Redis URI for persistence through TieredCache
+            estimated_cost_per_call: Estimated USD cost of one LLM call, used for cost-saved reporting
+        """
+        self.embedding_fn = embedding_fn
+        self.similarity_threshold = similarity_threshold
+        self.ttl = ttl
+        self.max_entries_per_language = max_entries_per_language
+        self.estimated_cost_per_call = estimated_cost_per_call
+
+        self._partitions: Dict[str, _LanguagePartition] = {}
+        self._lock = threading.RLock()
+
+        self.stats = {
+            'lookups': 0,
+            'exact_hits': 0,
+            'semantic_hits': 0,
+            'misses': 0,
+            'stores': 0,
+            'evictions': 0,
+            'expirations': 0,
+            'similarity_sum': 0.0
+        }
+
+        self.store = None
+        if redis_uri:
+            self.store = TieredCache(
+                cache_prefix="semantic_response",
+                redis_uri=redis_uri,
+                ttl=ttl,
+                max_size=max_entries_per_language
+            )
+            if self.store.redis_client is None:
+                # TieredCache fell back to memory only; our own partitions already cover that
+                self.store = None
+
+        logger.info(
+            f"✅ Initialized SemanticResponseCache (threshold={similarity_threshold}, ttl={ttl}s, "
+            f"max_entries={max_entries_per_language}, persistent={self.store is not None})"
+        )
+
+    @staticmethod
+    def _entry_key(normalized_query: str) -> str:
+        return hashlib.sha1(normalized_query.encode("utf-8")).hexdigest()
+
+    def _partition(self, language: str) -> _LanguagePartition:
+        partition = self._partitions.get(language)
+        if partition is None:
+            partition = _LanguagePartition()
+            self._partitions[language] = partition
+        return partition
+
+    def _embed(self, text: str, language: str) -> Optional[np.ndarray]:
+        """Embed and L2-normalize text, returning None if no usable embedding is available."""
+        if self.embedding_fn is None:
+            return None
+        try:
+            embedding = np.asarray(self.embedding_fn(text, language), dtype=np.float32).ravel()
+        except Exception as e:
+            logger.warning(f"Semantic cache embedding failed: {e}")
+            return None
+        norm = np.linalg.norm(embedding)
+        if embedding.size == 0 or not np.isfinite(norm) or norm == 0:
+            return None
+        return embedding / norm
+
+    def _is_expired(self, entry: Dict[str, Any], now: float) -> bool:
+        return now - entry["created_at"] > self.ttl
+
+    def _purge_expired(self, partition: _LanguagePartition, now: float) -> None:
+        expired = [key for key, entry in partition.entries.items() if self._is_expired(entry, now)]
+        for key in expired:
+            del partition.entries[key]
+        if expired:
+            partition.mark_dirty()
+            self.stats['expirations'] += len(expired)
+
+    def lookup(self, query: str, language: str = "en") -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached response for a query.
+
+        Args:
+            query: The user's query
+            language: Language partition to search
+
+        Returns:
+            Dict with ``text``, ``match_type`` and ``similarity`` on a hit, otherwise None
+        """
+        normalized = normalize_text(query)
+        if not normalized:
+            return None
+
+        with self._lock:
+            self.stats['lookups'] += 1
+            now = time.time()
+            partition = self._partition(language)
+            key = self._entry_key(normalized)
+
+            entry = partition.entries.get(key)
+            if entry is None and self.store is not None:
+                entry = self._load_persisted_entry(partition, language, key)
+            if entry is not None:
+                if not self._is_expired(entry, now):
+                    partition.entries.move_to_end(key)
+                    self.stats['exact_hits'] += 1
+                    return {"text": entry["text"], "match_type": "exact", "similarity": 1.0}
+                del partition.entries[key]
+                partition.mark_dirty()
+                self.stats['expirations'] += 1
+
+        query_embedding = self._embed(normalized, language)
+
+        with self._lock:
+            if query_embedding is not None:
+                self._purge_expired(partition, now)
+                keys, matrix = partition.matrix()
+                if matrix is not None and matrix.shape[1] == query_embedding.shape[0]:
+                    similarities = matrix @ query_embedding
+                    best = int(np.argmax(similarities))
+                    best_similarity = float(similarities[best])
+                    if best_similarity >= self.similarity_threshold:
+                        best_key = keys[best]
+                        partition.entries.move_to_end(best_key)
+                        self.stats['semantic_hits'] += 1
+                        self.stats['similarity_sum'] += best_similarity
+                        return {
+                            "text": partition.entries[best_key]["text"],
+                            "match_type": "semantic",
+                            "similarity": best_similarity
+                        }
+
+            self.stats['misses'] += 1
+            return None
+
+    def store_response(self, query: str, response_text: str, language: str = "en") -> None:
+        """
+        Cache a response for a query.
+
+        Args:
+            query: The user's query
+            response_text: The LLM response to cache
+            language: Language partition to store into
+        """
+        normalized = normalize_text(query)
+        if not normalized or not response_text:
+            return
+
+        embedding = self._embed(normalized, language)
+
+        with self._lock:
+            partition = self._partition(language)
+            key = self._entry_key(normalized)
+            entry = {
+                "query": normalized,
+                "text": response_text,
+                "embedding": embedding,
+                "created_at": time.time()
+            }
+            partition.entries[key] = entry
+            partition.entries.move_to_end(key)
+            partition.mark_dirty()
+            self.stats['stores'] += 1
+
+            while len(partition.entries) > self.max_entries_per_language:
+                partition.entries.popitem(last=False)
+                self.stats['evictions'] += 1
+
+        if self.store is not None:
+            self._persist_entry(language, key, entry)
+
+    def _persist_entry(self, language: str, key: str, entry: Dict[str, Any]) -> None:
+        """Write an entry and update the language index in the persistent store."""
+        try:
+            payload = dict(entry)
+            payload["embedding"] = entry["embedding"].tolist() if entry["embedding"] is not None else None
+            self.store.set({"language": language, "entry": key}, payload)
+
+            index = self.store.get({"language": language, "index": "entries"}) or []
+            if key not in index:
+                index.append(key)
+                index = index[-self.max_entries_per_language:]
+                self.store.set({"language": language, "index": "entries"}, index)
+        except Exception as e:
+            logger.warning(f"Failed to persist semantic cache entry: {e}")
+
+    def _load_persisted_entry(self, partition: _LanguagePartition, language: str,
+                              key: str) -> Optional[Dict[str, Any]]:
+        """Load a single entry from the persistent store into the in-memory partition."""
+        try:
+            payload = self.store.get({"language": language, "entry": key})
+        except Exception as e:
+            logger.warning(f"Failed to read semantic cache entry: {e}")
+            return None
+        if not payload:
+            return None
+
+        embedding = payload.get("embedding")
+        payload["embedding"] = np.asarray(embedding, dtype=np.float32) if embedding else None
+        partition.entries[key] = payload
+        partition.mark_dirty()
+        return payload
+
+    def warm_from_store(self, languages: Optional[List[str]] = None) -> int:
+        """
+        Load persisted entries into memory so semantic lookups can match them.
+
+        Args:
+            languages: Language partitions to load (defaults to en and ar)
+
+        Returns:
+            Number of entries loaded
+        """
+        if self.store is None:
+            return 0
+
+        loaded = 0
+        now = time.time()
+        for language in languages or ["en", "ar"]:
+            try:
+                index = self.store.get({"language": language, "index": "entries"}) or []
+            except Exception as e:
+                logger.warning(f"Failed to read semantic cache index for {language}: {e}")
+                continue
+            with self._lock:
+                partition = self._partition(language)
+                for key in index:
+                    entry = self._load_persisted_entry(partition, language, key)
+                    if entry is not None and not self._is_expired(entry, now):
+                        loaded += 1
+                self._purge_expired(partition, now)
+
+        logger.info(f"Warmed semantic response cache with {loaded} persisted entries")
+        return loaded
+
+    def clear(self) -> None:
+        """Clear all in-memory entries (persisted entries expire via TTL)."""
+        with self._lock:
+            self._partitions.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics including hit rate and estimated cost saved.
+
+        Returns:
+            Dictionary with cache statistics
+        """
+        with self._lock:
+            hits = self.stats['exact_hits'] + self.stats['semantic_hits']
+            lookups = self.stats['lookups']
+            return {
+                "lookups": lookups,
+                "hits": hits,
+                "exact_hits": self.stats['exact_hits'],
+                "semantic_hits": self.stats['semantic_hits'],
+                "misses": self.stats['misses'],
+                "hit_rate": (hits / lookups) * 100 if lookups else 0.0,
+                "average_semantic_similarity": (
+                    self.stats['similarity_sum'] / self.stats['semantic_hits']
+                    if self.stats['semantic_hits'] else 0.0
+                ),
+                "estimated_cost_saved_usd": hits * self.estimated_cost_per_call,
+                "stores": self.stats['stores'],
+                "evictions": self.stats['evictions'],
+                "expirations": self.stats['expirations'],
+                "entries_by_language": {
+                    language: len(partition.entries)
+                    for language, partition in self._partitions.items()
+                },
+                "similarity_threshold": self.similarity_threshold,
+                "ttl_seconds": self.ttl,
+                "persistent": self.store is not None
+            }
@@ -9,8 +9,10 @@ import os
 import uuid
 from typing import Dict, List, Any, Optional
 from datetime import datetime, timedelta
+import sqlite3
 import threading
 import time
+import zlib
 import redis
 
 logger = logging.getLogger(__name__)
@@ -163,10 +165,10 @@ class SessionManager:
                 os.remove(test_file)
                 
                 # Initialize file storage backend
-                self.storage_backend = FileSessionStorage(file_path)
+                self.storage_backend = self._create_file_storage(file_path)
                 logger.info(f"Fallback file storage initialized at: {file_path}")
                 return
-            except (IOError, OSError, PermissionError) as e:
+            except (IOError, OSError, PermissionError, sqlite3.Error) as e:
                 logger.warning(f"Cannot use {file_path} for fallback storage: {str(e)}")
         
         # If we get here, we couldn't create a writable directory
@@ -185,7 +187,7 @@ class SessionManager:
             os.makedirs(file_path, exist_ok=True)
             
             # Initialize file backend
-            self.storage_backend = FileSessionStorage(file_path)
+            self.storage_backend = self._create_file_storage(file_path)
             
             logger.info(f"File storage backend initialized: {file_path}")
         except Exception as e:
@@ -193,6 +195,23 @@ class SessionManager:
             logger.info("Using in-memory session storage")
             self.storage_backend = None
     
+    def _create_file_storage(self, file_path: str) -> "SQLiteSessionStorage":
+        """
+        Create the embedded SQLite session store in a directory.
+        
+        Sessions left by the previous one-JSON-file-per-session backend are
+        imported on first use.
+        
+        Args:
+            file_path (str): Session storage directory
+            
+        Returns:
+            SQLiteSessionStorage: Storage backend
+        """
+        storage = SQLiteSessionStorage(os.path.join(file_path, "sessions.db"), session_ttl=self.session_ttl)
+        storage.import_json_files(file_path)
+        return storage
+    
     def create_session(self) -> str:
         """
         Create a new session.
@@ -600,6 +619,17 @@ class SessionManager:
                 for session_id in expired_sessions:
                     self.delete_session(session_id)
                 
+                # Bulk-expire stored sessions, touching only the rows that are due
+                if isinstance(self.storage_backend, SQLiteSessionStorage):
+                    while True:
+                        expired_batch = self.storage_backend.delete_expired(limit=1000)
+                        with self.session_lock:
+                            for session_id in expired_batch:
+                                self.sessions.pop(session_id, None)
+                        expired_sessions.extend(expired_batch)
+                        if len(expired_batch) < 1000:
+                            break
+                
                 if expired_sessions:
                     logger.info(f"Cleaned up {len(expired_sessions)} expired sessions")
             
@@ -705,4 +735,267 @@ class FileSessionStorage:
             return sessions
         except Exception as e:
             logger.error(f"Failed to get all sessions: {str(e)}")
-            return {}
\ No newline at end of file
+            return {}
+
+class SQLiteSessionStorage:
+    """
+    Embedded session storage backend on SQLite in WAL mode.
+    
+    Sessions are stored as compact (optionally zlib-compressed) JSON in one
+    table with an index on ``last_accessed``, so expiry deletes only the rows
+    that are due instead of scanning and parsing every session. Writes are
+    atomic upserts.
+    """
+    
+    # Payloads larger than this are stored zlib-compressed
+    COMPRESS_THRESHOLD = 1024
+    
+    ENCODING_JSON = 0
+    ENCODING_ZLIB_JSON = 1
+    
+    def __init__(self, db_path: str, session_ttl: Optional[int] = None):
+        """
+        Initialize SQLite session storage.
+        
+        Args:
+            db_path (str): Path to the SQLite database file
+            session_ttl (int, optional): Sessions not written for this many seconds are treated as expired
+        """
+        self.db_path = db_path
+        self.session_ttl = session_ttl
+        self.lock = threading.Lock()
+        
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        
+        # One shared connection; access is serialized by self.lock
+        self.conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA busy_timeout=5000")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS sessions (
+                session_id TEXT PRIMARY KEY,
+                data BLOB NOT NULL,
+                encoding INTEGER NOT NULL DEFAULT 0,
+                last_accessed REAL NOT NULL
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_sessions_last_accessed ON sessions(last_accessed)")
+    
+    def _encode(self, session_data: Dict) -> tuple:
+        payload = json.dumps(session_data, separators=(',', ':'), ensure_ascii=False, default=str).encode('utf-8')
+        if len(payload) > self.COMPRESS_THRESHOLD:
+            return zlib.compress(payload), self.ENCODING_ZLIB_JSON
+        return payload, self.ENCODING_JSON
+    
+    def _decode(self, data: bytes, encoding: int) -> Dict:
+        if encoding == self.ENCODING_ZLIB_JSON:
+            data = zlib.decompress(data)
+        return json.loads(data)
+    
+    def _cutoff(self) -> float:
+        return time.time() - self.session_ttl if self.session_ttl else 0.0
+    
+    def get(self, session_id: str) -> Optional[Dict]:
+        """
+        Get session data by ID.
+        
+        Args:
+            session_id (str): Session ID
+            
+        Returns:
+            dict: Session data if found and not expired, None otherwise
+        """
+        try:
+            with self.lock:
+                row = self.conn.execute(
+                    "SELECT data, encoding FROM sessions WHERE session_id = ? AND last_accessed >= ?",
+                    (session_id, self._cutoff())
+                ).fetchone()
+            return self._decode(row[0], row[1]) if row else None
+        except Exception as e:
+            logger.error(f"Failed to read session {session_id} from SQLite: {str(e)}")
+            return None
+    
+    def set(self, session_id: str, session_data: Dict) -> bool:
+        """
+        Store session data (atomic upsert).
+        
+        Args:
+            session_id (str): Session ID
+            session_data (dict): Session data
+            
+        Returns:
+            bool: Success status
+        """
+        return self.set_many({session_id: session_data})
+    
+    def set_many(self, sessions: Dict[str, Dict], last_accessed: Optional[Dict[str, float]] = None) -> bool:
+        """
+        Store several sessions in one transaction.
+        
+        Args:
+            sessions (dict): Session ID -> session data
+            last_accessed (dict, optional): Session ID -> last access time to store
+                instead of now (used when importing existing sessions)
+            
+        Returns:
+            bool: Success status
+        """
+        try:
+            now = time.time()
+            last_accessed = last_accessed or {}
+            rows = [
+                (session_id, *self._encode(session_data), last_accessed.get(session_id, now))
+                for session_id, session_data in sessions.items()
+            ]
+            with self.lock:
+                self.conn.execute("BEGIN IMMEDIATE")
+                try:
+                    self.conn.executemany(
+                        """
+                        INSERT INTO sessions (session_id, data, encoding, last_accessed) VALUES (?, ?, ?, ?)
+                        ON CONFLICT(session_id) DO UPDATE SET
+                            data = excluded.data,
+                            encoding = excluded.encoding,
+                            last_accessed = excluded.last_accessed
+                        """,
+                        rows
+                    )
+                    self.conn.execute("COMMIT")
+                except Exception:
+                    self.conn.execute("ROLLBACK")
+                    raise
+            return True
+        except Exception as e:
+            logger.error(f"Failed to write sessions to SQLite: {str(e)}")
+            return False
+    
+    def delete(self, session_id: str) -> bool:
+        """
+        Delete session data.
+        
+        Args:
+            session_id (str): Session ID
+            
+        Returns:
+            bool: Success status
+        """
+        try:
+            with self.lock:
+                self.conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+            return True
+        except Exception as e:
+            logger.error(f"Failed to delete session {session_id} from SQLite: {str(e)}")
+            return False
+    
+    def delete_expired(self, cutoff: Optional[float] = None, limit: int = 1000) -> List[str]:
+        """
+        Delete sessions last written before ``cutoff``, oldest first.
+        
+        Only the expired rows are touched (range scan on the last_accessed index).
+        
+        Args:
+            cutoff (float, optional): Unix timestamp; defaults to now - session_ttl
+            limit (int): Maximum number of sessions deleted in this batch
+            
+        Returns:
+            list: IDs of the deleted sessions
+        """
+        cutoff = self._cutoff() if cutoff is None else cutoff
+        try:
+            with self.lock:
+                self.conn.execute("BEGIN IMMEDIATE")
+                try:
+                    expired = [row[0] for row in self.conn.execute(
+                        "SELECT session_id FROM sessions WHERE last_accessed < ? ORDER BY last_accessed LIMIT ?",
+                        (cutoff, limit)
+                    )]
+                    self.conn.executemany("DELETE FROM sessions WHERE session_id = ?", [(sid,) for sid in expired])
+                    self.conn.execute("COMMIT")
+                except Exception:
+                    self.conn.execute("ROLLBACK")
+                    raise
+            return expired
+        except Exception as e:
+            logger.error(f"Failed to delete expired sessions from SQLite: {str(e)}")
+            return []
+    
+    def get_all(self) -> Dict[str, Dict]:
+        """
+        Get all sessions that have not expired.
+        
+        Returns:
+            dict: Dictionary of session ID to session data
+        """
+        try:
+            with self.lock:
+                rows = self.conn.execute(
+                    "SELECT session_id, data, encoding FROM sessions WHERE last_accessed >= ?",
+                    (self._cutoff(),)
+                ).fetchall()
+            return {session_id: self._decode(data, encoding) for session_id, data, encoding in rows}
+        except Exception as e:
+            logger.error(f"Failed to get all sessions: {str(e)}")
+            return {}
+    
+    def count(self) -> int:
+        """Number of stored sessions (including expired rows not yet deleted)."""
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+    
+    def import_json_files(self, directory: str) -> int:
+        """
+        Import sessions from a legacy one-JSON-file-per-session directory.
+        
+        Imported files are removed once they are stored in SQLite. Each session
+        keeps its original last activity time, so stale sessions still expire
+        on schedule instead of getting a fresh TTL.
+        
+        Args:
+            directory (str): Directory containing ``<session_id>.json`` files
+            
+        Returns:
+            int: Number of sessions imported
+        """
+        legacy = FileSessionStorage(directory).get_all()
+        last_accessed = {
+            session_id: self._legacy_last_accessed(session_data, os.path.join(directory, f"{session_id}.json"))
+            for session_id, session_data in legacy.items()
+        }
+        if not legacy or not self.set_many(legacy, last_accessed):
+            return 0
+        
+        for session_id in legacy:
+            FileSessionStorage(directory).delete(session_id)
+        logger.info(f"Imported {len(legacy)} legacy JSON sessions into {self.db_path}")
+        return len(legacy)
+    
+    @staticmethod
+    def _legacy_last_accessed(session_data: Dict, file_name: str) -> float:
+        """
+        Last activity time of a legacy JSON session.
+        
+        Uses the session's ``last_activity``/``last_accessed`` field (ISO string or
+        Unix timestamp), falling back to the file's modification time.
+        """
+        for field in ("last_activity", "last_accessed"):
+            value = session_data.get(field)
+            try:
+                if isinstance(value, (int, float)):
+                    return float(value)
+                if isinstance(value, str):
+                    return datetime.fromisoformat(value).timestamp()
+            except ValueError:
+                continue
+        try:
+            return os.path.getmtime(file_name)
+        except OSError:
+            return time.time()
+    
+    def close(self) -> None:
+        """Close the database connection."""
+        with self.lock:
+            self.conn.close()
@@ -0,0 +1,235 @@
+"""
+Text Search Benchmarking Utilities
+
+This module compares the indexed full-text/trigram search built by
+TextSearchQueryBuilder with the ILIKE '%q%' queries it replaces: latency,
+result overlap, and whether the query plan uses an index.
+"""
+
+import json
+import time
+import statistics
+from typing import Any, Dict, List, Optional, Set
+
+from src.utils.logger import get_logger
+from src.knowledge.text_search import TextSearchQueryBuilder, build_ilike_query, get_text_search_support
+from src.services.postgres_database_service import PostgresqlDatabaseManager
+
+logger = get_logger(__name__)
+
+# Sample queries per table: exact names, partial names, Arabic spellings and typos
+DEFAULT_QUERIES = {
+    "attractions": ["pyramids", "egyptian museum", "karnak temple", "pyramds of giza", "الأهرامات", "المتحف المصري"],
+    "restaurants": ["koshary", "seafood", "nile view", "كشري"],
+    "accommodations": ["nile", "resort", "marriot", "فندق"],
+    "cities": ["cairo", "luxor", "aswan", "alexandria", "القاهرة", "الاسكندرية"],
+}
+
+
+class TextSearchBenchmark:
+    """Benchmark utility comparing indexed text search with ILIKE scans."""
+
+    def __init__(self, db_manager: PostgresqlDatabaseManager):
+        """
+        Initialize the benchmark utility.
+
+        Args:
+            db_manager: Database manager providing execute_query(query, params)
+        """
+        self.db_manager = db_manager
+
+    def _time_queries(self, queries: List[tuple], iterations: int) -> Dict[str, Any]:
+        """
+        Time a list of (sql, params) queries.
+
+        Returns:
+            Timing statistics plus the IDs returned for each query
+        """
+        timings = []
+        result_counts = []
+        result_ids: List[Set[Any]] = []
+
+        for sql, params in queries:
+            ids: Set[Any] = set()
+            for _ in range(iterations):
+                start_time = time.time()
+                results = self.db_manager.execute_query(sql, params) or []
+                timings.append(time.time() - start_time)
+                ids = {result.get("id") for result in results}
+            result_counts.append(len(ids))
+            result_ids.append(ids)
+
+        return {
+            "avg_time": statistics.mean(timings),
+            "median_time": statistics.median(timings),
+            "min_time": min(timings),
+            "max_time": max(timings),
+            "std_dev": statistics.stdev(timings) if len(timings) > 1 else 0,
+            "iterations": iterations,
+            "avg_results": statistics.mean(result_counts),
+            "result_ids": result_ids
+        }
+
+    def _plan_nodes(self, sql: str, params: tuple) -> List[str]:
+        """
+        Get the node types of a query's execution plan.
+
+        Returns:
+            List of plan node types (e.g. "Seq Scan", "Bitmap Index Scan")
+        """
+        try:
+            rows = self.db_manager.execute_query(f"EXPLAIN (FORMAT JSON) {sql}", params)
+            if not rows:
+                return []
+            plan = list(rows[0].values())[0]
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+
+            nodes = []
+            pending = [plan[0]["Plan"]]
+            while pending:
+                node = pending.pop()
+                nodes.append(node.get("Node Type"))
+                pending.extend(node.get("Plans", []))
+            return nodes
+        except Exception as e:
+            logger.warning(f"Could not explain query: {str(e)}")
+            return []
+
+    def benchmark_table(self, table: str, queries: List[str], iterations: int = 5,
+                        limit: int = 10) -> Dict[str, Any]:
+        """
+        Benchmark indexed search against ILIKE for one table.
+
+        Args:
+            table: Table to search
+            queries: Query texts to run
+            iterations: Number of runs per query
+            limit: Search result limit
+
+        Returns:
+            Dictionary with "ilike" and "indexed" timing statistics, speedup,
+            result overlap and the scan types of both plans
+        """
+        _, trigram = get_text_search_support(self.db_manager.execute_query, force=True)
+        builder = TextSearchQueryBuilder(trigram=trigram)
+
+        ilike_queries = [build_ilike_query(table, query, limit=limit) for query in queries]
+        indexed_queries = [builder.build(table, query, limit=limit) for query in queries]
+
+        ilike = self._time_queries(ilike_queries, iterations)
+        indexed = self._time_queries(indexed_queries, iterations)
+
+        # Share of ILIKE results the indexed search also finds
+        overlaps = [
+            len(ilike_ids & indexed_ids) / len(ilike_ids)
+            for ilike_ids, indexed_ids in zip(ilike.pop("result_ids"), indexed.pop("result_ids"))
+            if ilike_ids
+        ]
+
+        results = {
+            "ilike": ilike,
+            "indexed": indexed,
+            "speedup": ilike["avg_time"] / indexed["avg_time"] if indexed["avg_time"] else 0,
+            "overlap": statistics.mean(overlaps) if overlaps else None,
+            "ilike_plan": self._plan_nodes(*ilike_queries[0]) if queries else [],
+            "indexed_plan": self._plan_nodes(*indexed_queries[0]) if queries else []
+        }
+
+        logger.info(f"Text search benchmark for {table}: ILIKE {ilike['avg_time']:.4f}s, "
+                    f"indexed {indexed['avg_time']:.4f}s, speedup {results['speedup']:.1f}x")
+        return results
+
+    def benchmark_all_text_search(self, iterations: int = 5,
+                                  queries: Optional[Dict[str, List[str]]] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Benchmark every migrated table.
+
+        Args:
+            iterations: Number of runs per query
+            queries: Table -> query texts (defaults to DEFAULT_QUERIES)
+
+        Returns:
+            Dictionary with benchmark results for each table
+        """
+        queries = queries or DEFAULT_QUERIES
+        indexed_tables, _ = get_text_search_support(self.db_manager.execute_query, force=True)
+
+        results = {}
+        for table, table_queries in queries.items():
+            if table not in indexed_tables:
+                logger.warning(f"Skipping {table}: no text search columns (run database initialization first)")
+                continue
+            results[table] = self.benchmark_table(table, table_queries, iterations=iterations)
+        return results
+
+    def generate_benchmark_report(self, results: Dict[str, Dict[str, Any]]) -> str:
+        """
+        Generate a readable benchmark report.
+
+        Args:
+            results: Benchmark results from benchmark_all_text_search
+
+        Returns:
+            Formatted report string
+        """
+        report_lines = ["# Text Search Performance Benchmark Report", ""]
+
+        # Add a summary table
+        report_lines.append("## Summary")
+        report_lines.append("")
+        report_lines.append("| Table | ILIKE Avg (s) | Indexed Avg (s) | Speedup | Result Overlap |")
+        report_lines.append("|-------|--------------|----------------|---------|----------------|")
+
+        for table, stats in results.items():
+            overlap = f"{stats['overlap']:.0%}" if stats["overlap"] is not None else "n/a"
+            report_lines.append(
+                f"| {table} | {stats['ilike']['avg_time']:.4f} | {stats['indexed']['avg_time']:.4f} | "
+                f"{stats['speedup']:.1f}x | {overlap} |"
+            )
+
+        report_lines.append("")
+        report_lines.append("## Detailed Results")
+
+        for table, stats in results.items():
+            report_lines.append(f"### {table}")
+            for method in ("ilike", "indexed"):
+                method_stats = stats[method]
+                report_lines.append(f"- {method}: avg {method_stats['avg_time']:.4f}s, "
+                                    f"median {method_stats['median_time']:.4f}s, "
+                                    f"min {method_stats['min_time']:.4f}s, "
+                                    f"max {method_stats['max_time']:.4f}s, "
+                                    f"avg results {method_stats['avg_results']:.1f}")
+            report_lines.append(f"- ILIKE plan: {', '.join(filter(None, stats['ilike_plan'])) or 'n/a'}")
+            report_lines.append(f"- Indexed plan: {', '.join(filter(None, stats['indexed_plan'])) or 'n/a'}")
+            report_lines.append("")
+
+        return "\n".join(report_lines)
+
+def main():
+    """Run benchmarks as a standalone script."""
+    # Connect to database
+    db_uri = input("Enter PostgreSQL database URI (or press Enter for default): ")
+    db_uri = db_uri.strip() if db_uri.strip() else None
+
+    db_manager = PostgresqlDatabaseManager(database_uri=db_uri)
+    benchmark = TextSearchBenchmark(db_manager)
+
+    # Number of iterations
+    iterations = int(input("Number of benchmark iterations per query (default 5): ") or "5")
+
+    print(f"Running text search benchmarks with {iterations} iterations each...")
+    results = benchmark.benchmark_all_text_search(iterations=iterations)
+
+    # Generate and save report
+    report = benchmark.generate_benchmark_report(results)
+    with open("text_search_benchmark_report.md", "w") as f:
+        f.write(report)
+
+    print("Benchmark completed. Results saved to text_search_benchmark_report.md")
+
+    # Close database connection
+    db_manager.disconnect()
+
+if __name__ == "__main__":
+    main()
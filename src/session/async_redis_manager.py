@@ -0,0 +1,510 @@
+"""
+asyncio Redis session manager.
+
+Uses the same key layout as RedisSessionManager (metadata hash plus capped
+message list), so sync and async callers share sessions. Every operation is a
+single pipelined round trip on redis.asyncio, so request handlers never block
+the event loop on session I/O.
+"""
+
+import json
+import logging
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
+
+from redis.exceptions import RedisError
+
+from src.config_unified import settings
+from src.session.expiry_index import DEFAULT_CLEANUP_BATCH_SIZE, EXPIRY_INDEX_KEY, EXPIRY_OWNERS_KEY
+from src.session.redis_connection import RedisConnectionManager
+from src.session.redis_manager import (
+    build_message,
+    decode_session,
+    encode_session_fields,
+    index_user_session,
+    messages_key,
+    session_key,
+    session_owner,
+    user_sessions_key,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncRedisSessionManager:
+    """Session manager on redis.asyncio with a local memory fallback"""
+
+    # Seconds to wait before trying Redis again after a failure
+    RETRY_INTERVAL = 30.0
+
+    def __init__(self, redis_uri: str, session_ttl: int = 3600, max_messages: Optional[int] = None,
+                 local_sessions: Optional[Dict[str, Dict[str, Any]]] = None,
+                 local_sessions_lock: Optional[threading.RLock] = None):
+        """
+        Initialize the asyncio Redis session manager
+
+        Args:
+            redis_uri (str): Redis connection URI
+            session_ttl (int, optional): Session time-to-live in seconds. Defaults to 3600 (1 hour).
+            max_messages (int, optional): Messages kept per session. Defaults to settings.session_max_messages.
+            local_sessions (Dict, optional): Local fallback store to share with a sync manager
+            local_sessions_lock (RLock, optional): Lock guarding ``local_sessions``
+        """
+        self.redis_uri = redis_uri
+        self.session_ttl = session_ttl
+        self.max_messages = max_messages or settings.session_max_messages
+        self.redis = RedisConnectionManager.get_async_redis_client(redis_uri)
+
+        self._local_sessions = local_sessions if local_sessions is not None else {}
+        self._local_sessions_lock = local_sessions_lock or threading.RLock()
+        self._unavailable_until = 0.0
+
+        logger.info(f"asyncio Redis session manager ready for {redis_uri} "
+                    f"(TTL: {session_ttl}s, max messages: {self.max_messages})")
+
+    # --- Availability and local fallback ---
+
+    def _redis_available(self) -> bool:
+        return time.time() >= self._unavailable_until
+
+    def _mark_unavailable(self, error: Exception) -> None:
+        logger.error(f"Redis session operation failed, using local memory for {self.RETRY_INTERVAL:.0f}s: {error}")
+        self._unavailable_until = time.time() + self.RETRY_INTERVAL
+
+    def _get_local(self, session_id: str) -> Optional[Dict[str, Any]]:
+        with self._local_sessions_lock:
+            session = self._local_sessions.get(session_id)
+            if session is not None:
+                session["last_accessed"] = time.time()
+            return session
+
+    def _cache_local(self, session_id: str, session: Dict[str, Any]) -> None:
+        with self._local_sessions_lock:
+            self._local_sessions[session_id] = session.copy()
+
+    def _update_local(self, session_id: str, updates: Dict[str, Any]) -> bool:
+        with self._local_sessions_lock:
+            session = self._local_sessions.get(session_id)
+            if session is None:
+                return False
+            session.update(updates)
+            session["last_accessed"] = time.time()
+            return True
+
+    def _add_local_message(self, session_id: str, message: Dict[str, Any]) -> None:
+        with self._local_sessions_lock:
+            session = self._local_sessions.setdefault(session_id, {
+                "session_id": session_id,
+                "created_at": time.time(),
+                "messages": [],
+                "message_count": 0,
+                "metadata": {},
+                "context": {}
+            })
+            session["messages"] = (list(session.get("messages", [])) + [message])[-self.max_messages:]
+            session["message_count"] = session.get("message_count", 0) + 1
+            session["last_accessed"] = time.time()
+
+    def _expire(self, pipe, session_id: str, existing_only: bool = False) -> None:
+        # Refresh key TTLs and the session's score in the expiry index together.
+        # Reads pass existing_only so a missing session is never indexed; past-due
+        # entries are left for cleanup_expired_sessions, which also unlinks the user set.
+        pipe.expire(session_key(session_id), self.session_ttl)
+        pipe.expire(messages_key(session_id), self.session_ttl)
+        pipe.zadd(EXPIRY_INDEX_KEY, {session_id: time.time() + self.session_ttl}, xx=existing_only)
+
+    # --- Session operations ---
+
+    async def create_session(self, user_id: Optional[str] = None, metadata: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Create a new session
+
+        Args:
+            user_id (str, optional): User ID to associate with the session. Defaults to None.
+            metadata (Dict[str, Any], optional): Additional metadata. Defaults to None.
+
+        Returns:
+            str: Session ID
+        """
+        session_id = str(uuid.uuid4())
+        timestamp = time.time()
+        session = {
+            "session_id": session_id,
+            "created_at": timestamp,
+            "last_accessed": timestamp,
+            "user_id": user_id,
+            "metadata": metadata or {},
+            "messages": [],
+            "message_count": 0
+        }
+        self._cache_local(session_id, session)
+
+        if self._redis_available():
+            try:
+                async with self.redis.pipeline(transaction=False) as pipe:
+                    pipe.hset(session_key(session_id), mapping={**encode_session_fields(session), "message_count": 0})
+                    self._expire(pipe, session_id)
+                    if user_id:
+                        index_user_session(pipe, user_id, session_id, self.session_ttl)
+                    await pipe.execute()
+            except RedisError as e:
+                self._mark_unavailable(e)
+
+        return session_id
+
+    async def get_session(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get session data by session ID, refreshing its TTL
+
+        Args:
+            session_id (str): Session ID
+
+        Returns:
+            Optional[Dict[str, Any]]: Session data or None if not found
+        """
+        if not self._redis_available():
+            return self._get_local(session_id)
+
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                pipe.hgetall(session_key(session_id))
+                pipe.lrange(messages_key(session_id), 0, -1)
+                self._expire(pipe, session_id, existing_only=True)
+                fields, messages = (await pipe.execute())[:2]
+            if not fields:
+                return None
+
+            session = decode_session(fields, messages)
+            session["last_accessed"] = time.time()
+            await self.redis.hset(session_key(session_id), "last_accessed", json.dumps(session["last_accessed"]))
+
+            self._cache_local(session_id, session)
+            return session
+
+        except RedisError as e:
+            self._mark_unavailable(e)
+            return self._get_local(session_id)
+
+    async def update_session(self, session_id: str, updates: Dict[str, Any]) -> bool:
+        """
+        Update individual session fields without reading or rewriting the session
+
+        Args:
+            session_id (str): Session ID
+            updates (Dict[str, Any]): Fields to update
+
+        Returns:
+            bool: True if successful, False if session not found
+        """
+        updates = {key: value for key, value in updates.items() if key not in ("session_id", "created_at")}
+        found_locally = self._update_local(session_id, updates)
+        if not self._redis_available():
+            return found_locally
+
+        fields = encode_session_fields(updates)
+        fields["last_accessed"] = json.dumps(time.time())
+        try:
+            if not await self.redis.exists(session_key(session_id)):
+                return False
+            async with self.redis.pipeline(transaction=False) as pipe:
+                pipe.hset(session_key(session_id), mapping=fields)
+                self._expire(pipe, session_id)
+                await pipe.execute()
+            return True
+
+        except RedisError as e:
+            self._mark_unavailable(e)
+            return found_locally
+
+    async def save_session(self, session_id: str, session_data: Dict[str, Any]) -> bool:
+        """
+        Save session data fields
+
+        Messages are not rewritten: they are only appended through
+        ``add_message_to_session``.
+
+        Args:
+            session_id (str): Session ID
+            session_data (Dict[str, Any]): Session data
+
+        Returns:
+            bool: True if successful (local fallback counts as success)
+        """
+        if "session_id" in session_data and session_data["session_id"] != session_id:
+            logger.warning(f"Session ID mismatch: {session_id} vs {session_data['session_id']}")
+            session_data["session_id"] = session_id
+        session_data["last_accessed"] = time.time()
+        self._cache_local(session_id, session_data)
+
+        if not self._redis_available():
+            return True
+
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                pipe.hset(session_key(session_id), mapping=encode_session_fields(session_data))
+                self._expire(pipe, session_id)
+                user_id = session_data.get("user_id")
+                if user_id:
+                    index_user_session(pipe, user_id, session_id, self.session_ttl)
+                await pipe.execute()
+        except RedisError as e:
+            self._mark_unavailable(e)
+        return True
+
+    async def delete_session(self, session_id: str) -> bool:
+        """
+        Delete a session
+
+        Args:
+            session_id (str): Session ID
+
+        Returns:
+            bool: True if deleted, False if session not found
+        """
+        with self._local_sessions_lock:
+            found_locally = self._local_sessions.pop(session_id, None) is not None
+        if not self._redis_available():
+            return found_locally
+
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                pipe.exists(session_key(session_id))
+                pipe.hget(session_key(session_id), "user_id")
+                exists, user_id = await pipe.execute()
+            if not exists:
+                return found_locally
+
+            async with self.redis.pipeline(transaction=False) as pipe:
+                user_id = json.loads(user_id) if user_id is not None else None
+                if user_id:
+                    pipe.srem(user_sessions_key(user_id), session_id)
+                pipe.delete(session_key(session_id), messages_key(session_id))
+                pipe.zrem(EXPIRY_INDEX_KEY, session_id)
+                pipe.hdel(EXPIRY_OWNERS_KEY, session_id)
+                await pipe.execute()
+            logger.debug(f"Deleted Redis session: {session_id}")
+            return True
+
+        except (RedisError, json.JSONDecodeError) as e:
+            logger.error(f"Error deleting session from Redis: {e}")
+            return found_locally
+
+    async def add_message_to_session(self, session_id: str, message: Dict[str, Any] = None,
+                                     role: str = None, content: str = None) -> bool:
+        """
+        Append a message to the session history in one round trip
+
+        RPUSH + LTRIM keep the list capped at ``max_messages``; the count,
+        last access time and TTLs are updated in the same pipeline.
+
+        Args:
+            session_id (str): Session ID
+            message (Dict[str, Any], optional): Message data dictionary
+            role (str, optional): Message role ('user' or 'assistant')
+            content (str, optional): Message content
+
+        Returns:
+            bool: True if successful
+        """
+        msg = build_message(message, role, content)
+        if msg is None:
+            logger.error("Either message dict or role+content must be provided")
+            return False
+
+        self._add_local_message(session_id, msg)
+        if not self._redis_available():
+            return True
+
+        now = time.time()
+        try:
+            async with self.redis.pipeline(transaction=True) as pipe:
+                pipe.rpush(messages_key(session_id), json.dumps(msg, default=str))
+                pipe.ltrim(messages_key(session_id), -self.max_messages, -1)
+                pipe.hsetnx(session_key(session_id), "session_id", json.dumps(session_id))
+                pipe.hsetnx(session_key(session_id), "created_at", json.dumps(now))
+                pipe.hincrby(session_key(session_id), "message_count", 1)
+                pipe.hset(session_key(session_id), "last_accessed", json.dumps(now))
+                self._expire(pipe, session_id)
+                await pipe.execute()
+        except RedisError as e:
+            self._mark_unavailable(e)
+        return True
+
+    async def save_sessions_batch(self, items: List[Tuple[str, Dict[str, Any], List[Dict[str, Any]]]]) -> None:
+        """
+        Write several sessions in one pipelined round trip
+
+        Args:
+            items (List[Tuple]): (session ID, session fields, new messages to append) per session
+
+        Raises:
+            RedisError: If the pipeline fails (nothing is marked as written)
+        """
+        now = time.time()
+        for session_id, session_data, messages in items:
+            self._cache_local(session_id, session_data)
+
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for session_id, session_data, messages in items:
+                pipe.hset(session_key(session_id), mapping={
+                    **encode_session_fields(session_data),
+                    "last_accessed": json.dumps(now)
+                })
+                if messages:
+                    pipe.rpush(messages_key(session_id), *[json.dumps(msg, default=str) for msg in messages])
+                    pipe.ltrim(messages_key(session_id), -self.max_messages, -1)
+                    pipe.hincrby(session_key(session_id), "message_count", len(messages))
+                self._expire(pipe, session_id)
+                user_id = session_data.get("user_id")
+                if user_id:
+                    index_user_session(pipe, user_id, session_id, self.session_ttl)
+            await pipe.execute()
+
+    async def get_session_messages(self, session_id: str, limit: Optional[int] = None) -> Optional[List[Dict[str, Any]]]:
+        """
+        Get the messages of a session without loading its metadata
+
+        Args:
+            session_id (str): Session ID
+            limit (int, optional): Return only the most recent ``limit`` messages
+
+        Returns:
+            Optional[List[Dict[str, Any]]]: Messages, or None if the session has none stored
+        """
+        if not self._redis_available():
+            session = self._get_local(session_id)
+            if session is None:
+                return None
+            messages = session.get("messages", [])
+            return messages[-limit:] if limit else messages
+
+        try:
+            raw_messages = await self.redis.lrange(messages_key(session_id), -limit if limit else 0, -1)
+            if not raw_messages and not await self.redis.exists(session_key(session_id)):
+                return None
+            return decode_session({}, raw_messages)["messages"]
+        except RedisError as e:
+            self._mark_unavailable(e)
+            session = self._get_local(session_id)
+            return session.get("messages", []) if session else None
+
+    async def get_user_sessions(self, user_id: str) -> List[Dict[str, Any]]:
+        """
+        Get all sessions for a user
+
+        Args:
+            user_id (str): User ID
+
+        Returns:
+            List[Dict[str, Any]]: List of session data
+        """
+        try:
+            session_ids = list(await self.redis.smembers(user_sessions_key(user_id)))
+            if not session_ids:
+                return []
+
+            # One round trip for every session of the user
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for session_id in session_ids:
+                    pipe.hgetall(session_key(session_id))
+                    pipe.lrange(messages_key(session_id), 0, -1)
+                results = await pipe.execute()
+
+            sessions = []
+            stale = []
+            for index, session_id in enumerate(session_ids):
+                fields, messages = results[2 * index], results[2 * index + 1]
+                if fields:
+                    sessions.append(decode_session(fields, messages))
+                else:
+                    stale.append(session_id)
+            if stale:
+                await self.redis.srem(user_sessions_key(user_id), *stale)
+            return sessions
+        except RedisError as e:
+            logger.error(f"Error retrieving user sessions from Redis: {e}")
+            return []
+
+    async def cleanup_expired_sessions(self, days_old: int = 1, batch_size: int = DEFAULT_CLEANUP_BATCH_SIZE) -> int:
+        """
+        Delete sessions not accessed for ``days_old`` days (Redis TTLs handle the rest)
+
+        Due sessions are read from the expiry index sorted set, so only they
+        are touched, ``batch_size`` at a time.
+
+        Args:
+            days_old (int, optional): Age threshold in days. Defaults to 1.
+            batch_size (int, optional): Sessions deleted per pipelined batch.
+
+        Returns:
+            int: Number of sessions deleted (or -1 if operation failed)
+        """
+        # Expiry score is last access + TTL
+        max_score = time.time() - (days_old * 24 * 60 * 60) + self.session_ttl
+        sessions_deleted = 0
+        try:
+            while True:
+                session_ids = await self.redis.zrangebyscore(EXPIRY_INDEX_KEY, "-inf", max_score,
+                                                             start=0, num=batch_size)
+                if not session_ids:
+                    break
+
+                # Owners come from the owners hash: the session hash may already have expired
+                async with self.redis.pipeline(transaction=False) as pipe:
+                    pipe.hmget(EXPIRY_OWNERS_KEY, session_ids)
+                    for session_id in session_ids:
+                        pipe.hget(session_key(session_id), "user_id")
+                    owners, *user_ids = await pipe.execute()
+
+                async with self.redis.pipeline(transaction=False) as pipe:
+                    for session_id, owner, user_id in zip(session_ids, owners, user_ids):
+                        pipe.delete(session_key(session_id), messages_key(session_id))
+                        user_id = session_owner(owner, user_id)
+                        if user_id:
+                            pipe.srem(user_sessions_key(user_id), session_id)
+                    pipe.hdel(EXPIRY_OWNERS_KEY, *session_ids)
+                    pipe.zrem(EXPIRY_INDEX_KEY, *session_ids)
+                    await pipe.execute()
+
+                with self._local_sessions_lock:
+                    for session_id in session_ids:
+                        self._local_sessions.pop(session_id, None)
+                sessions_deleted += len(session_ids)
+                if len(session_ids) < batch_size:
+                    break
+
+            logger.info(f"Cleaned up {sessions_deleted} expired Redis sessions")
+            return sessions_deleted
+        except RedisError as e:
+            logger.error(f"Error cleaning up expired sessions in Redis: {e}")
+            return -1
+
+    async def get_context(self, session_id: str) -> Dict[str, Any]:
+        """
+        Get context data from a session.
+
+        Args:
+            session_id (str): Session ID
+
+        Returns:
+            Dict[str, Any]: Context data or empty dict if session not found
+        """
+        if self._redis_available():
+            try:
+                context = await self.redis.hget(session_key(session_id), "context")
+                return json.loads(context) if context else {}
+            except (RedisError, json.JSONDecodeError) as e:
+                logger.error(f"Error retrieving context from session {session_id}: {e}")
+        session = self._get_local(session_id)
+        return session.get("context", {}) if session else {}
+
+    async def validate_session(self, token: str) -> Optional[Dict[str, Any]]:
+        """
+        Validate a session token (the token is the session ID).
+
+        Returns:
+            Optional[Dict[str, Any]]: Session data if valid, None if invalid
+        """
+        return await self.get_session(token)
@@ -24,6 +24,7 @@ from abc import ABC, abstractmethod
 
 # Import Redis connection manager
 from src.session.redis_connection import RedisConnectionManager
+from src.session.expiry_index import DEFAULT_CLEANUP_BATCH_SIZE, ExpiryIndex
 
 # Configure logging
 logging.basicConfig(
@@ -135,6 +136,13 @@ class SessionData:
             # If we can't parse the expiration date, assume it's expired
             return True
     
+    def expiry_timestamp(self) -> float:
+        """Expiration time as a unix timestamp (0 if it cannot be parsed)"""
+        try:
+            return datetime.fromisoformat(self.expires_at).timestamp()
+        except (ValueError, TypeError):
+            return 0.0
+    
     def update_timestamp(self) -> None:
         """Update the last updated timestamp"""
         self.updated_at = datetime.now().isoformat()
@@ -304,6 +312,7 @@ class MemorySessionBackend(SessionStorageBackend):
     def __init__(self):
         """Initialize in-memory session backend"""
         self.sessions: Dict[str, SessionData] = {}
+        self.expiry_index = ExpiryIndex()
         self.lock = threading.RLock()
     
     def get(self, session_id: str) -> Optional[SessionData]:
@@ -330,11 +339,13 @@ class MemorySessionBackend(SessionStorageBackend):
             
             # Save session data
             self.sessions[session.session_id] = session
+            self.expiry_index.touch(session.session_id, session.expiry_timestamp())
             return True
     
     def delete(self, session_id: str) -> bool:
         """Delete session data"""
         with self.lock:
+            self.expiry_index.discard(session_id)
             if session_id in self.sessions:
                 del self.sessions[session_id]
                 return True
@@ -345,18 +356,29 @@ class MemorySessionBackend(SessionStorageBackend):
         with self.lock:
             return session_id in self.sessions
     
-    def cleanup_expired(self) -> int:
-        """Clean up expired sessions"""
-        with self.lock:
-            expired_sessions = [
-                session_id for session_id, session in self.sessions.items()
-                if session.is_expired()
-            ]
-            
-            for session_id in expired_sessions:
-                del self.sessions[session_id]
-            
-            return len(expired_sessions)
+    def cleanup_expired(self, batch_size: int = DEFAULT_CLEANUP_BATCH_SIZE) -> int:
+        """Clean up expired sessions, visiting only those due in the expiry index"""
+        deleted = 0
+        while True:
+            with self.lock:
+                due = self.expiry_index.pop_due(limit=batch_size)
+                for session_id in due:
+                    session = self.sessions.get(session_id)
+                    if session is None:
+                        continue
+                    if session.is_expired():
+                        del self.sessions[session_id]
+                        deleted += 1
+                    else:
+                        # Expiry was extended in place; re-index at the new time
+                        self.expiry_index.touch(session_id, session.expiry_timestamp())
+            # Release the lock between batches so requests are not held up
+            if len(due) < batch_size:
+                return deleted
+    
+    def next_expiry(self) -> Optional[float]:
+        """Earliest session expiry time, or None if there are no sessions"""
+        return self.expiry_index.next_expiry()
     
     def is_available(self) -> bool:
         """Check if memory backend is available"""
@@ -660,8 +682,10 @@ class EnhancedSessionManager:
                     # Update metric
                     self.metrics["expired_sessions"] += expired_count
                 
-                # Sleep for 1 hour
-                time.sleep(3600)
+                # Sleep until the next session is due (at most 1 hour)
+                next_expiry = self.memory_backend.next_expiry()
+                delay = 3600 if next_expiry is None else next_expiry - time.time()
+                time.sleep(min(max(delay, 1), 3600))
             except Exception as e:
                 logger.error(f"Error in cleanup thread: {e}")
                 
@@ -0,0 +1,99 @@
+"""
+Time-ordered session expiry index.
+
+Session managers record each session's expiry time when it is written or
+accessed, so cleanup only touches sessions that are actually due instead of
+walking every session. In memory this is a min-heap with lazy invalidation;
+in Redis it is a sorted set scored by expiry time (see ``EXPIRY_INDEX_KEY``).
+"""
+
+import heapq
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+# Redis sorted set: member = session ID, score = expiry time (unix seconds).
+# Deliberately outside the session key prefix so it can never collide with a session ID.
+EXPIRY_INDEX_KEY = "sessions:v2:expiry_index"
+
+# Redis hash: field = session ID, value = owning user ID. Kept next to the index
+# so cleanup can drop a session from its user's set after Redis has expired the
+# session hash that also records the owner.
+EXPIRY_OWNERS_KEY = "sessions:v2:expiry_owners"
+
+# Default number of sessions removed per cleanup batch
+DEFAULT_CLEANUP_BATCH_SIZE = 500
+
+
+class ExpiryIndex:
+    """
+    Min-heap of (expiry time, session ID) with lazy invalidation.
+
+    ``touch`` pushes a new entry and records the current expiry; superseded
+    heap entries are skipped when popped and compacted away when they
+    outnumber live ones.
+    """
+
+    def __init__(self):
+        self._heap: List[Tuple[float, str]] = []
+        self._expiry: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def touch(self, session_id: str, expires_at: float) -> None:
+        """
+        Set a session's expiry time.
+
+        Args:
+            session_id: Session identifier
+            expires_at: Unix timestamp at which the session expires
+        """
+        with self._lock:
+            if self._expiry.get(session_id) == expires_at:
+                return
+            self._expiry[session_id] = expires_at
+            heapq.heappush(self._heap, (expires_at, session_id))
+            if len(self._heap) > 2 * len(self._expiry) + 64:
+                self._compact()
+
+    def discard(self, session_id: str) -> None:
+        """Remove a session from the index (its heap entries become stale)."""
+        with self._lock:
+            self._expiry.pop(session_id, None)
+
+    def pop_due(self, until: Optional[float] = None, limit: int = DEFAULT_CLEANUP_BATCH_SIZE) -> List[str]:
+        """
+        Remove and return sessions whose expiry time is at or before ``until``.
+
+        Args:
+            until: Unix timestamp (defaults to now)
+            limit: Maximum number of sessions returned
+
+        Returns:
+            Session IDs in expiry order
+        """
+        until = time.time() if until is None else until
+        due = []
+        with self._lock:
+            while self._heap and len(due) < limit and self._heap[0][0] <= until:
+                expires_at, session_id = heapq.heappop(self._heap)
+                if self._expiry.get(session_id) == expires_at:
+                    del self._expiry[session_id]
+                    due.append(session_id)
+        return due
+
+    def next_expiry(self) -> Optional[float]:
+        """Earliest live expiry time, or None if the index is empty."""
+        with self._lock:
+            while self._heap and self._expiry.get(self._heap[0][1]) != self._heap[0][0]:
+                heapq.heappop(self._heap)
+            return self._heap[0][0] if self._heap else None
+
+    def _compact(self) -> None:
+        self._heap = [(expires_at, session_id) for session_id, expires_at in self._expiry.items()]
+        heapq.heapify(self._heap)
+
+    def __len__(self) -> int:
+        return len(self._expiry)
+
+    def __contains__(self, session_id: str) -> bool:
+        return session_id in self._expiry
@@ -6,11 +6,12 @@ Stores sessions in local memory, with no persistence between application restart
 import logging
 import time
 import uuid
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Set
 from datetime import datetime
 from fastapi import Response
 
 from src.config_unified import settings
+from src.session.expiry_index import DEFAULT_CLEANUP_BATCH_SIZE, ExpiryIndex
 
 logger = logging.getLogger(__name__)
 
@@ -25,7 +26,8 @@ class MemorySessionManager:
             session_ttl (int, optional): Session time-to-live in seconds. Defaults to 3600 (1 hour).
         """
         self.sessions: Dict[str, Dict[str, Any]] = {}  # session_id -> session data
-        self.user_sessions: Dict[str, List[str]] = {}  # user_id -> list of session_ids
+        self.user_sessions: Dict[str, Set[str]] = {}  # user_id -> session_ids
+        self.expiry_index = ExpiryIndex()  # session expiry times, so cleanup only visits due sessions
         self.session_ttl = session_ttl
         logger.info(f"Initialized memory session manager with TTL: {session_ttl}s")
 
@@ -56,12 +58,11 @@ class MemorySessionManager:
 
         # Store session
         self.sessions[session_id] = session
+        self.expiry_index.touch(session_id, timestamp + self.session_ttl)
 
         # Add to user index if user_id provided
         if user_id:
-            if user_id not in self.user_sessions:
-                self.user_sessions[user_id] = []
-            self.user_sessions[user_id].append(session_id)
+            self.user_sessions.setdefault(user_id, set()).add(session_id)
 
         logger.debug(f"Created memory session: {session_id} for user: {user_id}")
         return session_id
@@ -123,11 +124,13 @@ class MemorySessionManager:
         # Remove from user index if applicable
         user_id = self.sessions[session_id].get("user_id")
         if user_id and user_id in self.user_sessions:
-            if session_id in self.user_sessions[user_id]:
-                self.user_sessions[user_id].remove(session_id)
+            self.user_sessions[user_id].discard(session_id)
+            if not self.user_sessions[user_id]:
+                del self.user_sessions[user_id]
 
         # Delete session
         del self.sessions[session_id]
+        self.expiry_index.discard(session_id)
         logger.debug(f"Deleted memory session: {session_id}")
         return True
 
@@ -139,7 +142,9 @@ class MemorySessionManager:
             session_id (str): Session ID
         """
         if session_id in self.sessions:
-            self.sessions[session_id]["last_accessed"] = time.time()
+            now = time.time()
+            self.sessions[session_id]["last_accessed"] = now
+            self.expiry_index.touch(session_id, now + self.session_ttl)
 
     def add_message_to_session(self, session_id: str, message: Dict[str, Any]) -> bool:
         """
@@ -196,37 +201,41 @@ class MemorySessionManager:
             return []
 
         sessions = []
-        for session_id in self.user_sessions[user_id]:
+        for session_id in list(self.user_sessions[user_id]):
             session = self.get_session(session_id)
             if session:
                 sessions.append(session)
 
         return sessions
 
-    def cleanup_expired_sessions(self, days_old: int = 1) -> int:
+    def cleanup_expired_sessions(self, days_old: int = 1, batch_size: int = DEFAULT_CLEANUP_BATCH_SIZE) -> int:
         """
         Clean up expired sessions
 
+        Only sessions that are due are visited, through the expiry index,
+        in batches of ``batch_size``.
+
         Args:
             days_old (int, optional): Delete sessions older than this many days. Defaults to 1.
+            batch_size (int, optional): Sessions deleted per batch.
 
         Returns:
             int: Number of sessions deleted
         """
         cutoff_time = time.time() - (days_old * 24 * 60 * 60)
-        sessions_to_delete = []
-
-        # Find expired sessions
-        for session_id, session in self.sessions.items():
-            if session["last_accessed"] < cutoff_time:
-                sessions_to_delete.append(session_id)
-
-        # Delete expired sessions
-        for session_id in sessions_to_delete:
-            self.delete_session(session_id)
-
-        logger.info(f"Cleaned up {len(sessions_to_delete)} expired memory sessions")
-        return len(sessions_to_delete)
+        deleted = 0
+
+        # Expiry is last access + TTL, so "not accessed since cutoff" is "expires before cutoff + TTL"
+        while True:
+            due = self.expiry_index.pop_due(until=cutoff_time + self.session_ttl, limit=batch_size)
+            for session_id in due:
+                if self.delete_session(session_id):
+                    deleted += 1
+            if len(due) < batch_size:
+                break
+
+        logger.info(f"Cleaned up {deleted} expired memory sessions")
+        return deleted
 
     # --- Authentication-related methods ---
 
@@ -10,6 +10,8 @@ import functools
 import random
 from typing import Any, Callable, Dict, Optional, TypeVar, cast, List, Tuple
 from redis import Redis, ConnectionPool, RedisError
+from redis import asyncio as redis_asyncio
+from redis.asyncio.retry import Retry as AsyncRetry
 from redis.retry import Retry
 from redis.backoff import ExponentialBackoff
 from datetime import datetime, timedelta
@@ -30,6 +32,9 @@ class RedisConnectionManager:
     _pools: Dict[str, ConnectionPool] = {}
     _pools_lock = threading.RLock()
 
+    # asyncio clients (one pooled client per URI)
+    _async_clients: Dict[str, redis_asyncio.Redis] = {}
+
     # In-memory fallback cache
     _memory_cache: Dict[str, Dict[str, Any]] = {}
     _memory_cache_lock = threading.RLock()
@@ -102,6 +107,50 @@ class RedisConnectionManager:
         # Create Redis client with retry
         return Redis(connection_pool=pool, retry=retry)
 
+    @classmethod
+    def get_async_redis_client(cls, redis_uri: str) -> redis_asyncio.Redis:
+        """
+        Get a pooled asyncio Redis client for the given URI.
+
+        Uses the same timeouts and retry policy as the sync client, with
+        responses decoded to str.
+
+        Args:
+            redis_uri (str): Redis connection URI
+
+        Returns:
+            redis.asyncio.Redis: asyncio Redis client
+        """
+        with cls._pools_lock:
+            if redis_uri not in cls._async_clients:
+                logger.info(f"Creating new asyncio Redis connection pool for {redis_uri}")
+                cls._async_clients[redis_uri] = redis_asyncio.Redis.from_url(
+                    redis_uri,
+                    max_connections=cls._max_connections,
+                    socket_timeout=cls._connection_timeout,
+                    socket_connect_timeout=cls._connection_timeout,
+                    health_check_interval=30,
+                    retry_on_timeout=True,
+                    retry=AsyncRetry(
+                        ExponentialBackoff(cap=cls._retry_max_delay, base=cls._retry_base_delay),
+                        cls._max_retries
+                    ),
+                    decode_responses=True
+                )
+            return cls._async_clients[redis_uri]
+
+    @classmethod
+    async def close_async_clients(cls) -> None:
+        """Close all asyncio Redis clients and their connection pools."""
+        with cls._pools_lock:
+            clients = list(cls._async_clients.values())
+            cls._async_clients.clear()
+        for client in clients:
+            try:
+                await client.aclose()
+            except Exception as e:
+                logger.warning(f"Error closing asyncio Redis client: {e}")
+
     @classmethod
     def with_redis_fallback(cls, fallback_value: T) -> Callable[[Callable[..., T]], Callable[..., T]]:
         """
@@ -1,7 +1,8 @@
 """
 Redis-based session manager for persistent session storage.
-Stores sessions in Redis with configurable TTL.
-Features connection pooling, retry logic, and fallback mechanism.
+Stores sessions in Redis with configurable TTL: metadata in a hash and
+messages in a capped list. Features connection pooling, retry logic, and
+fallback mechanism; ``async_manager`` exposes the same sessions on redis.asyncio.
 """
 
 import json
@@ -17,11 +18,140 @@ from redis.exceptions import RedisError
 from fastapi import Request, Response
 
 from src.config_unified import settings
+from src.session.expiry_index import DEFAULT_CLEANUP_BATCH_SIZE, EXPIRY_INDEX_KEY, EXPIRY_OWNERS_KEY
 
 from src.session.redis_connection import RedisConnectionManager
 
 logger = logging.getLogger(__name__)
 
+# Session layout: metadata in a hash (one JSON-encoded value per field) and
+# messages in a capped list, so a new message is an append instead of a
+# rewrite of the whole session.
+SESSION_KEY_PREFIX = "session:v2:"
+
+# Fields that are maintained by the message list rather than written from session data
+MESSAGE_FIELDS = ("messages", "message_count")
+
+
+def session_key(session_id: str) -> str:
+    """Redis key of the session metadata hash."""
+    return f"{SESSION_KEY_PREFIX}{session_id}"
+
+
+def messages_key(session_id: str) -> str:
+    """Redis key of the session message list."""
+    return f"{SESSION_KEY_PREFIX}{session_id}:messages"
+
+
+def user_sessions_key(user_id: str) -> str:
+    """Redis key of the set of session IDs belonging to a user."""
+    return f"user:{user_id}:sessions"
+
+
+def index_user_session(pipe, user_id: str, session_id: str, session_ttl: int) -> None:
+    """
+    Queue adding a session to its user's set and recording the owner for expiry cleanup.
+
+    Args:
+        pipe: Redis pipeline
+        user_id (str): User ID
+        session_id (str): Session ID
+        session_ttl (int): Session TTL in seconds (the user set lives ten times longer)
+    """
+    pipe.sadd(user_sessions_key(user_id), session_id)
+    pipe.expire(user_sessions_key(user_id), session_ttl * 10)
+    pipe.hset(EXPIRY_OWNERS_KEY, session_id, user_id)
+
+
+def session_owner(indexed_owner: Any, user_id_field: Any) -> Optional[str]:
+    """
+    Owner of a session being cleaned up.
+
+    Args:
+        indexed_owner: Value from the expiry owners hash (str, bytes or None)
+        user_id_field: JSON-encoded ``user_id`` field of the session hash, for
+            sessions indexed before owners were recorded
+
+    Returns:
+        Optional[str]: User ID, or None if the session has no known owner
+    """
+    if indexed_owner is not None:
+        return indexed_owner.decode('utf-8') if isinstance(indexed_owner, bytes) else indexed_owner
+    try:
+        return json.loads(user_id_field) if user_id_field is not None else None
+    except ValueError:
+        return None
+
+
+def encode_session_fields(data: Dict[str, Any]) -> Dict[str, str]:
+    """
+    Encode session fields for a Redis hash, skipping message fields.
+
+    Args:
+        data (Dict[str, Any]): Session fields
+
+    Returns:
+        Dict[str, str]: Field name -> JSON-encoded value
+    """
+    return {
+        key: json.dumps(value, default=str)
+        for key, value in data.items()
+        if key not in MESSAGE_FIELDS
+    }
+
+
+def decode_session(fields: Dict[Any, Any], messages: List[Any]) -> Dict[str, Any]:
+    """
+    Rebuild a session dictionary from its metadata hash and message list.
+
+    Args:
+        fields (Dict): Raw hash fields (str or bytes)
+        messages (List): Raw JSON-encoded messages
+
+    Returns:
+        Dict[str, Any]: Session data
+    """
+    session = {}
+    for key, value in fields.items():
+        if isinstance(key, bytes):
+            key = key.decode('utf-8')
+        try:
+            session[key] = json.loads(value)
+        except (TypeError, ValueError):
+            session[key] = value.decode('utf-8') if isinstance(value, bytes) else value
+
+    session["messages"] = []
+    for message in messages:
+        try:
+            session["messages"].append(json.loads(message))
+        except (TypeError, ValueError):
+            logger.warning("Skipping undecodable session message")
+    session.setdefault("message_count", len(session["messages"]))
+    return session
+
+
+def build_message(message: Optional[Dict[str, Any]] = None, role: Optional[str] = None,
+                  content: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """
+    Build a session message from a message dict or role + content.
+
+    Returns:
+        Optional[Dict[str, Any]]: Message with a timestamp, or None if no valid data was given
+    """
+    if message is not None:
+        # Add timestamp if not provided
+        if "timestamp" not in message:
+            message["timestamp"] = datetime.now().isoformat()
+        return message
+    if role is not None and content is not None:
+        return {
+            "role": role,
+            "content": content,
+            "timestamp": datetime.now().isoformat()
+        }
+    return None
+
+
 class RedisSessionManager:
     """Session manager that stores sessions in Redis with fallback mechanism"""
 
@@ -32,16 +162,19 @@ class RedisSessionManager:
     # Flag to track Redis availability
     _redis_available = True
 
-    def __init__(self, redis_uri: str, session_ttl: int = 3600):
+    def __init__(self, redis_uri: str, session_ttl: int = 3600, max_messages: Optional[int] = None):
         """
         Initialize the Redis session manager
 
         Args:
             redis_uri (str): Redis connection URI
             session_ttl (int, optional): Session time-to-live in seconds. Defaults to 3600 (1 hour).
+            max_messages (int, optional): Messages kept per session. Defaults to settings.session_max_messages.
         """
         self.session_ttl = session_ttl
         self.redis_uri = redis_uri
+        self.max_messages = max_messages or settings.session_max_messages
+        self._async_manager = None
 
         try:
             # Get Redis client with connection pooling and retry logic
@@ -60,6 +193,29 @@ class RedisSessionManager:
             logger.warning("Using local memory fallback for session storage")
             # Don't raise an exception, use fallback instead
 
+    @property
+    def async_manager(self):
+        """
+        asyncio twin of this manager over the same keys, for use from async request handlers.
+
+        Returns:
+            AsyncRedisSessionManager or None if Redis is unavailable
+        """
+        if self._async_manager is None and self._redis_available:
+            try:
+                from src.session.async_redis_manager import AsyncRedisSessionManager
+                self._async_manager = AsyncRedisSessionManager(
+                    redis_uri=self.redis_uri,
+                    session_ttl=self.session_ttl,
+                    max_messages=self.max_messages,
+                    local_sessions=self._local_sessions,
+                    local_sessions_lock=self._local_sessions_lock
+                )
+            except Exception as e:
+                logger.warning(f"asyncio Redis session backend unavailable: {e}")
+                self._redis_available = False
+        return self._async_manager
+
     def create_session(self, user_id: Optional[str] = None, metadata: Optional[Dict[str, Any]] = None) -> str:
         """
         Create a new session
@@ -101,18 +257,13 @@ class RedisSessionManager:
                 logger.warning(f"Redis is unhealthy, creating session in local memory only: {session_id}")
                 return session_id
 
-            self.redis.setex(
-                f"session:{session_id}",
-                self.session_ttl,
-                json.dumps(session)
-            )
-
-            # Index session by user_id if provided
+            pipe = self.redis.pipeline(transaction=False)
+            pipe.hset(session_key(session_id), mapping={**encode_session_fields(session), "message_count": 0})
+            self._expire(pipe, session_id)
+            # Index session by user_id if provided (longer TTL for user index)
             if user_id:
-                self.redis.sadd(f"user:{user_id}:sessions", session_id)
-                # Set TTL on user's sessions set if it doesn't exist
-                if not self.redis.exists(f"user:{user_id}:sessions"):
-                    self.redis.expire(f"user:{user_id}:sessions", self.session_ttl * 10)  # Longer TTL for user index
+                index_user_session(pipe, user_id, session_id, self.session_ttl)
+            pipe.execute()
 
             logger.debug(f"Created Redis session: {session_id} for user: {user_id}")
             return session_id
@@ -146,26 +297,27 @@ class RedisSessionManager:
                 logger.warning("Redis is unhealthy, using local memory fallback")
                 return self._get_session_from_local_cache(session_id)
 
-            # Try to get session from Redis
-            session_data = self.redis.get(f"session:{session_id}")
-            if not session_data:
+            # Read metadata and messages and refresh TTLs in one round trip
+            pipe = self.redis.pipeline(transaction=False)
+            pipe.hgetall(session_key(session_id))
+            pipe.lrange(messages_key(session_id), 0, -1)
+            self._expire(pipe, session_id, existing_only=True)
+            fields, messages = pipe.execute()[:2]
+            if not fields:
                 return None
 
-            # Parse JSON data
-            session = json.loads(session_data)
+            session = decode_session(fields, messages)
 
             # Update last accessed time
             self._update_last_accessed(session_id)
-
-            # Refresh TTL
-            self.redis.expire(f"session:{session_id}", self.session_ttl)
+            session["last_accessed"] = time.time()
 
             # Cache session in local memory as backup
             self._cache_session_locally(session_id, session)
 
             return session
 
-        except (RedisError, json.JSONDecodeError) as e:
+        except RedisError as e:
             logger.error(f"Error retrieving session from Redis: {e}")
 
             # Mark Redis as unavailable
@@ -208,7 +360,7 @@ class RedisSessionManager:
 
     def update_session(self, session_id: str, updates: Dict[str, Any]) -> bool:
         """
-        Update session data
+        Update individual session fields without rewriting the session
 
         Args:
             session_id (str): Session ID
@@ -218,38 +370,33 @@ class RedisSessionManager:
             bool: True if successful, False if session not found
         """
         try:
-            # Get current session
-            session_data = self.redis.get(f"session:{session_id}")
-            if not session_data:
+            if not self.redis.exists(session_key(session_id)):
                 return False
 
-            # Parse JSON data
-            session = json.loads(session_data)
-
-            # Update session data
-            for key, value in updates.items():
-                if key not in ["session_id", "created_at", "messages"]:  # Don't overwrite these
-                    session[key] = value
+            # Don't overwrite these
+            fields = encode_session_fields({
+                key: value for key, value in updates.items()
+                if key not in ("session_id", "created_at")
+            })
+            fields["last_accessed"] = json.dumps(time.time())
 
-            # Update last accessed time
-            session["last_accessed"] = time.time()
-
-            # Store updated session
-            self.redis.setex(
-                f"session:{session_id}",
-                self.session_ttl,
-                json.dumps(session)
-            )
+            pipe = self.redis.pipeline(transaction=False)
+            pipe.hset(session_key(session_id), mapping=fields)
+            self._expire(pipe, session_id)
+            pipe.execute()
 
             return True
 
-        except (RedisError, json.JSONDecodeError) as e:
+        except RedisError as e:
             logger.error(f"Error updating session in Redis: {e}")
             return False
 
     def save_session(self, session_id: str, session_data: Dict[str, Any]) -> bool:
         """
-        Save complete session data, replacing any existing session
+        Save session data fields
+
+        Messages are not rewritten: they are only appended through
+        ``add_message_to_session``.
 
         Args:
             session_id (str): Session ID
@@ -280,24 +427,20 @@ class RedisSessionManager:
                 logger.warning("Redis is unhealthy, using local memory fallback")
                 return True
 
-            # Store session in Redis
-            self.redis.setex(
-                f"session:{session_id}",
-                self.session_ttl,
-                json.dumps(session_data)
-            )
+            # Store session fields in Redis
+            pipe = self.redis.pipeline(transaction=False)
+            pipe.hset(session_key(session_id), mapping=encode_session_fields(session_data))
+            self._expire(pipe, session_id)
 
             # Index by user_id if present
             user_id = session_data.get("user_id")
             if user_id:
-                self.redis.sadd(f"user:{user_id}:sessions", session_id)
-                # Set TTL on user's sessions set if it doesn't exist
-                if not self.redis.exists(f"user:{user_id}:sessions"):
-                    self.redis.expire(f"user:{user_id}:sessions", self.session_ttl * 10)
+                index_user_session(pipe, user_id, session_id, self.session_ttl)
+            pipe.execute()
 
             return True
 
-        except (RedisError, json.JSONDecodeError) as e:
+        except RedisError as e:
             logger.error(f"Error saving session in Redis: {e}")
 
             # Mark Redis as unavailable
@@ -316,22 +459,28 @@ class RedisSessionManager:
         Returns:
             bool: True if deleted, False if session not found
         """
+        with self._local_sessions_lock:
+            self._local_sessions.pop(session_id, None)
+
         try:
-            # Get session to check user_id
-            session_data = self.redis.get(f"session:{session_id}")
-            if not session_data:
+            # Get user_id to clean up the user index
+            pipe = self.redis.pipeline(transaction=False)
+            pipe.exists(session_key(session_id))
+            pipe.hget(session_key(session_id), "user_id")
+            exists, user_id = pipe.execute()
+            if not exists:
                 return False
 
-            # Parse JSON data
-            session = json.loads(session_data)
-
-            # Remove from user index if applicable
-            user_id = session.get("user_id")
+            pipe = self.redis.pipeline(transaction=False)
+            user_id = json.loads(user_id) if user_id is not None else None
             if user_id:
-                self.redis.srem(f"user:{user_id}:sessions", session_id)
+                pipe.srem(user_sessions_key(user_id), session_id)
 
-            # Delete session
-            self.redis.delete(f"session:{session_id}")
+            # Delete session metadata and messages
+            pipe.delete(session_key(session_id), messages_key(session_id))
+            pipe.zrem(EXPIRY_INDEX_KEY, session_id)
+            pipe.hdel(EXPIRY_OWNERS_KEY, session_id)
+            pipe.execute()
             logger.debug(f"Deleted Redis session: {session_id}")
             return True
 
@@ -339,6 +488,24 @@ class RedisSessionManager:
             logger.error(f"Error deleting session from Redis: {e}")
             return False
 
+    def _expire(self, pipe, session_id: str, existing_only: bool = False) -> None:
+        """
+        Queue TTL refreshes for a session's keys and its expiry index score
+
+        Past-due index entries are left for ``cleanup_expired_sessions``, which
+        also removes the session from its user's set before dropping the entry.
+
+        Args:
+            pipe: Redis pipeline
+            session_id (str): Session ID
+            existing_only (bool, optional): Only refresh the index score if the
+                session is already indexed (reads must not index missing sessions)
+        """
+        now = time.time()
+        pipe.expire(session_key(session_id), self.session_ttl)
+        pipe.expire(messages_key(session_id), self.session_ttl)
+        pipe.zadd(EXPIRY_INDEX_KEY, {session_id: now + self.session_ttl}, xx=existing_only)
+
     def _update_last_accessed(self, session_id: str) -> None:
         """
         Update the last accessed timestamp for a session
@@ -347,29 +514,17 @@ class RedisSessionManager:
             session_id (str): Session ID
         """
         try:
-            # Get current session
-            session_data = self.redis.get(f"session:{session_id}")
-            if not session_data:
-                return
-
-            # Parse JSON data
-            session = json.loads(session_data)
-
-            # Update last accessed time
-            session["last_accessed"] = time.time()
-
-            # Store updated session without modifying TTL
-            pipe = self.redis.pipeline()
-            pipe.setex(f"session:{session_id}", self.session_ttl, json.dumps(session))
-            pipe.execute()
-
-        except (RedisError, json.JSONDecodeError) as e:
+            self.redis.hset(session_key(session_id), "last_accessed", json.dumps(time.time()))
+        except RedisError as e:
             logger.error(f"Error updating last accessed time in Redis: {e}")
 
     def add_message_to_session(self, session_id: str, message: Dict[str, Any] = None, role: str = None, content: str = None) -> bool:
         """
         Add a message to the session history
 
+        The message is appended to the capped message list; the rest of the
+        session is not read or rewritten, so the cost does not grow with history.
+
         Args:
             session_id (str): Session ID
             message (Dict[str, Any], optional): Message data dictionary
@@ -379,23 +534,8 @@ class RedisSessionManager:
         Returns:
             bool: True if successful, False if session not found
         """
-        # Prepare the message
-        msg = None
-
-        # If message dict is provided, use it
-        if message is not None:
-            msg = message
-            # Add timestamp if not provided
-            if "timestamp" not in msg:
-                msg["timestamp"] = datetime.now().isoformat()
-        # Otherwise, try to create from role and content
-        elif role is not None and content is not None:
-            msg = {
-                "role": role,
-                "content": content,
-                "timestamp": datetime.now().isoformat()
-            }
-        else:
+        msg = build_message(message, role, content)
+        if msg is None:
             # No valid message data
             logger.error("Either message dict or role+content must be provided")
             return False
@@ -411,39 +551,23 @@ class RedisSessionManager:
                 logger.warning("Redis is unhealthy, using local memory fallback")
                 return self._add_message_to_local_session(session_id, msg)
 
-            # Get current session
-            session_data = self.redis.get(f"session:{session_id}")
-            if not session_data:
-                # Try local cache as fallback
-                return self._add_message_to_local_session(session_id, msg)
-
-            # Parse JSON data
-            session = json.loads(session_data)
-
-            # Add message to session
-            if "messages" not in session:
-                session["messages"] = []
-            session["messages"].append(msg)
-
-            # Update message count
-            session["message_count"] = len(session["messages"])
-
-            # Update last accessed time
-            session["last_accessed"] = time.time()
-
-            # Store updated session
-            self.redis.setex(
-                f"session:{session_id}",
-                self.session_ttl,
-                json.dumps(session)
-            )
+            now = time.time()
+            pipe = self.redis.pipeline(transaction=True)
+            pipe.rpush(messages_key(session_id), json.dumps(msg, default=str))
+            pipe.ltrim(messages_key(session_id), -self.max_messages, -1)
+            pipe.hsetnx(session_key(session_id), "session_id", json.dumps(session_id))
+            pipe.hsetnx(session_key(session_id), "created_at", json.dumps(now))
+            pipe.hincrby(session_key(session_id), "message_count", 1)
+            pipe.hset(session_key(session_id), "last_accessed", json.dumps(now))
+            self._expire(pipe, session_id)
+            pipe.execute()
 
-            # Update local cache
-            self._cache_session_locally(session_id, session)
+            # Keep the local backup in step without a read from Redis
+            self._add_message_to_local_session(session_id, msg)
 
             return True
 
-        except (RedisError, json.JSONDecodeError) as e:
+        except RedisError as e:
             logger.error(f"Error adding message to session in Redis: {e}")
 
             # Mark Redis as unavailable
@@ -480,13 +604,13 @@ class RedisSessionManager:
 
             session = self._local_sessions[session_id]
 
-            # Add message to session
-            if "messages" not in session:
-                session["messages"] = []
-            session["messages"].append(message)
+            # Add message to session (same cap as the Redis list)
+            messages = list(session.get("messages", []))
+            messages.append(message)
+            session["messages"] = messages[-self.max_messages:]
 
             # Update message count
-            session["message_count"] = len(session["messages"])
+            session["message_count"] = session.get("message_count", 0) + 1
 
             # Update last accessed time
             session["last_accessed"] = time.time()
@@ -521,22 +645,35 @@ class RedisSessionManager:
         """
         try:
             # Get session IDs for this user
-            session_ids = self.redis.smembers(f"user:{user_id}:sessions")
+            session_ids = self.redis.smembers(user_sessions_key(user_id))
             if not session_ids:
                 return []
 
-            sessions = []
+            # Convert bytes to string if needed
+            session_ids = [
+                session_id.decode('utf-8') if isinstance(session_id, bytes) else session_id
+                for session_id in session_ids
+            ]
+
+            # Load every session of the user in one round trip
+            pipe = self.redis.pipeline(transaction=False)
             for session_id in session_ids:
-                # Convert bytes to string if needed
-                if isinstance(session_id, bytes):
-                    session_id = session_id.decode('utf-8')
+                pipe.hgetall(session_key(session_id))
+                pipe.lrange(messages_key(session_id), 0, -1)
+            results = pipe.execute()
 
-                session = self.get_session(session_id)
-                if session:
-                    sessions.append(session)
+            sessions = []
+            stale = []
+            for index, session_id in enumerate(session_ids):
+                fields, messages = results[2 * index], results[2 * index + 1]
+                if fields:
+                    sessions.append(decode_session(fields, messages))
                 else:
-                    # Clean up reference to non-existent session
-                    self.redis.srem(f"user:{user_id}:sessions", session_id)
+                    stale.append(session_id)
+
+            # Clean up references to non-existent sessions
+            if stale:
+                self.redis.srem(user_sessions_key(user_id), *stale)
 
             return sessions
 
@@ -544,53 +681,59 @@ class RedisSessionManager:
             logger.error(f"Error retrieving user sessions from Redis: {e}")
             return []
 
-    def cleanup_expired_sessions(self, days_old: int = 1) -> int:
+    def cleanup_expired_sessions(self, days_old: int = 1, batch_size: int = DEFAULT_CLEANUP_BATCH_SIZE) -> int:
         """
         Clean up expired sessions (note: Redis handles TTL automatically,
         but this can be used for manual cleanup of very old sessions)
 
+        Due sessions are read from the expiry index sorted set, so only they
+        are touched, ``batch_size`` at a time.
+
         Args:
             days_old (int, optional): Delete sessions older than this many days. Defaults to 1.
+            batch_size (int, optional): Sessions deleted per pipelined batch.
 
         Returns:
             int: Number of sessions deleted (or -1 if operation failed)
         """
         try:
-            # Find all session keys
-            session_keys = self.redis.keys("session:*")
-            if not session_keys:
-                return 0
-
-            cutoff_time = time.time() - (days_old * 24 * 60 * 60)
+            # Expiry score is last access + TTL
+            max_score = time.time() - (days_old * 24 * 60 * 60) + self.session_ttl
             sessions_deleted = 0
 
-            for key in session_keys:
-                # Convert bytes to string if needed
-                if isinstance(key, bytes):
-                    key = key.decode('utf-8')
-
-                # Extract session_id from key
-                session_id = key.split(":", 1)[1]
-
-                # Get session data
-                session_data = self.redis.get(key)
-                if not session_data:
-                    continue
-
-                # Parse JSON data
-                try:
-                    session = json.loads(session_data)
-
-                    # Check if session is older than cutoff
-                    if session.get("last_accessed", 0) < cutoff_time:
-                        # Delete session
-                        if self.delete_session(session_id):
-                            sessions_deleted += 1
-
-                except json.JSONDecodeError:
-                    # Invalid JSON, delete the key
-                    self.redis.delete(key)
-                    sessions_deleted += 1
+            while True:
+                session_ids = self.redis.zrangebyscore(EXPIRY_INDEX_KEY, "-inf", max_score, start=0, num=batch_size)
+                if not session_ids:
+                    break
+                session_ids = [
+                    session_id.decode('utf-8') if isinstance(session_id, bytes) else session_id
+                    for session_id in session_ids
+                ]
+
+                # Look up owners for the user index (the session hash may already
+                # have expired), then delete the batch in one round trip
+                pipe = self.redis.pipeline(transaction=False)
+                pipe.hmget(EXPIRY_OWNERS_KEY, session_ids)
+                for session_id in session_ids:
+                    pipe.hget(session_key(session_id), "user_id")
+                owners, *user_ids = pipe.execute()
+
+                pipe = self.redis.pipeline(transaction=False)
+                for session_id, owner, user_id in zip(session_ids, owners, user_ids):
+                    pipe.delete(session_key(session_id), messages_key(session_id))
+                    user_id = session_owner(owner, user_id)
+                    if user_id:
+                        pipe.srem(user_sessions_key(user_id), session_id)
+                pipe.hdel(EXPIRY_OWNERS_KEY, *session_ids)
+                pipe.zrem(EXPIRY_INDEX_KEY, *session_ids)
+                pipe.execute()
+
+                with self._local_sessions_lock:
+                    for session_id in session_ids:
+                        self._local_sessions.pop(session_id, None)
+                sessions_deleted += len(session_ids)
+                if len(session_ids) < batch_size:
+                    break
 
             logger.info(f"Cleaned up {sessions_deleted} expired Redis sessions")
             return sessions_deleted
@@ -0,0 +1,409 @@
+"""
+Write-behind session layer for the chat hot path.
+
+Sessions are read from and written to an in-process map. Each write bumps a
+per-session version and marks the session dirty; a background task flushes
+dirty sessions to the backing session manager in batches (one Redis pipeline
+per batch when the asyncio Redis backend is available). A message turn
+therefore never waits on a session store round trip, and ``close`` guarantees
+a final flush on shutdown.
+"""
+
+import asyncio
+import copy
+import inspect
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.session.redis_manager import build_message
+
+logger = logging.getLogger(__name__)
+
+
+class _SessionEntry:
+    """Locally held session state with write tracking."""
+
+    __slots__ = ("data", "version", "flushed_version", "pending_messages", "last_access")
+
+    def __init__(self, data: Dict[str, Any], version: int = 0):
+        self.data = data
+        self.version = version
+        self.flushed_version = version
+        self.pending_messages: List[Dict[str, Any]] = []
+        self.last_access = time.time()
+
+    @property
+    def dirty(self) -> bool:
+        return self.version != self.flushed_version or bool(self.pending_messages)
+
+
+class WriteBehindSessionManager:
+    """
+    Session manager wrapper that serves chat sessions from memory and
+    persists changes in the background.
+
+    ``get_session``, ``save_session``, ``update_session`` and
+    ``add_message_to_session`` are coroutines that only touch the local map
+    (a backend read happens once, on a miss). Other session manager methods
+    are passed through to the backend.
+    """
+
+    # Chat code prefers a manager's asyncio twin; this wrapper's own coroutines are that twin
+    async_manager = None
+
+    def __init__(self, backend: Any, flush_interval_ms: int = 200, batch_size: int = 100,
+                 max_cached_sessions: int = 10000):
+        """
+        Initialize the write-behind layer.
+
+        Args:
+            backend: Session manager that stores sessions (e.g. RedisSessionManager)
+            flush_interval_ms: Interval between background flushes in milliseconds
+            batch_size: Maximum number of sessions written per batch
+            max_cached_sessions: Clean sessions beyond this count are evicted, least recently used first
+        """
+        self.backend = backend
+        self.flush_interval = flush_interval_ms / 1000.0
+        self.batch_size = batch_size
+        self.max_cached_sessions = max_cached_sessions
+        self.session_ttl = getattr(backend, "session_ttl", 3600)
+        self.max_messages = getattr(backend, "max_messages", None)
+
+        self._sessions: "OrderedDict[str, _SessionEntry]" = OrderedDict()
+        self._flush_task: Optional[asyncio.Task] = None
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._deleted_during_flush: set = set()
+        self._closed = False
+
+        add_message = getattr(backend, "add_message_to_session", None)
+        self._backend_takes_message = bool(add_message) and "message" in inspect.signature(add_message).parameters
+
+        self.stats = {
+            'local_hits': 0,
+            'backend_loads': 0,
+            'writes': 0,
+            'flushes': 0,
+            'sessions_flushed': 0,
+            'messages_flushed': 0,
+            'flush_errors': 0,
+            'last_flush_seconds': 0.0
+        }
+
+        logger.info(f"📝 Write-behind sessions enabled over {type(backend).__name__} "
+                    f"(flush every {flush_interval_ms}ms, batch {batch_size})")
+
+    def __getattr__(self, name: str) -> Any:
+        # Only called for attributes not defined here: pass through to the backend
+        if name == "backend":
+            raise AttributeError(name)
+        return getattr(self.backend, name)
+
+    # --- Background flushing ---
+
+    def start(self) -> None:
+        """Start the background flush task on the running event loop (idempotent)."""
+        if self._closed or (self._flush_task and not self._flush_task.done()):
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        if self._flush_lock is None:
+            self._flush_lock = asyncio.Lock()
+        self._flush_task = loop.create_task(self._flush_loop())
+        logger.info("📝 Session write-behind flusher started")
+
+    async def _flush_loop(self) -> None:
+        while not self._closed:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"❌ Session flush failed: {e}")
+
+    async def flush(self) -> int:
+        """
+        Write all dirty sessions to the backend in batches.
+
+        Returns:
+            Number of sessions written
+        """
+        if self._flush_lock is None:
+            self._flush_lock = asyncio.Lock()
+
+        async with self._flush_lock:
+            try:
+                return await self._flush_dirty()
+            finally:
+                await self._redelete_flushed()
+
+    async def _flush_dirty(self) -> int:
+        start_time = time.time()
+        dirty_ids = [session_id for session_id, entry in self._sessions.items() if entry.dirty]
+        written = 0
+
+        for offset in range(0, len(dirty_ids), self.batch_size):
+            batch = []
+            for session_id in dirty_ids[offset:offset + self.batch_size]:
+                entry = self._sessions.get(session_id)
+                if entry is None or not entry.dirty:
+                    continue
+                # Snapshot so writes made while the batch is in flight stay dirty
+                batch.append((session_id, entry, entry.version, copy.deepcopy(entry.data),
+                              list(entry.pending_messages)))
+            if not batch:
+                continue
+
+            try:
+                await self._write_batch([(session_id, data, messages)
+                                         for session_id, _, _, data, messages in batch])
+            except Exception as e:
+                self.stats['flush_errors'] += 1
+                logger.error(f"❌ Failed to flush {len(batch)} sessions (will retry): {e}")
+                break
+
+            for session_id, entry, version, _, messages in batch:
+                entry.flushed_version = max(entry.flushed_version, version)
+                del entry.pending_messages[:len(messages)]
+                self.stats['messages_flushed'] += len(messages)
+            written += len(batch)
+
+        if written:
+            self.stats['flushes'] += 1
+            self.stats['sessions_flushed'] += written
+            self.stats['last_flush_seconds'] = time.time() - start_time
+            logger.debug(f"📝 Flushed {written} sessions in {self.stats['last_flush_seconds']:.3f}s")
+
+        self._evict()
+        return written
+
+    async def _redelete_flushed(self) -> None:
+        # A batch snapshotted before delete_session ran can write the session back; delete it again
+        deleted, self._deleted_during_flush = self._deleted_during_flush, set()
+        for session_id in deleted:
+            if session_id not in self._sessions:
+                try:
+                    await asyncio.to_thread(self.backend.delete_session, session_id)
+                except Exception as e:
+                    logger.error(f"❌ Failed to re-delete session {session_id} after flush: {e}")
+
+    async def _write_batch(self, items: List[Tuple[str, Dict[str, Any], List[Dict[str, Any]]]]) -> None:
+        async_backend = getattr(self.backend, "async_manager", None)
+        if async_backend is not None and hasattr(async_backend, "save_sessions_batch"):
+            await async_backend.save_sessions_batch(items)
+            return
+
+        # Sync backends (file, memory): one worker thread call per batch
+        await asyncio.to_thread(self._write_batch_sync, items)
+
+    @staticmethod
+    def _without_pending(data: Dict[str, Any], messages: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Snapshot as it was before ``messages`` were added, so appending them does not duplicate them."""
+        if not messages:
+            return data
+        data = dict(data)
+        history = data.get("messages") or []
+        if history[-len(messages):] == messages:
+            data["messages"] = history[:-len(messages)]
+        else:
+            data.pop("messages", None)
+        data["message_count"] = max(0, data.get("message_count", len(messages)) - len(messages))
+        return data
+
+    def _write_batch_sync(self, items: List[Tuple[str, Dict[str, Any], List[Dict[str, Any]]]]) -> None:
+        for session_id, data, messages in items:
+            # The pending messages are appended below; the saved snapshot must not carry them too
+            self.backend.save_session(session_id, self._without_pending(data, messages))
+            for message in messages:
+                if self._backend_takes_message:
+                    self.backend.add_message_to_session(session_id, message=message)
+                else:
+                    self.backend.add_message_to_session(session_id, role=message.get("role"),
+                                                        content=message.get("content"))
+
+    def _evict(self) -> None:
+        now = time.time()
+        for session_id, entry in list(self._sessions.items()):
+            over_capacity = len(self._sessions) > self.max_cached_sessions
+            idle = now - entry.last_access > self.session_ttl
+            if not (over_capacity or idle):
+                break
+            if not entry.dirty:
+                del self._sessions[session_id]
+
+    async def close(self) -> None:
+        """Stop the background task and flush every remaining dirty session."""
+        self._closed = True
+        if self._flush_task:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+
+        written = await self.flush()
+        remaining = sum(1 for entry in self._sessions.values() if entry.dirty)
+        if remaining:
+            logger.error(f"❌ {remaining} sessions could not be flushed on shutdown")
+        else:
+            logger.info(f"✅ Session write-behind flushed {written} sessions on shutdown")
+
+    # --- Session access (hot path) ---
+
+    def _entry(self, session_id: str) -> Optional[_SessionEntry]:
+        entry = self._sessions.get(session_id)
+        if entry is None:
+            return None
+        if not entry.dirty and time.time() - entry.last_access > self.session_ttl:
+            # Expired locally; the backend copy has expired by now as well
+            del self._sessions[session_id]
+            return None
+        entry.last_access = time.time()
+        self._sessions.move_to_end(session_id)
+        return entry
+
+    def _mark_written(self, session_id: str, data: Dict[str, Any]) -> _SessionEntry:
+        entry = self._sessions.get(session_id)
+        if entry is None:
+            entry = _SessionEntry(data, version=0)
+            self._sessions[session_id] = entry
+        entry.data = data
+        entry.version += 1
+        entry.last_access = time.time()
+        self._sessions.move_to_end(session_id)
+        self.stats['writes'] += 1
+        self.start()
+        return entry
+
+    async def _load(self, session_id: str) -> Optional[Dict[str, Any]]:
+        async_backend = getattr(self.backend, "async_manager", None)
+        if async_backend is not None:
+            return await async_backend.get_session(session_id)
+        result = await asyncio.to_thread(self.backend.get_session, session_id)
+        if inspect.isawaitable(result):
+            result = await result
+        return result
+
+    async def get_session(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a session, from memory when held locally.
+
+        Args:
+            session_id: Session identifier
+
+        Returns:
+            Session data (the live local copy) or None if not found
+        """
+        entry = self._entry(session_id)
+        if entry is not None:
+            self.stats['local_hits'] += 1
+            return entry.data
+
+        session = await self._load(session_id)
+        self.stats['backend_loads'] += 1
+        if not session:
+            return None
+
+        # A write may have raced the load; it wins
+        entry = self._sessions.get(session_id)
+        if entry is not None:
+            return entry.data
+        self._sessions[session_id] = _SessionEntry(session)
+        self._evict()
+        return session
+
+    async def save_session(self, session_id: str, session_data: Dict[str, Any]) -> bool:
+        """
+        Record a session write; it is persisted by the next flush.
+
+        Args:
+            session_id: Session identifier
+            session_data: Complete session data
+
+        Returns:
+            True
+        """
+        session_data["last_accessed"] = time.time()
+        self._mark_written(session_id, session_data)
+        return True
+
+    async def update_session(self, session_id: str, updates: Dict[str, Any]) -> bool:
+        """
+        Update individual session fields; persisted by the next flush.
+
+        Args:
+            session_id: Session identifier
+            updates: Fields to update
+
+        Returns:
+            True if successful, False if the session was not found
+        """
+        session = await self.get_session(session_id)
+        if session is None:
+            return False
+        session.update({key: value for key, value in updates.items() if key not in ("session_id", "created_at")})
+        return await self.save_session(session_id, session)
+
+    async def add_message_to_session(self, session_id: str, message: Dict[str, Any] = None,
+                                     role: str = None, content: str = None) -> bool:
+        """
+        Append a message to a session; it is appended in the backend by the next flush.
+
+        Args:
+            session_id: Session identifier
+            message: Message data dictionary (optional)
+            role: Message role ('user' or 'assistant')
+            content: Message content
+
+        Returns:
+            True if successful
+        """
+        msg = build_message(message, role, content)
+        if msg is None:
+            logger.error("Either message dict or role+content must be provided")
+            return False
+
+        session = await self.get_session(session_id)
+        if session is None:
+            session = {"session_id": session_id, "created_at": time.time(), "messages": [], "message_count": 0}
+
+        messages = session.get("messages", []) + [msg]
+        session["messages"] = messages[-self.max_messages:] if self.max_messages else messages
+        session["message_count"] = session.get("message_count", 0) + 1
+        entry = self._mark_written(session_id, session)
+        entry.pending_messages.append(msg)
+        return True
+
+    # --- Pass-through operations that must see local state ---
+
+    def delete_session(self, session_id: str) -> bool:
+        """Drop the local copy (including unflushed changes) and delete from the backend."""
+        self._sessions.pop(session_id, None)
+        if self._flush_lock is not None and self._flush_lock.locked():
+            # An in-flight batch may still hold a snapshot; flush deletes it again once written
+            self._deleted_during_flush.add(session_id)
+        return self.backend.delete_session(session_id)
+
+    def get_context(self, session_id: str) -> Dict[str, Any]:
+        """Get session context, from memory when held locally."""
+        entry = self._sessions.get(session_id)
+        if entry is not None:
+            return entry.data.get("context", {})
+        return self.backend.get_context(session_id)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get write-behind statistics.
+
+        Returns:
+            Dictionary with hit, write and flush counters and the current dirty count
+        """
+        return {
+            **self.stats,
+            "cached_sessions": len(self._sessions),
+            "dirty_sessions": sum(1 for entry in self._sessions.values() if entry.dirty),
+            "flusher_running": bool(self._flush_task and not self._flush_task.done())
+        }
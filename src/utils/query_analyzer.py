@@ -32,6 +32,7 @@ class QueryAnalyzer:
         self.query_stats = defaultdict(list)
         self.slow_queries = []
         self.query_plans = {}
+        self.statement_stats = defaultdict(lambda: {'hits': 0, 'misses': 0, 'unprepared': 0})
     
     def record_query(self, query: str, params: Tuple, duration_ms: float, rows_affected: int) -> None:
         """
@@ -74,6 +75,49 @@ class QueryAnalyzer:
             
             logger.warning(f"Slow query detected ({duration_ms:.2f}ms): {normalized_query}")
     
+    def record_statement(self, shape: str, hit: Optional[bool]) -> None:
+        """
+        Record a prepared statement lookup for a query shape.
+        
+        Args:
+            shape: Query shape label
+            hit: True if the statement was already prepared on the connection,
+                False if it had to be prepared, None if the query ran unprepared
+        """
+        stats = self.statement_stats[shape]
+        if hit is None:
+            stats['unprepared'] += 1
+        elif hit:
+            stats['hits'] += 1
+        else:
+            stats['misses'] += 1
+    
+    def get_statement_cache_stats(self, include_shapes: bool = True) -> Dict[str, Any]:
+        """
+        Get prepared statement hit/miss statistics.
+        
+        Args:
+            include_shapes: Whether to include per-shape counters
+            
+        Returns:
+            Dictionary with totals, hit rate and (optionally) per-shape counters
+        """
+        shapes = {shape: dict(stats) for shape, stats in self.statement_stats.items()}
+        hits = sum(stats['hits'] for stats in shapes.values())
+        misses = sum(stats['misses'] for stats in shapes.values())
+        unprepared = sum(stats['unprepared'] for stats in shapes.values())
+        lookups = hits + misses
+        
+        result = {
+            'statement_hits': hits,
+            'statement_misses': misses,
+            'statement_unprepared': unprepared,
+            'statement_hit_rate': hits / lookups if lookups else 0.0
+        }
+        if include_shapes:
+            result['shapes'] = shapes
+        return result
+    
     def get_slow_queries(self) -> List[Dict[str, Any]]:
         """
         Get the list of slow queries.
@@ -416,3 +460,7 @@ class QueryAnalyzer:
                     columns.append(col)
         
         return columns
+
+
+# Shared analyzer for the process (prepared statement metrics report here)
+query_analyzer = QueryAnalyzer()
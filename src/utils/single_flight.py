@@ -0,0 +1,149 @@
+"""
+Request coalescing ("single-flight") for the Egypt Tourism Chatbot.
+
+Concurrent callers that ask for the same key share one in-flight call
+instead of each issuing their own, e.g. identical LLM prompts arriving
+during a burst of traffic.
+"""
+import asyncio
+import hashlib
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def make_prompt_key(prompt: str, **params: Any) -> str:
+    """
+    Build a single-flight key from a prompt and the call parameters that affect its result.
+
+    Whitespace is collapsed so that trivially different renderings of the same
+    prompt coalesce.
+
+    Args:
+        prompt: Prompt text
+        **params: Other call parameters (model, max_tokens, language, ...)
+
+    Returns:
+        Hex digest identifying the call
+    """
+    normalized_prompt = " ".join(prompt.split())
+    param_str = "|".join(f"{k}={params[k]}" for k in sorted(params))
+    return hashlib.sha256(f"{param_str}|{normalized_prompt}".encode("utf-8")).hexdigest()
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent async calls that share a key.
+
+    The first caller for a key (the leader) starts the call as a task; callers
+    arriving while it is in flight await the same task. The result, or the
+    exception, is delivered to every waiter. The shared task is shielded, so a
+    cancelled or timed-out waiter does not cancel the call for the others; it
+    is cancelled only once every waiter has gone away. Each waiter can pass its
+    own timeout, so joining a call started with a longer one never makes it
+    wait longer than it asked to.
+    """
+
+    def __init__(self, name: str = "single_flight"):
+        """
+        Initialize the single-flight group.
+
+        Args:
+            name: Name used in logs and stats
+        """
+        self.name = name
+        self._in_flight: Dict[str, asyncio.Task] = {}
+        self._waiters: Dict[str, int] = {}
+        self.stats = {
+            'leader_calls': 0,
+            'coalesced_waits': 0,
+            'errors': 0,
+            'max_waiters': 0,
+            'total_coalesced_wait_time': 0.0
+        }
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]], timeout: Optional[float] = None) -> Any:
+        """
+        Run ``fn`` for ``key``, or join the call already in flight for it.
+
+        Args:
+            key: Coalescing key (see make_prompt_key)
+            fn: Zero-argument coroutine function performing the call
+            timeout: Seconds this caller waits for the shared result (optional)
+
+        Returns:
+            The shared result
+
+        Raises:
+            asyncio.TimeoutError: If ``timeout`` elapses first; the shared call
+                keeps running for any other waiters
+            Exception: Whatever the shared call raised
+        """
+        result, _ = await self.do_with_info(key, fn, timeout=timeout)
+        return result
+
+    async def do_with_info(self, key: str, fn: Callable[[], Awaitable[Any]],
+                           timeout: Optional[float] = None) -> Tuple[Any, bool]:
+        """
+        Like do(), but also report whether this caller joined an existing call.
+
+        Returns:
+            Tuple of (shared result, coalesced flag)
+        """
+        task = self._in_flight.get(key)
+        is_leader = task is None
+
+        if is_leader:
+            self.stats['leader_calls'] += 1
+            task = asyncio.ensure_future(fn())
+            self._in_flight[key] = task
+            self._waiters[key] = 1
+            task.add_done_callback(lambda t, k=key: self._on_done(k, t))
+        else:
+            self.stats['coalesced_waits'] += 1
+            self._waiters[key] += 1
+            self.stats['max_waiters'] = max(self.stats['max_waiters'], self._waiters[key])
+            logger.debug(f"🔗 {self.name}: coalesced call onto in-flight request ({self._waiters[key]} waiters)")
+
+        start_time = time.time()
+        try:
+            return await asyncio.wait_for(asyncio.shield(task), timeout), not is_leader
+        except (asyncio.CancelledError, asyncio.TimeoutError):
+            if key in self._waiters and self._in_flight.get(key) is task:
+                self._waiters[key] -= 1
+                if self._waiters[key] <= 0 and not task.done():
+                    task.cancel()
+            raise
+        finally:
+            if not is_leader:
+                self.stats['total_coalesced_wait_time'] += time.time() - start_time
+
+    def _on_done(self, key: str, task: asyncio.Task) -> None:
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+            self._waiters.pop(key, None)
+        if not task.cancelled() and task.exception() is not None:
+            self.stats['errors'] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get coalescing statistics.
+
+        Returns:
+            Dictionary with leader/coalesced counts and the share of calls saved
+        """
+        total = self.stats['leader_calls'] + self.stats['coalesced_waits']
+        return {
+            "leader_calls": self.stats['leader_calls'],
+            "coalesced_waits": self.stats['coalesced_waits'],
+            "coalesced_rate": (self.stats['coalesced_waits'] / total) * 100 if total else 0.0,
+            "errors": self.stats['errors'],
+            "max_waiters": self.stats['max_waiters'],
+            "average_coalesced_wait_time": (
+                self.stats['total_coalesced_wait_time'] / self.stats['coalesced_waits']
+                if self.stats['coalesced_waits'] else 0.0
+            ),
+            "in_flight": len(self._in_flight)
+        }
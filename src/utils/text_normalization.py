@@ -0,0 +1,74 @@
+"""
+Text normalization helpers for the Egypt Tourism Chatbot.
+
+Provides a single bilingual (Arabic/English) normalization used wherever
+texts are compared or used as lookup keys.
+"""
+import re
+import unicodedata
+
+# Arabic diacritics (tashkeel) and tatweel, as (first, last) code point ranges
+ARABIC_DIACRITIC_RANGES = (
+    ('\u0610', '\u061A'),
+    ('\u064B', '\u065F'),
+    ('\u0670', '\u0670'),
+    ('\u06D6', '\u06ED'),
+    ('\u0640', '\u0640'),
+)
+_ARABIC_DIACRITICS = re.compile(
+    '[' + ''.join(first if first == last else f'{first}-{last}' for first, last in ARABIC_DIACRITIC_RANGES) + ']'
+)
+
+# Arabic letter variants folded to a canonical form
+ARABIC_LETTER_FOLDS = {
+    '\u0623': '\u0627',  # alef with hamza above -> alef
+    '\u0625': '\u0627',  # alef with hamza below -> alef
+    '\u0622': '\u0627',  # alef with madda -> alef
+    '\u0671': '\u0627',  # alef wasla -> alef
+    '\u0649': '\u064A',  # alef maqsura -> ya
+    '\u0629': '\u0647',  # ta marbuta -> ha
+    '\u0624': '\u0648',  # waw with hamza -> waw
+    '\u0626': '\u064A',  # ya with hamza -> ya
+}
+_ARABIC_CHAR_MAP = str.maketrans(ARABIC_LETTER_FOLDS)
+
+_PUNCTUATION = re.compile(r'[^\w\s]', re.UNICODE)
+_WHITESPACE = re.compile(r'\s+')
+
+
+def normalize_arabic(text: str) -> str:
+    """
+    Fold Arabic orthographic variants (alef forms, alef maqsura, ta marbuta)
+    and strip diacritics.
+
+    Args:
+        text: Text to normalize
+
+    Returns:
+        Normalized text
+    """
+    if not text:
+        return ""
+    text = _ARABIC_DIACRITICS.sub('', text)
+    return text.translate(_ARABIC_CHAR_MAP)
+
+
+def normalize_text(text: str, strip_punctuation: bool = True) -> str:
+    """
+    Normalize text for comparison: Unicode NFKC, lowercase, Arabic folding,
+    optional punctuation removal and whitespace collapsing.
+
+    Args:
+        text: Text to normalize
+        strip_punctuation: Whether to replace punctuation with spaces
+
+    Returns:
+        Normalized text
+    """
+    if not text:
+        return ""
+    text = unicodedata.normalize('NFKC', text).lower()
+    text = normalize_arabic(text)
+    if strip_punctuation:
+        text = _PUNCTUATION.sub(' ', text)
+    return _WHITESPACE.sub(' ', text).strip()
@@ -145,6 +145,49 @@ class VectorMonitor:
             elif error:
                 logger.error(log_message)
                 
+    @staticmethod
+    def log_ann_recall(collection: str,
+                       k: int,
+                       nprobe: int,
+                       queries: int,
+                       recall_at_k: float,
+                       ann_avg_ms: float,
+                       exact_avg_ms: float) -> None:
+        """
+        Log an ANN recall@k evaluation against brute-force search.
+        
+        Args:
+            collection (str): Collection name
+            k (int): Number of neighbours compared
+            nprobe (int): IVF lists probed
+            queries (int): Number of evaluation queries
+            recall_at_k (float): Share of exact top-k neighbours found by the ANN index
+            ann_avg_ms (float): Mean ANN search time in milliseconds
+            exact_avg_ms (float): Mean exact search time in milliseconds
+        """
+        metrics = {
+            "metric": "ann_recall",
+            "collection": collection,
+            "k": k,
+            "nprobe": nprobe,
+            "queries": queries,
+            "recall_at_k": recall_at_k,
+            "ann_avg_ms": ann_avg_ms,
+            "exact_avg_ms": exact_avg_ms,
+            "speedup": exact_avg_ms / ann_avg_ms if ann_avg_ms else None,
+            "timestamp": time.time()
+        }
+        vector_metrics_logger.info(json.dumps(metrics))
+        
+        log_message = (
+            f"ANN recall@{k} on {collection} (nprobe={nprobe}, {queries} queries): {recall_at_k:.3f}, "
+            f"ann {ann_avg_ms:.2f}ms vs exact {exact_avg_ms:.2f}ms"
+        )
+        if recall_at_k < 0.9:
+            logger.warning(log_message)
+        else:
+            logger.info(log_message)
+                
     @staticmethod
     def monitor_vector_search(func):
         """
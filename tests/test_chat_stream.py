@@ -0,0 +1,93 @@
+"""
+Tests for Chatbot.process_message_stream disconnect and error handling.
+"""
+import asyncio
+
+import pytest
+
+chatbot_service = pytest.importorskip("src.services.chatbot_service")
+
+
+class SlowSessionManager:
+    """Async session manager whose saves suspend, like the Redis backend."""
+
+    def __init__(self):
+        self.saved = {}
+
+    async def get_session(self, session_id):
+        return None
+
+    async def save_session(self, session_id, session):
+        await asyncio.sleep(0.05)
+        self.saved[session_id] = {**session, "conversation_history": list(session.get("conversation_history", []))}
+        return True
+
+
+class StalledStreamService:
+    """Streams one chunk, then waits until the consumer goes away."""
+
+    async def stream_response_async(self, prompt, max_tokens=400):
+        yield "The pyramids of Giza "
+        await asyncio.Event().wait()
+
+
+def make_chatbot(monkeypatch, session_manager, service):
+    placeholder = object()
+    chatbot = chatbot_service.Chatbot(None, placeholder, placeholder, placeholder, placeholder,
+                                      session_manager, placeholder)
+    monkeypatch.setattr(chatbot, "_get_anthropic_service", lambda: service)
+    return chatbot
+
+
+def test_disconnect_saves_partial_turn_despite_repeated_cancellation(monkeypatch):
+    session_manager = SlowSessionManager()
+    chatbot = make_chatbot(monkeypatch, session_manager, StalledStreamService())
+
+    async def scenario():
+        first_delta = asyncio.Event()
+
+        async def consume():
+            async for event in chatbot.process_message_stream("Tell me about Giza", "s1", "en"):
+                if event["event"] == "delta":
+                    first_delta.set()
+
+        consumer = asyncio.create_task(consume())
+        await first_delta.wait()
+        consumer.cancel()
+        await asyncio.sleep(0.01)
+        # A cancel scope re-delivers cancellation while the save is in progress
+        consumer.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await consumer
+        await asyncio.sleep(0.1)
+
+    asyncio.run(scenario())
+
+    history = session_manager.saved["s1"]["conversation_history"]
+    assert [turn["assistant"] for turn in history] == ["The pyramids of Giza"]
+
+
+def test_error_after_deltas_does_not_append_emergency_text(monkeypatch):
+    class OneChunkService:
+        async def stream_response_async(self, prompt, max_tokens=400):
+            yield "Karnak is in Luxor."
+
+    chatbot = make_chatbot(monkeypatch, SlowSessionManager(), OneChunkService())
+
+    def fail(response_text):
+        raise RuntimeError("cache check failed")
+
+    monkeypatch.setattr(chatbot, "_is_cacheable_llm_text", fail)
+
+    async def collect():
+        return [event async for event in chatbot.process_message_stream("Where is Karnak?", "s2", "en")]
+
+    events = asyncio.run(collect())
+
+    deltas = "".join(event["text"] for event in events if event["event"] == "delta")
+    done = events[-1]
+    assert deltas.startswith("Karnak is in Luxor")
+    assert "Egypt tourism assistant" not in deltas
+    assert done["event"] == "done"
+    assert done["response"]["partial"] is True
+    assert done["response"]["text"] == "Karnak is in Luxor."
@@ -0,0 +1,38 @@
+"""
+Tests for gazetteer matching in EnhancedEntityExtractor.
+"""
+import pytest
+
+enhanced_entity = pytest.importorskip("src.nlu.enhanced_entity")
+
+ENTITY_LISTS = {
+    "hotel": ["Mena House"],
+    "restaurant": ["Abou El Sid"],
+}
+
+
+def make_extractor():
+    extractor = enhanced_entity.EnhancedEntityExtractor("en", {}, nlp_model=None, knowledge_base=None)
+    extractor.entity_lists = ENTITY_LISTS
+    extractor.gazetteer = extractor._build_gazetteer()
+    return extractor
+
+
+def test_extract_fast_keeps_gazetteer_matches_to_intent_entity_types():
+    extractor = make_extractor()
+
+    result = extractor.extract_fast("Dinner at Abou El Sid, then back to Mena House", intent="restaurant_info")
+
+    assert result["entities"].get("restaurant") == ["Abou El Sid"]
+    assert "hotel" not in result["entities"]
+
+
+def test_refresh_rebuilds_gazetteer_from_entity_lists(monkeypatch):
+    extractor = make_extractor()
+    monkeypatch.setattr(extractor, "_load_entity_lists", lambda: {"hotel": ["Old Cataract"]})
+    monkeypatch.setattr(extractor, "build_entity_vectors", lambda: {})
+
+    extractor.refresh_entity_lists()
+
+    assert extractor.gazetteer.best_match("Old Cataract", "hotel") is not None
+    assert extractor.gazetteer.best_match("Mena House", "hotel") is None
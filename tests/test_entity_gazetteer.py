@@ -0,0 +1,38 @@
+"""
+Tests for EntityGazetteer exact-before-fuzzy matching.
+"""
+import pytest
+
+from src.nlu.entity_gazetteer import EntityGazetteer
+
+
+@pytest.fixture
+def gazetteer():
+    return EntityGazetteer({
+        "attraction": ["Karnak Temple", "Luxor Temple", "Valley of the Kings", "Kings Valley Lodge"],
+        "hotel": ["Luxor Temple View"],
+    })
+
+
+@pytest.mark.parametrize("text, expected, min_ratio", [
+    ("karnak temple and", "Karnak Temple", 0.85),
+    # A looser threshold lets the whole window fuzzy-match "Luxor Temple" at 0.8;
+    # "Valley of the Kings" makes the gazetteer scan windows that wide.
+    ("visit luxor temple", "Luxor Temple", 0.75),
+])
+def test_exact_phrase_beats_fuzzy_match_on_a_wider_window(text, expected, min_ratio):
+    gazetteer = EntityGazetteer(
+        {"attraction": ["Karnak Temple", "Luxor Temple", "Valley of the Kings"]}, min_ratio=min_ratio
+    )
+
+    matches = gazetteer.match(text)
+
+    assert [(match.value, match.score) for match in matches] == [(expected, 0.95)]
+
+
+def test_fuzzy_matching_still_covers_tokens_without_an_exact_hit(gazetteer):
+    matches = gazetteer.match("karnak tempel and the valley of the kings")
+
+    assert [match.value for match in matches] == ["Karnak Temple", "Valley of the Kings"]
+    assert 0.85 <= matches[0].score < 0.95
+    assert matches[1].score == 0.95
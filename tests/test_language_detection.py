@@ -0,0 +1,34 @@
+"""
+Tests for LanguageDetector script short-circuiting.
+"""
+import pytest
+
+language = pytest.importorskip("src.nlu.language")
+
+
+@pytest.fixture
+def detector():
+    return language.LanguageDetector()
+
+
+@pytest.mark.parametrize("text", ["hola", "bonjour le caire", "ezayak", "ezayak 3amel eh"])
+def test_ambiguous_latin_text_is_not_reported_as_confident_english(detector, text):
+    detected, confidence = detector.detect(text)
+
+    assert detected == "en"
+    assert confidence < detector.confidence_threshold
+    assert detector.stats["script_short_circuits"] == 0
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("What are the best hotels in Luxor?", "en"),
+    ("how far is abu simbel from aswan", "en"),
+    ("ما هو أفضل فندق في الأقصر", "ar"),
+])
+def test_arabic_script_and_clear_english_skip_the_model(detector, text, expected):
+    detected, confidence = detector.detect(text)
+
+    assert detected.startswith(expected)
+    assert confidence == detector.script_confidence
+    assert detector.stats["script_short_circuits"] == 1
+    assert detector.stats["model_detections"] == 0
@@ -0,0 +1,106 @@
+"""
+Tests for parallel retrieval in src.rag.pipeline.RAGPipeline.
+"""
+import threading
+from contextlib import contextmanager
+
+from src.rag.pipeline import RAGPipeline
+
+
+class FakeConnection:
+    """Stands in for a pooled psycopg2 connection."""
+
+    def __init__(self):
+        self.rolled_back = False
+
+    def rollback(self):
+        self.rolled_back = True
+
+
+class PooledDbManager:
+    """Db manager whose searches run on a connection bound per thread."""
+
+    def __init__(self):
+        self._local = threading.local()
+        self.connections = []
+        self.lock = threading.Lock()
+        # Both sources must be inside a query at the same time to finish
+        self.barrier = threading.Barrier(2, timeout=2)
+
+    @contextmanager
+    def pooled_connection(self):
+        conn = FakeConnection()
+        with self.lock:
+            self.connections.append(conn)
+        self._local.connection = conn
+        try:
+            yield conn
+        finally:
+            self._local.connection = None
+            conn.rollback()
+
+    def vector_search_attractions(self, embedding, limit=10):
+        conn = self._local.connection
+        self.barrier.wait()
+        assert not conn.rolled_back
+        return [{"id": 1, "similarity": 0.9, "connection": conn}]
+
+    def vector_search_hotels(self, embedding, limit=10):
+        self.barrier.wait()
+        raise RuntimeError("hotels table is missing")
+
+
+class SharedConnectionDbManager:
+    """Db manager with a single shared connection and no pooled_connection."""
+
+    def __init__(self):
+        self.connection = FakeConnection()
+        self.calls = []
+
+    def vector_search_attractions(self, embedding, limit=10):
+        self.calls.append(("attractions", threading.current_thread().name))
+        return [{"id": 1, "similarity": 0.9}]
+
+    def vector_search_hotels(self, embedding, limit=10):
+        self.calls.append(("hotels", threading.current_thread().name))
+        raise RuntimeError("hotels table is missing")
+
+
+def make_pipeline(db_manager):
+    return RAGPipeline(knowledge_base=None, db_manager=db_manager,
+                       config={"cache_enabled": False, "retrieval_timeout": 2.0})
+
+
+def test_parallel_sources_use_own_connections_and_survive_a_failure():
+    db_manager = PooledDbManager()
+    pipeline = make_pipeline(db_manager)
+
+    results, metadata = pipeline.retrieve_content(
+        "pyramids", use_hybrid=False, content_types=["attractions", "hotels"],
+        rerank=False, return_metadata=True)
+
+    assert [result["id"] for result in results] == [1]
+    assert results[0]["source"] == "attractions"
+    assert metadata["sources"]["attractions"]["status"] == "ok"
+    assert metadata["sources"]["hotels"]["status"] == "error"
+    assert metadata["partial"] is True
+    # Each source ran on its own connection, released after its search
+    assert len(db_manager.connections) == 2
+    assert db_manager.connections[0] is not db_manager.connections[1]
+    assert all(conn.rolled_back for conn in db_manager.connections)
+
+
+def test_shared_connection_sources_run_sequentially_in_caller():
+    db_manager = SharedConnectionDbManager()
+    pipeline = make_pipeline(db_manager)
+
+    results, metadata = pipeline.retrieve_content(
+        "pyramids", use_hybrid=False, content_types=["attractions", "hotels"],
+        rerank=False, return_metadata=True)
+
+    assert [result["id"] for result in results] == [1]
+    assert metadata["sources"]["hotels"]["status"] == "error"
+    assert [name for name, _ in db_manager.calls] == ["attractions", "hotels"]
+    assert {thread for _, thread in db_manager.calls} == {threading.current_thread().name}
+    assert db_manager.connection.rolled_back  # Failed query rolled back on the shared connection
+    assert pipeline._retrieval_executor is None
@@ -0,0 +1,70 @@
+"""
+Tests for expiry-index cleanup in the sync and asyncio Redis session managers.
+"""
+import asyncio
+import time
+
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis")
+redis_manager = pytest.importorskip("src.session.redis_manager")
+
+from src.session.async_redis_manager import AsyncRedisSessionManager  # noqa: E402
+from src.session.expiry_index import EXPIRY_INDEX_KEY, EXPIRY_OWNERS_KEY  # noqa: E402
+from src.session.redis_connection import RedisConnectionManager  # noqa: E402
+from src.session.redis_manager import (  # noqa: E402
+    RedisSessionManager,
+    messages_key,
+    session_key,
+    user_sessions_key,
+)
+
+# Two days ago: past the default one-day cleanup threshold
+PAST_DUE = time.time() - 2 * 24 * 60 * 60
+
+
+def expire_in_redis(client, session_id):
+    """Simulate Redis expiring a session's keys while its index entry is past due."""
+    client.delete(session_key(session_id), messages_key(session_id))
+    client.zadd(EXPIRY_INDEX_KEY, {session_id: PAST_DUE})
+
+
+def test_cleanup_removes_expired_session_from_user_set(monkeypatch):
+    client = fakeredis.FakeRedis()
+    monkeypatch.setattr(RedisConnectionManager, "get_redis_client", classmethod(lambda cls, uri: client))
+    monkeypatch.setattr(RedisConnectionManager, "is_redis_healthy", classmethod(lambda cls, uri: True))
+    manager = RedisSessionManager("redis://expiry-test", session_ttl=60)
+
+    expired = manager.create_session(user_id="user-1")
+    live = manager.create_session(user_id="user-1")
+    expire_in_redis(client, expired)
+
+    # Touching another session must not drop the past-due entry before cleanup sees it
+    assert manager.get_session(live) is not None
+    assert client.zscore(EXPIRY_INDEX_KEY, expired) is not None
+
+    assert manager.cleanup_expired_sessions() == 1
+    assert client.smembers(user_sessions_key("user-1")) == {live.encode()}
+    assert client.zscore(EXPIRY_INDEX_KEY, expired) is None
+    assert client.hget(EXPIRY_OWNERS_KEY, expired) is None
+
+
+def test_async_cleanup_removes_expired_session_from_user_set(monkeypatch):
+    client = fakeredis.FakeAsyncRedis(decode_responses=True)
+    monkeypatch.setattr(RedisConnectionManager, "get_async_redis_client", classmethod(lambda cls, uri: client))
+    manager = AsyncRedisSessionManager("redis://expiry-test", session_ttl=60)
+
+    async def scenario():
+        expired = await manager.create_session(user_id="user-1")
+        live = await manager.create_session(user_id="user-1")
+        await client.delete(session_key(expired), messages_key(expired))
+        await client.zadd(EXPIRY_INDEX_KEY, {expired: PAST_DUE})
+
+        assert await manager.get_session(live) is not None
+        assert await client.zscore(EXPIRY_INDEX_KEY, expired) is not None
+
+        assert await manager.cleanup_expired_sessions() == 1
+        assert await client.smembers(user_sessions_key("user-1")) == {live}
+        assert await client.hget(EXPIRY_OWNERS_KEY, expired) is None
+
+    asyncio.run(scenario())
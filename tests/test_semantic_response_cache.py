@@ -0,0 +1,43 @@
+"""
+Tests for SemanticResponseCache statistics and their reporting through the chatbot.
+"""
+import pytest
+
+from src.services.semantic_response_cache import SemanticResponseCache
+
+
+def make_cache_with_one_hit_and_one_miss():
+    cache = SemanticResponseCache(estimated_cost_per_call=0.02)
+    cache.store_response("What are the opening hours of the Egyptian Museum?", "9am to 5pm", "en")
+    assert cache.lookup("what are the opening hours of the egyptian museum", "en") is not None
+    assert cache.lookup("How much is a felucca ride in Aswan?", "en") is None
+    return cache
+
+
+def test_stats_count_one_hit_and_one_miss():
+    stats = make_cache_with_one_hit_and_one_miss().get_stats()
+
+    assert stats["lookups"] == 2
+    assert stats["hits"] == 1
+    assert stats["exact_hits"] == 1
+    assert stats["semantic_hits"] == 0
+    assert stats["misses"] == 1
+    assert stats["hit_rate"] == pytest.approx(50.0)
+    assert stats["estimated_cost_saved_usd"] == pytest.approx(0.02)
+    assert stats["entries_by_language"] == {"en": 1}
+
+
+def test_chatbot_reports_response_cache_stats():
+    chatbot_service = pytest.importorskip("src.services.chatbot_service")
+    chatbot = chatbot_service.Chatbot(None, None, None, None, None, None, None,
+                                      response_cache=make_cache_with_one_hit_and_one_miss())
+
+    report = chatbot.get_response_cache_stats()
+
+    assert report["enabled"] is True
+    assert report["hits"] == 1
+    assert report["misses"] == 1
+    assert report["hit_rate"] == pytest.approx(50.0)
+    assert chatbot_service.Chatbot(None, None, None, None, None, None, None).get_response_cache_stats() == {
+        "enabled": False
+    }
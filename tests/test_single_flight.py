@@ -0,0 +1,60 @@
+"""
+Tests for per-caller timeouts in SingleFlight.
+"""
+import asyncio
+import time
+
+import pytest
+
+from src.utils.single_flight import SingleFlight
+
+
+def test_follower_timeout_does_not_wait_for_longer_leader_call():
+    single_flight = SingleFlight(name="test")
+    calls = []
+
+    async def slow_call():
+        calls.append(1)
+        await asyncio.sleep(0.2)
+        return "answer"
+
+    async def scenario():
+        leader = asyncio.create_task(single_flight.do("prompt", slow_call, timeout=1.0))
+        await asyncio.sleep(0)
+
+        started = time.monotonic()
+        with pytest.raises(asyncio.TimeoutError):
+            await single_flight.do("prompt", slow_call, timeout=0.05)
+        follower_wait = time.monotonic() - started
+
+        # The follower giving up leaves the shared call running for the leader
+        assert await leader == "answer"
+        return follower_wait
+
+    follower_wait = asyncio.run(scenario())
+
+    assert follower_wait < 0.15
+    assert calls == [1]
+    assert single_flight.get_stats()["coalesced_waits"] == 1
+
+
+def test_shared_call_cancelled_when_only_waiter_times_out():
+    single_flight = SingleFlight(name="test")
+    cancelled = []
+
+    async def hanging_call():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(1)
+            raise
+
+    async def scenario():
+        with pytest.raises(asyncio.TimeoutError):
+            await single_flight.do("prompt", hanging_call, timeout=0.05)
+        await asyncio.sleep(0)
+
+    asyncio.run(scenario())
+
+    assert cancelled == [1]
+    assert single_flight.get_stats()["in_flight"] == 0
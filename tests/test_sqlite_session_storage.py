@@ -0,0 +1,33 @@
+"""
+Tests for importing legacy JSON sessions into SQLiteSessionStorage.
+"""
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+session_service = pytest.importorskip("src.services.session_service")
+
+
+def write_legacy_session(directory, session_id, last_activity):
+    session = {"id": session_id, "last_activity": last_activity.isoformat(), "context": {}}
+    (directory / f"{session_id}.json").write_text(json.dumps(session), encoding="utf-8")
+
+
+def test_import_keeps_legacy_last_activity(tmp_path):
+    legacy_dir = tmp_path / "sessions"
+    legacy_dir.mkdir()
+    write_legacy_session(legacy_dir, "stale", datetime.now() - timedelta(hours=2))
+    write_legacy_session(legacy_dir, "fresh", datetime.now() - timedelta(minutes=5))
+
+    storage = session_service.SQLiteSessionStorage(str(tmp_path / "sessions.db"), session_ttl=3600)
+    try:
+        assert storage.import_json_files(str(legacy_dir)) == 2
+        assert list(legacy_dir.iterdir()) == []
+
+        # The stale session keeps its age instead of getting a fresh TTL
+        assert storage.get("stale") is None
+        assert storage.get("fresh")["id"] == "fresh"
+        assert storage.delete_expired() == ["stale"]
+    finally:
+        storage.close()
@@ -0,0 +1,32 @@
+"""
+Tests for the PG_PREPARED_STATEMENTS switch of StatementRegistry.
+"""
+from src.knowledge.core.statement_registry import StatementRegistry
+
+
+class RecordingCursor:
+    def __init__(self):
+        self.statements = []
+
+    def execute(self, query, params=None):
+        self.statements.append(query)
+
+
+def test_registry_enabled_by_default(monkeypatch):
+    monkeypatch.delenv("PG_PREPARED_STATEMENTS", raising=False)
+    assert StatementRegistry().enabled is True
+
+
+def test_switch_disables_prepares(monkeypatch):
+    monkeypatch.setenv("PG_PREPARED_STATEMENTS", "false")
+    registry = StatementRegistry()
+    cursor = RecordingCursor()
+
+    assert registry.enabled is False
+    assert registry.execute(cursor, ("find", "attractions"), "SELECT * FROM attractions WHERE id = %s", (1,)) is False
+    assert cursor.statements == []
+
+
+def test_explicit_setting_overrides_environment(monkeypatch):
+    monkeypatch.setenv("PG_PREPARED_STATEMENTS", "false")
+    assert StatementRegistry(enabled=True).enabled is True